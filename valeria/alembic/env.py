@@ -43,6 +43,16 @@ from app.features.contributions.infrastructure.persistence.contribution_model im
 # ── New analysis models ───────────────────────────────────────────────────────
 from app.features.analysis.infrastructure.persistence.analysis_model import AnalysisJobModel, ExperimentModel
 
+# ── Image clustering models ───────────────────────────────────────────────────
+from app.features.cluster_images.infrastructure.persistence.cluster_model import (
+    ClusteringRunModel, ImageClusterModel, PhotographClusterModel,
+)
+
+# ── Object detection models ───────────────────────────────────────────────────
+from app.features.detect_objects.infrastructure.persistence.object_model import (
+    DetectedObjectModel, ObjectScanModel,
+)
+
 # this is the Alembic Config object
 config = context.config
 
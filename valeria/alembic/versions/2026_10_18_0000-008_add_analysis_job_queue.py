@@ -0,0 +1,27 @@
+"""Add background queue fields to analysis_jobs
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-18 00:00:00.000000
+
+analysis_jobs.status is stored as a plain string, so the new QUEUED and
+CANCELLED values need no schema change; only the retry counter is added.
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '008'
+down_revision: Union[str, None] = '007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('analysis_jobs') as batch_op:
+        batch_op.add_column(sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('analysis_jobs') as batch_op:
+        batch_op.drop_column('attempts')
@@ -0,0 +1,58 @@
+"""Add content hashes and the analysis result cache
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-18 01:00:00.000000
+
+photograph_files.content_sha256 is left NULL for existing rows; the
+analysis use cases hash those files lazily on their next analysis.
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '009'
+down_revision: Union[str, None] = '008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('photograph_files') as batch_op:
+        batch_op.add_column(sa.Column('content_sha256', sa.String(64), nullable=True))
+        batch_op.create_index('ix_photograph_files_content_sha256', ['content_sha256'])
+
+    with op.batch_alter_table('analysis_jobs') as batch_op:
+        batch_op.add_column(sa.Column('cache_hit', sa.Boolean(), nullable=False, server_default='0'))
+
+    op.create_table(
+        'analysis_result_cache',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('content_sha256', sa.String(64), nullable=False),
+        sa.Column('attribute_type', sa.String(30), nullable=False),
+        sa.Column('provider_name', sa.String(100), nullable=False),
+        sa.Column('provider_version', sa.String(50), nullable=False),
+        sa.Column('result', sa.JSON(), nullable=False),
+        sa.Column('hits', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column('last_used_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint(
+            'content_sha256', 'attribute_type', 'provider_name', 'provider_version',
+            name='uq_analysis_result_cache_key',
+        ),
+    )
+    op.create_index('ix_analysis_result_cache_id', 'analysis_result_cache', ['id'])
+    op.create_index('ix_analysis_result_cache_content_sha256', 'analysis_result_cache', ['content_sha256'])
+    op.create_index('ix_analysis_result_cache_last_used_at', 'analysis_result_cache', ['last_used_at'])
+
+
+def downgrade() -> None:
+    op.drop_table('analysis_result_cache')
+
+    with op.batch_alter_table('analysis_jobs') as batch_op:
+        batch_op.drop_column('cache_hit')
+
+    with op.batch_alter_table('photograph_files') as batch_op:
+        batch_op.drop_index('ix_photograph_files_content_sha256')
+        batch_op.drop_column('content_sha256')
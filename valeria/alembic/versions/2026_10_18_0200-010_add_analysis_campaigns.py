@@ -0,0 +1,53 @@
+"""Add analysis campaigns
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-18 02:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '010'
+down_revision: Union[str, None] = '009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'analysis_campaigns',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('scope_type', sa.String(30), nullable=False),
+        sa.Column('scope_id', sa.Integer(), nullable=False),
+        sa.Column('attribute_types', sa.JSON(), nullable=False),
+        sa.Column('concurrency', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(30), nullable=False),
+        sa.Column('total_photographs', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('skipped', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('triggered_by', sa.Integer(), nullable=True),
+        sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(['triggered_by'], ['users.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_analysis_campaigns_id', 'analysis_campaigns', ['id'])
+    op.create_index('ix_analysis_campaigns_status', 'analysis_campaigns', ['status'])
+
+    with op.batch_alter_table('analysis_jobs') as batch_op:
+        batch_op.add_column(sa.Column('campaign_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key(
+            'fk_analysis_jobs_campaign_id', 'analysis_campaigns',
+            ['campaign_id'], ['id'], ondelete='SET NULL',
+        )
+        batch_op.create_index('ix_analysis_jobs_campaign_id', ['campaign_id'])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('analysis_jobs') as batch_op:
+        batch_op.drop_index('ix_analysis_jobs_campaign_id')
+        batch_op.drop_constraint('fk_analysis_jobs_campaign_id', type_='foreignkey')
+        batch_op.drop_column('campaign_id')
+
+    op.drop_table('analysis_campaigns')
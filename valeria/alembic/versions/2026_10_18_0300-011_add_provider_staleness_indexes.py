@@ -0,0 +1,33 @@
+"""Index attribute records by provider version for staleness queries
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-18 03:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+
+revision: str = '011'
+down_revision: Union[str, None] = '010'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_TABLES = (
+    'attr_technical_metadata',
+    'attr_chronology_dating',
+    'attr_geographic_reference',
+    'attr_environmental_spatial',
+)
+
+
+def upgrade() -> None:
+    for table in _TABLES:
+        op.create_index(
+            f'ix_{table}_provider_staleness', table,
+            ['status', 'analysis_provider', 'provider_version'],
+        )
+
+
+def downgrade() -> None:
+    for table in _TABLES:
+        op.drop_index(f'ix_{table}_provider_staleness', table_name=table)
@@ -0,0 +1,36 @@
+"""Add per-job resource metrics to analysis_jobs
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-18 04:00:00.000000
+
+Existing jobs keep NULL metrics; only runs after the upgrade are measured.
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '012'
+down_revision: Union[str, None] = '011'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('analysis_jobs') as batch_op:
+        batch_op.add_column(sa.Column('decode_ms', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('inference_ms', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('db_write_ms', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('peak_memory_bytes', sa.BigInteger(), nullable=True))
+        batch_op.add_column(sa.Column('input_pixels', sa.BigInteger(), nullable=True))
+        batch_op.add_column(sa.Column('input_bytes', sa.BigInteger(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('analysis_jobs') as batch_op:
+        batch_op.drop_column('input_bytes')
+        batch_op.drop_column('input_pixels')
+        batch_op.drop_column('peak_memory_bytes')
+        batch_op.drop_column('db_write_ms')
+        batch_op.drop_column('inference_ms')
+        batch_op.drop_column('decode_ms')
@@ -0,0 +1,48 @@
+"""Add photograph_derivatives (web renditions of photograph files)
+
+Revision ID: 013
+Revises: 012
+Create Date: 2026-10-18 05:00:00.000000
+
+Files registered before this revision get their renditions on first
+request (on-demand generation), so no backfill is needed.
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '013'
+down_revision: Union[str, None] = '012'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'photograph_derivatives',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('photograph_file_id', sa.Integer(), nullable=False),
+        sa.Column('rendition', sa.String(30), nullable=False),
+        sa.Column('format', sa.String(30), nullable=False),
+        sa.Column('file_path', sa.String(512), nullable=False),
+        sa.Column('width_px', sa.Integer(), nullable=False),
+        sa.Column('height_px', sa.Integer(), nullable=False),
+        sa.Column('file_size_bytes', sa.Integer(), nullable=False),
+        sa.Column('source_sha256', sa.String(64), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(['photograph_file_id'], ['photograph_files.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint(
+            'photograph_file_id', 'rendition', 'format',
+            name='uq_photograph_derivatives_rendition',
+        ),
+    )
+    op.create_index('ix_photograph_derivatives_id', 'photograph_derivatives', ['id'])
+    op.create_index(
+        'ix_photograph_derivatives_photograph_file_id', 'photograph_derivatives', ['photograph_file_id'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('photograph_derivatives')
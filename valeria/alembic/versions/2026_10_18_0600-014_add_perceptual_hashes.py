@@ -0,0 +1,29 @@
+"""Add perceptual hashes to photograph files
+
+Revision ID: 014
+Revises: 013
+Create Date: 2026-10-18 06:00:00.000000
+
+photograph_files.perceptual_hash is left NULL for existing rows; run
+scripts/duplicate_report.py (or request a file's duplicates) to fill it.
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '014'
+down_revision: Union[str, None] = '013'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('photograph_files') as batch_op:
+        batch_op.add_column(sa.Column('perceptual_hash', sa.BigInteger(), nullable=True))
+        batch_op.create_index('ix_photograph_files_perceptual_hash', ['perceptual_hash'])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('photograph_files') as batch_op:
+        batch_op.drop_index('ix_photograph_files_perceptual_hash')
+        batch_op.drop_column('perceptual_hash')
@@ -0,0 +1,75 @@
+"""Add image clustering runs, clusters and photograph assignments
+
+Revision ID: 015
+Revises: 014
+Create Date: 2026-10-18 07:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '015'
+down_revision: Union[str, None] = '014'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'clustering_runs',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('embedding_model', sa.String(100), nullable=False),
+        sa.Column('status', sa.String(30), nullable=False),
+        sa.Column('requested_clusters', sa.Integer(), nullable=True),
+        sa.Column('n_clusters', sa.Integer(), nullable=True),
+        sa.Column('photographs', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('error_message', sa.Text(), nullable=True),
+        sa.Column('triggered_by', sa.Integer(), nullable=True),
+        sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(['triggered_by'], ['users.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_clustering_runs_id', 'clustering_runs', ['id'])
+    op.create_index('ix_clustering_runs_status', 'clustering_runs', ['status'])
+
+    op.create_table(
+        'image_clusters',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('run_id', sa.Integer(), nullable=False),
+        sa.Column('label', sa.Integer(), nullable=False),
+        sa.Column('size', sa.Integer(), nullable=False),
+        sa.Column('centroid', sa.LargeBinary(), nullable=False),
+        sa.Column('layout_x', sa.Float(), nullable=False),
+        sa.Column('layout_y', sa.Float(), nullable=False),
+        sa.Column('representative_id', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['run_id'], ['clustering_runs.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['representative_id'], ['photographs.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('run_id', 'label', name='uq_image_clusters_run_label'),
+    )
+    op.create_index('ix_image_clusters_id', 'image_clusters', ['id'])
+    op.create_index('ix_image_clusters_run_id', 'image_clusters', ['run_id'])
+
+    op.create_table(
+        'photograph_clusters',
+        sa.Column('photograph_id', sa.Integer(), nullable=False),
+        sa.Column('run_id', sa.Integer(), nullable=False),
+        sa.Column('label', sa.Integer(), nullable=False),
+        sa.Column('similarity', sa.Float(), nullable=False),
+        sa.Column('layout_x', sa.Float(), nullable=False),
+        sa.Column('layout_y', sa.Float(), nullable=False),
+        sa.Column('incremental', sa.Boolean(), nullable=False, server_default='0'),
+        sa.ForeignKeyConstraint(['photograph_id'], ['photographs.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['run_id'], ['clustering_runs.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('photograph_id'),
+    )
+    op.create_index('ix_photograph_clusters_run_id', 'photograph_clusters', ['run_id'])
+    op.create_index('ix_photograph_clusters_label', 'photograph_clusters', ['label'])
+
+
+def downgrade() -> None:
+    op.drop_table('photograph_clusters')
+    op.drop_table('image_clusters')
+    op.drop_table('clustering_runs')
@@ -0,0 +1,51 @@
+"""Add detected objects and object scans
+
+Revision ID: 016
+Revises: 015
+Create Date: 2026-10-18 08:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '016'
+down_revision: Union[str, None] = '015'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'detected_objects',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('photograph_id', sa.Integer(), nullable=False),
+        sa.Column('label', sa.String(50), nullable=False),
+        sa.Column('score', sa.Float(), nullable=False),
+        sa.Column('x0', sa.Float(), nullable=False),
+        sa.Column('y0', sa.Float(), nullable=False),
+        sa.Column('x1', sa.Float(), nullable=False),
+        sa.Column('y1', sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(['photograph_id'], ['photographs.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_detected_objects_id', 'detected_objects', ['id'])
+    op.create_index('ix_detected_objects_photograph_id', 'detected_objects', ['photograph_id'])
+    op.create_index('ix_detected_objects_label_photograph', 'detected_objects', ['label', 'photograph_id'])
+
+    op.create_table(
+        'object_scans',
+        sa.Column('photograph_id', sa.Integer(), nullable=False),
+        sa.Column('provider', sa.String(100), nullable=False),
+        sa.Column('provider_version', sa.String(100), nullable=False),
+        sa.Column('file_id', sa.Integer(), nullable=True),
+        sa.Column('objects', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('scanned_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(['photograph_id'], ['photographs.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['file_id'], ['photograph_files.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('photograph_id'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('object_scans')
+    op.drop_table('detected_objects')
@@ -0,0 +1,28 @@
+"""Add the content hash stat signature to photograph files
+
+Revision ID: 017
+Revises: 016
+Create Date: 2026-10-18 09:00:00.000000
+
+photograph_files.content_stat is left NULL for existing rows: their
+content_sha256 is recomputed once, on the next derivative, pyramid or
+download request, and kept while the file's size and mtime do not change.
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '017'
+down_revision: Union[str, None] = '016'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('photograph_files') as batch_op:
+        batch_op.add_column(sa.Column('content_stat', sa.String(40), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('photograph_files') as batch_op:
+        batch_op.drop_column('content_stat')
@@ -31,19 +31,65 @@ class Settings(BaseSettings):
     # AI CONFIGURATION
     # ===================================
     use_local_embeddings: bool = Field(default=True, alias="USE_LOCAL_EMBEDDINGS")
-    use_local_object_detection: bool = Field(default=True, alias="USE_LOCAL_OBJECT_DETECTION")
+    # Detección de objetos local (YOLO exportado a ONNX, CPU); ver OBJECT_DETECTION_*
+    use_local_object_detection: bool = Field(default=False, alias="USE_LOCAL_OBJECT_DETECTION")
 
     # ===================================
     # TAXONOMY ANALYZERS — agnósticos al proveedor
     # Cambia el valor en .env para cambiar de herramienta sin tocar código.
     #
-    # ATTR02_ANALYZER: stub (default) | clip
+    # ATTR02_ANALYZER: stub (default) | clip | clip-onnx
     # ATTR03_ANALYZER: stub (default) | geoclip
-    # ATTR04_ANALYZER: stub (default) | places365
+    # ATTR04_ANALYZER: stub (default) | places365 | places365-onnx
     # ===================================
     attr02_analyzer: str = Field(default="stub", alias="ATTR02_ANALYZER")
     attr03_analyzer: str = Field(default="stub", alias="ATTR03_ANALYZER")
     attr04_analyzer: str = Field(default="stub", alias="ATTR04_ANALYZER")
+    # GeoCLIP: región candidata (vacío = mundo | "lat_min,lon_min,lat_max,lon_max" | .geojson | .csv LAT,LON)
+    geoclip_region: str = Field(default="", alias="GEOCLIP_REGION")
+    # Carga los analizadores configurados al arrancar (lifespan) en vez de en
+    # la primera solicitud. Las instancias se comparten en todo el proceso.
+    analyzers_preload: bool = Field(default=False, alias="ANALYZERS_PRELOAD")
+
+    # ===================================
+    # ANALYSIS QUEUE — ejecución en segundo plano de los análisis
+    # ===================================
+    analysis_workers: int = Field(default=2, alias="ANALYSIS_WORKERS")
+    analysis_max_attempts: int = Field(default=3, alias="ANALYSIS_MAX_ATTEMPTS")
+    analysis_retry_backoff_seconds: float = Field(default=5.0, alias="ANALYSIS_RETRY_BACKOFF_SECONDS")
+    # Campañas de análisis: jobs en cola por campaña a la vez y reconsulta del progreso (s)
+    analysis_campaign_concurrency: int = Field(default=4, alias="ANALYSIS_CAMPAIGN_CONCURRENCY")
+    analysis_campaign_poll_seconds: float = Field(default=5.0, alias="ANALYSIS_CAMPAIGN_POLL_SECONDS")
+    # Ejecución fuera del event loop: "thread" (default) | "process"; workers
+    # simultáneos y límite de hilos de torch por worker (0 = default de torch)
+    analysis_executor: str = Field(default="thread", alias="ANALYSIS_EXECUTOR")
+    analysis_executor_workers: int = Field(default=2, alias="ANALYSIS_EXECUTOR_WORKERS")
+    analysis_torch_threads: int = Field(default=0, alias="ANALYSIS_TORCH_THREADS")
+    # Imágenes por pasada del modelo en analyze_batch (CLIP, Places365, YOLO)
+    analysis_batch_size: int = Field(default=8, alias="ANALYSIS_BATCH_SIZE")
+    # Lado mayor (px) de la copia RGB de trabajo decodificada una sola vez por archivo
+    analysis_working_size: int = Field(default=512, alias="ANALYSIS_WORKING_SIZE")
+    # Archivos decodificados que se mantienen en memoria para compartir entre analizadores
+    analysis_decode_cache_size: int = Field(default=4, alias="ANALYSIS_DECODE_CACHE_SIZE")
+    # Memoria máxima (MB) para decodificar un archivo; los TIFF más grandes se leen por franjas
+    analysis_decode_memory_mb: int = Field(default=512, alias="ANALYSIS_DECODE_MEMORY_MB")
+    # Registrar el pico de memoria residente (RSS) de cada job de análisis (solo Linux)
+    analysis_trace_memory: bool = Field(default=True, alias="ANALYSIS_TRACE_MEMORY")
+    # Caché de resultados por hash SHA-256 del archivo + proveedor + versión
+    analysis_result_cache_enabled: bool = Field(default=True, alias="ANALYSIS_RESULT_CACHE_ENABLED")
+    analysis_result_cache_max_entries: int = Field(default=50000, alias="ANALYSIS_RESULT_CACHE_MAX_ENTRIES")
+    # ExifTool persistente (-stay_open) para metadatos de archivos RAW
+    exiftool_path: str = Field(default="exiftool", alias="EXIFTOOL_PATH")
+    exiftool_workers: int = Field(default=2, alias="EXIFTOOL_WORKERS")
+    exiftool_timeout_seconds: float = Field(default=30.0, alias="EXIFTOOL_TIMEOUT_SECONDS")
+    # Backend ONNX Runtime (proveedores *-onnx): hilos intra-op (0 = automático) y cuantización int8
+    onnx_intra_op_threads: int = Field(default=0, alias="ONNX_INTRA_OP_THREADS")
+    onnx_quantize_int8: bool = Field(default=False, alias="ONNX_QUANTIZE_INT8")
+    # Artefactos de modelos (manifiesto con checksums): directorio (vacío = ~/.cache/roger/models),
+    # modo sin descargas en runtime y carga de pesos con mmap (páginas compartidas entre procesos)
+    model_artifacts_dir: str = Field(default="", alias="MODEL_ARTIFACTS_DIR")
+    model_artifacts_offline: bool = Field(default=False, alias="MODEL_ARTIFACTS_OFFLINE")
+    model_artifacts_mmap: bool = Field(default=True, alias="MODEL_ARTIFACTS_MMAP")
     
     # ===================================
     # API
@@ -180,6 +226,32 @@ class Settings(BaseSettings):
         alias="AWS_SECRET_ACCESS_KEY"
     )
     s3_bucket_name: Optional[str] = Field(default=None, alias="S3_BUCKET_NAME")
+    # Derivados web (thumbnail / preview / large): directorio, formatos, calidad y workers
+    derivatives_dir: str = Field(default="./storage/derivatives", alias="DERIVATIVES_DIR")
+    derivative_formats: str = Field(default="webp,jpeg", alias="DERIVATIVE_FORMATS")
+    derivative_quality: int = Field(default=82, alias="DERIVATIVE_QUALITY")
+    derivative_workers: int = Field(default=1, alias="DERIVATIVE_WORKERS")
+    # IIIF: pirámides de teselas, caché LRU de imágenes renderizadas (MB) y área máxima por respuesta
+    iiif_dir: str = Field(default="./storage/iiif", alias="IIIF_DIR")
+    iiif_tile_size: int = Field(default=512, alias="IIIF_TILE_SIZE")
+    iiif_tile_quality: int = Field(default=90, alias="IIIF_TILE_QUALITY")
+    iiif_workers: int = Field(default=1, alias="IIIF_WORKERS")
+    iiif_cache_dir: str = Field(default="./storage/iiif-cache", alias="IIIF_CACHE_DIR")
+    iiif_cache_mb: int = Field(default=1024, alias="IIIF_CACHE_MB")
+    iiif_max_area: int = Field(default=16777216, alias="IIIF_MAX_AREA")  # 4096 x 4096
+    # Duplicados: workers del hash perceptual y distancia de Hamming máxima por defecto (0-16 bits de 64)
+    duplicate_hash_workers: int = Field(default=1, alias="DUPLICATE_HASH_WORKERS")
+    duplicate_max_distance: int = Field(default=10, alias="DUPLICATE_MAX_DISTANCE")
+    # Similitud visual: embeddings CLIP de las fotografías (matriz float16 mapeada en memoria)
+    embeddings_dir: str = Field(default="./storage/embeddings", alias="EMBEDDINGS_DIR")
+    # Agrupamiento de imágenes: número de grupos al recalcular (0 = automático, √(n/2))
+    cluster_count: int = Field(default=0, alias="CLUSTER_COUNT")
+    # Detección de objetos: modelo ONNX (vacío = ~/.cache/roger/onnx/yolov8n.onnx) y puntaje mínimo guardado
+    object_detection_model: str = Field(default="", alias="OBJECT_DETECTION_MODEL")
+    object_detection_min_score: float = Field(default=0.25, alias="OBJECT_DETECTION_MIN_SCORE")
+    # Descargas vía nginx X-Accel-Redirect: raíz de los archivos y location interna que la expone
+    download_accel_root: Optional[str] = Field(default=None, alias="DOWNLOAD_ACCEL_ROOT")
+    download_accel_prefix: Optional[str] = Field(default=None, alias="DOWNLOAD_ACCEL_PREFIX")
     
     # ===================================
     # RATE LIMITING
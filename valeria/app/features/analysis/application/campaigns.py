@@ -0,0 +1,187 @@
+"""
+Planning and progress of collection-scale analysis campaigns.
+
+A campaign covers every photograph under a collection, box or roll for a
+set of attribute types. Planning writes one PENDING job row per
+(photograph, attribute) still to analyze; the campaign runner then
+dispatches them to the job queue a few at a time. A pair is skipped when:
+
+  - the photograph has no registered file, or
+  - it already has an ACTIVE record written by the provider name and
+    version currently configured for that attribute.
+
+Planning is idempotent (pairs that already have a job in the campaign are
+left alone), so a campaign interrupted while planning is simply planned
+again on resume. Progress is derived from the job rows, never from
+counters, so it stays correct across crashes.
+"""
+
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.features.analysis.infrastructure.persistence.analysis_model import (
+    AnalysisCampaignModel,
+    AnalysisJobModel,
+    AnalysisAttributeType,
+    CampaignScope,
+    CampaignStatus,
+    JobStatus,
+)
+from app.features.analysis.application.staleness import RECORD_MODELS, current_provider
+from app.features.archive.infrastructure.persistence.archive_model import (
+    BoxModel,
+    PhotographFileModel,
+    PhotographModel,
+    RollModel,
+)
+from app.features.taxonomy.infrastructure.persistence.taxonomy_model import AttributeStatus
+from app.features.view_images.infrastructure.persistence.image_model import CollectionModel
+
+_SCOPE_MODELS = {
+    CampaignScope.COLLECTION: CollectionModel,
+    CampaignScope.BOX: BoxModel,
+    CampaignScope.ROLL: RollModel,
+}
+
+_INSERT_CHUNK = 500
+
+
+def photographs_in_scope(scope_type: CampaignScope, scope_id: int):
+    """SELECT of the ids of every photograph under a collection, box or roll."""
+    query = select(PhotographModel.id)
+    if scope_type == CampaignScope.ROLL:
+        return query.where(PhotographModel.roll_id == scope_id)
+    query = query.join(RollModel, RollModel.id == PhotographModel.roll_id)
+    if scope_type == CampaignScope.BOX:
+        return query.where(RollModel.box_id == scope_id)
+    return (
+        query.join(BoxModel, BoxModel.id == RollModel.box_id)
+        .where(BoxModel.collection_id == scope_id)
+    )
+
+
+async def scope_exists(session: AsyncSession, scope_type: CampaignScope, scope_id: int) -> bool:
+    model = _SCOPE_MODELS[CampaignScope(scope_type)]
+    result = await session.execute(select(model.id).where(model.id == scope_id))
+    return result.scalar_one_or_none() is not None
+
+
+async def plan_campaign(session: AsyncSession, campaign: AnalysisCampaignModel) -> int:
+    """
+    Create the PENDING jobs of a PLANNING campaign and move it to RUNNING.
+    Returns the number of jobs created by this call. Commits.
+    """
+    scope = photographs_in_scope(CampaignScope(campaign.scope_type), campaign.scope_id)
+    photograph_ids = list((await session.execute(scope.order_by(PhotographModel.id))).scalars().all())
+    with_files = set((await session.execute(
+        select(PhotographFileModel.photograph_id)
+        .where(PhotographFileModel.photograph_id.in_(scope))
+        .distinct()
+    )).scalars().all())
+    planned = set((await session.execute(
+        select(AnalysisJobModel.photograph_id, AnalysisJobModel.attribute_type)
+        .where(AnalysisJobModel.campaign_id == campaign.id)
+    )).all())
+
+    jobs: list[AnalysisJobModel] = []
+    skipped = 0
+    for value in campaign.attribute_types:
+        attribute_type = AnalysisAttributeType(value)
+        provider_name, provider_version = await current_provider(attribute_type)
+        record = RECORD_MODELS[attribute_type]
+        current = set((await session.execute(
+            select(record.photograph_id).where(
+                record.photograph_id.in_(scope),
+                record.status == AttributeStatus.ACTIVE,
+                record.analysis_provider == provider_name,
+                record.provider_version == provider_version,
+            )
+        )).scalars().all())
+
+        for photograph_id in photograph_ids:
+            if (photograph_id, attribute_type) in planned:
+                continue
+            if photograph_id not in with_files or photograph_id in current:
+                skipped += 1
+                continue
+            jobs.append(AnalysisJobModel(
+                photograph_id=photograph_id,
+                attribute_type=attribute_type,
+                tool_name=provider_name,
+                tool_version=provider_version,
+                status=JobStatus.PENDING,
+                triggered_by=campaign.triggered_by,
+                attempts=0,
+                campaign_id=campaign.id,
+            ))
+
+    for start in range(0, len(jobs), _INSERT_CHUNK):
+        session.add_all(jobs[start:start + _INSERT_CHUNK])
+        await session.flush()
+
+    campaign.total_photographs = len(photograph_ids)
+    campaign.skipped = skipped
+    campaign.status = CampaignStatus.RUNNING
+    if campaign.started_at is None:
+        campaign.started_at = datetime.now(timezone.utc)
+    await session.commit()
+    return len(jobs)
+
+
+async def job_status_counts(session: AsyncSession, campaign_id: int) -> dict[JobStatus, int]:
+    result = await session.execute(
+        select(AnalysisJobModel.status, func.count())
+        .where(AnalysisJobModel.campaign_id == campaign_id)
+        .group_by(AnalysisJobModel.status)
+    )
+    counts = {status: 0 for status in JobStatus}
+    for status, count in result.all():
+        counts[JobStatus(status)] = count
+    return counts
+
+
+def _utc(moment: Optional[datetime]) -> Optional[datetime]:
+    # SQLite hands back naive datetimes for timezone-aware columns
+    if moment is not None and moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc)
+    return moment
+
+
+async def campaign_progress(session: AsyncSession, campaign: AnalysisCampaignModel) -> dict:
+    """
+    Counts per job status plus throughput. images_per_second counts
+    analyses (one image through one analyzer, cache hits included) finished
+    since the campaign started; eta_seconds extrapolates it to the jobs left.
+    """
+    counts = await job_status_counts(session, campaign.id)
+    cache_hits = (await session.execute(
+        select(func.count()).select_from(AnalysisJobModel).where(
+            AnalysisJobModel.campaign_id == campaign.id,
+            AnalysisJobModel.cache_hit.is_(True),
+        )
+    )).scalar_one()
+
+    finished = counts[JobStatus.COMPLETED] + counts[JobStatus.FAILED]
+    remaining = counts[JobStatus.PENDING] + counts[JobStatus.QUEUED] + counts[JobStatus.RUNNING]
+    started_at = _utc(campaign.started_at)
+    end = _utc(campaign.completed_at) or datetime.now(timezone.utc)
+    elapsed = max((end - started_at).total_seconds(), 0.0) if started_at else 0.0
+    rate = finished / elapsed if elapsed > 0 else 0.0
+
+    return {
+        "planned": sum(counts.values()),
+        "pending": counts[JobStatus.PENDING],
+        "queued": counts[JobStatus.QUEUED],
+        "running": counts[JobStatus.RUNNING],
+        "completed": counts[JobStatus.COMPLETED],
+        "failed": counts[JobStatus.FAILED],
+        "cancelled": counts[JobStatus.CANCELLED],
+        "cache_hits": cache_hits,
+        "elapsed_seconds": round(elapsed, 1),
+        "images_per_second": round(rate, 3),
+        "eta_seconds": round(remaining / rate, 1) if remaining and rate > 0 else None,
+    }
@@ -0,0 +1,103 @@
+"""
+p50 / p95 of the per-job resource metrics, grouped by tool and version.
+
+Only COMPLETED jobs that actually ran the analyzer count: cache hits never
+decode or infer, and failed runs stop at arbitrary points. SQLite has no
+percentile aggregate, so counts are aggregated per group in SQL and each
+percentile is read as the (at most) two ordered values around its rank
+(ORDER BY ... LIMIT 2 OFFSET rank); job rows are never loaded wholesale.
+"""
+
+from datetime import datetime
+from typing import Optional, Sequence
+
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.features.analysis.infrastructure.persistence.analysis_model import (
+    AnalysisAttributeType,
+    AnalysisJobModel,
+    JobStatus,
+)
+
+METRIC_FIELDS = (
+    "decode_ms",
+    "inference_ms",
+    "db_write_ms",
+    "peak_memory_bytes",
+    "input_pixels",
+    "input_bytes",
+)
+
+
+def _at_rank(ordered: Sequence[float], rank: float) -> float:
+    """Value at fractional rank of ordered, interpolating between neighbours."""
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def percentile(values: Sequence[float], q: float) -> Optional[float]:
+    """Linear-interpolated percentile (q in 0..100) of values; None when empty."""
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    return _at_rank(ordered, (len(ordered) - 1) * q / 100)
+
+
+async def _sql_percentile(session: AsyncSession, column, filters: list, samples: int, q: float) -> Optional[float]:
+    """percentile() of column over the rows matching filters, which hold samples non-null values."""
+    if not samples:
+        return None
+    rank = (samples - 1) * q / 100
+    result = await session.execute(
+        select(column).where(*filters, column.is_not(None)).order_by(column).offset(int(rank)).limit(2)
+    )
+    return _at_rank(result.scalars().all(), rank - int(rank))
+
+
+async def job_metrics_summary(
+    session: AsyncSession,
+    attribute_type: Optional[AnalysisAttributeType] = None,
+    since: Optional[datetime] = None,
+) -> list[dict]:
+    """
+    One entry per (tool_name, tool_version): the job count and, for every
+    metric, {"p50", "p95", "samples"} over the jobs that recorded it.
+    """
+    filters = [
+        AnalysisJobModel.status == JobStatus.COMPLETED,
+        AnalysisJobModel.cache_hit.is_(False),
+    ]
+    if attribute_type is not None:
+        filters.append(AnalysisJobModel.attribute_type == attribute_type)
+    if since is not None:
+        filters.append(AnalysisJobModel.completed_at >= since)
+
+    columns = [getattr(AnalysisJobModel, field) for field in METRIC_FIELDS]
+    groups = await session.execute(
+        select(
+            AnalysisJobModel.tool_name, AnalysisJobModel.tool_version, func.count(),
+            *(func.count(column) for column in columns),
+        )
+        .where(*filters)
+        .group_by(AnalysisJobModel.tool_name, AnalysisJobModel.tool_version)
+    )
+
+    summary = []
+    for tool_name, tool_version, jobs, *samples in sorted(groups.all(), key=lambda g: (g[0], g[1] or "")):
+        entry = {"tool_name": tool_name, "tool_version": tool_version, "jobs": jobs}
+        version_filter = (
+            AnalysisJobModel.tool_version.is_(None) if tool_version is None
+            else AnalysisJobModel.tool_version == tool_version
+        )
+        group_filters = [*filters, AnalysisJobModel.tool_name == tool_name, version_filter]
+        for field, column, count in zip(METRIC_FIELDS, columns, samples):
+            entry[field] = {
+                "p50": await _sql_percentile(session, column, group_filters, count, 50),
+                "p95": await _sql_percentile(session, column, group_filters, count, 95),
+                "samples": count,
+            }
+        summary.append(entry)
+    return summary
@@ -0,0 +1,132 @@
+"""
+Shared AnalysisJob bookkeeping for the attribute extraction use cases.
+
+A use case either runs inline (taxonomy analyze routes) and creates its own
+RUNNING job, or runs inside the background queue and adopts the QUEUED job
+row that the queue already claimed.
+
+analyze_with_cache() wraps the analyzer call with the content-hash result
+cache; a hit still goes through the same job row, flagged cache_hit. The
+file is hashed again first when its size or mtime changed, so a master
+replaced on disk is a miss rather than the old file's result.
+
+measured_analysis() is the analyzer call the use cases hand to it: it runs
+in the analysis executor and records the worker's decode / inference /
+memory / input-size metrics on the job. complete_analysis_job() closes the
+job with the time spent persisting the attribute record.
+"""
+
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.features.analysis.infrastructure.persistence.analysis_model import (
+    AnalysisJobModel,
+    AnalysisAttributeType,
+    JobStatus,
+)
+from app.features.analysis.infrastructure.adapters.result_cache import analysis_result_cache
+from app.features.archive.infrastructure.persistence.archive_model import PhotographFileModel
+from app.infrastructure.analysis.content_hash import refresh_content_hash
+from app.infrastructure.analysis.executor import analysis_executor
+from app.infrastructure.analysis.instrumentation import elapsed_ms
+from app.shared.domain.exceptions import EntityNotFoundError
+
+
+async def start_analysis_job(
+    session: AsyncSession,
+    photograph_id: int,
+    attribute_type: AnalysisAttributeType,
+    tool_name: str,
+    tool_version: Optional[str],
+    triggered_by: Optional[int],
+    job_id: Optional[int] = None,
+) -> AnalysisJobModel:
+    """Return a RUNNING job: the existing one when job_id is given, else a new row."""
+    if job_id is None:
+        job = AnalysisJobModel(
+            photograph_id=photograph_id,
+            attribute_type=attribute_type,
+            tool_name=tool_name,
+            tool_version=tool_version,
+            status=JobStatus.RUNNING,
+            triggered_by=triggered_by,
+            started_at=datetime.now(timezone.utc),
+            attempts=1,
+        )
+        session.add(job)
+        await session.flush()
+        return job
+
+    result = await session.execute(
+        select(AnalysisJobModel).where(AnalysisJobModel.id == job_id)
+    )
+    job = result.scalar_one_or_none()
+    if not job:
+        raise EntityNotFoundError(f"AnalysisJob con id={job_id} no encontrado")
+    job.tool_name = tool_name
+    job.tool_version = tool_version
+    job.status = JobStatus.RUNNING
+    if job.started_at is None:
+        job.started_at = datetime.now(timezone.utc)
+    await session.flush()
+    return job
+
+
+async def analyze_with_cache(
+    session: AsyncSession,
+    job: AnalysisJobModel,
+    target_file: PhotographFileModel,
+    compute: Callable[[], Awaitable[dict]],
+) -> dict:
+    """
+    Return the analyzer result for target_file under job's tool and version,
+    from the result cache when the same bytes were analyzed before, else by
+    awaiting compute() and storing a successful result.
+    """
+    if not analysis_result_cache.enabled:
+        return await compute()
+
+    await refresh_content_hash(target_file)
+    content_hash = target_file.content_sha256
+    if content_hash is None:
+        return await compute()
+
+    key = (content_hash, job.attribute_type, job.tool_name, job.tool_version or "")
+    cached = await analysis_result_cache.get(session, *key)
+    if cached is not None:
+        job.cache_hit = True
+        return cached
+
+    analysis = await compute()
+    if not analysis.get("error"):
+        await analysis_result_cache.put(session, *key, analysis)
+    return analysis
+
+
+def measured_analysis(
+    job: AnalysisJobModel, slot: str, file_path: str, use_decoded: bool = True,
+) -> Callable[[], Awaitable[dict]]:
+    """compute() for analyze_with_cache that stores the run's metrics on job."""
+    async def compute() -> dict:
+        analysis, metrics = await analysis_executor.analyze_measured(slot, file_path, use_decoded)
+        for field, value in metrics.items():
+            setattr(job, field, value)
+        return analysis
+    return compute
+
+
+async def complete_analysis_job(
+    session: AsyncSession, job: AnalysisJobModel, write_started: float,
+) -> None:
+    """
+    Mark job COMPLETED. write_started is the time.perf_counter() reading
+    taken before the use case began persisting its record; db_write_ms
+    covers supersede + insert + flush (the caller's commit comes later).
+    """
+    job.db_write_ms = elapsed_ms(write_started)
+    job.status = JobStatus.COMPLETED
+    job.completed_at = datetime.now(timezone.utc)
+    await session.flush()
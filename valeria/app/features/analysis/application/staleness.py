@@ -0,0 +1,130 @@
+"""
+Detection of analysis results written by an outdated provider.
+
+Every ACTIVE AI-sourced attribute record stores analysis_provider and
+provider_version. A record is stale when either differs from the provider
+currently configured for its attribute (e.g. Places365 moved to a new
+checkpoint, or ATTR02_ANALYZER switched from stub to clip). Records written
+by curators or approved contributions are never stale: re-running a model
+must not replace human work.
+
+The queries filter on (status, analysis_provider, provider_version), which
+every attribute table indexes (migration 011).
+"""
+
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import and_, func, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.features.analysis.infrastructure.persistence.analysis_model import AnalysisAttributeType
+from app.features.taxonomy.infrastructure.persistence.taxonomy_model import (
+    AttributeStatus,
+    AttrChronologyDatingModel,
+    AttrEnvironmentalSpatialModel,
+    AttrGeographicReferenceModel,
+    AttrTechnicalMetadataModel,
+    SourceType,
+)
+from app.infrastructure.analysis.executor import TECHNICAL, analysis_executor
+from app.infrastructure.analysis.model_registry import CHRONOLOGY, ENVIRONMENTAL, GEOGRAPHIC
+
+RECORD_MODELS = {
+    AnalysisAttributeType.TECHNICAL: AttrTechnicalMetadataModel,
+    AnalysisAttributeType.CHRONOLOGY: AttrChronologyDatingModel,
+    AnalysisAttributeType.GEOGRAPHIC: AttrGeographicReferenceModel,
+    AnalysisAttributeType.ENVIRONMENTAL: AttrEnvironmentalSpatialModel,
+}
+
+SLOTS = {
+    AnalysisAttributeType.TECHNICAL: TECHNICAL,
+    AnalysisAttributeType.CHRONOLOGY: CHRONOLOGY,
+    AnalysisAttributeType.GEOGRAPHIC: GEOGRAPHIC,
+    AnalysisAttributeType.ENVIRONMENTAL: ENVIRONMENTAL,
+}
+
+
+async def current_provider(attribute_type: AnalysisAttributeType) -> tuple[str, str]:
+    """(provider_name, provider_version) configured for an attribute type."""
+    return await analysis_executor.provider_info(SLOTS[AnalysisAttributeType(attribute_type)])
+
+
+def _ai_active(record):
+    conditions = [record.status == AttributeStatus.ACTIVE]
+    if hasattr(record, "source_type"):
+        conditions.append(record.source_type == SourceType.AI)
+    return and_(*conditions)
+
+
+def stale_condition(record, provider_name: str, provider_version: str):
+    """WHERE clause selecting a record table's stale rows."""
+    return and_(
+        _ai_active(record),
+        or_(
+            record.analysis_provider.is_(None),
+            record.provider_version.is_(None),
+            record.analysis_provider != provider_name,
+            record.provider_version != provider_version,
+        ),
+    )
+
+
+async def stale_summary(
+    session: AsyncSession,
+    attribute_types: Optional[list[AnalysisAttributeType]] = None,
+) -> list[dict]:
+    """Per attribute: the current provider and how many stale records each old one left."""
+    summary = []
+    for attribute_type in attribute_types or list(AnalysisAttributeType):
+        provider_name, provider_version = await current_provider(attribute_type)
+        record = RECORD_MODELS[attribute_type]
+        result = await session.execute(
+            select(record.analysis_provider, record.provider_version, func.count())
+            .where(stale_condition(record, provider_name, provider_version))
+            .group_by(record.analysis_provider, record.provider_version)
+        )
+        outdated = [
+            {"provider": name, "provider_version": version, "count": count}
+            for name, version, count in result.all()
+        ]
+        summary.append({
+            "attribute_type": attribute_type.value,
+            "provider": provider_name,
+            "provider_version": provider_version,
+            "stale": sum(o["count"] for o in outdated),
+            "outdated": outdated,
+        })
+    return summary
+
+
+async def stale_photographs(
+    session: AsyncSession,
+    attribute_types: Optional[list[AnalysisAttributeType]] = None,
+    limit: Optional[int] = None,
+) -> list[tuple[int, list[AnalysisAttributeType]]]:
+    """
+    Photographs with at least one stale record and the attribute types to
+    re-run, in priority order: most stale attributes first, then the
+    photographs whose oldest stale record was analyzed earliest.
+    """
+    stale: dict[int, list[AnalysisAttributeType]] = {}
+    oldest: dict[int, datetime] = {}
+    for attribute_type in attribute_types or list(AnalysisAttributeType):
+        provider_name, provider_version = await current_provider(attribute_type)
+        record = RECORD_MODELS[attribute_type]
+        result = await session.execute(
+            select(record.photograph_id, func.min(record.analyzed_at))
+            .where(stale_condition(record, provider_name, provider_version))
+            .group_by(record.photograph_id)
+        )
+        for photograph_id, analyzed_at in result.all():
+            stale.setdefault(photograph_id, []).append(attribute_type)
+            if photograph_id not in oldest or analyzed_at < oldest[photograph_id]:
+                oldest[photograph_id] = analyzed_at
+
+    ordered = sorted(stale, key=lambda pid: (-len(stale[pid]), oldest[pid], pid))
+    if limit is not None:
+        ordered = ordered[:limit]
+    return [(photograph_id, stale[photograph_id]) for photograph_id in ordered]
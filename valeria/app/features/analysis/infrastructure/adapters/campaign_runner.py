@@ -0,0 +1,275 @@
+"""
+Drives analysis campaigns through the background job queue.
+
+One asyncio task per unfinished campaign:
+
+  PLANNING ──plan_campaign──▶ RUNNING ──all jobs terminal──▶ COMPLETED
+                                 └──cancel()──▶ CANCELLED
+
+While RUNNING, the task keeps at most `concurrency` of the campaign's jobs
+QUEUED or RUNNING, promoting PENDING rows in id order as earlier ones
+finish. The queue workers stay shared with interactive uploads, so a large
+collection never takes every slot. The task wakes on the queue's job events
+and re-checks every ANALYSIS_CAMPAIGN_POLL_SECONDS as a fallback.
+
+Crash safety comes from the rows: QUEUED/RUNNING jobs are recovered by the
+queue itself, and start() relaunches every PLANNING or RUNNING campaign.
+"""
+
+import asyncio
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+import structlog
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.config.settings import settings
+from app.features.analysis.application.campaigns import (
+    job_status_counts,
+    plan_campaign,
+    scope_exists,
+)
+from app.features.analysis.infrastructure.adapters.job_queue import AnalysisJobQueue, analysis_queue
+from app.features.analysis.infrastructure.persistence.analysis_model import (
+    AnalysisCampaignModel,
+    AnalysisJobModel,
+    AnalysisAttributeType,
+    CampaignScope,
+    CampaignStatus,
+    JobStatus,
+)
+from app.shared.domain.exceptions import EntityNotFoundError, ValidationError
+
+logger = structlog.get_logger()
+
+
+class AnalysisCampaignRunner:
+    """Plans campaigns and feeds their jobs to the queue with bounded concurrency."""
+
+    def __init__(
+        self,
+        queue: Optional[AnalysisJobQueue] = None,
+        session_factory: Optional[Callable[[], AsyncSession]] = None,
+        poll_seconds: Optional[float] = None,
+    ) -> None:
+        self._queue = queue or analysis_queue
+        self._session_factory = session_factory
+        self.poll_seconds = (
+            poll_seconds if poll_seconds is not None else settings.analysis_campaign_poll_seconds
+        )
+        self._tasks: dict[int, asyncio.Task] = {}
+        self._wakeups: dict[int, asyncio.Event] = {}
+
+    def _sessions(self) -> AsyncSession:
+        if self._session_factory is None:
+            from app.infrastructure.database.session import AsyncSessionLocal
+            self._session_factory = AsyncSessionLocal
+        return self._session_factory()
+
+    # ── Lifecycle ─────────────────────────────────────────────────────────────
+
+    async def start(self) -> None:
+        """Relaunch campaigns left PLANNING or RUNNING by a previous process."""
+        self._queue.add_listener(self._on_job_event)
+        async with self._sessions() as session:
+            result = await session.execute(
+                select(AnalysisCampaignModel.id)
+                .where(AnalysisCampaignModel.status.in_(CampaignStatus.unfinished()))
+                .order_by(AnalysisCampaignModel.id)
+            )
+            unfinished = list(result.scalars().all())
+        for campaign_id in unfinished:
+            self.launch(campaign_id)
+        if unfinished:
+            logger.info("Analysis campaigns resumed", count=len(unfinished))
+
+    async def stop(self) -> None:
+        """Cancel the campaign tasks; the campaigns stay unfinished and resume on start()."""
+        self._queue.remove_listener(self._on_job_event)
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks.clear()
+        self._wakeups.clear()
+
+    def launch(self, campaign_id: int) -> None:
+        """Start driving a campaign unless it is already being driven."""
+        self._queue.add_listener(self._on_job_event)
+        task = self._tasks.get(campaign_id)
+        if task is not None and not task.done():
+            return
+        task = asyncio.create_task(self._run(campaign_id))
+        self._tasks[campaign_id] = task
+        task.add_done_callback(
+            lambda done: self._tasks.pop(campaign_id) if self._tasks.get(campaign_id) is done else None
+        )
+
+    def driving(self, campaign_id: int) -> bool:
+        task = self._tasks.get(campaign_id)
+        return task is not None and not task.done()
+
+    async def wait(self, campaign_id: int, timeout: Optional[float] = None) -> None:
+        """Wait until the campaign's task ends or timeout elapses (CLI, tests)."""
+        task = self._tasks.get(campaign_id)
+        if task is not None:
+            await asyncio.wait({task}, timeout=timeout)
+
+    # ── Commands ──────────────────────────────────────────────────────────────
+
+    async def create(
+        self,
+        session: AsyncSession,
+        scope_type: CampaignScope,
+        scope_id: int,
+        attribute_types: list[AnalysisAttributeType],
+        triggered_by: Optional[int],
+        concurrency: Optional[int] = None,
+    ) -> AnalysisCampaignModel:
+        """Persist a PLANNING campaign in the caller's session, commit it and launch it."""
+        scope_type = CampaignScope(scope_type)
+        if not attribute_types:
+            raise ValidationError("La campaña debe incluir al menos un tipo de atributo.")
+        if not await scope_exists(session, scope_type, scope_id):
+            raise EntityNotFoundError(f"{scope_type.value} con id={scope_id} no encontrado")
+
+        campaign = AnalysisCampaignModel(
+            scope_type=scope_type,
+            scope_id=scope_id,
+            attribute_types=[AnalysisAttributeType(a).value for a in dict.fromkeys(attribute_types)],
+            concurrency=max(concurrency or settings.analysis_campaign_concurrency, 1),
+            status=CampaignStatus.PLANNING,
+            triggered_by=triggered_by,
+        )
+        session.add(campaign)
+        await session.flush()
+        await session.commit()
+        await session.refresh(campaign)
+        self.launch(campaign.id)
+        logger.info(
+            "Analysis campaign created", campaign_id=campaign.id,
+            scope=scope_type.value, scope_id=scope_id, attributes=campaign.attribute_types,
+        )
+        return campaign
+
+    async def cancel(self, campaign_id: int) -> Optional[AnalysisCampaignModel]:
+        """
+        Cancel an unfinished campaign: PENDING jobs are cancelled in bulk,
+        queued and running ones through the queue. None if it does not exist.
+        """
+        async with self._sessions() as session:
+            campaign = await session.get(AnalysisCampaignModel, campaign_id)
+            if campaign is None or campaign.status not in CampaignStatus.unfinished():
+                return campaign
+            now = datetime.now(timezone.utc)
+            campaign.status = CampaignStatus.CANCELLED
+            campaign.completed_at = now
+            await session.execute(
+                update(AnalysisJobModel)
+                .where(
+                    AnalysisJobModel.campaign_id == campaign_id,
+                    AnalysisJobModel.status == JobStatus.PENDING,
+                )
+                .values(status=JobStatus.CANCELLED, completed_at=now)
+            )
+            outstanding = list((await session.execute(
+                select(AnalysisJobModel.id).where(
+                    AnalysisJobModel.campaign_id == campaign_id,
+                    AnalysisJobModel.status.in_((JobStatus.QUEUED, JobStatus.RUNNING)),
+                )
+            )).scalars().all())
+            await session.commit()
+
+        task = self._tasks.pop(campaign_id, None)
+        if task is not None:
+            task.cancel()
+        for job_id in outstanding:
+            await self._queue.cancel(job_id)
+        logger.info("Analysis campaign cancelled", campaign_id=campaign_id)
+        return campaign
+
+    # ── Driver ────────────────────────────────────────────────────────────────
+
+    def _on_job_event(self, event: dict) -> None:
+        wakeup = self._wakeups.get(event.get("campaign_id"))
+        if wakeup is not None:
+            wakeup.set()
+
+    async def _run(self, campaign_id: int) -> None:
+        wakeup = self._wakeups.setdefault(campaign_id, asyncio.Event())
+        try:
+            async with self._sessions() as session:
+                campaign = await session.get(AnalysisCampaignModel, campaign_id)
+                if campaign is None:
+                    return
+                if campaign.status == CampaignStatus.PLANNING:
+                    planned = await plan_campaign(session, campaign)
+                    logger.info(
+                        "Analysis campaign planned", campaign_id=campaign_id,
+                        jobs=planned, skipped=campaign.skipped,
+                    )
+
+            while True:
+                wakeup.clear()
+                if not await self._dispatch(campaign_id):
+                    return
+                try:
+                    await asyncio.wait_for(wakeup.wait(), timeout=self.poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            # The campaign stays unfinished and is relaunched on the next start()
+            logger.error("Analysis campaign error", campaign_id=campaign_id, error=str(exc))
+        finally:
+            self._wakeups.pop(campaign_id, None)
+
+    async def _dispatch(self, campaign_id: int) -> bool:
+        """Top up the campaign's in-flight jobs. False once the campaign is over."""
+        async with self._sessions() as session:
+            campaign = await session.get(AnalysisCampaignModel, campaign_id)
+            if campaign is None or campaign.status != CampaignStatus.RUNNING:
+                return False
+
+            counts = await job_status_counts(session, campaign_id)
+            in_flight = counts[JobStatus.QUEUED] + counts[JobStatus.RUNNING]
+            if not counts[JobStatus.PENDING] and not in_flight:
+                campaign.status = CampaignStatus.COMPLETED
+                campaign.completed_at = datetime.now(timezone.utc)
+                await session.commit()
+                logger.info(
+                    "Analysis campaign completed", campaign_id=campaign_id,
+                    completed=counts[JobStatus.COMPLETED], failed=counts[JobStatus.FAILED],
+                )
+                return False
+
+            free = campaign.concurrency - in_flight
+            if free <= 0 or not counts[JobStatus.PENDING]:
+                return True
+            job_ids = list((await session.execute(
+                select(AnalysisJobModel.id)
+                .where(
+                    AnalysisJobModel.campaign_id == campaign_id,
+                    AnalysisJobModel.status == JobStatus.PENDING,
+                )
+                .order_by(AnalysisJobModel.id)
+                .limit(free)
+            )).scalars().all())
+            await session.execute(
+                update(AnalysisJobModel)
+                .where(AnalysisJobModel.id.in_(job_ids), AnalysisJobModel.status == JobStatus.PENDING)
+                .values(status=JobStatus.QUEUED)
+            )
+            await session.commit()
+
+        # Committed QUEUED before enqueue: a crash in between is recovered by the queue
+        for job_id in job_ids:
+            self._queue.enqueue(job_id)
+        return True
+
+
+# Global campaign runner (started in the application lifespan, after the queue)
+campaign_runner = AnalysisCampaignRunner()
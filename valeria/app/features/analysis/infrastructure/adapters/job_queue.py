@@ -0,0 +1,399 @@
+"""
+In-process background queue for attribute analysis jobs.
+
+register_file used to run the four extraction use cases inside the HTTP
+request, which for real providers can exceed nginx's proxy_read_timeout.
+The queue persists one QUEUED AnalysisJob row per attribute and returns
+immediately; a bounded pool of asyncio workers then executes them.
+
+Lifecycle of a job row:
+
+  QUEUED ──claim──▶ RUNNING ──▶ COMPLETED
+     ▲                 │
+     └── retry (backoff)┤──▶ FAILED      (attempts exhausted)
+                        └──▶ CANCELLED   (cancel() while queued or running)
+
+Jobs are claimed with a conditional UPDATE (status=QUEUED → RUNNING), so a
+job is never executed twice. On startup, the API re-queues jobs left QUEUED
+or RUNNING by a previous process; this assumes one recovering queue per
+database (a single API process), which is how the container runs today.
+Scripts that run beside the API start their queue with recover=False and
+only run the jobs they queue themselves: resetting RUNNING rows there would
+run the API's in-flight jobs a second time.
+
+Status changes are published to per-photograph subscribers for the SSE
+progress stream, and to queue-wide listeners (the campaign runner).
+
+Campaign jobs are created PENDING and only become QUEUED when the campaign
+runner dispatches them (see campaign_runner), so recovery on startup never
+floods the queue with a whole collection.
+"""
+
+import asyncio
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Optional
+
+import structlog
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.config.settings import settings
+from app.features.analysis.infrastructure.persistence.analysis_model import (
+    AnalysisJobModel,
+    AnalysisAttributeType,
+    JobStatus,
+)
+
+logger = structlog.get_logger()
+
+# (session, photograph_id, triggered_by, job_id) -> awaitable
+JobRunner = Callable[[AsyncSession, int, Optional[int], int], Awaitable[Any]]
+
+
+def _default_runners() -> dict[AnalysisAttributeType, JobRunner]:
+    """Map attribute types to their extraction use cases (imported lazily)."""
+    from app.features.taxonomy.application.extract_technical_metadata_usecase import (
+        ExtractTechnicalMetadataUseCase,
+    )
+    from app.features.taxonomy.application.extract_chronology_usecase import ExtractChronologyUseCase
+    from app.features.taxonomy.application.extract_geographic_usecase import ExtractGeographicUseCase
+    from app.features.taxonomy.application.extract_environmental_usecase import (
+        ExtractEnvironmentalUseCase,
+    )
+    from app.features.taxonomy.infrastructure.adapters.taxonomy_repository import TaxonomyRepository
+
+    def runner(use_case_cls) -> JobRunner:
+        async def run(session, photograph_id, triggered_by, job_id):
+            usecase = use_case_cls(TaxonomyRepository(session), session)
+            return await usecase.execute(photograph_id, triggered_by=triggered_by, job_id=job_id)
+        return run
+
+    return {
+        AnalysisAttributeType.TECHNICAL: runner(ExtractTechnicalMetadataUseCase),
+        AnalysisAttributeType.CHRONOLOGY: runner(ExtractChronologyUseCase),
+        AnalysisAttributeType.GEOGRAPHIC: runner(ExtractGeographicUseCase),
+        AnalysisAttributeType.ENVIRONMENTAL: runner(ExtractEnvironmentalUseCase),
+    }
+
+
+def _configured_tool(attribute_type: AnalysisAttributeType) -> str:
+    """Provider name recorded on a QUEUED row until the use case fills the real one."""
+    return {
+        AnalysisAttributeType.TECHNICAL: "pillow",
+        AnalysisAttributeType.CHRONOLOGY: settings.attr02_analyzer,
+        AnalysisAttributeType.GEOGRAPHIC: settings.attr03_analyzer,
+        AnalysisAttributeType.ENVIRONMENTAL: settings.attr04_analyzer,
+    }[attribute_type].lower().strip()
+
+
+def job_event(job: AnalysisJobModel) -> dict:
+    """Serializable snapshot of a job for progress subscribers."""
+    return {
+        "job_id": job.id,
+        "photograph_id": job.photograph_id,
+        "attribute_type": getattr(job.attribute_type, "value", job.attribute_type),
+        "tool_name": job.tool_name,
+        "status": getattr(job.status, "value", job.status),
+        "attempts": job.attempts,
+        "cache_hit": bool(job.cache_hit),
+        "error_message": job.error_message,
+        "campaign_id": job.campaign_id,
+    }
+
+
+class AnalysisJobQueue:
+    """Bounded pool of asyncio workers consuming analysis job ids."""
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], AsyncSession]] = None,
+        runners: Optional[dict[AnalysisAttributeType, JobRunner]] = None,
+        workers: Optional[int] = None,
+        max_attempts: Optional[int] = None,
+        backoff_seconds: Optional[float] = None,
+    ) -> None:
+        self._session_factory = session_factory
+        self._runners = runners
+        self.workers = workers if workers is not None else settings.analysis_workers
+        self.max_attempts = max_attempts if max_attempts is not None else settings.analysis_max_attempts
+        self.backoff_seconds = (
+            backoff_seconds if backoff_seconds is not None
+            else settings.analysis_retry_backoff_seconds
+        )
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker_tasks: list[asyncio.Task] = []
+        self._running: dict[int, asyncio.Task] = {}
+        self._cancelled: set[int] = set()
+        self._delayed: set[asyncio.Task] = set()
+        self._subscribers: dict[int, set[asyncio.Queue]] = {}
+        self._listeners: set[Callable[[dict], None]] = set()
+
+    # ── Lifecycle ─────────────────────────────────────────────────────────────
+
+    @property
+    def started(self) -> bool:
+        return bool(self._worker_tasks)
+
+    def _sessions(self) -> AsyncSession:
+        if self._session_factory is None:
+            from app.infrastructure.database.session import AsyncSessionLocal
+            self._session_factory = AsyncSessionLocal
+        return self._session_factory()
+
+    def _runner_for(self, attribute_type: AnalysisAttributeType) -> JobRunner:
+        if self._runners is None:
+            self._runners = _default_runners()
+        return self._runners[AnalysisAttributeType(attribute_type)]
+
+    async def start(self, recover: bool = True) -> None:
+        """
+        Spawn workers and, with recover (the API), re-queue every job left
+        unfinished by a previous process.
+        """
+        if self.started:
+            return
+        self._queue = asyncio.Queue()
+        for i in range(max(self.workers, 1)):
+            self._worker_tasks.append(asyncio.create_task(self._worker(i)))
+        if recover:
+            await self.recover()
+
+    async def recover(self, campaign_id: Optional[int] = None, include_running: bool = True) -> int:
+        """
+        Queue the QUEUED jobs (of one campaign, or all) in this process; with
+        include_running, reset RUNNING ones first, which is only safe when no
+        other process is running them. Returns how many were queued. A job
+        also queued elsewhere still runs once: claiming is atomic.
+        """
+        scope = [] if campaign_id is None else [AnalysisJobModel.campaign_id == campaign_id]
+        async with self._sessions() as session:
+            if include_running:
+                await session.execute(
+                    update(AnalysisJobModel)
+                    .where(AnalysisJobModel.status == JobStatus.RUNNING, *scope)
+                    .values(status=JobStatus.QUEUED)
+                )
+            result = await session.execute(
+                select(AnalysisJobModel.id)
+                .where(AnalysisJobModel.status == JobStatus.QUEUED, *scope)
+                .order_by(AnalysisJobModel.id)
+            )
+            pending = list(result.scalars().all())
+            await session.commit()
+        for job_id in pending:
+            self.enqueue(job_id)
+        if pending:
+            logger.info("Analysis jobs recovered", count=len(pending), campaign_id=campaign_id)
+        return len(pending)
+
+    async def stop(self) -> None:
+        """Cancel workers and delayed retries. Interrupted jobs stay RUNNING and are recovered on start()."""
+        for task in [*self._delayed, *self._running.values(), *self._worker_tasks]:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, *self._delayed, return_exceptions=True)
+        self._worker_tasks.clear()
+        self._delayed.clear()
+        self._running.clear()
+        self._queue = None
+
+    async def join(self) -> None:
+        """Wait until every job put on the queue has been processed (tests, CLI)."""
+        while True:
+            if self._queue is not None:
+                await self._queue.join()
+            if not self._delayed:
+                return
+            await asyncio.gather(*list(self._delayed), return_exceptions=True)
+
+    # ── Submission & cancellation ─────────────────────────────────────────────
+
+    async def submit(
+        self,
+        session: AsyncSession,
+        photograph_id: int,
+        attribute_types: list[AnalysisAttributeType],
+        triggered_by: Optional[int],
+    ) -> list[AnalysisJobModel]:
+        """
+        Create QUEUED rows in the caller's session and commit them, then hand
+        the ids to the workers. Commit happens here because workers read the
+        rows from their own sessions.
+        """
+        jobs = [
+            AnalysisJobModel(
+                photograph_id=photograph_id,
+                attribute_type=attribute_type,
+                tool_name=_configured_tool(attribute_type),
+                status=JobStatus.QUEUED,
+                triggered_by=triggered_by,
+                attempts=0,
+            )
+            for attribute_type in attribute_types
+        ]
+        session.add_all(jobs)
+        await session.flush()
+        await session.commit()
+        for job in jobs:
+            self.enqueue(job.id)
+            self._publish(job.photograph_id, job_event(job))
+        return jobs
+
+    def enqueue(self, job_id: int) -> None:
+        if self._queue is None:
+            raise RuntimeError("La cola de análisis no está iniciada.")
+        self._queue.put_nowait(job_id)
+
+    async def cancel(self, job_id: int) -> Optional[AnalysisJobModel]:
+        """
+        Cancel a queued or running job. Returns the job, or None if it does
+        not exist. Jobs already in a terminal state are returned unchanged.
+        """
+        async with self._sessions() as session:
+            job = (await session.execute(
+                select(AnalysisJobModel).where(AnalysisJobModel.id == job_id)
+            )).scalar_one_or_none()
+            if job is None or job.status in JobStatus.terminal():
+                return job
+            job.status = JobStatus.CANCELLED
+            job.completed_at = datetime.now(timezone.utc)
+            await session.commit()
+            event = job_event(job)
+
+        self._cancelled.add(job_id)
+        task = self._running.get(job_id)
+        if task is not None:
+            task.cancel()
+        self._publish(event["photograph_id"], event)
+        return job
+
+    # ── Progress subscribers (SSE) ────────────────────────────────────────────
+
+    def subscribe(self, photograph_id: int) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.setdefault(photograph_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, photograph_id: int, queue: asyncio.Queue) -> None:
+        subscribers = self._subscribers.get(photograph_id)
+        if subscribers is None:
+            return
+        subscribers.discard(queue)
+        if not subscribers:
+            del self._subscribers[photograph_id]
+
+    def add_listener(self, listener: Callable[[dict], None]) -> None:
+        """Receive every job event, whatever the photograph (must not block)."""
+        self._listeners.add(listener)
+
+    def remove_listener(self, listener: Callable[[dict], None]) -> None:
+        self._listeners.discard(listener)
+
+    def _publish(self, photograph_id: int, event: dict) -> None:
+        for queue in self._subscribers.get(photograph_id, ()):
+            queue.put_nowait(event)
+        for listener in list(self._listeners):
+            listener(event)
+
+    # ── Workers ───────────────────────────────────────────────────────────────
+
+    async def _worker(self, index: int) -> None:
+        assert self._queue is not None
+        queue = self._queue
+        while True:
+            job_id = await queue.get()
+            try:
+                task = asyncio.create_task(self._process(job_id))
+                self._running[job_id] = task
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    if job_id not in self._cancelled:
+                        raise
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.error("Analysis worker error", worker=index, job_id=job_id, error=str(exc))
+            finally:
+                self._running.pop(job_id, None)
+                self._cancelled.discard(job_id)
+                queue.task_done()
+
+    async def _claim(self, job_id: int) -> Optional[AnalysisJobModel]:
+        """Atomically move a QUEUED job to RUNNING. None if it was cancelled or taken."""
+        async with self._sessions() as session:
+            result = await session.execute(
+                update(AnalysisJobModel)
+                .where(AnalysisJobModel.id == job_id, AnalysisJobModel.status == JobStatus.QUEUED)
+                .values(
+                    status=JobStatus.RUNNING,
+                    attempts=AnalysisJobModel.attempts + 1,
+                    started_at=datetime.now(timezone.utc),
+                    error_message=None,
+                )
+            )
+            if result.rowcount != 1:
+                await session.rollback()
+                return None
+            job = (await session.execute(
+                select(AnalysisJobModel).where(AnalysisJobModel.id == job_id)
+            )).scalar_one()
+            await session.commit()
+            return job
+
+    async def _process(self, job_id: int) -> None:
+        job = await self._claim(job_id)
+        if job is None:
+            return
+        photograph_id, attempts = job.photograph_id, job.attempts
+        self._publish(photograph_id, job_event(job))
+
+        error: Optional[str] = None
+        try:
+            async with self._sessions() as session:
+                try:
+                    await self._runner_for(job.attribute_type)(
+                        session, photograph_id, job.triggered_by, job_id,
+                    )
+                    await session.commit()
+                except BaseException:
+                    await session.rollback()
+                    raise
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            error = str(exc) or type(exc).__name__
+
+        await self._finish(job_id, photograph_id, attempts, error)
+
+    async def _finish(self, job_id: int, photograph_id: int, attempts: int, error: Optional[str]) -> None:
+        retry = error is not None and attempts < self.max_attempts
+        async with self._sessions() as session:
+            job = (await session.execute(
+                select(AnalysisJobModel).where(AnalysisJobModel.id == job_id)
+            )).scalar_one()
+            if job.status == JobStatus.CANCELLED:
+                return
+            if error is not None:
+                job.error_message = error
+                job.status = JobStatus.QUEUED if retry else JobStatus.FAILED
+                job.completed_at = None if retry else datetime.now(timezone.utc)
+            await session.commit()
+            event = job_event(job)
+        self._publish(photograph_id, event)
+
+        if retry:
+            delay = self.backoff_seconds * (2 ** (attempts - 1))
+            logger.warning("Analysis job retry scheduled", job_id=job_id, attempt=attempts, delay=delay)
+            task = asyncio.create_task(self._enqueue_later(job_id, delay))
+            self._delayed.add(task)
+            task.add_done_callback(self._delayed.discard)
+
+    async def _enqueue_later(self, job_id: int, delay: float) -> None:
+        await asyncio.sleep(delay)
+        if self._queue is not None:
+            self._queue.put_nowait(job_id)
+
+
+# Global queue instance (started in the application lifespan)
+analysis_queue = AnalysisJobQueue()
@@ -0,0 +1,157 @@
+"""
+Content-addressed cache of analyzer results.
+
+Entries are keyed by (content SHA-256, attribute type, provider name,
+provider version): re-registering the same bytes, or re-running analysis
+after a restart, returns the stored result instead of running the model
+again. Bumping a provider's version string naturally misses old entries.
+
+The table is bounded by ANALYSIS_RESULT_CACHE_MAX_ENTRIES; when a store
+pushes it over the limit the least recently used entries are evicted.
+Hit / miss / store / eviction counters are kept per process and exposed
+through GET /taxonomy/analysis-cache.
+"""
+
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import delete, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.config.settings import settings
+from app.features.analysis.infrastructure.persistence.analysis_model import (
+    AnalysisAttributeType,
+    AnalysisResultCacheModel,
+)
+
+
+class AnalysisResultCache:
+    """Database-backed, size-bounded result cache with in-process metrics."""
+
+    def __init__(self, max_entries: Optional[int] = None, enabled: Optional[bool] = None) -> None:
+        self._max_entries = max_entries
+        self._enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return settings.analysis_result_cache_enabled if self._enabled is None else self._enabled
+
+    @property
+    def max_entries(self) -> int:
+        return settings.analysis_result_cache_max_entries if self._max_entries is None else self._max_entries
+
+    @staticmethod
+    def _key_filter(
+        content_sha256: str,
+        attribute_type: AnalysisAttributeType,
+        provider_name: str,
+        provider_version: str,
+    ):
+        return (
+            AnalysisResultCacheModel.content_sha256 == content_sha256,
+            AnalysisResultCacheModel.attribute_type == attribute_type,
+            AnalysisResultCacheModel.provider_name == provider_name,
+            AnalysisResultCacheModel.provider_version == provider_version,
+        )
+
+    async def get(
+        self,
+        session: AsyncSession,
+        content_sha256: str,
+        attribute_type: AnalysisAttributeType,
+        provider_name: str,
+        provider_version: str,
+    ) -> Optional[dict]:
+        """Cached result dict, or None on a miss (counted either way)."""
+        result = await session.execute(
+            select(AnalysisResultCacheModel).where(
+                *self._key_filter(content_sha256, attribute_type, provider_name, provider_version)
+            )
+        )
+        entry = result.scalar_one_or_none()
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        entry.hits = (entry.hits or 0) + 1
+        entry.last_used_at = datetime.now(timezone.utc)
+        await session.flush()
+        return dict(entry.result)
+
+    async def put(
+        self,
+        session: AsyncSession,
+        content_sha256: str,
+        attribute_type: AnalysisAttributeType,
+        provider_name: str,
+        provider_version: str,
+        analysis: dict,
+    ) -> None:
+        """Store a successful result, then evict down to max_entries."""
+        if self.max_entries <= 0:
+            return
+        entry = AnalysisResultCacheModel(
+            content_sha256=content_sha256,
+            attribute_type=attribute_type,
+            provider_name=provider_name,
+            provider_version=provider_version,
+            result=analysis,
+            last_used_at=datetime.now(timezone.utc),
+        )
+        try:
+            # Savepoint: a concurrent job may have stored the same key first.
+            async with session.begin_nested():
+                session.add(entry)
+        except IntegrityError:
+            return
+        self.stores += 1
+        await self._evict(session)
+
+    async def _evict(self, session: AsyncSession) -> None:
+        count = await session.scalar(select(func.count(AnalysisResultCacheModel.id)))
+        excess = (count or 0) - self.max_entries
+        if excess <= 0:
+            return
+        oldest = (
+            select(AnalysisResultCacheModel.id)
+            .order_by(AnalysisResultCacheModel.last_used_at, AnalysisResultCacheModel.id)
+            .limit(excess)
+        )
+        await session.execute(
+            delete(AnalysisResultCacheModel)
+            .where(AnalysisResultCacheModel.id.in_(oldest))
+            .execution_options(synchronize_session=False)
+        )
+        self.evictions += excess
+
+    async def clear(self, session: AsyncSession) -> int:
+        """Delete every entry. Returns the number of rows removed."""
+        result = await session.execute(delete(AnalysisResultCacheModel))
+        return result.rowcount or 0
+
+    async def stats(self, session: AsyncSession) -> dict:
+        entries = await session.scalar(select(func.count(AnalysisResultCacheModel.id)))
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": entries or 0,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+        }
+
+    def reset_metrics(self) -> None:
+        self.hits = self.misses = self.stores = self.evictions = 0
+
+
+# Global cache instance
+analysis_result_cache = AnalysisResultCache()
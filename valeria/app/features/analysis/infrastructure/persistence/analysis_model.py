@@ -6,8 +6,8 @@ AnalysisJobs track tool executions; Experiments are formal research acts.
 from enum import Enum
 
 from sqlalchemy import (
-    Column, String, Integer, Text, DateTime,
-    ForeignKey, Enum as SQLEnum, Date,
+    Column, String, Integer, BigInteger, Float, Text, DateTime, Boolean, JSON,
+    ForeignKey, Enum as SQLEnum, Date, UniqueConstraint,
 )
 from sqlalchemy.sql import func
 
@@ -16,9 +16,15 @@ from app.infrastructure.database.base import Base
 
 class JobStatus(str, Enum):
     PENDING = "pending"
+    QUEUED = "queued"
     RUNNING = "running"
     COMPLETED = "completed"
     FAILED = "failed"
+    CANCELLED = "cancelled"
+
+    @classmethod
+    def terminal(cls) -> tuple["JobStatus", ...]:
+        return (cls.COMPLETED, cls.FAILED, cls.CANCELLED)
 
 
 class ExperimentStatus(str, Enum):
@@ -28,6 +34,23 @@ class ExperimentStatus(str, Enum):
     FAILED = "failed"
 
 
+class CampaignScope(str, Enum):
+    COLLECTION = "collection"
+    BOX = "box"
+    ROLL = "roll"
+
+
+class CampaignStatus(str, Enum):
+    PLANNING = "planning"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    CANCELLED = "cancelled"
+
+    @classmethod
+    def unfinished(cls) -> tuple["CampaignStatus", ...]:
+        return (cls.PLANNING, cls.RUNNING)
+
+
 class AnalysisAttributeType(str, Enum):
     TECHNICAL = "technical"
     CHRONOLOGY = "chronology"
@@ -44,6 +67,13 @@ class AnalysisJobModel(Base):
     Tracks every tool execution over a photograph.
     Agnostic to tool: tool_name is a free string (pillow, places365, geocLIP, claude, etc.).
     Linked optionally to an Experiment when it forms part of a formal research act.
+    Jobs submitted to the background queue start QUEUED; attempts counts
+    executions including retries. cache_hit marks jobs answered from the
+    analysis result cache instead of running the tool. Jobs planned by a
+    campaign carry its campaign_id and wait PENDING until it dispatches them.
+    The resource columns split a run into decode, inference and DB write
+    time, with peak resident memory and input size (see instrumentation);
+    they stay NULL for jobs that never reached the analyzer.
     """
 
     __tablename__ = "analysis_jobs"
@@ -69,6 +99,18 @@ class AnalysisJobModel(Base):
     started_at = Column(DateTime(timezone=True), nullable=True)
     completed_at = Column(DateTime(timezone=True), nullable=True)
     error_message = Column(Text, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    cache_hit = Column(Boolean, nullable=False, default=False, server_default="0")
+    campaign_id = Column(
+        Integer, ForeignKey("analysis_campaigns.id", ondelete="SET NULL"),
+        nullable=True, index=True,
+    )
+    decode_ms = Column(Float, nullable=True)
+    inference_ms = Column(Float, nullable=True)
+    db_write_ms = Column(Float, nullable=True)
+    peak_memory_bytes = Column(BigInteger, nullable=True)
+    input_pixels = Column(BigInteger, nullable=True)
+    input_bytes = Column(BigInteger, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     def __repr__(self) -> str:
@@ -78,6 +120,79 @@ class AnalysisJobModel(Base):
         )
 
 
+class AnalysisCampaignModel(Base):
+    """
+    Bulk analysis of every photograph under a collection, box or roll.
+    Progress lives in the campaign's job rows; the counters here only record
+    what planning decided (photographs in scope, analyses skipped because an
+    ACTIVE record from the current provider version already exists).
+    """
+
+    __tablename__ = "analysis_campaigns"
+
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
+    scope_type = Column(
+        SQLEnum(CampaignScope, values_callable=_enum_values),
+        nullable=False,
+    )
+    scope_id = Column(Integer, nullable=False)
+    attribute_types = Column(JSON, nullable=False)
+    concurrency = Column(Integer, nullable=False)
+    status = Column(
+        SQLEnum(CampaignStatus, values_callable=_enum_values),
+        nullable=False, default=CampaignStatus.PLANNING, index=True,
+    )
+    total_photographs = Column(Integer, nullable=False, default=0, server_default="0")
+    skipped = Column(Integer, nullable=False, default=0, server_default="0")
+    triggered_by = Column(
+        Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True,
+    )
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    def __repr__(self) -> str:
+        return (
+            f"<AnalysisCampaignModel(id={self.id}, scope={self.scope_type}:{self.scope_id}, "
+            f"status={self.status})>"
+        )
+
+
+class AnalysisResultCacheModel(Base):
+    """
+    Analyzer output keyed by file content and exact provider version.
+    A new provider version never matches old entries, so upgrading a model
+    invalidates its cached results without any explicit purge.
+    """
+
+    __tablename__ = "analysis_result_cache"
+    __table_args__ = (
+        UniqueConstraint(
+            "content_sha256", "attribute_type", "provider_name", "provider_version",
+            name="uq_analysis_result_cache_key",
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
+    content_sha256 = Column(String(64), nullable=False, index=True)
+    attribute_type = Column(
+        SQLEnum(AnalysisAttributeType, values_callable=_enum_values),
+        nullable=False,
+    )
+    provider_name = Column(String(100), nullable=False)
+    provider_version = Column(String(50), nullable=False)
+    result = Column(JSON, nullable=False)
+    hits = Column(Integer, nullable=False, default=0, server_default="0")
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    last_used_at = Column(DateTime(timezone=True), nullable=False, index=True)
+
+    def __repr__(self) -> str:
+        return (
+            f"<AnalysisResultCacheModel(id={self.id}, attribute_type={self.attribute_type}, "
+            f"provider={self.provider_name}/{self.provider_version})>"
+        )
+
+
 class ExperimentModel(Base):
     """
     Formal research act connecting a photograph, an attribute dimension,
@@ -0,0 +1,264 @@
+"""
+ZIP export of a roll or a whole box for researchers.
+
+The archive holds, per photograph the user may download (see file_access):
+
+    <scope>/[roll-<id>/]<photograph>/<registered files>
+    <scope>/[roll-<id>/]<photograph>/derivatives/<file id>-<rendition>.<ext>   (optional)
+    <scope>/manifest.json   photographs, files and ACTIVE taxonomy attributes
+    <scope>/manifest.csv    one row per photograph, attributes flattened
+
+<photograph> is the identifier, prefixed with the photograph id when
+another photograph of the same folder already uses it (identifiers are
+not unique); file names clashing within a photograph get the file id.
+
+Box exports get one roll-<id>/ folder per roll. Everything is read from
+the database up front, in id chunks (see file_access.id_chunks), and the
+manifests come first in the archive. File contents are streamed from
+disk while the response is written (see zip_stream), so memory does not
+grow with the size of the export.
+Registered files missing from storage are listed in the manifest with
+"missing": true and left out of the archive.
+"""
+
+import csv
+import io
+import json
+import os
+import re
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone
+from enum import Enum
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.features.archive.application.file_access import accessible_photograph_ids, id_chunks
+from app.features.archive.infrastructure.adapters.zip_stream import ZipEntry
+from app.features.archive.infrastructure.persistence.archive_model import (
+    BoxModel,
+    PhotographDerivativeModel,
+    PhotographFileModel,
+    PhotographModel,
+    RollModel,
+)
+from app.features.taxonomy.infrastructure.persistence.taxonomy_model import (
+    AttrChronologyDatingModel,
+    AttrEnvironmentalSpatialModel,
+    AttrGeographicReferenceModel,
+    AttrTechnicalMetadataModel,
+    AttributeStatus,
+)
+from app.shared.domain.exceptions import EntityNotFoundError, PermissionDeniedError
+
+ATTRIBUTE_MODELS = {
+    "technical": AttrTechnicalMetadataModel,
+    "chronology": AttrChronologyDatingModel,
+    "geographic": AttrGeographicReferenceModel,
+    "environmental": AttrEnvironmentalSpatialModel,
+}
+
+# Bookkeeping columns left out of the manifests
+_SKIPPED_COLUMNS = {"id", "photograph_id", "status", "raw_output"}
+
+_UNSAFE = re.compile(r"[^\w.-]+")
+
+
+@dataclass
+class ArchiveExport:
+    """What to stream: archive name, ordered entries and a few counts."""
+
+    filename: str
+    entries: list[ZipEntry] = field(default_factory=list)
+    photographs: int = 0
+    skipped_photographs: int = 0
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _safe(name: str) -> str:
+    return _UNSAFE.sub("_", name).strip("._") or "file"
+
+
+def _attribute_values(row) -> dict:
+    return {
+        column.name: _plain(getattr(row, column.name))
+        for column in row.__table__.columns
+        if column.name not in _SKIPPED_COLUMNS
+    }
+
+
+async def _active_attributes(session: AsyncSession, photograph_ids: list[int]) -> dict[int, dict]:
+    """{photograph_id: {attribute: values}} from the latest ACTIVE row of each attribute."""
+    attributes: dict[int, dict] = {pid: {} for pid in photograph_ids}
+    for name, model in ATTRIBUTE_MODELS.items():
+        for chunk in id_chunks(photograph_ids):
+            rows = (await session.execute(
+                select(model)
+                .where(model.photograph_id.in_(chunk))
+                .where(model.status == AttributeStatus.ACTIVE)
+                .order_by(model.analyzed_at, model.id)
+            )).scalars().all()
+            for row in rows:
+                attributes[row.photograph_id][name] = _attribute_values(row)
+    return attributes
+
+
+def _manifest_csv(photographs: list[dict]) -> bytes:
+    columns = ["photograph_id", "identifier", "frame_number", "roll_id", "box_id", "files"]
+    for name, model in ATTRIBUTE_MODELS.items():
+        columns += [f"{name}.{c.name}" for c in model.__table__.columns if c.name not in _SKIPPED_COLUMNS]
+
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=columns)
+    writer.writeheader()
+    for photo in photographs:
+        row = {key: photo[key] for key in columns[:5]}
+        row["files"] = ";".join(f["path"] for f in photo["files"] if not f.get("missing"))
+        for name, values in photo["attributes"].items():
+            row.update({f"{name}.{key}": value for key, value in values.items()})
+        writer.writerow(row)
+    return out.getvalue().encode("utf-8")
+
+
+async def _build(
+    session: AsyncSession,
+    scope: str,
+    rolls: list[RollModel],
+    user_id: int,
+    include_derivatives: bool,
+    roll_folders: bool,
+) -> ArchiveExport:
+    roll_by_id = {roll.id: roll for roll in rolls}
+    photographs = (await session.execute(
+        select(PhotographModel)
+        .where(PhotographModel.roll_id.in_(roll_by_id))
+        .order_by(PhotographModel.roll_id, PhotographModel.frame_number, PhotographModel.id)
+    )).scalars().all()
+    allowed = await accessible_photograph_ids(session, user_id, [p.id for p in photographs])
+    if photographs and not allowed:
+        raise PermissionDeniedError("No tiene permiso para descargar fotografías de este conjunto.")
+    skipped = len(photographs) - len(allowed)
+    photographs = [p for p in photographs if p.id in allowed]
+    photo_ids = [p.id for p in photographs]
+
+    files: dict[int, list[PhotographFileModel]] = {pid: [] for pid in photo_ids}
+    for chunk in id_chunks(photo_ids):
+        for pf in (await session.execute(
+            select(PhotographFileModel)
+            .where(PhotographFileModel.photograph_id.in_(chunk))
+            .order_by(PhotographFileModel.is_master.desc(), PhotographFileModel.id)
+        )).scalars().all():
+            files[pf.photograph_id].append(pf)
+
+    derivatives: dict[int, list[PhotographDerivativeModel]] = {}
+    if include_derivatives:
+        file_ids = [pf.id for group in files.values() for pf in group]
+        for chunk in id_chunks(file_ids):
+            for row in (await session.execute(
+                select(PhotographDerivativeModel)
+                .where(PhotographDerivativeModel.photograph_file_id.in_(chunk))
+                .order_by(PhotographDerivativeModel.id)
+            )).scalars().all():
+                derivatives.setdefault(row.photograph_file_id, []).append(row)
+
+    attributes = await _active_attributes(session, photo_ids)
+
+    export = ArchiveExport(filename=f"{scope}.zip", photographs=len(photographs), skipped_photographs=skipped)
+    content: list[ZipEntry] = []
+    manifest: list[dict] = []
+    used_folders: set[str] = set()
+    for photo in photographs:
+        parent = f"{scope}/roll-{photo.roll_id}" if roll_folders else scope
+        folder = f"{parent}/{_safe(photo.identifier or f'photograph-{photo.id}')}"
+        if folder in used_folders:
+            folder = f"{parent}/{photo.id}-{_safe(photo.identifier or 'photograph')}"
+        used_folders.add(folder)
+        listed = []
+        used_names: set[str] = set()
+        for pf in files[photo.id]:
+            name = _safe(os.path.basename(pf.file_path))
+            if name in used_names:
+                name = f"{pf.id}-{name}"
+            used_names.add(name)
+            arcname = f"{folder}/{name}"
+            present = os.path.isfile(pf.file_path)
+            listed.append({
+                "file_id": pf.id,
+                "path": arcname,
+                "file_type": _plain(pf.file_type),
+                "is_master": pf.is_master,
+                "file_size_bytes": pf.file_size_bytes,
+                "content_sha256": pf.content_sha256,
+                **({} if present else {"missing": True}),
+            })
+            if present:
+                content.append(ZipEntry(arcname, path=pf.file_path))
+            # Derivatives of the current source only (older versions may linger until re-rendered)
+            for row in derivatives.get(pf.id, []):
+                if row.source_sha256 != pf.content_sha256 or not os.path.isfile(row.file_path):
+                    continue
+                extension = os.path.splitext(row.file_path)[1]
+                arcname = f"{folder}/derivatives/{pf.id}-{_plain(row.rendition)}{extension}"
+                listed.append({
+                    "file_id": pf.id,
+                    "path": arcname,
+                    "derivative": _plain(row.rendition),
+                    "format": _plain(row.format),
+                    "width_px": row.width_px,
+                    "height_px": row.height_px,
+                })
+                content.append(ZipEntry(arcname, path=row.file_path, compress=False))
+
+        roll = roll_by_id[photo.roll_id]
+        manifest.append({
+            "photograph_id": photo.id,
+            "identifier": photo.identifier,
+            "frame_number": photo.frame_number,
+            "roll_id": roll.id,
+            "box_id": roll.box_id,
+            "license": photo.license,
+            "copyright_notes": photo.copyright_notes,
+            "files": listed,
+            "attributes": attributes[photo.id],
+        })
+
+    document = {
+        "scope": scope,
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "photographs": manifest,
+    }
+    export.entries = [
+        ZipEntry(f"{scope}/manifest.json", data=json.dumps(document, ensure_ascii=False, indent=2).encode("utf-8")),
+        ZipEntry(f"{scope}/manifest.csv", data=_manifest_csv(manifest)),
+        *content,
+    ]
+    return export
+
+
+async def export_roll(
+    session: AsyncSession, roll_id: int, user_id: int, include_derivatives: bool = True,
+) -> ArchiveExport:
+    roll = await session.get(RollModel, roll_id)
+    if roll is None:
+        raise EntityNotFoundError(f"Rollo con id={roll_id} no encontrado")
+    return await _build(session, f"roll-{roll_id}", [roll], user_id, include_derivatives, roll_folders=False)
+
+
+async def export_box(
+    session: AsyncSession, box_id: int, user_id: int, include_derivatives: bool = True,
+) -> ArchiveExport:
+    box = await session.get(BoxModel, box_id)
+    if box is None:
+        raise EntityNotFoundError(f"Caja con id={box_id} no encontrada")
+    rolls = (await session.execute(
+        select(RollModel).where(RollModel.box_id == box_id).order_by(RollModel.id)
+    )).scalars().all()
+    return await _build(session, f"box-{box_id}", list(rolls), user_id, include_derivatives, roll_folders=True)
@@ -0,0 +1,73 @@
+"""
+Duplicate report: groups of files that show the same picture.
+
+Built from duplicate_index.groups(), with each file's photograph, roll and
+box attached so curators can tell a second scan of a negative from the
+CR3 + JPG pair of a single photograph. Groups made only of one
+photograph's files are expected and left out unless asked for.
+"""
+
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.features.archive.infrastructure.adapters.duplicate_index import DuplicateIndex, duplicate_index
+from app.features.archive.infrastructure.persistence.archive_model import (
+    PhotographFileModel,
+    PhotographModel,
+    RollModel,
+)
+from app.infrastructure.analysis.perceptual_hash import from_signed64, hamming
+
+
+async def duplicate_groups(
+    session: AsyncSession,
+    max_distance: int,
+    include_same_photograph: bool = False,
+    index: Optional[DuplicateIndex] = None,
+) -> list[dict]:
+    """
+    [{"group": n, "photographs": k, "files": [...]}] where each file has
+    its ids, type, path and distance (bits) to the group's first file.
+    """
+    index = index or duplicate_index
+    groups = await index.groups(session, max_distance)
+    file_ids = [file_id for group in groups for file_id in group]
+    if not file_ids:
+        return []
+
+    rows = (await session.execute(
+        select(PhotographFileModel, PhotographModel.identifier, RollModel.id, RollModel.box_id)
+        .join(PhotographModel, PhotographModel.id == PhotographFileModel.photograph_id)
+        .join(RollModel, RollModel.id == PhotographModel.roll_id)
+        .where(PhotographFileModel.id.in_(file_ids))
+    )).all()
+    by_id = {pf.id: (pf, identifier, roll_id, box_id) for pf, identifier, roll_id, box_id in rows}
+
+    report = []
+    for group in groups:
+        members = [by_id[file_id] for file_id in group if file_id in by_id]
+        photographs = {pf.photograph_id for pf, *_ in members}
+        if len(members) < 2 or (len(photographs) < 2 and not include_same_photograph):
+            continue
+        reference = from_signed64(members[0][0].perceptual_hash)
+        report.append({
+            "group": len(report) + 1,
+            "photographs": len(photographs),
+            "files": [
+                {
+                    "file_id": pf.id,
+                    "photograph_id": pf.photograph_id,
+                    "identifier": identifier,
+                    "roll_id": roll_id,
+                    "box_id": box_id,
+                    "file_type": pf.file_type.value,
+                    "is_master": pf.is_master,
+                    "file_path": pf.file_path,
+                    "distance": hamming(reference, from_signed64(pf.perceptual_hash)),
+                }
+                for pf, identifier, roll_id, box_id in members
+            ],
+        })
+    return report
@@ -0,0 +1,101 @@
+"""
+Download permission for photograph files.
+
+A user may download a photograph's files when any of these holds:
+  - their role handles the archive (curador, administrador, digitalizador)
+  - both the photograph and its collection are public
+  - they digitalized or are responsible for the photograph
+  - they belong to a project linked to the photograph or its collection
+Inactive or unknown users may not download anything.
+"""
+
+from typing import Iterable, Iterator, Optional, Sequence
+
+from sqlalchemy import and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.sql import Select
+
+from app.features.archive.infrastructure.persistence.archive_model import (
+    BoxModel,
+    PhotographFileModel,
+    PhotographModel,
+    RollModel,
+)
+from app.features.authenticate.domain.role import Role
+from app.features.authenticate.infrastructure.adapters.user_repository import UserRepository
+from app.features.manage_projects.infrastructure.persistence.project_model import (
+    ProjectCollectionModel,
+    ProjectMemberModel,
+    ProjectPhotographModel,
+)
+from app.features.view_images.infrastructure.persistence.image_model import CollectionModel
+
+DOWNLOAD_ROLES = (Role.CURADOR, Role.ADMINISTRADOR, Role.DIGITALIZADOR)
+
+# Bound parameters per IN (...) list; asyncpg and SQLite cap a statement at 32767.
+_ID_CHUNK = 10000
+
+
+def id_chunks(ids: Sequence[int]) -> Iterator[Sequence[int]]:
+    """ids in slices short enough for one IN (...) list."""
+    for start in range(0, len(ids), _ID_CHUNK):
+        yield ids[start:start + _ID_CHUNK]
+
+
+async def accessible_photographs(session: AsyncSession, user_id: int) -> Optional[Select]:
+    """
+    SELECT of the photograph ids user_id may download, to use as a subquery
+    (PhotographModel.id.in_(...)); None when the user may download nothing.
+    """
+    user = await UserRepository(session).get_by_id(user_id)
+    if user is None or not user.is_active:
+        return None
+    if user.role in DOWNLOAD_ROLES:
+        return select(PhotographModel.id)
+
+    projects = select(ProjectMemberModel.project_id).where(ProjectMemberModel.user_id == user_id)
+    return (
+        select(PhotographModel.id)
+        .join(RollModel, RollModel.id == PhotographModel.roll_id)
+        .join(BoxModel, BoxModel.id == RollModel.box_id)
+        .join(CollectionModel, CollectionModel.id == BoxModel.collection_id)
+        .where(or_(
+            and_(PhotographModel.is_public == True, CollectionModel.is_public == True),
+            PhotographModel.digitalized_by == user_id,
+            PhotographModel.responsible_by == user_id,
+            CollectionModel.id.in_(
+                select(ProjectCollectionModel.collection_id)
+                .where(ProjectCollectionModel.project_id.in_(projects))
+            ),
+            PhotographModel.id.in_(
+                select(ProjectPhotographModel.photograph_id)
+                .where(ProjectPhotographModel.project_id.in_(projects))
+            ),
+        ))
+    )
+
+
+async def accessible_photograph_ids(
+    session: AsyncSession, user_id: int, photograph_ids: Iterable[int],
+) -> set[int]:
+    """The subset of photograph_ids whose files user_id may download (queried in chunks)."""
+    ids = sorted(set(photograph_ids))
+    if not ids:
+        return set()
+    accessible = await accessible_photographs(session, user_id)
+    if accessible is None:
+        return set()
+
+    allowed = set()
+    for chunk in id_chunks(ids):
+        allowed.update((await session.execute(
+            select(PhotographModel.id)
+            .where(PhotographModel.id.in_(chunk))
+            .where(PhotographModel.id.in_(accessible))
+        )).scalars().all())
+    return allowed
+
+
+async def can_download_file(session: AsyncSession, user_id: int, pf: PhotographFileModel) -> bool:
+    return pf.photograph_id in await accessible_photograph_ids(session, user_id, [pf.photograph_id])
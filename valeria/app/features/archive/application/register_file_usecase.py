@@ -1,6 +1,8 @@
 from typing import Optional
 from app.features.archive.domain.archive import PhotographFile, FileType
 from app.features.archive.domain.archive_port import IArchiveRepository
+from app.infrastructure.analysis.content_hash import current_sha256
+from app.infrastructure.analysis.executor import analysis_executor
 from app.shared.domain.exceptions import EntityNotFoundError, ValidationError
 
 
@@ -21,11 +23,17 @@ class RegisterPhotographFileUseCase:
             raise EntityNotFoundError(f"Fotografía con id={photograph_id} no encontrada")
         if not file_path or not file_path.strip():
             raise ValidationError("La ruta del archivo no puede estar vacía")
+        file_path = file_path.strip()
+        # None when the file is not reachable from the API host yet;
+        # the analysis use cases hash it lazily in that case.
+        content_sha256, content_stat = await analysis_executor.run(current_sha256, file_path)
         pf = PhotographFile(
             photograph_id=photograph_id,
             file_type=file_type,
-            file_path=file_path.strip(),
+            file_path=file_path,
             is_master=is_master,
             file_size_bytes=file_size_bytes,
+            content_sha256=content_sha256,
+            content_stat=content_stat,
         )
         return await self.repository.register_file(pf)
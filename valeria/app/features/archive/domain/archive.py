@@ -202,6 +202,8 @@ class PhotographFile(BaseEntity):
         file_path: str,
         is_master: bool = False,
         file_size_bytes: Optional[int] = None,
+        content_sha256: Optional[str] = None,
+        content_stat: Optional[str] = None,
         id: Optional[int] = None,
         created_at: Optional[datetime] = None,
         updated_at: Optional[datetime] = None,
@@ -212,6 +214,8 @@ class PhotographFile(BaseEntity):
         self.file_path = file_path
         self.is_master = is_master
         self.file_size_bytes = file_size_bytes
+        self.content_sha256 = content_sha256
+        self.content_stat = content_stat
 
     def __repr__(self) -> str:
         return f"PhotographFile(id={self.id}, file_type={self.file_type}, is_master={self.is_master})"
@@ -0,0 +1,102 @@
+"""
+Multi-index hashing: Hamming-radius search over 64-bit perceptual hashes.
+
+Each hash is split into four 16-bit substrings, and each substring position
+has its own table of substring -> hashes. If two hashes are within k bits,
+then by pigeonhole at least one of their substrings differs by at most
+k // 4 bits. A query therefore probes, in each table, the substrings within
+k // 4 of its own: 137 probes per table for k <= 11 and 697 for k <= 15.
+It then checks the full distance of the few hashes found. The cost depends
+on k and on bucket sizes, not on how many hashes are indexed.
+
+A BK-tree was the other candidate. It visits a large part of the tree for
+k around 8 on 64-bit hashes and is slower than a linear scan in Python.
+
+Several items may share one hash (byte-identical or identical-looking
+files). Pure data structure: no I/O, not thread-safe (callers serialize
+writes).
+"""
+
+from functools import lru_cache
+from itertools import combinations
+from typing import Generic, Hashable, Iterator, TypeVar
+
+T = TypeVar("T", bound=Hashable)
+
+_CHUNKS = 4
+_CHUNK_BITS = 16
+_CHUNK_MASK = (1 << _CHUNK_BITS) - 1
+
+
+@lru_cache(maxsize=None)
+def _flip_masks(radius: int) -> tuple[int, ...]:
+    """Every 16-bit mask with at most radius bits set."""
+    return tuple(
+        sum(1 << bit for bit in bits)
+        for r in range(radius + 1)
+        for bits in combinations(range(_CHUNK_BITS), r)
+    )
+
+
+def _chunks(value: int) -> list[int]:
+    return [(value >> (i * _CHUNK_BITS)) & _CHUNK_MASK for i in range(_CHUNKS)]
+
+
+class MultiIndexHash(Generic[T]):
+    """Maps 64-bit hashes to the items that have them, searchable by Hamming radius."""
+
+    def __init__(self) -> None:
+        self._items: dict[int, list[T]] = {}
+        self._tables: list[dict[int, set[int]]] = [{} for _ in range(_CHUNKS)]
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, value: int, item: T) -> None:
+        items = self._items.get(value)
+        if items is None:
+            items = self._items[value] = []
+            for table, chunk in zip(self._tables, _chunks(value)):
+                table.setdefault(chunk, set()).add(value)
+        items.append(item)
+        self._size += 1
+
+    def remove(self, value: int, item: T) -> bool:
+        items = self._items.get(value)
+        if not items or item not in items:
+            return False
+        items.remove(item)
+        self._size -= 1
+        if not items:
+            del self._items[value]
+            for table, chunk in zip(self._tables, _chunks(value)):
+                bucket = table[chunk]
+                bucket.discard(value)
+                if not bucket:
+                    del table[chunk]
+        return True
+
+    def search(self, value: int, max_distance: int) -> list[tuple[int, int, T]]:
+        """(distance, hash, item) of every item within max_distance of value, nearest first."""
+        masks = _flip_masks(max(max_distance, 0) // _CHUNKS)
+        candidates: set[int] = set()
+        for table, chunk in zip(self._tables, _chunks(value)):
+            for mask in masks:
+                bucket = table.get(chunk ^ mask)
+                if bucket:
+                    candidates.update(bucket)
+
+        found = []
+        for candidate in candidates:
+            distance = (candidate ^ value).bit_count()
+            if distance <= max_distance:
+                found.extend((distance, candidate, item) for item in self._items[candidate])
+        found.sort(key=lambda match: match[0])
+        return found
+
+    def __iter__(self) -> Iterator[tuple[int, T]]:
+        """(hash, item) of every item, in no particular order."""
+        for value, items in self._items.items():
+            for item in items:
+                yield value, item
@@ -0,0 +1,151 @@
+"""
+IIIF Image API 3.0 request parameters for ROGER - Valeria API.
+
+{region}/{size}/{rotation}/{quality}.{format} is resolved against the
+image's full-resolution width and height into pixel values: the region to
+extract, the size to scale it to, then mirroring, rotation, quality and
+output format. Invalid or out-of-bounds requests raise ValidationError
+(the API answers 400), as the specification requires.
+
+https://iiif.io/api/image/3.0/
+"""
+
+import math
+import re
+from dataclasses import dataclass
+from typing import Optional
+
+from app.shared.domain.exceptions import ValidationError
+
+QUALITIES = ("default", "color", "gray", "bitonal")
+FORMATS = ("jpg", "png", "webp")
+
+_NUMBER = r"\d+(?:\.\d+)?"
+_REGION_PX = re.compile(r"^(\d+),(\d+),(\d+),(\d+)$")
+_REGION_PCT = re.compile(rf"^pct:({_NUMBER}),({_NUMBER}),({_NUMBER}),({_NUMBER})$")
+_SIZE_WH = re.compile(r"^(!)?(\d+)?,(\d+)?$")
+_SIZE_PCT = re.compile(rf"^pct:({_NUMBER})$")
+_ROTATION = re.compile(rf"^(!)?({_NUMBER})$")
+
+
+@dataclass(frozen=True)
+class ImageRequest:
+    """A IIIF image request resolved to pixels."""
+
+    region: tuple[int, int, int, int]  # x, y, w, h in full-resolution pixels
+    size: tuple[int, int]
+    mirror: bool
+    rotation: float  # degrees clockwise, [0, 360)
+    quality: str
+    format: str
+
+    @property
+    def cache_key(self) -> str:
+        x, y, w, h = self.region
+        return (
+            f"{x},{y},{w},{h}/{self.size[0]},{self.size[1]}/"
+            f"{'!' if self.mirror else ''}{self.rotation:g}/{self.quality}.{self.format}"
+        )
+
+
+def parse_region(region: str, width: int, height: int) -> tuple[int, int, int, int]:
+    if region == "full":
+        return 0, 0, width, height
+    if region == "square":
+        side = min(width, height)
+        return (width - side) // 2, (height - side) // 2, side, side
+
+    match = _REGION_PX.match(region)
+    if match:
+        x, y, w, h = (int(v) for v in match.groups())
+    else:
+        match = _REGION_PCT.match(region)
+        if not match:
+            raise ValidationError(f"Región IIIF inválida: {region}")
+        px, py, pw, ph = (float(v) for v in match.groups())
+        x, y = round(px * width / 100), round(py * height / 100)
+        w, h = round(pw * width / 100), round(ph * height / 100)
+
+    if w <= 0 or h <= 0 or x >= width or y >= height:
+        raise ValidationError(f"La región {region} está vacía o fuera de la imagen.")
+    return x, y, min(w, width - x), min(h, height - y)
+
+
+def parse_size(size: str, region_w: int, region_h: int, max_area: Optional[int] = None) -> tuple[int, int]:
+    upscale = size.startswith("^")
+    spec = size[1:] if upscale else size
+
+    # Largest scale the server allows for this region (maxArea), capped at 1 without ^.
+    limit = math.sqrt(max_area / (region_w * region_h)) if max_area else math.inf
+    if spec == "max":
+        scale = limit if upscale and limit != math.inf else min(limit, 1.0)
+        return max(math.floor(region_w * scale), 1), max(math.floor(region_h * scale), 1)
+
+    match = _SIZE_PCT.match(spec)
+    if match:
+        pct = float(match.group(1))
+        if pct <= 0 or (pct > 100 and not upscale):
+            raise ValidationError(f"Tamaño IIIF inválido: {size}")
+        w, h = round(region_w * pct / 100), round(region_h * pct / 100)
+    else:
+        match = _SIZE_WH.match(spec)
+        if not match or (match.group(2) is None and match.group(3) is None):
+            raise ValidationError(f"Tamaño IIIF inválido: {size}")
+        confined, req_w, req_h = match.group(1), match.group(2), match.group(3)
+        if confined:
+            if req_w is None or req_h is None:
+                raise ValidationError(f"Tamaño IIIF inválido: {size}")
+            scale = min(int(req_w) / region_w, int(req_h) / region_h)
+            if not upscale:
+                scale = min(scale, 1.0)
+            w, h = round(region_w * scale), round(region_h * scale)
+        elif req_h is None:
+            w = int(req_w)
+            h = round(region_h * w / region_w)
+        elif req_w is None:
+            h = int(req_h)
+            w = round(region_w * h / region_h)
+        else:
+            w, h = int(req_w), int(req_h)
+
+    if w <= 0 or h <= 0:
+        raise ValidationError(f"El tamaño {size} produce una imagen vacía.")
+    if not upscale and (w > region_w or h > region_h):
+        raise ValidationError(f"El tamaño {size} amplía la región; use ^{size} para permitirlo.")
+    if max_area and w * h > max_area:
+        raise ValidationError(f"El tamaño {size} supera el área máxima de {max_area} píxeles.")
+    return w, h
+
+
+def parse_rotation(rotation: str) -> tuple[bool, float]:
+    match = _ROTATION.match(rotation)
+    if not match or float(match.group(2)) > 360:
+        raise ValidationError(f"Rotación IIIF inválida: {rotation}")
+    return bool(match.group(1)), float(match.group(2)) % 360
+
+
+def parse_image_request(
+    region: str,
+    size: str,
+    rotation: str,
+    quality: str,
+    format: str,
+    width: int,
+    height: int,
+    max_area: Optional[int] = None,
+) -> ImageRequest:
+    """Resolve the path parameters of a IIIF image request for a width × height image."""
+    if quality not in QUALITIES:
+        raise ValidationError(f"Calidad IIIF no soportada: {quality}")
+    if format not in FORMATS:
+        raise ValidationError(f"Formato IIIF no soportado: {format}")
+    x, y, w, h = parse_region(region, width, height)
+    mirror, degrees = parse_rotation(rotation)
+    return ImageRequest(
+        region=(x, y, w, h),
+        size=parse_size(size, w, h, max_area),
+        mirror=mirror,
+        rotation=degrees,
+        quality=quality,
+        format=format,
+    )
@@ -230,6 +230,8 @@ class ArchiveRepository(IArchiveRepository):
             file_path=file.file_path,
             is_master=file.is_master,
             file_size_bytes=file.file_size_bytes,
+            content_sha256=file.content_sha256,
+            content_stat=file.content_stat,
         )
         self.session.add(model)
         await self.session.flush()
@@ -283,5 +285,6 @@ class ArchiveRepository(IArchiveRepository):
             id=m.id, photograph_id=m.photograph_id,
             file_type=m.file_type, file_path=m.file_path,
             is_master=m.is_master, file_size_bytes=m.file_size_bytes,
+            content_sha256=m.content_sha256, content_stat=m.content_stat,
             created_at=m.created_at, updated_at=m.updated_at,
         )
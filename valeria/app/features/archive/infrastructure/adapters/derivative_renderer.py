@@ -0,0 +1,114 @@
+"""
+Rendering of web derivatives (thumbnail, preview, large) from a photograph file.
+
+Blocking Pillow work; derivative_store runs it off the event loop. The
+source is read through the analysis decode stage (image_decoding), so
+16-bit scans, pyramidal TIFFs and oversized masters are decoded within
+ANALYSIS_DECODE_MEMORY_MB at the largest rendition size instead of at full
+resolution. Then:
+
+  orientation  the EXIF Orientation tag is applied to the pixels (the
+               output carries no EXIF, so browsers cannot rotate it twice)
+  color        an embedded RGB ICC profile (Adobe RGB, ProPhoto…) is
+               converted to sRGB; every rendition is tagged sRGB
+  sizes        each rendition is downscaled from the next larger one with
+               Lanczos; smaller masters are never upscaled
+
+Output files are written atomically, so a reader never sees a partial file.
+"""
+
+import io
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional, Sequence
+
+from app.features.archive.infrastructure.persistence.archive_model import (
+    DerivativeFormat,
+    DerivativeRendition,
+)
+from app.infrastructure.analysis.image_decoding import ORIENTATION_TAG, apply_orientation, decode_image
+
+# Longest side (px) of each rendition
+RENDITION_SIZES = {
+    DerivativeRendition.THUMBNAIL: 256,
+    DerivativeRendition.PREVIEW: 1024,
+    DerivativeRendition.LARGE: 2048,
+}
+
+EXTENSIONS = {DerivativeFormat.WEBP: "webp", DerivativeFormat.JPEG: "jpg"}
+MEDIA_TYPES = {DerivativeFormat.WEBP: "image/webp", DerivativeFormat.JPEG: "image/jpeg"}
+
+
+def _srgb_profile():
+    from PIL import ImageCms
+    return ImageCms.ImageCmsProfile(ImageCms.createProfile("sRGB"))
+
+
+def to_srgb(image, icc_profile: Optional[bytes]):
+    """RGB image converted from its embedded RGB profile to sRGB; unchanged otherwise."""
+    if not icc_profile:
+        return image
+    from PIL import ImageCms
+
+    try:
+        source = ImageCms.ImageCmsProfile(io.BytesIO(icc_profile))
+        # CMYK or grayscale profiles describe the original, not this RGB copy.
+        if source.profile.xcolor_space.strip() != "RGB":
+            return image
+        return ImageCms.profileToProfile(image, source, _srgb_profile(), outputMode="RGB")
+    except (ImageCms.PyCMSError, OSError, ValueError):
+        return image
+
+
+def _save(image, path: Path, fmt: DerivativeFormat, quality: int, icc: bytes) -> None:
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".part")
+    os.close(fd)
+    try:
+        if fmt == DerivativeFormat.WEBP:
+            image.save(tmp, format="WEBP", quality=quality, method=4, icc_profile=icc)
+        else:
+            image.save(
+                tmp, format="JPEG", quality=quality, optimize=True, progressive=True, icc_profile=icc,
+            )
+        os.replace(tmp, path)
+    finally:
+        Path(tmp).unlink(missing_ok=True)
+
+
+def render_derivatives(
+    source_path: str,
+    output_dir: Path,
+    formats: Sequence[DerivativeFormat],
+    quality: int,
+) -> list[dict]:
+    """
+    Write every rendition in every format to output_dir and describe them:
+    [{"rendition", "format", "file_path", "width_px", "height_px", "file_size_bytes"}].
+    Raises on unreadable sources (RAW, missing file).
+    """
+    from PIL import Image
+
+    largest = max(RENDITION_SIZES.values())
+    decoded = decode_image(source_path, max_side=largest)
+    image = apply_orientation(decoded.image, decoded.exif.get(ORIENTATION_TAG))
+    image = to_srgb(image, decoded.icc_profile)
+    icc = _srgb_profile().tobytes()
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    rendered = []
+    for rendition, size in sorted(RENDITION_SIZES.items(), key=lambda item: -item[1]):
+        # In place: image is this call's own decode, and each size is saved before the next.
+        image.thumbnail((size, size), Image.Resampling.LANCZOS)
+        for fmt in formats:
+            path = output_dir / f"{rendition.value}.{EXTENSIONS[fmt]}"
+            _save(image, path, fmt, quality, icc)
+            rendered.append({
+                "rendition": rendition,
+                "format": fmt,
+                "file_path": str(path),
+                "width_px": image.width,
+                "height_px": image.height,
+                "file_size_bytes": path.stat().st_size,
+            })
+    return rendered
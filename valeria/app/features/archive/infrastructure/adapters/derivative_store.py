@@ -0,0 +1,177 @@
+"""
+Web derivatives of photograph files: background generation, on-demand
+fallback and the photograph_derivatives rows that record them.
+
+Registering a JPG/TIFF/PNG file submits it here; background workers (see
+file_render_workers) render its thumbnail / preview / large renditions in
+every DERIVATIVE_FORMATS format (see derivative_renderer) off the event
+loop. A file whose renditions are missing (registered before this existed,
+server restarted mid-render, derivatives directory wiped) is rendered on
+its first request instead.
+
+Renditions are keyed by the source's content_sha256, under
+DERIVATIVES_DIR/<file id>/<sha prefix>/, so replacing a master on disk
+produces new files rather than overwriting ones a client may be reading.
+The hash is recomputed whenever the file's size or mtime changed since it
+was taken (see content_hash.refresh_content_hash), which is what makes a
+replaced master stale.
+One render per file runs at a time; concurrent requests wait for it.
+"""
+
+import shutil
+from pathlib import Path
+from typing import Callable, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.config.settings import settings
+from app.features.archive.infrastructure.adapters.derivative_renderer import render_derivatives
+from app.features.archive.infrastructure.adapters.file_render_workers import FileRenderWorkers
+from app.features.archive.infrastructure.persistence.archive_model import (
+    DerivativeFormat,
+    DerivativeRendition,
+    FileType,
+    PhotographDerivativeModel,
+    PhotographFileModel,
+)
+from app.infrastructure.analysis.content_hash import refresh_content_hash
+from app.infrastructure.analysis.executor import analysis_executor
+from app.shared.domain.exceptions import EntityNotFoundError, ValidationError
+
+# File types Pillow can decode (RAW masters need an exported JPG/TIFF)
+RENDERABLE_TYPES = (FileType.JPG, FileType.TIFF, FileType.PNG)
+
+
+class DerivativeStore(FileRenderWorkers):
+    """Renders, records and looks up web renditions of photograph files."""
+
+    kind = "Derivative"
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], AsyncSession]] = None,
+        root: Optional[Path] = None,
+        workers: Optional[int] = None,
+    ) -> None:
+        super().__init__(session_factory, workers)
+        self._root = root
+
+    @property
+    def root(self) -> Path:
+        return self._root if self._root is not None else Path(settings.derivatives_dir)
+
+    @property
+    def formats(self) -> list[DerivativeFormat]:
+        names = [f.strip().lower() for f in settings.derivative_formats.split(",") if f.strip()]
+        return [DerivativeFormat(name) for name in names] or [DerivativeFormat.JPEG]
+
+    def default_workers(self) -> int:
+        return settings.derivative_workers
+
+    # ── Rendering & lookup ────────────────────────────────────────────────────
+
+    async def list_for_file(self, session: AsyncSession, file_id: int) -> list[PhotographDerivativeModel]:
+        result = await session.execute(
+            select(PhotographDerivativeModel)
+            .where(PhotographDerivativeModel.photograph_file_id == file_id)
+            .order_by(PhotographDerivativeModel.id)
+        )
+        return list(result.scalars().all())
+
+    def _current(self, rows: list[PhotographDerivativeModel], source_sha256: Optional[str]) -> bool:
+        wanted = {(r, f) for r in DerivativeRendition for f in self.formats}
+        have = {
+            (r.rendition, r.format) for r in rows
+            if r.source_sha256 == source_sha256 and Path(r.file_path).exists()
+        }
+        return wanted <= have
+
+    async def ensure(
+        self, session: AsyncSession, pf: PhotographFileModel, force: bool = False,
+    ) -> list[PhotographDerivativeModel]:
+        """
+        Rows for every rendition of pf, rendering them first when missing,
+        stale (source bytes changed) or force is set. Flushes, does not commit.
+        Raises ValidationError for file types that cannot be rendered.
+        """
+        if pf.file_type not in RENDERABLE_TYPES:
+            raise ValidationError(
+                f"No se pueden generar derivados web de archivos {pf.file_type.value.upper()}; "
+                "registre una exportación JPG o TIFF."
+            )
+        async with self.file_lock(pf.id):
+            return await self._ensure_locked(session, pf, force)
+
+    async def _ensure_locked(
+        self, session: AsyncSession, pf: PhotographFileModel, force: bool,
+    ) -> list[PhotographDerivativeModel]:
+        await refresh_content_hash(pf)
+        source_sha256 = pf.content_sha256
+        rows = await self.list_for_file(session, pf.id)
+        if not force and self._current(rows, source_sha256):
+            return rows
+
+        version = (source_sha256 or "unhashed")[:16]
+        output_dir = self.root / str(pf.id) / version
+        rendered = await analysis_executor.run(
+            render_derivatives, pf.file_path, output_dir, self.formats, settings.derivative_quality,
+        )
+
+        by_key = {(r.rendition, r.format): r for r in rows}
+        current = []
+        for item in rendered:
+            row = by_key.pop((item["rendition"], item["format"]), None)
+            if row is None:
+                row = PhotographDerivativeModel(photograph_file_id=pf.id)
+                session.add(row)
+            for key, value in item.items():
+                setattr(row, key, value)
+            row.source_sha256 = source_sha256
+            current.append(row)
+        for stale in by_key.values():  # formats no longer configured
+            await session.delete(stale)
+        await session.flush()
+
+        await analysis_executor.run(self._remove_other_versions, self.root / str(pf.id), version)
+        return current
+
+    @staticmethod
+    def _remove_other_versions(file_dir: Path, keep: str) -> None:
+        if not file_dir.is_dir():
+            return
+        for child in file_dir.iterdir():
+            if child.is_dir() and child.name != keep:
+                shutil.rmtree(child, ignore_errors=True)
+
+    async def get(
+        self,
+        session: AsyncSession,
+        file_id: int,
+        rendition: DerivativeRendition,
+        fmt: DerivativeFormat,
+    ) -> PhotographDerivativeModel:
+        """One rendition, rendered on demand when missing (cache miss)."""
+        pf = await session.get(PhotographFileModel, file_id)
+        if pf is None:
+            raise EntityNotFoundError(f"Archivo con id={file_id} no encontrado")
+        if fmt not in self.formats:
+            raise ValidationError(f"Formato de derivado no habilitado: {fmt.value}")
+
+        await refresh_content_hash(pf)
+        rows = await self.list_for_file(session, file_id)
+        for row in rows:
+            if (
+                row.rendition == rendition and row.format == fmt
+                and (pf.content_sha256 is None or row.source_sha256 == pf.content_sha256)
+                and Path(row.file_path).exists()
+            ):
+                return row
+        for row in await self.ensure(session, pf):
+            if row.rendition == rendition and row.format == fmt:
+                return row
+        raise EntityNotFoundError(f"Derivado {rendition.value}/{fmt.value} no disponible")
+
+
+# Global derivative store
+derivative_store = DerivativeStore()
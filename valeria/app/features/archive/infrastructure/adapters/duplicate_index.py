@@ -0,0 +1,198 @@
+"""
+Perceptual hash index of photograph files: near-duplicate lookup.
+
+Registering a file submits it here (see file_render_workers). A background
+worker computes its perceptual hash (see perceptual_hash) off the event
+loop and stores it in photograph_files.perceptual_hash. Files registered
+before that column existed are hashed on their first lookup, or in bulk
+with scripts/duplicate_report.py.
+
+Lookups use an in-memory multi-index hash (see hash_index) over every
+stored hash. It is loaded from the database on first use (one query, 8
+bytes per file) and kept current as files are hashed, so a search within
+DUPLICATE_MAX_DISTANCE bits does not scan the table. Each lookup first
+compares the count and highest id of the hashed files with the ones the
+index was loaded at; when another process (a worker, duplicate_report.py)
+hashed or deleted files meanwhile they differ, and the index is reloaded.
+"""
+
+import asyncio
+from typing import Callable, Optional
+
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.config.settings import settings
+from app.features.archive.domain.hash_index import MultiIndexHash
+from app.features.archive.infrastructure.adapters.file_render_workers import FileRenderWorkers
+from app.features.archive.infrastructure.persistence.archive_model import PhotographFileModel
+from app.infrastructure.analysis.executor import analysis_executor
+from app.infrastructure.analysis.perceptual_hash import from_signed64, perceptual_hash_file, to_signed64
+from app.shared.domain.exceptions import EntityNotFoundError, ValidationError
+
+_BACKFILL_BATCH = 100
+
+
+class DuplicateIndex(FileRenderWorkers):
+    """Hashes files in the background and finds the ones within k bits of each other."""
+
+    kind = "Perceptual hash"
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], AsyncSession]] = None,
+        workers: Optional[int] = None,
+    ) -> None:
+        super().__init__(session_factory, workers)
+        self._index: Optional[MultiIndexHash[int]] = None
+        # file id -> hash; hashes computed before the index is loaded wait here
+        self._hashes: dict[int, int] = {}
+        # (count, max id) of the hashed files the index reflects
+        self._stamp: Optional[tuple[int, int]] = None
+        self._load_lock = asyncio.Lock()
+
+    def default_workers(self) -> int:
+        return settings.duplicate_hash_workers
+
+    # ── Hashing ───────────────────────────────────────────────────────────────
+
+    async def ensure(self, session: AsyncSession, pf: PhotographFileModel, force: bool = False) -> Optional[int]:
+        """
+        pf's perceptual hash (unsigned), computing and flushing it first when
+        missing or force is set. None when the file cannot be decoded.
+        """
+        async with self.file_lock(pf.id):
+            if pf.perceptual_hash is not None and not force:
+                value = from_signed64(pf.perceptual_hash)
+            else:
+                value = await analysis_executor.run(perceptual_hash_file, pf.file_path)
+                if value is None:
+                    return None
+                pf.perceptual_hash = to_signed64(value)
+                await session.flush()
+            self._remember(pf.id, value)
+            return value
+
+    def _remember(self, file_id: int, value: int) -> None:
+        previous = self._hashes.get(file_id)
+        if previous == value:
+            return
+        self._hashes[file_id] = value
+        if self._index is not None:
+            if previous is not None:
+                self._index.remove(previous, file_id)
+            elif self._stamp is not None:
+                count, max_id = self._stamp
+                self._stamp = (count + 1, max(max_id, file_id))
+            self._index.add(value, file_id)
+
+    async def backfill(self, session: AsyncSession, limit: Optional[int] = None) -> tuple[int, int]:
+        """Hash files that have no perceptual hash yet. Returns (hashed, unreadable)."""
+        query = (
+            select(PhotographFileModel)
+            .where(PhotographFileModel.perceptual_hash.is_(None))
+            .order_by(PhotographFileModel.id)
+        )
+        if limit is not None:
+            query = query.limit(limit)
+        files = list((await session.execute(query)).scalars().all())
+        hashed = unreadable = 0
+        for start in range(0, len(files), _BACKFILL_BATCH):
+            for pf in files[start:start + _BACKFILL_BATCH]:
+                if await self.ensure(session, pf) is None:
+                    unreadable += 1
+                else:
+                    hashed += 1
+            await session.commit()
+        return hashed, unreadable
+
+    # ── Lookup ────────────────────────────────────────────────────────────────
+
+    async def index(self, session: AsyncSession) -> MultiIndexHash[int]:
+        """The index of every stored hash, (re)loaded when the table changed."""
+        async with self._load_lock:
+            stamp = await self._table_stamp(session)
+            if self._index is None or stamp != self._stamp:
+                rows = await session.execute(
+                    select(PhotographFileModel.id, PhotographFileModel.perceptual_hash)
+                    .where(PhotographFileModel.perceptual_hash.is_not(None))
+                )
+                hashes = {file_id: from_signed64(value) for file_id, value in rows.all()}
+                if self._index is None:
+                    hashes.update(self._hashes)
+                index: MultiIndexHash[int] = MultiIndexHash()
+                for file_id, value in hashes.items():
+                    index.add(value, file_id)
+                self._hashes, self._index, self._stamp = hashes, index, stamp
+        return self._index
+
+    @staticmethod
+    async def _table_stamp(session: AsyncSession) -> tuple[int, int]:
+        count, max_id = (await session.execute(
+            select(func.count(PhotographFileModel.id), func.max(PhotographFileModel.id))
+            .where(PhotographFileModel.perceptual_hash.is_not(None))
+        )).one()
+        return count, max_id or 0
+
+    def reset(self) -> None:
+        """Drop the in-memory index; the next lookup reloads it from the database."""
+        self._index = None
+        self._hashes = {}
+        self._stamp = None
+
+    async def similar(
+        self, session: AsyncSession, file_id: int, max_distance: int,
+    ) -> list[tuple[PhotographFileModel, int]]:
+        """(file, distance) of every other file within max_distance bits, nearest first."""
+        pf = await session.get(PhotographFileModel, file_id)
+        if pf is None:
+            raise EntityNotFoundError(f"Archivo con id={file_id} no encontrado")
+        value = await self.ensure(session, pf)
+        if value is None:
+            raise ValidationError("No se pudo leer el archivo para calcular su hash perceptual.")
+
+        index = await self.index(session)
+        distances = {match: d for d, _, match in index.search(value, max_distance) if match != file_id}
+        if not distances:
+            return []
+        rows = (await session.execute(
+            select(PhotographFileModel).where(PhotographFileModel.id.in_(distances))
+        )).scalars().all()
+        return sorted(((row, distances[row.id]) for row in rows), key=lambda m: (m[1], m[0].id))
+
+    async def groups(self, session: AsyncSession, max_distance: int) -> list[list[int]]:
+        """
+        File ids linked by chains of matches within max_distance bits
+        (connected components), each sorted, largest groups first.
+        """
+        index = await self.index(session)
+        parent: dict[int, int] = {}
+
+        def find(x: int) -> int:
+            while parent.setdefault(x, x) != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        searched: set[int] = set()
+        for value, file_id in index:
+            # One search per distinct hash: it already returns every file sharing it
+            if value in searched:
+                continue
+            searched.add(value)
+            for _, _, match in index.search(value, max_distance):
+                if match != file_id:
+                    root_a, root_b = find(file_id), find(match)
+                    if root_a != root_b:
+                        parent[max(root_a, root_b)] = min(root_a, root_b)
+
+        components: dict[int, list[int]] = {}
+        for file_id in parent:
+            components.setdefault(find(file_id), []).append(file_id)
+        groups = [sorted(ids) for ids in components.values() if len(ids) > 1]
+        return sorted(groups, key=lambda g: (-len(g), g[0]))
+
+
+# Global duplicate index
+duplicate_index = DuplicateIndex()
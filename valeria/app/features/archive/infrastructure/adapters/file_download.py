@@ -0,0 +1,61 @@
+"""
+HTTP delivery of photograph files (masters and their exports).
+
+Python serves files through DownloadResponse. It is Starlette's
+FileResponse, which already handles Range (including multipart ranges),
+If-Range, HEAD and, on ASGI servers that offer the http.response.pathsend
+extension, hands the whole file to the server so it can use sendfile().
+Otherwise the file is streamed in 1 MiB chunks rather than 64 KiB ones,
+which is enough for multi-gigabyte TIFFs. The ETag is strong and derived
+from content_sha256, so it survives copies and restores that change mtime,
+and If-Range resumes only against the exact same bytes.
+
+Behind nginx, set DOWNLOAD_ACCEL_ROOT (directory the files live under) and
+DOWNLOAD_ACCEL_PREFIX (an `internal` location aliasing it). The API then
+only answers with X-Accel-Redirect after the permission check, and nginx
+sends the bytes itself, ranges and sendfile included.
+"""
+
+import os
+from typing import Optional
+
+from starlette.responses import FileResponse
+
+from app.config.settings import settings
+from app.features.archive.infrastructure.persistence.archive_model import FileType
+
+MEDIA_TYPES = {
+    FileType.JPG: "image/jpeg",
+    FileType.TIFF: "image/tiff",
+    FileType.PNG: "image/png",
+    FileType.CR3: "image/x-canon-cr3",
+}
+
+
+class DownloadResponse(FileResponse):
+    chunk_size = 1024 * 1024
+
+
+def strong_etag(content_sha256: str) -> str:
+    return f'"{content_sha256}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match check (weak comparison, as RFC 9110 requires for it)."""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in (tag.removeprefix("W/") for tag in candidates)
+
+
+def accel_redirect_path(file_path: str) -> Optional[str]:
+    """Internal nginx URI of file_path, or None when X-Accel is off or the file is outside its root."""
+    prefix, root = settings.download_accel_prefix, settings.download_accel_root
+    if not prefix or not root:
+        return None
+    root = os.path.realpath(root)
+    path = os.path.realpath(file_path)
+    if os.path.commonpath([root, path]) != root:
+        return None
+    relative = os.path.relpath(path, root).replace(os.sep, "/")
+    return f"{prefix.rstrip('/')}/{relative}"
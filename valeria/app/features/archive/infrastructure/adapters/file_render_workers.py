@@ -0,0 +1,129 @@
+"""
+In-process background rendering of photograph files.
+
+Base for the stores that turn a registered file into something served over
+HTTP (web derivatives, IIIF tile pyramids). A store is submitted file ids
+after registration; a small pool of asyncio workers calls its ensure() for
+each one in a fresh session. Nothing about pending work is persisted:
+whatever was not rendered before a restart is rendered on first request.
+
+ensure() implementations hold file_lock(file_id) so one render per file
+runs at a time and concurrent requests wait for it instead of repeating it.
+"""
+
+import asyncio
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Optional
+
+import structlog
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.features.archive.infrastructure.persistence.archive_model import PhotographFileModel
+
+logger = structlog.get_logger()
+
+
+class FileRenderWorkers(ABC):
+    """Queue + asyncio workers calling ensure(session, file) per submitted file id."""
+
+    # Noun used in log messages ("Derivative generation failed")
+    kind = "Render"
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], AsyncSession]] = None,
+        workers: Optional[int] = None,
+    ) -> None:
+        self._session_factory = session_factory
+        self._workers = workers
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker_tasks: list[asyncio.Task] = []
+        self._locks: dict[int, asyncio.Lock] = {}
+        self._lock_users: dict[int, int] = {}
+
+    def default_workers(self) -> int:
+        return 1
+
+    @property
+    def workers(self) -> int:
+        return max(self._workers if self._workers is not None else self.default_workers(), 1)
+
+    @property
+    def started(self) -> bool:
+        return self._queue is not None
+
+    def _sessions(self) -> AsyncSession:
+        if self._session_factory is None:
+            from app.infrastructure.database.session import AsyncSessionLocal
+            return AsyncSessionLocal()
+        return self._session_factory()
+
+    @abstractmethod
+    async def ensure(self, session: AsyncSession, pf: PhotographFileModel, force: bool = False):
+        """Render pf (if missing, stale or force) and return the store's result."""
+
+    # ── Lifecycle ─────────────────────────────────────────────────────────────
+
+    async def start(self) -> None:
+        if self.started:
+            return
+        self._queue = asyncio.Queue()
+        for i in range(self.workers):
+            self._worker_tasks.append(asyncio.create_task(self._worker(i)))
+
+    async def stop(self) -> None:
+        """Cancel workers. Unrendered files are rendered on their first request."""
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks.clear()
+        self._queue = None
+
+    async def join(self) -> None:
+        """Wait until every submitted file has been processed (tests, CLI)."""
+        if self._queue is not None:
+            await self._queue.join()
+
+    # ── Submission ────────────────────────────────────────────────────────────
+
+    async def submit(self, session: AsyncSession, file_id: int) -> None:
+        """
+        Commit the caller's session (the worker reads the file row from its
+        own session), then queue the file for background rendering.
+        """
+        await session.commit()
+        if self._queue is None:
+            logger.debug(f"{self.kind} workers not started; rendering on demand", file_id=file_id)
+            return
+        self._queue.put_nowait(file_id)
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            file_id = await self._queue.get()
+            try:
+                async with self._sessions() as session:
+                    pf = await session.get(PhotographFileModel, file_id)
+                    if pf is not None:
+                        await self.ensure(session, pf)
+                        await session.commit()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning(f"{self.kind} generation failed", file_id=file_id, worker=index, error=str(exc))
+            finally:
+                self._queue.task_done()
+
+    @asynccontextmanager
+    async def file_lock(self, file_id: int) -> AsyncIterator[None]:
+        """Serialize renders of one file; the lock is dropped once nobody holds or awaits it."""
+        lock = self._locks.setdefault(file_id, asyncio.Lock())
+        self._lock_users[file_id] = self._lock_users.get(file_id, 0) + 1
+        try:
+            async with lock:
+                yield
+        finally:
+            self._lock_users[file_id] -= 1
+            if not self._lock_users[file_id]:
+                del self._lock_users[file_id]
+                del self._locks[file_id]
@@ -0,0 +1,142 @@
+"""
+IIIF tile pyramids of photograph files: background building, on-demand
+fallback and rendering of image requests.
+
+Registering a JPG/TIFF/PNG file submits it here (see file_render_workers);
+its pyramid (see tile_pyramid) is built under
+IIIF_DIR/<file id>/<sha prefix>/, so a replaced master gets a new pyramid
+and the old one is removed. A file without a pyramid gets one on its first
+info.json or image request.
+
+Image requests that match a stored tile are answered with that file.
+Anything else is composed from the pyramid once and kept in the disk LRU
+tile cache (IIIF_CACHE_DIR, IIIF_CACHE_MB), and answered with its bytes.
+"""
+
+import shutil
+from pathlib import Path
+from typing import Callable, Optional, Union
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.settings import settings
+from app.features.archive.domain.iiif import ImageRequest
+from app.features.archive.infrastructure.adapters.derivative_store import RENDERABLE_TYPES
+from app.features.archive.infrastructure.adapters.file_render_workers import FileRenderWorkers
+from app.features.archive.infrastructure.adapters.tile_cache import TileCache
+from app.features.archive.infrastructure.adapters.tile_pyramid import (
+    aligned_tile,
+    build_pyramid,
+    read_manifest,
+    render_request,
+)
+from app.features.archive.infrastructure.persistence.archive_model import PhotographFileModel
+from app.infrastructure.analysis.content_hash import refresh_content_hash
+from app.infrastructure.analysis.executor import analysis_executor
+from app.shared.domain.exceptions import EntityNotFoundError, ValidationError
+
+
+class PyramidStore(FileRenderWorkers):
+    """Builds tile pyramids and answers IIIF image requests from them."""
+
+    kind = "Pyramid"
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], AsyncSession]] = None,
+        root: Optional[Path] = None,
+        cache: Optional[TileCache] = None,
+        workers: Optional[int] = None,
+    ) -> None:
+        super().__init__(session_factory, workers)
+        self._root = root
+        self._cache = cache
+
+    @property
+    def root(self) -> Path:
+        return self._root if self._root is not None else Path(settings.iiif_dir)
+
+    @property
+    def cache(self) -> TileCache:
+        if self._cache is None:
+            self._cache = TileCache(Path(settings.iiif_cache_dir), settings.iiif_cache_mb * 1024 * 1024)
+        return self._cache
+
+    def default_workers(self) -> int:
+        return settings.iiif_workers
+
+    def _pyramid_dir(self, pf: PhotographFileModel) -> Path:
+        return self.root / str(pf.id) / (pf.content_sha256 or "unhashed")[:16]
+
+    async def ensure(self, session: AsyncSession, pf: PhotographFileModel, force: bool = False) -> dict:
+        """
+        Manifest of pf's pyramid, building it first when missing, stale
+        (source bytes changed) or force is set. Raises ValidationError for
+        file types that cannot be tiled.
+        """
+        if pf.file_type not in RENDERABLE_TYPES:
+            raise ValidationError(
+                f"No se puede generar la pirámide IIIF de archivos {pf.file_type.value.upper()}; "
+                "registre una exportación JPG o TIFF."
+            )
+        async with self.file_lock(pf.id):
+            await refresh_content_hash(pf)
+            pyramid_dir = self._pyramid_dir(pf)
+            manifest = None if force else read_manifest(pyramid_dir)
+            if manifest is None:
+                if force:
+                    await analysis_executor.run(shutil.rmtree, pyramid_dir, True)
+                manifest = await analysis_executor.run(
+                    build_pyramid, pf.file_path, pyramid_dir,
+                    settings.iiif_tile_size, settings.iiif_tile_quality,
+                )
+                await analysis_executor.run(self._remove_other_versions, pyramid_dir)
+            return manifest
+
+    @staticmethod
+    def _remove_other_versions(pyramid_dir: Path) -> None:
+        for child in pyramid_dir.parent.iterdir():
+            if child.is_dir() and child.name != pyramid_dir.name and not child.name.startswith("."):
+                shutil.rmtree(child, ignore_errors=True)
+
+    async def _file(self, session: AsyncSession, file_id: int) -> PhotographFileModel:
+        pf = await session.get(PhotographFileModel, file_id)
+        if pf is None:
+            raise EntityNotFoundError(f"Archivo con id={file_id} no encontrado")
+        return pf
+
+    async def info(self, session: AsyncSession, file_id: int) -> dict:
+        """Pyramid manifest (dimensions, tile size, levels) of a file."""
+        return await self.ensure(session, await self._file(session, file_id))
+
+    async def render(self, session: AsyncSession, file_id: int, request: ImageRequest) -> Union[Path, bytes]:
+        """
+        The encoded response to request: the path of a stored tile when the
+        request is exactly one, otherwise the bytes of a tile cache entry
+        (rendered and stored on miss).
+        """
+        pf = await self._file(session, file_id)
+        manifest = await self.ensure(session, pf)
+        pyramid_dir = self._pyramid_dir(pf)
+
+        if (
+            request.format == "jpg" and request.quality in ("default", "color")
+            and not request.mirror and not request.rotation
+        ):
+            tile = aligned_tile(manifest, pyramid_dir, request.region, request.size)
+            if tile is not None and tile.exists():
+                return tile
+
+        key = f"{pf.id}/{pf.content_sha256}/{request.cache_key}"
+        cached = await analysis_executor.run(self.cache.get, key, request.format)
+        if cached is not None:
+            return cached
+        data = await analysis_executor.run(
+            render_request, manifest, pyramid_dir, request, settings.iiif_tile_quality,
+        )
+        await analysis_executor.run(self.cache.put, key, request.format, data)
+        return data
+
+
+# Global pyramid store
+pyramid_store = PyramidStore()
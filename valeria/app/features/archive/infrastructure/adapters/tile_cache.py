@@ -0,0 +1,131 @@
+"""
+Disk LRU cache of rendered IIIF images with a byte budget.
+
+Requests that are not a stored pyramid tile (other regions, sizes,
+rotations, qualities or formats) are rendered once and kept here, so a
+viewer panning back and forth, or many clients opening the same view,
+pay for composing and encoding only the first time.
+
+Entries are files named by the hash of their key; recency is the file's
+mtime, refreshed on every hit, so the order survives restarts and is
+shared by every process using the directory. The directory is the source
+of truth: the in-memory index is only an estimate of its size, rebuilt
+from the directory before evicting. When the total exceeds IIIF_CACHE_MB
+the least recently used files are deleted. Callers include
+the source's content hash in the key, so a replaced master never hits
+stale entries; those simply age out.
+
+Thread-safe: reads and writes happen on executor threads.
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+# Eviction frees down to this fraction of the budget, so the directory is
+# rescanned once per few puts rather than on every one
+_LOW_WATER = 0.9
+
+
+class TileCache:
+    """Byte-bounded, least-recently-used directory of rendered images."""
+
+    def __init__(self, root: Path, max_bytes: int) -> None:
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self._index: Optional["OrderedDict[str, int]"] = None
+        self._total = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _name(key: str, extension: str) -> str:
+        return f"{hashlib.sha256(key.encode()).hexdigest()}.{extension}"
+
+    def _path(self, name: str) -> Path:
+        return self.root / name[:2] / name
+
+    def _load_index(self) -> "OrderedDict[str, int]":
+        if self._index is None:
+            entries = []
+            if self.root.is_dir():
+                for path in self.root.glob("*/*"):
+                    if path.name.startswith("."):
+                        continue
+                    try:
+                        st = path.stat()
+                    except OSError:
+                        continue
+                    entries.append((st.st_mtime_ns, path.name, st.st_size))
+            entries.sort()
+            self._index = OrderedDict((name, size) for _, name, size in entries)
+            self._total = sum(self._index.values())
+        return self._index
+
+    @property
+    def total_bytes(self) -> int:
+        with self._lock:
+            self._load_index()
+            return self._total
+
+    def get(self, key: str, extension: str) -> Optional[bytes]:
+        """
+        Contents of the cached entry (marked most recently used), or None.
+        Read under the lock: a returned path could be evicted before it is sent.
+        """
+        name = self._name(key, extension)
+        path = self._path(name)
+        with self._lock:
+            index = self._load_index()
+            try:
+                data = path.read_bytes()
+                os.utime(path)
+            except OSError:
+                # Evicted, possibly by another process sharing the directory
+                self._total -= index.pop(name, 0)
+                return None
+            # Possibly written by another process since the index was loaded
+            self._total += len(data) - index.pop(name, 0)
+            index[name] = len(data)
+            return data
+
+    def put(self, key: str, extension: str, data: bytes) -> None:
+        """
+        Store data under key. Over budget, the index is first reloaded from
+        the directory (other processes add entries this one has not seen),
+        then least recently used entries go until below _LOW_WATER of it.
+        """
+        name = self._name(key, extension)
+        path = self._path(name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{name}.", suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(data)
+            os.replace(tmp, path)
+        finally:
+            Path(tmp).unlink(missing_ok=True)
+
+        with self._lock:
+            index = self._load_index()
+            self._total += len(data) - index.pop(name, 0)
+            index[name] = len(data)
+            if self._total <= self.max_bytes:
+                return
+            self._index = None
+            index = self._load_index()
+            index.move_to_end(name)
+            while self._total > self.max_bytes * _LOW_WATER and len(index) > 1:
+                oldest, size = index.popitem(last=False)
+                self._path(oldest).unlink(missing_ok=True)
+                self._total -= size
+
+    def clear(self) -> None:
+        with self._lock:
+            for name in self._load_index():
+                self._path(name).unlink(missing_ok=True)
+            self._index.clear()
+            self._total = 0
@@ -0,0 +1,334 @@
+"""
+Multi-resolution tile pyramids for deep zoom (IIIF).
+
+Blocking Pillow work; pyramid_store runs it off the event loop. A pyramid
+is a directory of JPEG tiles plus a manifest:
+
+    <dir>/manifest.json          width, height, tile_size, levels
+    <dir>/<scale factor>/<col>_<row>.jpg
+
+Level k holds the image downscaled by 2**k (each dimension rounded up), cut
+into tile_size × tile_size tiles; the last level fits in a single tile.
+Those are exactly the tiles a IIIF viewer requests, so deep zoom serves
+pre-encoded files, and any other region is composed from the tiles of the
+closest level that covers it instead of decoding the master.
+
+Building streams the master top to bottom (image_decoding.iter_full_resolution):
+each strip of tile rows is written, halved and fed to the next level, so
+peak memory is a few strips per level, not the full-resolution image.
+EXIF-rotated masters (camera JPEGs) are rotated before tiling: in memory
+when they fit ANALYSIS_DECODE_MEMORY_MB, otherwise through a temporary raw
+copy on disk read column-wise. Embedded RGB ICC profiles are converted to
+sRGB.
+
+render_request() answers a parsed IIIF request from the pyramid: compose
+the region, then mirror, rotate, apply the quality and encode.
+"""
+
+import io
+import json
+import math
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Iterator, Optional
+
+import numpy as np
+
+from app.config.settings import settings
+from app.features.archive.domain.iiif import ImageRequest
+from app.features.archive.infrastructure.adapters.derivative_renderer import to_srgb
+from app.infrastructure.analysis.image_decoding import (
+    ORIENTATION_TAG,
+    apply_orientation,
+    iter_full_resolution,
+    read_exif,
+)
+
+MANIFEST = "manifest.json"
+
+
+def _quarter_turns():
+    from PIL import Image
+
+    # Clockwise degrees → transpose (Pillow's ROTATE_* are counter-clockwise)
+    return {
+        90.0: Image.Transpose.ROTATE_270,
+        180.0: Image.Transpose.ROTATE_180,
+        270.0: Image.Transpose.ROTATE_90,
+    }
+
+
+def level_sizes(width: int, height: int, tile_size: int) -> list[tuple[int, int, int]]:
+    """[(scale_factor, width, height)] from full resolution down to one tile."""
+    levels = []
+    scale = 1
+    while True:
+        w, h = math.ceil(width / scale), math.ceil(height / scale)
+        levels.append((scale, w, h))
+        if w <= tile_size and h <= tile_size:
+            return levels
+        scale *= 2
+
+
+def tile_path(pyramid_dir: Path, scale_factor: int, col: int, row: int) -> Path:
+    return pyramid_dir / str(scale_factor) / f"{col}_{row}.jpg"
+
+
+def read_manifest(pyramid_dir: Path) -> Optional[dict]:
+    try:
+        return json.loads((pyramid_dir / MANIFEST).read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def _stack(top, bottom):
+    from PIL import Image
+
+    stacked = Image.new("RGB", (top.width, top.height + bottom.height))
+    stacked.paste(top, (0, 0))
+    stacked.paste(bottom, (0, top.height))
+    return stacked
+
+
+class _LevelWriter:
+    """Buffers rows of one level, writes them as tile rows and feeds the next level."""
+
+    def __init__(self, pyramid_dir: Path, scale_factor: int, tile_size: int, quality: int,
+                 below: Optional["_LevelWriter"]) -> None:
+        self.dir = pyramid_dir
+        self.scale_factor = scale_factor
+        self.tile_size = tile_size
+        self.quality = quality
+        self.below = below
+        self.buffer = None
+        self.row = 0
+        (pyramid_dir / str(scale_factor)).mkdir(parents=True, exist_ok=True)
+
+    def feed(self, rows) -> None:
+        self.buffer = rows if self.buffer is None else _stack(self.buffer, rows)
+        while self.buffer is not None and self.buffer.height >= self.tile_size:
+            strip = self.buffer.crop((0, 0, self.buffer.width, self.tile_size))
+            rest = self.buffer.height - self.tile_size
+            self.buffer = (
+                self.buffer.crop((0, self.tile_size, self.buffer.width, self.buffer.height))
+                if rest else None
+            )
+            self._emit(strip)
+
+    def close(self) -> None:
+        if self.buffer is not None:
+            self._emit(self.buffer)
+            self.buffer = None
+        if self.below is not None:
+            self.below.close()
+
+    def _emit(self, strip) -> None:
+        size = self.tile_size
+        for col in range(math.ceil(strip.width / size)):
+            tile = strip.crop((col * size, 0, min((col + 1) * size, strip.width), strip.height))
+            tile.save(tile_path(self.dir, self.scale_factor, col, self.row), format="JPEG", quality=self.quality)
+        self.row += 1
+        if self.below is not None:
+            # tile_size is even, so only the last strip of a level has odd rows.
+            self.below.feed(strip.reduce(2))
+
+
+# EXIF Orientation → the same transform as apply_orientation, as numpy views
+_ARRAY_ORIENTATIONS = {
+    2: lambda a: a[:, ::-1],
+    3: lambda a: a[::-1, ::-1],
+    4: lambda a: a[::-1],
+    5: lambda a: a.transpose(1, 0, 2),
+    6: lambda a: np.rot90(a, -1),
+    7: lambda a: a[::-1, ::-1].transpose(1, 0, 2),
+    8: lambda a: np.rot90(a, 1),
+}
+
+
+def _spilled_bands(source_path: str, tile_size: int, orientation: int, icc: Optional[bytes],
+                   width: int, height: int, spill_dir: Path) -> Iterator:
+    """
+    Bands of a rotated master too large to rotate in memory: the sRGB
+    pixels go to a temporary raw file, then each output band is read
+    through an oriented view of its memory map.
+    """
+    from PIL import Image
+
+    # Beside the pyramid rather than in /tmp, which may be RAM-backed
+    spill_dir.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryFile(dir=spill_dir, prefix=".orient-") as fh:
+        fh.truncate(width * height * 3)
+        raw = np.memmap(fh, dtype=np.uint8, mode="r+", shape=(height, width, 3))
+        for top, band in iter_full_resolution(source_path, tile_size):
+            rows = np.asarray(to_srgb(band, icc).convert("RGB"))
+            raw[top:top + len(rows)] = rows
+        oriented = _ARRAY_ORIENTATIONS[orientation](raw)
+        for top in range(0, oriented.shape[0], tile_size):
+            yield Image.fromarray(np.ascontiguousarray(oriented[top:top + tile_size]))
+        del oriented, raw
+
+
+def _oriented_bands(source_path: str, tile_size: int, orientation: Optional[int], icc: Optional[bytes],
+                    spill_dir: Path):
+    """(width, height, iterator of sRGB bands) of the master as displayed."""
+    from PIL import Image
+
+    with Image.open(source_path) as img:
+        width, height = img.size
+    if orientation not in _ARRAY_ORIENTATIONS:
+        bands = (to_srgb(band, icc) for _, band in iter_full_resolution(source_path, tile_size))
+        return width, height, bands
+
+    out_width, out_height = (height, width) if orientation >= 5 else (width, height)
+    if width * height * 3 > settings.analysis_decode_memory_mb * 1024 * 1024:
+        return out_width, out_height, _spilled_bands(
+            source_path, tile_size, orientation, icc, width, height, spill_dir,
+        )
+
+    full = Image.new("RGB", (width, height))
+    for top, band in iter_full_resolution(source_path, tile_size):
+        full.paste(to_srgb(band, icc), (0, top))
+    full = apply_orientation(full, orientation)
+    return full.width, full.height, (
+        full.crop((0, top, full.width, min(top + tile_size, full.height)))
+        for top in range(0, full.height, tile_size)
+    )
+
+
+def build_pyramid(source_path: str, pyramid_dir: Path, tile_size: int, quality: int) -> dict:
+    """
+    Write the pyramid of source_path to pyramid_dir and return its manifest.
+    The directory appears complete or not at all (built beside it, then
+    renamed). Raises on unreadable sources and MemoryError on masters that
+    cannot be streamed within ANALYSIS_DECODE_MEMORY_MB.
+    """
+    from PIL import Image
+
+    if tile_size % 2:
+        raise ValueError("tile_size must be even")
+    with Image.open(source_path) as img:
+        exif = read_exif(img)
+        icc = img.info.get("icc_profile")
+    width, height, bands = _oriented_bands(
+        source_path, tile_size, exif.get(ORIENTATION_TAG), icc, pyramid_dir.parent,
+    )
+    levels = level_sizes(width, height, tile_size)
+
+    staging = pyramid_dir.with_name(f".{pyramid_dir.name}.{os.getpid()}.part")
+    shutil.rmtree(staging, ignore_errors=True)
+    try:
+        writer = None
+        for scale, _, _ in reversed(levels):
+            writer = _LevelWriter(staging, scale, tile_size, quality, below=writer)
+        for band in bands:
+            writer.feed(band)
+        writer.close()
+
+        manifest = {
+            "width": width,
+            "height": height,
+            "tile_size": tile_size,
+            "levels": [{"scale_factor": s, "width": w, "height": h} for s, w, h in levels],
+        }
+        (staging / MANIFEST).write_text(json.dumps(manifest))
+        try:
+            os.replace(staging, pyramid_dir)
+        except OSError:
+            # Built concurrently by another process: keep theirs.
+            if read_manifest(pyramid_dir) is None:
+                raise
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    return manifest
+
+
+def aligned_tile(manifest: dict, pyramid_dir: Path, region: tuple[int, int, int, int],
+                 size: tuple[int, int]) -> Optional[Path]:
+    """The stored tile that is exactly region at size, if there is one."""
+    x, y, w, h = region
+    tile_size = manifest["tile_size"]
+    for level in manifest["levels"]:
+        scale = level["scale_factor"]
+        span = tile_size * scale
+        if x % span or y % span:
+            continue
+        if w != min(span, manifest["width"] - x) or h != min(span, manifest["height"] - y):
+            continue
+        col, row = x // span, y // span
+        expected = (
+            min(tile_size, level["width"] - col * tile_size),
+            min(tile_size, level["height"] - row * tile_size),
+        )
+        if size == expected:
+            return tile_path(pyramid_dir, scale, col, row)
+    return None
+
+
+def read_region(manifest: dict, pyramid_dir: Path, region: tuple[int, int, int, int],
+                size: tuple[int, int]):
+    """
+    RGB image of region (full-resolution pixels) scaled to size, composed
+    from the tiles of the smallest level that still has enough pixels.
+    """
+    from PIL import Image
+
+    x, y, w, h = region
+    target_w, target_h = size
+    tile_size = manifest["tile_size"]
+    level = manifest["levels"][0]
+    for candidate in manifest["levels"]:
+        scale = candidate["scale_factor"]
+        if w / scale >= target_w and h / scale >= target_h:
+            level = candidate
+
+    scale = level["scale_factor"]
+    x0, y0 = x // scale, y // scale
+    x1 = min(math.ceil((x + w) / scale), level["width"])
+    y1 = min(math.ceil((y + h) / scale), level["height"])
+    canvas = Image.new("RGB", (max(x1 - x0, 1), max(y1 - y0, 1)))
+    for row in range(y0 // tile_size, (y1 - 1) // tile_size + 1):
+        for col in range(x0 // tile_size, (x1 - 1) // tile_size + 1):
+            with Image.open(tile_path(pyramid_dir, scale, col, row)) as tile:
+                canvas.paste(tile, (col * tile_size - x0, row * tile_size - y0))
+    if canvas.size != size:
+        canvas = canvas.resize(size, Image.Resampling.LANCZOS)
+    return canvas
+
+
+def render_request(manifest: dict, pyramid_dir: Path, request: ImageRequest, quality: int) -> bytes:
+    """Encoded bytes of a IIIF image request: region, size, mirror, rotation, quality, format."""
+    from PIL import Image, ImageOps
+
+    image = read_region(manifest, pyramid_dir, request.region, request.size)
+    if request.mirror:
+        image = ImageOps.mirror(image)
+
+    transparent = request.format in ("png", "webp") and request.quality != "bitonal"
+    quarter_turns = _quarter_turns()
+    if request.rotation in quarter_turns:
+        image = image.transpose(quarter_turns[request.rotation])
+    elif request.rotation:
+        # Spec: the corners outside the rotated image are transparent where the format allows.
+        if transparent:
+            image = image.convert("RGBA")
+        image = image.rotate(
+            -request.rotation, resample=Image.Resampling.BICUBIC, expand=True,
+            fillcolor=(0, 0, 0, 0) if transparent else (255, 255, 255),
+        )
+
+    if request.quality == "gray":
+        image = image.convert("LA" if image.mode == "RGBA" else "L")
+    elif request.quality == "bitonal":
+        image = image.convert("1")
+
+    out = io.BytesIO()
+    if request.format == "jpg":
+        image = image.convert("L" if image.mode in ("1", "L", "LA") else "RGB")
+        image.save(out, format="JPEG", quality=quality)
+    elif request.format == "webp":
+        image.save(out, format="WEBP", quality=quality)
+    else:
+        image.save(out, format="PNG")
+    return out.getvalue()
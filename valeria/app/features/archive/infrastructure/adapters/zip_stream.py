@@ -0,0 +1,99 @@
+"""
+ZIP archives produced as a byte stream, without temporary files.
+
+zipfile writes to an unseekable sink, so every entry gets a data descriptor
+(sizes and CRC after the data) instead of a header patched afterwards, and
+the bytes written so far are handed to the caller after every chunk. Memory
+stays at one read chunk plus the compressor's window, however large the
+archive is; entries over 4 GiB switch to ZIP64 from their size on disk.
+
+Already-compressed images (JPEG, PNG, WebP, CR3, compressed TIFF) are
+stored as-is; uncompressed TIFFs and text are deflated.
+"""
+
+import io
+import os
+import time
+import zipfile
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Optional
+
+CHUNK_SIZE = 1024 * 1024
+
+_STORED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".cr3", ".gif"}
+_TIFF_EXTENSIONS = {".tif", ".tiff"}
+_TIFF_COMPRESSION_TAG = 259
+
+
+@dataclass
+class ZipEntry:
+    """One archive member: a file on disk (path) or generated bytes (data)."""
+
+    arcname: str
+    path: Optional[str] = None
+    data: Optional[bytes] = None
+    compress: Optional[bool] = None  # None: decided from the file (should_compress)
+
+
+def should_compress(path: str) -> bool:
+    """False for formats that are already compressed, where deflate only costs CPU."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension in _STORED_EXTENSIONS:
+        return False
+    if extension in _TIFF_EXTENSIONS:
+        from PIL import Image
+
+        try:
+            with Image.open(path) as img:
+                return img.tag_v2.get(_TIFF_COMPRESSION_TAG, 1) == 1
+        except Exception:
+            return False
+    return True
+
+
+class _Sink(io.RawIOBase):
+    """Unseekable write target that hands out what was written since the last drain."""
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def stream_zip(entries: Iterable[ZipEntry]) -> Iterator[bytes]:
+    """Yield the bytes of a ZIP archive of entries, in order, as they are produced."""
+    sink = _Sink()
+    with zipfile.ZipFile(sink, mode="w", allowZip64=True) as archive:
+        for entry in entries:
+            if entry.path is not None:
+                info = zipfile.ZipInfo.from_file(entry.path, entry.arcname)
+                compress = should_compress(entry.path) if entry.compress is None else entry.compress
+            else:
+                info = zipfile.ZipInfo(entry.arcname, date_time=time.localtime()[:6])
+                info.file_size = len(entry.data)
+                compress = True if entry.compress is None else entry.compress
+            info.compress_type = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+
+            with archive.open(info, mode="w") as member:
+                if entry.path is not None:
+                    with open(entry.path, "rb") as source:
+                        while chunk := source.read(CHUNK_SIZE):
+                            member.write(chunk)
+                            if data := sink.drain():
+                                yield data
+                else:
+                    member.write(entry.data)
+            if data := sink.drain():
+                yield data
+    if data := sink.drain():
+        yield data
@@ -1,13 +1,13 @@
 """
 Archive SQLAlchemy models for ROGER - Valeria API
-Boxes, Rolls, Photographs, PhotographFiles
+Boxes, Rolls, Photographs, PhotographFiles, PhotographDerivatives
 """
 
 from enum import Enum
 
 from sqlalchemy import (
-    Column, String, Integer, Boolean, Text, Date, Float,
-    ForeignKey, Enum as SQLEnum,
+    Column, String, Integer, BigInteger, Boolean, Text, Date, Float,
+    ForeignKey, Enum as SQLEnum, UniqueConstraint,
 )
 
 from app.infrastructure.database.base import BaseModel
@@ -42,6 +42,17 @@ class FileType(str, Enum):
     PNG = "png"
 
 
+class DerivativeRendition(str, Enum):
+    THUMBNAIL = "thumbnail"
+    PREVIEW = "preview"
+    LARGE = "large"
+
+
+class DerivativeFormat(str, Enum):
+    WEBP = "webp"
+    JPEG = "jpeg"
+
+
 class BoxModel(BaseModel):
     """Physical storage box within a collection."""
 
@@ -143,6 +154,52 @@ class PhotographFileModel(BaseModel):
     file_path = Column(String(512), nullable=False)
     is_master = Column(Boolean, default=False, nullable=False)
     file_size_bytes = Column(Integer, nullable=True)
+    # SHA-256 of the file bytes; keys the analysis result cache
+    content_sha256 = Column(String(64), nullable=True, index=True)
+    # "<size>:<mtime ns>" of the bytes content_sha256 was computed from (see content_hash)
+    content_stat = Column(String(40), nullable=True)
+    # 64-bit perceptual hash stored signed (see perceptual_hash); finds rescans and exports
+    perceptual_hash = Column(BigInteger, nullable=True, index=True)
 
     def __repr__(self) -> str:
         return f"<PhotographFileModel(id={self.id}, file_type={self.file_type}, is_master={self.is_master})>"
+
+
+class PhotographDerivativeModel(BaseModel):
+    """
+    Web rendition of a photograph file (thumbnail, preview, large) in one
+    format. source_sha256 is the content hash of the file it was rendered
+    from; a row whose hash no longer matches the file is re-rendered.
+    """
+
+    __tablename__ = "photograph_derivatives"
+    __table_args__ = (
+        UniqueConstraint(
+            "photograph_file_id", "rendition", "format",
+            name="uq_photograph_derivatives_rendition",
+        ),
+    )
+
+    photograph_file_id = Column(
+        Integer, ForeignKey("photograph_files.id", ondelete="CASCADE"),
+        nullable=False, index=True,
+    )
+    rendition = Column(
+        SQLEnum(DerivativeRendition, values_callable=lambda x: [e.value for e in x]),
+        nullable=False,
+    )
+    format = Column(
+        SQLEnum(DerivativeFormat, values_callable=lambda x: [e.value for e in x]),
+        nullable=False,
+    )
+    file_path = Column(String(512), nullable=False)
+    width_px = Column(Integer, nullable=False)
+    height_px = Column(Integer, nullable=False)
+    file_size_bytes = Column(Integer, nullable=False)
+    source_sha256 = Column(String(64), nullable=True)
+
+    def __repr__(self) -> str:
+        return (
+            f"<PhotographDerivativeModel(id={self.id}, file_id={self.photograph_file_id}, "
+            f"rendition={self.rendition}, format={self.format})>"
+        )
@@ -0,0 +1,129 @@
+"""
+IIIF Image API 3.0 endpoints for photograph files (deep zoom viewers).
+
+    /iiif/{file_id}/info.json
+    /iiif/{file_id}/{region}/{size}/{rotation}/{quality}.{format}
+
+Served from each file's tile pyramid (see pyramid_store): viewer tiles are
+pre-encoded files, other requests are rendered once and cached on disk.
+Compliance level 2, plus mirroring, arbitrary rotation, upscaling (^) and
+WebP output. Since any region can be requested at full size, both routes
+require the same permission as downloading the file.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.responses import FileResponse, JSONResponse, RedirectResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.settings import settings
+from app.features.archive.application.file_access import can_download_file
+from app.features.archive.domain.iiif import parse_image_request
+from app.features.archive.infrastructure.adapters.pyramid_store import pyramid_store
+from app.features.archive.infrastructure.persistence.archive_model import PhotographFileModel
+from app.features.authenticate.interfaces.api.dependencies import get_current_user_id
+from app.infrastructure.database.session import get_db
+from app.shared.domain.exceptions import EntityNotFoundError, ValidationError
+
+
+router = APIRouter(prefix="/iiif", tags=["IIIF"])
+
+IIIF_CONTEXT = "http://iiif.io/api/image/3/context.json"
+PROFILE_LINK = '<http://iiif.io/api/image/3/level2.json>;rel="profile"'
+MEDIA_TYPES = {"jpg": "image/jpeg", "png": "image/png", "webp": "image/webp"}
+
+
+async def _manifest(db: AsyncSession, file_id: int, user_id: int) -> dict:
+    """Pyramid manifest of a file the user may download (any region rebuilds the master)."""
+    pf = await db.get(PhotographFileModel, file_id)
+    if pf is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Archivo no encontrado.")
+    if not await can_download_file(db, user_id, pf):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="No tiene permiso para descargar este archivo.")
+    try:
+        return await pyramid_store.info(db, file_id)
+    except EntityNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except ValidationError as e:
+        raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail=str(e))
+    except (OSError, MemoryError):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="No se pudo leer el archivo fuente para generar la pirámide IIIF.",
+        )
+
+
+@router.get("/{file_id}", include_in_schema=False)
+async def image_service(file_id: int, request: Request):
+    """The base URI of an image service redirects to its info.json."""
+    return RedirectResponse(str(request.url_for("iiif_info", file_id=file_id)), status_code=303)
+
+
+@router.get("/{file_id}/info.json", name="iiif_info")
+async def iiif_info(
+    file_id: int,
+    request: Request,
+    user_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+):
+    """Image information: dimensions, tile grid and supported features."""
+    manifest = await _manifest(db, file_id, user_id)
+    tile_size = manifest["tile_size"]
+    levels = manifest["levels"]
+    info = {
+        "@context": IIIF_CONTEXT,
+        "id": str(request.url_for("iiif_info", file_id=file_id)).removesuffix("/info.json"),
+        "type": "ImageService3",
+        "protocol": "http://iiif.io/api/image",
+        "profile": "level2",
+        "width": manifest["width"],
+        "height": manifest["height"],
+        "maxArea": settings.iiif_max_area,
+        "sizes": [
+            {"width": level["width"], "height": level["height"]}
+            for level in reversed(levels)
+            if level["width"] * level["height"] <= settings.iiif_max_area
+        ],
+        "tiles": [{
+            "width": tile_size,
+            "height": tile_size,
+            "scaleFactors": [level["scale_factor"] for level in levels],
+        }],
+        "extraQualities": ["color", "gray", "bitonal"],
+        "extraFormats": ["webp"],
+        "extraFeatures": ["mirroring", "rotationArbitrary", "sizeUpscaling"],
+    }
+    accept = request.headers.get("accept", "")
+    media_type = (
+        f'application/ld+json;profile="{IIIF_CONTEXT}"' if "application/ld+json" in accept
+        else "application/json"
+    )
+    return JSONResponse(info, media_type=media_type, headers={"Link": PROFILE_LINK})
+
+
+@router.get("/{file_id}/{region}/{size}/{rotation}/{quality_format}")
+async def iiif_image(
+    file_id: int,
+    region: str,
+    size: str,
+    rotation: str,
+    quality_format: str,
+    user_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+):
+    """A region of the image, scaled, rotated and encoded as requested."""
+    quality, _sep, fmt = quality_format.rpartition(".")
+    manifest = await _manifest(db, file_id, user_id)
+    try:
+        image_request = parse_image_request(
+            region, size, rotation, quality, fmt,
+            manifest["width"], manifest["height"], settings.iiif_max_area,
+        )
+        rendered = await pyramid_store.render(db, file_id, image_request)
+    except ValidationError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    media_type = MEDIA_TYPES[image_request.format]
+    headers = {"Cache-Control": "private, max-age=86400", "Link": PROFILE_LINK}
+    if isinstance(rendered, bytes):
+        return Response(rendered, media_type=media_type, headers=headers)
+    return FileResponse(rendered, media_type=media_type, headers=headers)
@@ -2,13 +2,29 @@
 FastAPI routes for the archive feature.
 Manages the physical hierarchy: Box → Roll → Photograph → PhotographFile.
 Write operations require CURADOR or ADMINISTRADOR role.
+Registering a master file queues its attribute analyses (see job_queue);
+campaigns analyze a whole collection, box or roll (see campaign_runner).
+Registering a JPG/TIFF/PNG file also queues its web derivatives
+(thumbnail / preview / large, see derivative_store) and its IIIF tile
+pyramid (see pyramid_store, served by iiif_routes). Every registered file
+is perceptually hashed for duplicate detection (see duplicate_index).
 """
 
+import asyncio
+import json
+import os
+from datetime import datetime
 from typing import List, Optional
+from urllib.parse import quote
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import FileResponse, StreamingResponse
+from pydantic import BaseModel as PydanticModel
+from pydantic import Field as PydanticField
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select as sa_select
 
+from app.config.settings import settings
 from app.features.archive.application.create_collection_usecase import CreateCollectionUseCase
 from app.features.archive.application.get_collection_usecase import GetCollectionUseCase
 from app.features.archive.application.list_collections_usecase import ListCollectionsUseCase
@@ -23,7 +39,29 @@ from app.features.archive.application.create_photograph_usecase import CreatePho
 from app.features.archive.application.get_photograph_usecase import GetPhotographUseCase
 from app.features.archive.application.list_photographs_usecase import ListPhotographsUseCase
 from app.features.archive.application.register_file_usecase import RegisterPhotographFileUseCase
+from app.features.archive.application.archive_export import ArchiveExport, export_box, export_roll
+from app.features.archive.application.duplicate_report import duplicate_groups
+from app.features.archive.application.file_access import can_download_file
 from app.features.archive.infrastructure.adapters.archive_repository import ArchiveRepository
+from app.features.archive.infrastructure.adapters.derivative_renderer import MEDIA_TYPES
+from app.features.archive.infrastructure.adapters.derivative_store import (
+    RENDERABLE_TYPES,
+    derivative_store,
+)
+from app.features.archive.infrastructure.adapters.duplicate_index import duplicate_index
+from app.features.archive.infrastructure.adapters.file_download import (
+    MEDIA_TYPES as FILE_MEDIA_TYPES,
+    DownloadResponse,
+    accel_redirect_path,
+    etag_matches,
+    strong_etag,
+)
+from app.features.archive.infrastructure.adapters.pyramid_store import pyramid_store
+from app.features.archive.infrastructure.adapters.zip_stream import stream_zip
+from app.features.archive.infrastructure.persistence.archive_model import (
+    DerivativeFormat, DerivativeRendition, PhotographFileModel, PhotographModel,
+)
+from app.features.detect_objects.infrastructure.adapters.detection_queue import object_detection_queue
 from app.features.archive.interfaces.api.schemas import (
     CollectionCreateRequest, CollectionUpdateRequest, CollectionListResponse, CollectionResponse,
     BoxCreateRequest, BoxListResponse, BoxResponse,
@@ -34,14 +72,22 @@ from app.features.archive.interfaces.api.schemas import (
 from app.features.authenticate.domain.role import Role
 from app.features.authenticate.infrastructure.adapters.user_repository import UserRepository
 from app.features.authenticate.interfaces.api.dependencies import get_current_user_id
+from app.infrastructure.analysis.content_hash import refresh_content_hash
+from app.infrastructure.analysis.embedding_index import embeddings_for
+from app.infrastructure.analysis.executor import analysis_executor
+from app.infrastructure.analysis.perceptual_hash import from_signed64
+from app.infrastructure.analysis.providers.attr02.clip_temporal_analyzer import EMBEDDING_MODEL
 from app.infrastructure.database.session import get_db
-from app.features.analysis.infrastructure.persistence.analysis_model import AnalysisJobModel
-from app.features.taxonomy.application.extract_technical_metadata_usecase import ExtractTechnicalMetadataUseCase
-from app.features.taxonomy.application.extract_chronology_usecase import ExtractChronologyUseCase
-from app.features.taxonomy.application.extract_geographic_usecase import ExtractGeographicUseCase
-from app.features.taxonomy.application.extract_environmental_usecase import ExtractEnvironmentalUseCase
-from app.features.taxonomy.infrastructure.adapters.taxonomy_repository import TaxonomyRepository
-from app.shared.domain.exceptions import EntityNotFoundError, ValidationError, BusinessRuleViolationError
+from app.features.analysis.application.campaigns import campaign_progress
+from app.features.analysis.infrastructure.adapters.campaign_runner import campaign_runner
+from app.features.analysis.infrastructure.adapters.job_queue import analysis_queue, job_event
+from app.features.analysis.infrastructure.persistence.analysis_model import (
+    AnalysisJobModel, AnalysisAttributeType, JobStatus,
+    AnalysisCampaignModel, CampaignScope, CampaignStatus,
+)
+from app.shared.domain.exceptions import (
+    EntityNotFoundError, ValidationError, BusinessRuleViolationError, PermissionDeniedError,
+)
 
 
 router = APIRouter(prefix="/archive", tags=["Archive"])
@@ -349,13 +395,13 @@ async def get_photograph(
 
 class PhotographFileWithAnalysisResponse(PhotographFileResponse):
     analysis_triggered: bool = False
-    analysis_error: Optional[str] = None
+    job_ids: List[int] = []
 
 
 @router.post(
     "/photographs/{photograph_id}/files",
     response_model=PhotographFileWithAnalysisResponse,
-    status_code=status.HTTP_201_CREATED,
+    status_code=status.HTTP_202_ACCEPTED,
 )
 async def register_file(
     photograph_id: int,
@@ -363,6 +409,14 @@ async def register_file(
     user_id: int = Depends(_require_write_access),
     db: AsyncSession = Depends(get_db),
 ):
+    """
+    Register a file. For masters, the four attribute analyses are queued as
+    background jobs; poll /photographs/{id}/jobs or subscribe to
+    /photographs/{id}/jobs/stream for progress. Renderable files get their
+    web derivatives and IIIF tile pyramid generated in the background;
+    every file is hashed for duplicate detection. With
+    USE_LOCAL_OBJECT_DETECTION set, masters are also queued for object detection.
+    """
     try:
         repo = ArchiveRepository(db)
         usecase = RegisterPhotographFileUseCase(repo)
@@ -378,27 +432,31 @@ async def register_file(
     except ValidationError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
-    analysis_triggered = False
-    analysis_errors: list[str] = []
-
+    job_ids: list[int] = []
     if request.is_master:
-        analysis_triggered = True
-        tax_repo = TaxonomyRepository(db)
-        for UseCase in (
-            ExtractTechnicalMetadataUseCase,
-            ExtractChronologyUseCase,
-            ExtractGeographicUseCase,
-            ExtractEnvironmentalUseCase,
-        ):
-            try:
-                await UseCase(tax_repo, db).execute(photograph_id, triggered_by=user_id)
-            except Exception as exc:
-                analysis_errors.append(str(exc))
+        jobs = await analysis_queue.submit(
+            db,
+            photograph_id=photograph_id,
+            attribute_types=[
+                AnalysisAttributeType.TECHNICAL,
+                AnalysisAttributeType.CHRONOLOGY,
+                AnalysisAttributeType.GEOGRAPHIC,
+                AnalysisAttributeType.ENVIRONMENTAL,
+            ],
+            triggered_by=user_id,
+        )
+        job_ids = [j.id for j in jobs]
+    if pf.file_type in RENDERABLE_TYPES:
+        await derivative_store.submit(db, pf.id)
+        await pyramid_store.submit(db, pf.id)
+    await duplicate_index.submit(db, pf.id)
+    if request.is_master and settings.use_local_object_detection:
+        await object_detection_queue.submit(db, photograph_id)
 
     return PhotographFileWithAnalysisResponse(
         **pf.__dict__,
-        analysis_triggered=analysis_triggered,
-        analysis_error="; ".join(analysis_errors) if analysis_errors else None,
+        analysis_triggered=bool(job_ids),
+        job_ids=job_ids,
     )
 
 
@@ -418,11 +476,6 @@ async def list_files(
 
 # ── Analysis Jobs ─────────────────────────────────────────────────────────────
 
-from datetime import datetime
-from pydantic import BaseModel as PydanticModel
-from sqlalchemy.future import select as sa_select
-
-
 class AnalysisJobResponse(PydanticModel):
     id: int
     photograph_id: int
@@ -434,11 +487,35 @@ class AnalysisJobResponse(PydanticModel):
     started_at: Optional[datetime]
     completed_at: Optional[datetime]
     error_message: Optional[str]
+    attempts: int = 0
+    cache_hit: bool = False
+    decode_ms: Optional[float] = None
+    inference_ms: Optional[float] = None
+    db_write_ms: Optional[float] = None
+    peak_memory_bytes: Optional[int] = None
+    input_pixels: Optional[int] = None
+    input_bytes: Optional[int] = None
     created_at: datetime
 
     model_config = {"from_attributes": True}
 
 
+def _job_response(j: AnalysisJobModel) -> AnalysisJobResponse:
+    return AnalysisJobResponse(
+        id=j.id, photograph_id=j.photograph_id,
+        attribute_type=j.attribute_type.value if hasattr(j.attribute_type, 'value') else str(j.attribute_type),
+        tool_name=j.tool_name, tool_version=j.tool_version,
+        status=j.status.value if hasattr(j.status, 'value') else str(j.status),
+        triggered_by=j.triggered_by,
+        started_at=j.started_at, completed_at=j.completed_at,
+        error_message=j.error_message, attempts=j.attempts or 0,
+        cache_hit=bool(j.cache_hit),
+        decode_ms=j.decode_ms, inference_ms=j.inference_ms, db_write_ms=j.db_write_ms,
+        peak_memory_bytes=j.peak_memory_bytes, input_pixels=j.input_pixels,
+        input_bytes=j.input_bytes, created_at=j.created_at,
+    )
+
+
 @router.get("/photographs/{photograph_id}/jobs", response_model=List[AnalysisJobResponse])
 async def list_analysis_jobs(
     photograph_id: int,
@@ -451,13 +528,514 @@ async def list_analysis_jobs(
         .where(AnalysisJobModel.photograph_id == photograph_id)
         .order_by(AnalysisJobModel.created_at.desc())
     )
-    jobs = result.scalars().all()
-    return [AnalysisJobResponse(
-        id=j.id, photograph_id=j.photograph_id,
-        attribute_type=j.attribute_type.value if hasattr(j.attribute_type, 'value') else str(j.attribute_type),
-        tool_name=j.tool_name, tool_version=j.tool_version,
-        status=j.status.value if hasattr(j.status, 'value') else str(j.status),
-        triggered_by=j.triggered_by,
-        started_at=j.started_at, completed_at=j.completed_at,
-        error_message=j.error_message, created_at=j.created_at,
-    ) for j in jobs]
+    return [_job_response(j) for j in result.scalars().all()]
+
+
+@router.get("/photographs/{photograph_id}/jobs/stream")
+async def stream_analysis_jobs(
+    photograph_id: int,
+    _: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Server-Sent Events stream of job status changes for a photograph.
+    Sends the current state of every job first and closes once none is
+    QUEUED or RUNNING.
+    """
+    subscription = analysis_queue.subscribe(photograph_id)
+    result = await db.execute(
+        sa_select(AnalysisJobModel)
+        .where(AnalysisJobModel.photograph_id == photograph_id)
+        .order_by(AnalysisJobModel.id)
+    )
+    snapshot = {j.id: job_event(j) for j in result.scalars().all()}
+
+    def _active(events: dict) -> bool:
+        return any(e["status"] not in [s.value for s in JobStatus.terminal()] for e in events.values())
+
+    async def events():
+        try:
+            for event in snapshot.values():
+                yield f"event: job\ndata: {json.dumps(event)}\n\n"
+            while _active(snapshot):
+                try:
+                    event = await asyncio.wait_for(subscription.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                snapshot[event["job_id"]] = event
+                yield f"event: job\ndata: {json.dumps(event)}\n\n"
+            yield "event: done\ndata: {}\n\n"
+        finally:
+            analysis_queue.unsubscribe(photograph_id, subscription)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/jobs/{job_id}/cancel", response_model=AnalysisJobResponse)
+async def cancel_analysis_job(
+    job_id: int,
+    _: int = Depends(_require_write_access),
+):
+    """Cancel a QUEUED or RUNNING analysis job."""
+    job = await analysis_queue.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job de análisis no encontrado.")
+    return _job_response(job)
+
+
+# ── Analysis Campaigns ────────────────────────────────────────────────────────
+
+class AnalysisCampaignCreateRequest(PydanticModel):
+    scope_type: CampaignScope
+    scope_id: int
+    attribute_types: List[AnalysisAttributeType] = PydanticField(
+        default_factory=lambda: list(AnalysisAttributeType),
+    )
+    concurrency: Optional[int] = PydanticField(default=None, ge=1)
+
+
+class AnalysisCampaignProgress(PydanticModel):
+    planned: int
+    pending: int
+    queued: int
+    running: int
+    completed: int
+    failed: int
+    cancelled: int
+    cache_hits: int
+    elapsed_seconds: float
+    images_per_second: float
+    eta_seconds: Optional[float]
+
+
+class AnalysisCampaignResponse(PydanticModel):
+    id: int
+    scope_type: str
+    scope_id: int
+    attribute_types: List[str]
+    concurrency: int
+    status: str
+    total_photographs: int
+    skipped: int
+    triggered_by: Optional[int]
+    started_at: Optional[datetime]
+    completed_at: Optional[datetime]
+    created_at: Optional[datetime]
+    progress: AnalysisCampaignProgress
+
+
+async def _campaign_response(db: AsyncSession, campaign: AnalysisCampaignModel) -> AnalysisCampaignResponse:
+    return AnalysisCampaignResponse(
+        id=campaign.id,
+        scope_type=getattr(campaign.scope_type, "value", campaign.scope_type),
+        scope_id=campaign.scope_id,
+        attribute_types=campaign.attribute_types,
+        concurrency=campaign.concurrency,
+        status=getattr(campaign.status, "value", campaign.status),
+        total_photographs=campaign.total_photographs or 0,
+        skipped=campaign.skipped or 0,
+        triggered_by=campaign.triggered_by,
+        started_at=campaign.started_at,
+        completed_at=campaign.completed_at,
+        created_at=campaign.created_at,
+        progress=AnalysisCampaignProgress(**await campaign_progress(db, campaign)),
+    )
+
+
+@router.post(
+    "/campaigns",
+    response_model=AnalysisCampaignResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def create_analysis_campaign(
+    request: AnalysisCampaignCreateRequest,
+    user_id: int = Depends(_require_write_access),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Analyze every photograph under a collection, box or roll. Planning and
+    execution run in the background; poll GET /campaigns/{id} for progress.
+    Photographs whose ACTIVE record already comes from the current provider
+    version are skipped.
+    """
+    try:
+        campaign = await campaign_runner.create(
+            db, request.scope_type, request.scope_id, request.attribute_types,
+            triggered_by=user_id, concurrency=request.concurrency,
+        )
+    except EntityNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except ValidationError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return await _campaign_response(db, campaign)
+
+
+@router.get("/campaigns/{campaign_id}", response_model=AnalysisCampaignResponse)
+async def get_analysis_campaign(
+    campaign_id: int,
+    _: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+):
+    """Campaign state with progress: counts per job status, throughput and ETA."""
+    campaign = await db.get(AnalysisCampaignModel, campaign_id)
+    if campaign is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Campaña de análisis no encontrada.")
+    return await _campaign_response(db, campaign)
+
+
+@router.post("/campaigns/{campaign_id}/resume", response_model=AnalysisCampaignResponse)
+async def resume_analysis_campaign(
+    campaign_id: int,
+    _: int = Depends(_require_write_access),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Drive an unfinished campaign from this process again, e.g. after the CLI
+    that started it was interrupted. API-started campaigns resume on startup.
+    """
+    campaign = await db.get(AnalysisCampaignModel, campaign_id)
+    if campaign is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Campaña de análisis no encontrada.")
+    if campaign.status not in CampaignStatus.unfinished():
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="La campaña ya terminó.")
+    campaign_runner.launch(campaign_id)
+    return await _campaign_response(db, campaign)
+
+
+@router.post("/campaigns/{campaign_id}/cancel", response_model=AnalysisCampaignResponse)
+async def cancel_analysis_campaign(
+    campaign_id: int,
+    _: int = Depends(_require_write_access),
+    db: AsyncSession = Depends(get_db),
+):
+    """Cancel pending, queued and running jobs of an unfinished campaign."""
+    campaign = await campaign_runner.cancel(campaign_id)
+    if campaign is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Campaña de análisis no encontrada.")
+    return await _campaign_response(db, campaign)
+
+
+# ── Web Derivatives ───────────────────────────────────────────────────────────
+
+class PhotographDerivativeResponse(PydanticModel):
+    id: int
+    photograph_file_id: int
+    rendition: str
+    format: str
+    width_px: int
+    height_px: int
+    file_size_bytes: int
+    source_sha256: Optional[str]
+    created_at: datetime
+    updated_at: datetime
+
+    model_config = {"from_attributes": True}
+
+
+async def _downloadable_file(db: AsyncSession, file_id: int, user_id: int) -> PhotographFileModel:
+    """The file row, 404 when missing and 403 unless the user may download it."""
+    pf = await db.get(PhotographFileModel, file_id)
+    if pf is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Archivo no encontrado.")
+    if not await can_download_file(db, user_id, pf):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="No tiene permiso para descargar este archivo.")
+    return pf
+
+
+def _negotiate_format(accept: Optional[str]) -> DerivativeFormat:
+    """WebP when the client accepts it and it is enabled, JPEG otherwise."""
+    formats = derivative_store.formats
+    if DerivativeFormat.WEBP in formats and "image/webp" in (accept or ""):
+        return DerivativeFormat.WEBP
+    return DerivativeFormat.JPEG if DerivativeFormat.JPEG in formats else formats[0]
+
+
+@router.get("/files/{file_id}/derivatives", response_model=List[PhotographDerivativeResponse])
+async def list_derivatives(
+    file_id: int,
+    user_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+):
+    """Renditions generated so far (empty while background generation is pending)."""
+    await _downloadable_file(db, file_id, user_id)
+    rows = await derivative_store.list_for_file(db, file_id)
+    return [PhotographDerivativeResponse.model_validate(r) for r in rows]
+
+
+@router.get("/files/{file_id}/derivatives/{rendition}")
+async def get_derivative(
+    file_id: int,
+    rendition: DerivativeRendition,
+    format: Optional[DerivativeFormat] = Query(None, description="webp | jpeg; por defecto según Accept"),
+    accept: Optional[str] = Header(None),
+    user_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Serve one rendition of a file, rendering it on demand when it has not
+    been generated yet. Without ?format= the Accept header picks WebP or JPEG.
+    Requires the same permission as downloading the file.
+    """
+    await _downloadable_file(db, file_id, user_id)
+    fmt = format or _negotiate_format(accept)
+    try:
+        row = await derivative_store.get(db, file_id, rendition, fmt)
+    except EntityNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except ValidationError as e:
+        raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail=str(e))
+    except OSError:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="No se pudo leer el archivo fuente para generar el derivado.",
+        )
+
+    headers = {"Cache-Control": "private, max-age=86400"}
+    if format is None:
+        headers["Vary"] = "Accept"
+    return FileResponse(row.file_path, media_type=MEDIA_TYPES[fmt], headers=headers)
+
+
+# ── File Downloads ────────────────────────────────────────────────────────────
+
+@router.api_route("/files/{file_id}/download", methods=["GET", "HEAD"])
+async def download_file(
+    file_id: int,
+    if_none_match: Optional[str] = Header(None),
+    user_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Download a photograph file. Supports Range / If-Range (resumable
+    downloads) and If-None-Match against a strong ETag of the content hash.
+    With DOWNLOAD_ACCEL_PREFIX set, nginx sends the bytes (X-Accel-Redirect).
+    """
+    pf = await _downloadable_file(db, file_id, user_id)
+    if not os.path.isfile(pf.file_path):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="El archivo no está disponible en el almacenamiento.")
+
+    await refresh_content_hash(pf)
+    etag = strong_etag(pf.content_sha256)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    filename = os.path.basename(pf.file_path)
+    internal_uri = accel_redirect_path(pf.file_path)
+    if internal_uri is not None:
+        return Response(
+            headers={
+                **headers,
+                "X-Accel-Redirect": quote(internal_uri),
+                "Content-Type": FILE_MEDIA_TYPES[pf.file_type],
+                "Content-Disposition": f"attachment; filename*=utf-8''{quote(filename)}",
+            },
+        )
+    return DownloadResponse(
+        pf.file_path, media_type=FILE_MEDIA_TYPES[pf.file_type], filename=filename, headers=headers,
+    )
+
+
+# ── Exports ───────────────────────────────────────────────────────────────────
+
+def _zip_response(export: ArchiveExport) -> StreamingResponse:
+    return StreamingResponse(
+        stream_zip(export.entries),
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": f'attachment; filename="{export.filename}"',
+            "Cache-Control": "private, no-store",
+            "X-Export-Photographs": str(export.photographs),
+            "X-Export-Skipped-Photographs": str(export.skipped_photographs),
+        },
+    )
+
+
+@router.get("/rolls/{roll_id}/export")
+async def export_roll_zip(
+    roll_id: int,
+    include_derivatives: bool = Query(True, description="Incluir las versiones web ya generadas"),
+    user_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    ZIP of the roll's photographs the user may download, with manifest.json
+    and manifest.csv (metadata and ACTIVE attributes). Streamed as it is
+    built: nothing is staged on disk or held in memory.
+    """
+    try:
+        export = await export_roll(db, roll_id, user_id, include_derivatives)
+    except EntityNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except PermissionDeniedError as e:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
+    return _zip_response(export)
+
+
+@router.get("/boxes/{box_id}/export")
+async def export_box_zip(
+    box_id: int,
+    include_derivatives: bool = Query(True, description="Incluir las versiones web ya generadas"),
+    user_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+):
+    """ZIP of every roll in the box, laid out as roll-<id>/ folders (see export_roll_zip)."""
+    try:
+        export = await export_box(db, box_id, user_id, include_derivatives)
+    except EntityNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except PermissionDeniedError as e:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
+    return _zip_response(export)
+
+
+# ── Duplicates ────────────────────────────────────────────────────────────────
+
+_MAX_DISTANCE = Query(
+    None, ge=0, le=16,
+    description="Distancia de Hamming máxima (bits de 64); por defecto DUPLICATE_MAX_DISTANCE",
+)
+
+
+class DuplicateFileResponse(PydanticModel):
+    file_id: int
+    photograph_id: int
+    file_type: str
+    file_path: str
+    is_master: bool
+    perceptual_hash: str
+    distance: int
+    same_photograph: bool
+
+
+class DuplicateGroupFileResponse(PydanticModel):
+    file_id: int
+    photograph_id: int
+    identifier: Optional[str]
+    roll_id: int
+    box_id: int
+    file_type: str
+    is_master: bool
+    file_path: str
+    distance: int
+
+
+class DuplicateGroupResponse(PydanticModel):
+    group: int
+    photographs: int
+    files: List[DuplicateGroupFileResponse]
+
+
+@router.get("/files/{file_id}/duplicates", response_model=List[DuplicateFileResponse])
+async def list_file_duplicates(
+    file_id: int,
+    max_distance: Optional[int] = _MAX_DISTANCE,
+    _: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Other files showing the same picture (rescans, exports, CR3 + JPG
+    pairs), nearest first. Distance 0 is an identical-looking image.
+    """
+    max_distance = settings.duplicate_max_distance if max_distance is None else max_distance
+    try:
+        pf = await db.get(PhotographFileModel, file_id)
+        matches = await duplicate_index.similar(db, file_id, max_distance)
+    except EntityNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except ValidationError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+    return [
+        DuplicateFileResponse(
+            file_id=match.id,
+            photograph_id=match.photograph_id,
+            file_type=match.file_type.value,
+            file_path=match.file_path,
+            is_master=match.is_master,
+            perceptual_hash=f"{from_signed64(match.perceptual_hash):016x}",
+            distance=distance,
+            same_photograph=match.photograph_id == pf.photograph_id,
+        )
+        for match, distance in matches
+    ]
+
+
+@router.get("/duplicates", response_model=List[DuplicateGroupResponse])
+async def duplicate_report(
+    max_distance: Optional[int] = _MAX_DISTANCE,
+    include_same_photograph: bool = Query(False, description="Incluir grupos de una sola fotografía (p. ej. CR3 + JPG)"),
+    _: int = Depends(_require_write_access),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Groups of hashed files within max_distance of each other, largest
+    first. Files not hashed yet are not included; hash them with
+    scripts/duplicate_report.py.
+    """
+    max_distance = settings.duplicate_max_distance if max_distance is None else max_distance
+    return await duplicate_groups(db, max_distance, include_same_photograph)
+
+
+# ── Visual Similarity ─────────────────────────────────────────────────────────
+
+class SimilarPhotographResponse(PydanticModel):
+    photograph_id: int
+    roll_id: int
+    frame_number: Optional[int]
+    identifier: Optional[str]
+    similarity: float
+
+
+@router.get("/photographs/{photograph_id}/similar", response_model=List[SimilarPhotographResponse])
+async def similar_photographs(
+    photograph_id: int,
+    k: int = Query(12, ge=1, le=100, description="Número de fotografías a devolver"),
+    _: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    "More like this": the k photographs whose CLIP image embeddings are
+    closest (cosine similarity, 1.0 = same picture) to this one's.
+    Embeddings are stored when the chronology is dated with the CLIP
+    analyzer; scripts/build_embeddings.py computes the missing ones.
+    """
+    if await db.get(PhotographModel, photograph_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Fotografía con id={photograph_id} no encontrada",
+        )
+    index = embeddings_for(EMBEDDING_MODEL)
+    query = await analysis_executor.run(index.get, photograph_id)
+    if query is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=(
+                f"La fotografía {photograph_id} aún no tiene embedding visual: se calcula al "
+                "fechar con ATTR02_ANALYZER=clip o con scripts/build_embeddings.py"
+            ),
+        )
+    # Rows of photographs deleted since they were indexed are not candidates
+    existing = (await db.execute(sa_select(PhotographModel.id))).scalars().all()
+    matches = await analysis_executor.run(index.search, query, k, [photograph_id], existing)
+    photos = {
+        photo.id: photo
+        for photo in (await db.execute(
+            sa_select(PhotographModel).where(PhotographModel.id.in_([pid for pid, _ in matches]))
+        )).scalars()
+    }
+    return [
+        SimilarPhotographResponse(
+            photograph_id=pid,
+            roll_id=photos[pid].roll_id,
+            frame_number=photos[pid].frame_number,
+            identifier=photos[pid].identifier,
+            similarity=round(score, 4),
+        )
+        for pid, score in matches
+        if pid in photos
+    ]
@@ -202,6 +202,7 @@ class PhotographFileResponse(BaseModel):
     file_path: str
     is_master: bool
     file_size_bytes: Optional[int]
+    content_sha256: Optional[str] = None
     created_at: datetime
     updated_at: datetime
 
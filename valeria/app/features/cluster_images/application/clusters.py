@@ -0,0 +1,233 @@
+"""
+Cluster-based browsing over the latest completed clustering run.
+
+store_fit() replaces the served clustering with a background fit;
+absorb_photograph() places a newly embedded photograph into it without a
+refit (see domain/clustering). Reads never touch the embeddings.
+"""
+
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import delete, func, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.features.archive.infrastructure.persistence.archive_model import PhotographModel
+from app.features.cluster_images.domain.clustering import (
+    absorb,
+    decode_centroid,
+    encode_centroid,
+    nearest_centroid,
+    pack_layout,
+    place,
+)
+from app.features.cluster_images.infrastructure.adapters.cluster_fitting import ClusterFit
+from app.features.cluster_images.infrastructure.persistence.cluster_model import (
+    ClusteringRunModel,
+    ClusteringStatus,
+    ImageClusterModel,
+    PhotographClusterModel,
+)
+from app.infrastructure.analysis.embedding_index import EmbeddingIndex, embeddings_for
+from app.infrastructure.analysis.executor import analysis_executor
+from app.shared.domain.exceptions import EntityNotFoundError
+
+_INSERT_BATCH = 5000
+_LAYOUT_NEIGHBORS = 10
+
+
+async def current_run(session: AsyncSession, embedding_model: Optional[str] = None) -> Optional[ClusteringRunModel]:
+    """The latest COMPLETED run (of embedding_model, when given)."""
+    query = select(ClusteringRunModel).where(ClusteringRunModel.status == ClusteringStatus.COMPLETED)
+    if embedding_model is not None:
+        query = query.where(ClusteringRunModel.embedding_model == embedding_model)
+    result = await session.execute(
+        query.order_by(ClusteringRunModel.completed_at.desc(), ClusteringRunModel.id.desc()).limit(1)
+    )
+    return result.scalar_one_or_none()
+
+
+async def require_current_run(session: AsyncSession) -> ClusteringRunModel:
+    run = await current_run(session)
+    if run is None:
+        raise EntityNotFoundError(
+            "Aún no hay agrupamiento de imágenes: ejecute un reagrupamiento (POST /clusters/runs)"
+        )
+    return run
+
+
+# ── Writing ───────────────────────────────────────────────────────────────────
+
+async def store_fit(
+    session: AsyncSession, run: ClusteringRunModel, photograph_ids: np.ndarray, fit: ClusterFit,
+) -> None:
+    """Replace every assignment and older runs' clusters with this fit (caller commits)."""
+    labels, layout = fit.labels, fit.layout
+    await session.execute(delete(PhotographClusterModel))
+    await session.execute(delete(ImageClusterModel).where(ImageClusterModel.run_id != run.id))
+
+    clusters = []
+    for label, centroid in enumerate(fit.centroids):
+        members = np.flatnonzero(labels == label)
+        if len(members):
+            x, y = layout[members].mean(axis=0)
+            representative = int(photograph_ids[members[np.argmax(fit.similarities[members])]])
+        else:
+            x = y = 0.0
+            representative = None
+        clusters.append({
+            "run_id": run.id, "label": label, "size": len(members),
+            "centroid": encode_centroid(centroid),
+            "layout_x": float(x), "layout_y": float(y),
+            "representative_id": representative,
+        })
+    await session.execute(insert(ImageClusterModel), clusters)
+
+    rows = [
+        {
+            "photograph_id": int(pid), "run_id": run.id, "label": int(label),
+            "similarity": float(similarity), "layout_x": float(x), "layout_y": float(y),
+            "incremental": False,
+        }
+        for pid, label, similarity, (x, y) in zip(photograph_ids, labels, fit.similarities, layout)
+    ]
+    for start in range(0, len(rows), _INSERT_BATCH):
+        await session.execute(insert(PhotographClusterModel), rows[start:start + _INSERT_BATCH])
+
+    run.n_clusters = len(clusters)
+    run.photographs = len(rows)
+
+
+async def absorb_photograph(
+    session: AsyncSession,
+    photograph_id: int,
+    vector: np.ndarray,
+    embedding_model: str,
+    index: Optional[EmbeddingIndex] = None,
+) -> Optional[PhotographClusterModel]:
+    """
+    Assign a (re-)embedded photograph to the current run's nearest cluster,
+    update that centroid and place it in the layout. None without a run.
+
+    The layout neighbours come from the shared embedding index, which
+    re-reads rows appended by other processes (see embedding_index). The
+    clusters whose size or centroid change are re-read under a row lock
+    (SELECT ... FOR UPDATE) just before the update, so concurrent absorbs
+    in other sessions or processes serialize instead of losing updates.
+    """
+    run = await current_run(session, embedding_model)
+    if run is None:
+        return None
+    clusters = list((await session.execute(
+        select(ImageClusterModel.label, ImageClusterModel.centroid)
+        .where(ImageClusterModel.run_id == run.id)
+        .order_by(ImageClusterModel.label)
+    )).all())
+    if not clusters:
+        return None
+
+    row, similarity = nearest_centroid(np.stack([decode_centroid(c.centroid) for c in clusters]), vector)
+    label = clusters[row].label
+    assignment = await session.get(PhotographClusterModel, photograph_id)
+    same_run = assignment is not None and assignment.run_id == run.id
+    left = assignment.label if same_run and assignment.label != label else None
+    joins = not same_run or left is not None
+
+    # Layout position among the most similar photographs already placed
+    index = index or embeddings_for(embedding_model)
+    neighbours = await analysis_executor.run(index.search, vector, _LAYOUT_NEIGHBORS, [photograph_id])
+    positions = {
+        pid: (x, y)
+        for pid, x, y in (await session.execute(
+            select(PhotographClusterModel.photograph_id, PhotographClusterModel.layout_x, PhotographClusterModel.layout_y)
+            .where(PhotographClusterModel.run_id == run.id)
+            .where(PhotographClusterModel.photograph_id.in_([pid for pid, _ in neighbours]))
+        )).all()
+    }
+    placed = [(positions[pid], score) for pid, score in neighbours if pid in positions]
+    position = place(np.array([p for p, _ in placed]), np.array([s for _, s in placed]))
+
+    locked = {
+        cluster.label: cluster
+        for cluster in (await session.execute(
+            select(ImageClusterModel)
+            .where(ImageClusterModel.run_id == run.id)
+            .where(ImageClusterModel.label.in_([label] if left is None else [label, left]))
+            .order_by(ImageClusterModel.label)
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        )).scalars().all()
+    }
+    cluster = locked.get(label)
+    if cluster is None:
+        return None  # a refit replaced the run meanwhile
+    x, y = position if position is not None else (cluster.layout_x, cluster.layout_y)
+    if left in locked:
+        locked[left].size = max(locked[left].size - 1, 0)
+    if joins:
+        cluster.centroid = encode_centroid(absorb(decode_centroid(cluster.centroid), cluster.size, vector))
+        cluster.layout_x += (x - cluster.layout_x) / (cluster.size + 1)
+        cluster.layout_y += (y - cluster.layout_y) / (cluster.size + 1)
+        cluster.size += 1
+
+    if assignment is None:
+        assignment = PhotographClusterModel(photograph_id=photograph_id)
+        session.add(assignment)
+    assignment.run_id = run.id
+    assignment.label = label
+    assignment.similarity = similarity
+    assignment.layout_x, assignment.layout_y = x, y
+    assignment.incremental = True
+    await session.flush()
+    return assignment
+
+
+# ── Reading ───────────────────────────────────────────────────────────────────
+
+async def cluster_summaries(session: AsyncSession, run: ClusteringRunModel) -> list[ImageClusterModel]:
+    result = await session.execute(
+        select(ImageClusterModel)
+        .where(ImageClusterModel.run_id == run.id)
+        .order_by(ImageClusterModel.size.desc(), ImageClusterModel.label)
+    )
+    return list(result.scalars().all())
+
+
+async def cluster_members(
+    session: AsyncSession, run: ClusteringRunModel, label: int, skip: int = 0, limit: int = 100,
+) -> tuple[int, list[tuple[PhotographModel, PhotographClusterModel]]]:
+    """(total, [(photograph, assignment)]) of one cluster, most typical first."""
+    exists = await session.execute(
+        select(ImageClusterModel.id)
+        .where(ImageClusterModel.run_id == run.id, ImageClusterModel.label == label)
+    )
+    if exists.scalar_one_or_none() is None:
+        raise EntityNotFoundError(f"Grupo {label} no encontrado")
+
+    members = (
+        select(PhotographModel, PhotographClusterModel)
+        .join(PhotographClusterModel, PhotographClusterModel.photograph_id == PhotographModel.id)
+        .where(PhotographClusterModel.run_id == run.id, PhotographClusterModel.label == label)
+    )
+    total = (await session.execute(select(func.count()).select_from(members.subquery()))).scalar() or 0
+    rows = (await session.execute(
+        members.order_by(PhotographClusterModel.similarity.desc(), PhotographModel.id).offset(skip).limit(limit)
+    )).all()
+    return total, [(photo, assignment) for photo, assignment in rows]
+
+
+async def layout_bytes(session: AsyncSession, run: ClusteringRunModel) -> bytes:
+    """Every placed photograph as LAYOUT_DTYPE records, in photograph id order."""
+    rows = (await session.execute(
+        select(
+            PhotographClusterModel.photograph_id, PhotographClusterModel.label,
+            PhotographClusterModel.layout_x, PhotographClusterModel.layout_y,
+        )
+        .where(PhotographClusterModel.run_id == run.id)
+        .order_by(PhotographClusterModel.photograph_id)
+    )).all()
+    if not rows:
+        return b""
+    ids, labels, xs, ys = zip(*rows)
+    return pack_layout(ids, labels, xs, ys)
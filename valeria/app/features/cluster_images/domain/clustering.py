@@ -0,0 +1,74 @@
+"""
+Incremental clustering of image embeddings.
+
+A full fit (mini-batch k-means + UMAP, see cluster_fitting) runs in the
+background. Between fits, new photographs are absorbed without refitting:
+
+  - assignment: the centroid with the highest cosine similarity;
+  - centroid update: the mini-batch k-means rule, a running mean with
+    per-cluster learning rate 1 / size, so a centroid drifts towards the
+    photographs it absorbs exactly as it would in one more k-means batch;
+  - layout position: the similarity-weighted mean of the 2D positions of
+    the photograph's nearest already-placed neighbours (UMAP keeps
+    neighbours together, so this lands the point among them).
+
+Layouts are served as LAYOUT_DTYPE records: 16 bytes per photograph.
+"""
+
+import math
+from typing import Optional
+
+import numpy as np
+
+# photograph id, cluster label, x, y; little-endian, 16 bytes per record
+LAYOUT_DTYPE = np.dtype([("photograph_id", "<i4"), ("label", "<i4"), ("x", "<f4"), ("y", "<f4")])
+
+MAX_AUTO_CLUSTERS = 256
+
+
+def default_cluster_count(photographs: int) -> int:
+    """sqrt(n / 2) clusters (at least 2, at most MAX_AUTO_CLUSTERS and n)."""
+    if photographs < 2:
+        return photographs
+    return min(max(round(math.sqrt(photographs / 2)), 2), MAX_AUTO_CLUSTERS, photographs)
+
+
+def encode_centroid(centroid: np.ndarray) -> bytes:
+    return np.asarray(centroid, dtype="<f4").tobytes()
+
+
+def decode_centroid(data: bytes) -> np.ndarray:
+    return np.frombuffer(data, dtype="<f4").astype(np.float32)
+
+
+def nearest_centroid(centroids: np.ndarray, vector: np.ndarray) -> tuple[int, float]:
+    """(row, cosine similarity) of the centroid closest to vector."""
+    norms = np.linalg.norm(centroids, axis=1)
+    norms[norms == 0] = 1.0
+    v = np.asarray(vector, dtype=np.float32)
+    similarities = (centroids @ v) / (norms * (np.linalg.norm(v) or 1.0))
+    row = int(np.argmax(similarities))
+    return row, float(similarities[row])
+
+
+def absorb(centroid: np.ndarray, size: int, vector: np.ndarray) -> np.ndarray:
+    """Centroid after adding vector to a cluster that had size members."""
+    return centroid + (np.asarray(vector, dtype=np.float32) - centroid) / (size + 1)
+
+
+def place(positions: np.ndarray, similarities: np.ndarray) -> Optional[tuple[float, float]]:
+    """Layout position from neighbours' (m, 2) positions and similarities; None without neighbours."""
+    if len(positions) == 0:
+        return None
+    weights = np.clip(np.asarray(similarities, dtype=np.float64), 0.0, None) ** 2 + 1e-6
+    x, y = (np.asarray(positions, dtype=np.float64) * weights[:, None]).sum(axis=0) / weights.sum()
+    return float(x), float(y)
+
+
+def pack_layout(photograph_ids, labels, xs, ys) -> bytes:
+    records = np.empty(len(photograph_ids), dtype=LAYOUT_DTYPE)
+    records["photograph_id"] = photograph_ids
+    records["label"] = labels
+    records["x"] = xs
+    records["y"] = ys
+    return records.tobytes()
@@ -0,0 +1,56 @@
+"""
+Full clustering fit over image embeddings (blocking; run it in the
+analysis executor from a background job, never inside a request).
+
+MiniBatchKMeans on the L2-normalized embeddings (so Euclidean k-means ranks
+like cosine similarity) and a 2D UMAP layout with the cosine metric.
+Both come from scikit-learn / umap-learn (requirements.txt).
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+_BATCH_SIZE = 4096
+_UMAP_NEIGHBORS = 15
+
+
+@dataclass
+class ClusterFit:
+    labels: np.ndarray        # (n,) cluster label per vector
+    centroids: np.ndarray     # (k, dim) float32
+    similarities: np.ndarray  # (n,) cosine similarity to its centroid
+    layout: np.ndarray        # (n, 2) float32
+
+
+def fit_clusters(vectors: np.ndarray, n_clusters: int, seed: int = 0) -> ClusterFit:
+    try:
+        from sklearn.cluster import MiniBatchKMeans
+        import umap
+    except ImportError as exc:
+        raise ImportError(
+            "Image clustering requires: pip install scikit-learn umap-learn"
+        ) from exc
+
+    vectors = np.asarray(vectors, dtype=np.float32)
+    vectors = vectors / np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None)
+    kmeans = MiniBatchKMeans(
+        n_clusters=n_clusters, batch_size=_BATCH_SIZE, n_init=3, random_state=seed,
+    ).fit(vectors)
+    labels = kmeans.labels_.astype(np.int64)
+    centroids = kmeans.cluster_centers_.astype(np.float32)
+
+    unit = centroids / np.clip(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12, None)
+    similarities = np.einsum("ij,ij->i", vectors, unit[labels])
+
+    if len(vectors) > 2:
+        reducer = umap.UMAP(
+            n_components=2, metric="cosine",
+            n_neighbors=min(_UMAP_NEIGHBORS, len(vectors) - 1),
+            # Spectral initialization needs more points than a handful
+            init="spectral" if len(vectors) > 10 else "random",
+        )
+        layout = reducer.fit_transform(vectors).astype(np.float32)
+    else:
+        layout = np.zeros((len(vectors), 2), dtype=np.float32)
+    return ClusterFit(labels=labels, centroids=centroids, similarities=similarities, layout=layout)
@@ -0,0 +1,214 @@
+"""
+Runs full clustering recomputes as background jobs.
+
+  QUEUED ──▶ RUNNING ──fit stored──▶ COMPLETED
+                └──error──▶ FAILED
+
+submit() commits a QUEUED run and returns at once; an asyncio task takes
+a snapshot of the embedding index, fits it in the analysis executor (see
+cluster_fitting) and stores the result in one transaction, so browsing
+keeps serving the previous clustering until the new one is complete.
+Photographs embedded while the fit ran are absorbed into it afterwards.
+Only one run is active at a time.
+
+Runs are claimed with a conditional UPDATE (status=QUEUED → RUNNING), so
+a run launched by several processes is fitted once. On startup the API
+re-queues runs left RUNNING by a previous process (start(recover=True));
+like the analysis queue, this assumes one recovering process per database.
+"""
+
+import asyncio
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+import numpy as np
+import structlog
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.config.settings import settings
+from app.features.archive.infrastructure.persistence.archive_model import PhotographModel
+from app.features.cluster_images.application.clusters import absorb_photograph, store_fit
+from app.features.cluster_images.domain.clustering import default_cluster_count
+from app.features.cluster_images.infrastructure.adapters.cluster_fitting import fit_clusters
+from app.features.cluster_images.infrastructure.persistence.cluster_model import (
+    ClusteringRunModel,
+    ClusteringStatus,
+)
+from app.infrastructure.analysis.embedding_index import embeddings_for
+from app.infrastructure.analysis.executor import analysis_executor
+from app.shared.domain.exceptions import BusinessRuleViolationError, ValidationError
+
+logger = structlog.get_logger()
+
+
+class ClusteringRunner:
+    """Background clustering recomputes, one at a time."""
+
+    def __init__(self, session_factory: Optional[Callable[[], AsyncSession]] = None) -> None:
+        self._session_factory = session_factory
+        self._tasks: dict[int, asyncio.Task] = {}
+
+    def _sessions(self) -> AsyncSession:
+        if self._session_factory is None:
+            from app.infrastructure.database.session import AsyncSessionLocal
+            self._session_factory = AsyncSessionLocal
+        return self._session_factory()
+
+    # ── Lifecycle ─────────────────────────────────────────────────────────────
+
+    async def start(self, recover: bool = True) -> None:
+        """
+        Launch QUEUED runs; with recover, re-queue runs left RUNNING by a
+        previous process first, which is only safe when no other process is
+        fitting them.
+        """
+        async with self._sessions() as session:
+            if recover:
+                await session.execute(
+                    update(ClusteringRunModel)
+                    .where(ClusteringRunModel.status == ClusteringStatus.RUNNING)
+                    .values(status=ClusteringStatus.QUEUED)
+                )
+            result = await session.execute(
+                select(ClusteringRunModel.id)
+                .where(ClusteringRunModel.status == ClusteringStatus.QUEUED)
+                .order_by(ClusteringRunModel.id)
+            )
+            unfinished = list(result.scalars().all())
+            await session.commit()
+        for run_id in unfinished:
+            self.launch(run_id)
+        if unfinished:
+            logger.info("Clustering runs resumed", count=len(unfinished))
+
+    async def stop(self) -> None:
+        """Cancel running fits; their runs stay RUNNING and are recovered on start()."""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    def launch(self, run_id: int) -> None:
+        task = self._tasks.get(run_id)
+        if task is not None and not task.done():
+            return
+        task = asyncio.create_task(self._run(run_id))
+        self._tasks[run_id] = task
+        task.add_done_callback(
+            lambda done: self._tasks.pop(run_id) if self._tasks.get(run_id) is done else None
+        )
+
+    async def wait(self, run_id: int, timeout: Optional[float] = None) -> None:
+        """Wait until the run's task ends or timeout elapses (CLI, tests)."""
+        task = self._tasks.get(run_id)
+        if task is not None:
+            await asyncio.wait({task}, timeout=timeout)
+
+    # ── Commands ──────────────────────────────────────────────────────────────
+
+    async def submit(
+        self,
+        session: AsyncSession,
+        embedding_model: str,
+        n_clusters: Optional[int] = None,
+        triggered_by: Optional[int] = None,
+    ) -> ClusteringRunModel:
+        """Persist a QUEUED run in the caller's session, commit it and launch it."""
+        if n_clusters is not None and n_clusters < 2:
+            raise ValidationError("Se necesitan al menos 2 grupos.")
+        active = (await session.execute(
+            select(ClusteringRunModel.id)
+            .where(ClusteringRunModel.status.in_(ClusteringStatus.unfinished()))
+            .limit(1)
+        )).scalar_one_or_none()
+        if active is not None:
+            raise BusinessRuleViolationError(f"Ya hay un reagrupamiento en curso (id={active}).")
+
+        run = ClusteringRunModel(
+            embedding_model=embedding_model,
+            requested_clusters=n_clusters,
+            status=ClusteringStatus.QUEUED,
+            triggered_by=triggered_by,
+        )
+        session.add(run)
+        await session.flush()
+        await session.commit()
+        await session.refresh(run)
+        self.launch(run.id)
+        return run
+
+    # ── Background task ───────────────────────────────────────────────────────
+
+    async def _run(self, run_id: int) -> None:
+        try:
+            async with self._sessions() as session:
+                claimed = await session.execute(
+                    update(ClusteringRunModel)
+                    .where(ClusteringRunModel.id == run_id, ClusteringRunModel.status == ClusteringStatus.QUEUED)
+                    .values(status=ClusteringStatus.RUNNING, started_at=datetime.now(timezone.utc), error_message=None)
+                )
+                await session.commit()
+                if claimed.rowcount != 1:
+                    return  # missing, finished, or claimed by another process
+                run = await session.get(ClusteringRunModel, run_id)
+
+                try:
+                    await self._fit(session, run)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as exc:
+                    await session.rollback()
+                    run = await session.get(ClusteringRunModel, run_id)
+                    run.status = ClusteringStatus.FAILED
+                    run.error_message = str(exc)
+                    run.completed_at = datetime.now(timezone.utc)
+                    await session.commit()
+                    logger.warning("Clustering run failed", run_id=run_id, error=str(exc))
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:  # database gone: leave the run for the next start()
+            logger.error("Clustering run aborted", run_id=run_id, error=str(exc))
+
+    async def _fit(self, session: AsyncSession, run: ClusteringRunModel) -> None:
+        index = embeddings_for(run.embedding_model)
+        ids, vectors = await analysis_executor.run(index.snapshot)
+        # Embeddings of photographs deleted since they were analyzed are left out
+        keep = np.isin(ids, await self._photograph_ids(session))
+        ids, vectors = ids[keep], vectors[keep]
+        if len(ids) < 2:
+            raise ValidationError(
+                "Se necesitan al menos 2 fotografías con embedding visual (ver scripts/build_embeddings.py)."
+            )
+
+        n_clusters = min(
+            run.requested_clusters or settings.cluster_count or default_cluster_count(len(ids)), len(ids),
+        )
+        fit = await analysis_executor.run(fit_clusters, vectors, n_clusters)
+        await store_fit(session, run, ids, fit)
+        run.status = ClusteringStatus.COMPLETED
+        run.completed_at = datetime.now(timezone.utc)
+        await session.commit()
+        logger.info("Clustering run completed", run_id=run.id, photographs=len(ids), clusters=n_clusters)
+
+        # Photographs embedded during the fit; best effort, the run is already served
+        try:
+            late_ids, late_vectors = await analysis_executor.run(index.snapshot)
+            late = ~np.isin(late_ids, ids) & np.isin(late_ids, await self._photograph_ids(session))
+            for photograph_id, vector in zip(late_ids[late], late_vectors[late]):
+                await absorb_photograph(session, int(photograph_id), vector, run.embedding_model, index)
+            await session.commit()
+        except Exception as exc:
+            await session.rollback()
+            logger.warning("Clustering late absorb failed", run_id=run.id, error=str(exc))
+
+    @staticmethod
+    async def _photograph_ids(session: AsyncSession) -> np.ndarray:
+        ids = (await session.execute(select(PhotographModel.id))).scalars().all()
+        return np.fromiter(ids, dtype=np.int64, count=len(ids))
+
+
+# Global runner instance
+clustering_runner = ClusteringRunner()
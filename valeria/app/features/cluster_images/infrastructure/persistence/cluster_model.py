@@ -0,0 +1,114 @@
+"""
+Image clustering SQLAlchemy models for ROGER - Valeria API
+A ClusteringRun is one full fit over the stored image embeddings; its
+clusters and the photographs' assignments (with 2D layout positions) are
+what cluster-based browsing reads. Only the latest COMPLETED run is served.
+"""
+
+from enum import Enum
+
+from sqlalchemy import (
+    Column, String, Integer, Float, Text, DateTime, Boolean, LargeBinary,
+    ForeignKey, Enum as SQLEnum, UniqueConstraint,
+)
+from sqlalchemy.sql import func
+
+from app.infrastructure.database.base import Base
+
+
+class ClusteringStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+    @classmethod
+    def unfinished(cls) -> tuple["ClusteringStatus", ...]:
+        return (cls.QUEUED, cls.RUNNING)
+
+
+def _enum_values(x):
+    return [e.value for e in x]
+
+
+class ClusteringRunModel(Base):
+    """
+    A background recompute: mini-batch k-means plus a UMAP layout over every
+    embedding of one model. requested_clusters NULL means automatic.
+    """
+
+    __tablename__ = "clustering_runs"
+
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
+    embedding_model = Column(String(100), nullable=False)
+    status = Column(
+        SQLEnum(ClusteringStatus, values_callable=_enum_values),
+        nullable=False, default=ClusteringStatus.QUEUED, index=True,
+    )
+    requested_clusters = Column(Integer, nullable=True)
+    n_clusters = Column(Integer, nullable=True)
+    photographs = Column(Integer, nullable=False, default=0, server_default="0")
+    error_message = Column(Text, nullable=True)
+    triggered_by = Column(
+        Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True,
+    )
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<ClusteringRunModel(id={self.id}, status={self.status}, n_clusters={self.n_clusters})>"
+
+
+class ImageClusterModel(Base):
+    """
+    One cluster of a run. centroid is the float32 k-means centre (updated
+    as new photographs are absorbed); size counts its photographs;
+    layout_x/layout_y is the mean layout position of its members.
+    """
+
+    __tablename__ = "image_clusters"
+    __table_args__ = (UniqueConstraint("run_id", "label", name="uq_image_clusters_run_label"),)
+
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
+    run_id = Column(
+        Integer, ForeignKey("clustering_runs.id", ondelete="CASCADE"),
+        nullable=False, index=True,
+    )
+    label = Column(Integer, nullable=False)
+    size = Column(Integer, nullable=False, default=0)
+    centroid = Column(LargeBinary, nullable=False)
+    layout_x = Column(Float, nullable=False)
+    layout_y = Column(Float, nullable=False)
+    representative_id = Column(
+        Integer, ForeignKey("photographs.id", ondelete="SET NULL"), nullable=True,
+    )
+
+    def __repr__(self) -> str:
+        return f"<ImageClusterModel(run_id={self.run_id}, label={self.label}, size={self.size})>"
+
+
+class PhotographClusterModel(Base):
+    """
+    A photograph's cluster in the run that placed it. incremental marks
+    photographs absorbed after the fit (nearest centroid, layout position
+    interpolated from visually similar neighbours).
+    """
+
+    __tablename__ = "photograph_clusters"
+
+    photograph_id = Column(
+        Integer, ForeignKey("photographs.id", ondelete="CASCADE"), primary_key=True,
+    )
+    run_id = Column(
+        Integer, ForeignKey("clustering_runs.id", ondelete="CASCADE"),
+        nullable=False, index=True,
+    )
+    label = Column(Integer, nullable=False, index=True)
+    similarity = Column(Float, nullable=False)
+    layout_x = Column(Float, nullable=False)
+    layout_y = Column(Float, nullable=False)
+    incremental = Column(Boolean, nullable=False, default=False, server_default="0")
+
+    def __repr__(self) -> str:
+        return f"<PhotographClusterModel(photograph_id={self.photograph_id}, label={self.label})>"
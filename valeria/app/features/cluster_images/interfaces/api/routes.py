@@ -0,0 +1,227 @@
+"""
+FastAPI routes for cluster-based browsing (RF-01).
+
+Photographs are grouped by visual similarity of their CLIP image
+embeddings. Any authenticated user can browse the current clustering;
+CURADOR/ADMIN trigger full recomputes, which run in the background.
+"""
+
+import zlib
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from pydantic import BaseModel, Field
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.features.authenticate.domain.role import Role
+from app.features.authenticate.infrastructure.adapters.user_repository import UserRepository
+from app.features.authenticate.interfaces.api.dependencies import get_current_user_id
+from app.features.cluster_images.application.clusters import (
+    cluster_members,
+    cluster_summaries,
+    layout_bytes,
+    require_current_run,
+)
+from app.features.cluster_images.domain.clustering import LAYOUT_DTYPE
+from app.features.cluster_images.infrastructure.adapters.clustering_runner import clustering_runner
+from app.features.cluster_images.infrastructure.persistence.cluster_model import (
+    ClusteringRunModel,
+    ClusteringStatus,
+)
+from app.infrastructure.analysis.providers.attr02.clip_temporal_analyzer import EMBEDDING_MODEL
+from app.infrastructure.database.session import get_db
+from app.shared.domain.exceptions import (
+    BusinessRuleViolationError,
+    EntityNotFoundError,
+    ValidationError,
+)
+
+router = APIRouter(prefix="/clusters", tags=["Clusters"])
+
+_WRITE_ROLES = (Role.CURADOR, Role.ADMINISTRADOR)
+
+LAYOUT_FORMAT = ",".join(f"{name}:{LAYOUT_DTYPE.fields[name][0].str}" for name in LAYOUT_DTYPE.names)
+
+
+async def _require_write(user_id: int = Depends(get_current_user_id), db: AsyncSession = Depends(get_db)) -> int:
+    user = await UserRepository(db).get_by_id(user_id)
+    if not user or user.role not in _WRITE_ROLES:
+        raise HTTPException(status_code=403, detail="Solo curadores y administradores pueden recalcular los grupos.")
+    return user_id
+
+
+# ── Schemas ───────────────────────────────────────────────────────────────────
+
+class ClusteringRunRequest(BaseModel):
+    n_clusters: Optional[int] = Field(None, ge=2, le=1000, description="Por defecto CLUSTER_COUNT o automático")
+
+
+class ClusteringRunResponse(BaseModel):
+    id: int
+    status: ClusteringStatus
+    embedding_model: str
+    requested_clusters: Optional[int]
+    n_clusters: Optional[int]
+    photographs: int
+    error_message: Optional[str]
+    started_at: Optional[datetime]
+    completed_at: Optional[datetime]
+    created_at: datetime
+
+    model_config = {"from_attributes": True}
+
+
+class ClusterResponse(BaseModel):
+    label: int
+    size: int
+    layout_x: float
+    layout_y: float
+    representative_id: Optional[int]
+
+    model_config = {"from_attributes": True}
+
+
+class ClusteringResponse(BaseModel):
+    run: ClusteringRunResponse
+    clusters: List[ClusterResponse]
+
+
+class ClusterPhotographResponse(BaseModel):
+    photograph_id: int
+    roll_id: int
+    frame_number: Optional[int]
+    identifier: Optional[str]
+    similarity: float
+    incremental: bool
+
+
+class ClusterPhotographListResponse(BaseModel):
+    label: int
+    total: int
+    skip: int
+    limit: int
+    photographs: List[ClusterPhotographResponse]
+
+
+# ── Browsing ──────────────────────────────────────────────────────────────────
+
+@router.get("", response_model=ClusteringResponse)
+async def get_clusters(
+    _: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+):
+    """The current clustering: its run and clusters, largest first."""
+    try:
+        run = await require_current_run(db)
+    except EntityNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    return ClusteringResponse(
+        run=ClusteringRunResponse.model_validate(run),
+        clusters=[ClusterResponse.model_validate(c) for c in await cluster_summaries(db, run)],
+    )
+
+
+@router.get("/layout")
+async def get_cluster_layout(
+    if_none_match: Optional[str] = Header(None),
+    _: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    2D layout of every clustered photograph for a scatter view, as packed
+    little-endian records (X-Layout-Format): photograph_id int32, label
+    int32, x float32, y float32 — 16 bytes per photograph, in id order.
+    """
+    try:
+        run = await require_current_run(db)
+    except EntityNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    body = await layout_bytes(db, run)
+    etag = f'"{run.id}-{len(body)}-{zlib.crc32(body):08x}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "private, no-cache",
+        "X-Clustering-Run": str(run.id),
+        "X-Layout-Format": LAYOUT_FORMAT,
+    }
+    if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/octet-stream", headers=headers)
+
+
+@router.get("/{label}/photographs", response_model=ClusterPhotographListResponse)
+async def list_cluster_photographs(
+    label: int,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    _: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+):
+    """Photographs of one cluster, most typical (closest to the centroid) first."""
+    try:
+        run = await require_current_run(db)
+        total, members = await cluster_members(db, run, label, skip, limit)
+    except EntityNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    return ClusterPhotographListResponse(
+        label=label, total=total, skip=skip, limit=limit,
+        photographs=[
+            ClusterPhotographResponse(
+                photograph_id=photo.id,
+                roll_id=photo.roll_id,
+                frame_number=photo.frame_number,
+                identifier=photo.identifier,
+                similarity=round(assignment.similarity, 4),
+                incremental=assignment.incremental,
+            )
+            for photo, assignment in members
+        ],
+    )
+
+
+# ── Recomputes ────────────────────────────────────────────────────────────────
+
+@router.post("/runs", response_model=ClusteringRunResponse, status_code=status.HTTP_202_ACCEPTED)
+async def create_clustering_run(
+    body: ClusteringRunRequest,
+    user_id: int = Depends(_require_write),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Queue a full recompute (k-means + UMAP over every stored embedding).
+    It runs in the background; poll GET /clusters/runs/{id}. Until it
+    completes, browsing serves the previous clustering.
+    """
+    try:
+        run = await clustering_runner.submit(db, EMBEDDING_MODEL, body.n_clusters, triggered_by=user_id)
+    except ValidationError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+    except BusinessRuleViolationError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    return ClusteringRunResponse.model_validate(run)
+
+
+@router.get("/runs", response_model=List[ClusteringRunResponse])
+async def list_clustering_runs(
+    limit: int = Query(20, ge=1, le=100),
+    _: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+):
+    result = await db.execute(
+        select(ClusteringRunModel).order_by(ClusteringRunModel.id.desc()).limit(limit)
+    )
+    return [ClusteringRunResponse.model_validate(run) for run in result.scalars().all()]
+
+
+@router.get("/runs/{run_id}", response_model=ClusteringRunResponse)
+async def get_clustering_run(
+    run_id: int,
+    _: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+):
+    run = await db.get(ClusteringRunModel, run_id)
+    if run is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Reagrupamiento con id={run_id} no encontrado")
+    return ClusteringRunResponse.model_validate(run)
@@ -0,0 +1,88 @@
+"""
+Object detection over archive photographs.
+
+detect_photographs() picks each photograph's file the way the chronology
+use case does (master first, JPG/TIFF preferred), sends them to the
+detector in batches of ANALYSIS_BATCH_SIZE through the analysis executor
+(one forward pass per batch, images from the shared decode) and replaces
+each photograph's stored objects with the result.
+"""
+
+from typing import Iterable
+
+import structlog
+from sqlalchemy import delete, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.config.settings import settings
+from app.features.archive.infrastructure.persistence.archive_model import FileType, PhotographFileModel
+from app.features.detect_objects.infrastructure.persistence.object_model import (
+    DetectedObjectModel,
+    ObjectScanModel,
+)
+from app.infrastructure.analysis.base_analyzer import chunked
+from app.infrastructure.analysis.executor import analysis_executor
+
+logger = structlog.get_logger()
+
+
+async def detection_targets(session: AsyncSession, photograph_ids: Iterable[int]) -> dict[int, PhotographFileModel]:
+    """The file to scan of each photograph that has files."""
+    result = await session.execute(
+        select(PhotographFileModel)
+        .where(PhotographFileModel.photograph_id.in_(set(photograph_ids)))
+        .order_by(PhotographFileModel.photograph_id, PhotographFileModel.is_master.desc(), PhotographFileModel.id)
+    )
+    files: dict[int, list[PhotographFileModel]] = {}
+    for pf in result.scalars():
+        files.setdefault(pf.photograph_id, []).append(pf)
+    return {
+        photograph_id: next((f for f in candidates if f.file_type in (FileType.JPG, FileType.TIFF)), candidates[0])
+        for photograph_id, candidates in files.items()
+    }
+
+
+async def store_detections(session: AsyncSession, photograph_id: int, file_id: int, result: dict) -> int:
+    """Replace a photograph's objects with a detector result; returns how many (caller commits)."""
+    await session.execute(delete(DetectedObjectModel).where(DetectedObjectModel.photograph_id == photograph_id))
+    rows = [
+        {
+            "photograph_id": photograph_id, "label": obj["label"], "score": obj["score"],
+            "x0": obj["box"][0], "y0": obj["box"][1], "x1": obj["box"][2], "y1": obj["box"][3],
+        }
+        for obj in result.get("objects", [])
+    ]
+    if rows:
+        await session.execute(insert(DetectedObjectModel), rows)
+
+    scan = await session.get(ObjectScanModel, photograph_id)
+    if scan is None:
+        scan = ObjectScanModel(photograph_id=photograph_id)
+        session.add(scan)
+    scan.provider = result.get("provider", "")
+    scan.provider_version = result.get("provider_version", "")
+    scan.file_id = file_id
+    scan.objects = len(rows)
+    await session.flush()
+    return len(rows)
+
+
+async def detect_photographs(session: AsyncSession, photograph_ids: Iterable[int]) -> tuple[int, int]:
+    """
+    Detect objects in the photographs' files and store them, flushing per
+    batch (caller commits). Returns (scanned, failed); photographs without
+    files are skipped.
+    """
+    targets = list((await detection_targets(session, photograph_ids)).items())
+    scanned = failed = 0
+    for batch in chunked(targets, settings.analysis_batch_size):
+        results = await analysis_executor.detect_objects([pf.file_path for _, pf in batch])
+        for (photograph_id, pf), result in zip(batch, results):
+            if result.get("error"):
+                failed += 1
+                logger.warning("Object detection failed", photograph_id=photograph_id, error=result["error"])
+                continue
+            await store_detections(session, photograph_id, pf.id, result)
+            scanned += 1
+    return scanned, failed
@@ -0,0 +1,144 @@
+"""
+Queries over detected objects: which classes appear, and which
+photographs show a class, e.g. photographs with trains dated in the
+1930s. Counts are computed in SQL over the (label, photograph_id) index.
+Visibility follows visual search: public photographs of public
+collections, or (only_public=False) everything the user may access.
+"""
+
+from typing import Optional
+
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.features.archive.application.file_access import accessible_photographs
+from app.features.archive.infrastructure.persistence.archive_model import (
+    BoxModel,
+    PhotographModel,
+    RollModel,
+)
+from app.features.detect_objects.domain.detection import (
+    ObjectClassCount,
+    ObjectQuery,
+    PhotographObjects,
+)
+from app.features.detect_objects.infrastructure.persistence.object_model import (
+    DetectedObjectModel,
+    ObjectScanModel,
+)
+from app.features.taxonomy.application.dating_filter import dated_between
+from app.features.view_images.infrastructure.persistence.image_model import CollectionModel
+from app.shared.domain.exceptions import EntityNotFoundError
+
+
+async def _visible_photographs(session: AsyncSession, query: ObjectQuery, user_id: Optional[int]):
+    """
+    Select of the photographs passing the archive filters and visible to
+    the user, used as a subquery; [] when the user may see nothing.
+    """
+    stmt = (
+        select(PhotographModel.id)
+        .join(RollModel, RollModel.id == PhotographModel.roll_id)
+        .join(BoxModel, BoxModel.id == RollModel.box_id)
+        .join(CollectionModel, CollectionModel.id == BoxModel.collection_id)
+    )
+    if query.collection_id:
+        stmt = stmt.where(BoxModel.collection_id == query.collection_id)
+    if query.only_public:
+        stmt = stmt.where(PhotographModel.is_public == True, CollectionModel.is_public == True)
+    else:
+        accessible = await accessible_photographs(session, user_id) if user_id else None
+        if accessible is None:
+            return []
+        stmt = stmt.where(PhotographModel.id.in_(accessible))
+    stmt = dated_between(stmt, query.year_from, query.year_to)
+    if query.label:
+        stmt = stmt.where(PhotographModel.id.in_(
+            select(DetectedObjectModel.photograph_id).where(DetectedObjectModel.label == query.label)
+        ))
+    return stmt
+
+
+async def object_classes(
+    session: AsyncSession, query: ObjectQuery, user_id: Optional[int] = None,
+) -> list[ObjectClassCount]:
+    """Every detected class in the matching photographs, most widespread first."""
+    photographs = await _visible_photographs(session, query, user_id)
+    photographs_count = func.count(func.distinct(DetectedObjectModel.photograph_id))
+    stmt = (
+        select(DetectedObjectModel.label, photographs_count, func.count(DetectedObjectModel.id))
+        .where(DetectedObjectModel.score >= query.min_score)
+        .where(DetectedObjectModel.photograph_id.in_(photographs))
+        .group_by(DetectedObjectModel.label)
+        .order_by(photographs_count.desc(), DetectedObjectModel.label)
+    )
+    if query.label:
+        stmt = stmt.where(DetectedObjectModel.label == query.label)
+    return [
+        ObjectClassCount(label=label, photographs=n_photographs, objects=n_objects)
+        for label, n_photographs, n_objects in (await session.execute(stmt)).all()
+    ]
+
+
+async def photographs_with_object(
+    session: AsyncSession, query: ObjectQuery, user_id: Optional[int] = None, skip: int = 0, limit: int = 50,
+) -> tuple[int, list[PhotographObjects]]:
+    """(total, page) of the photographs showing query.label, most instances first."""
+    if not query.label:
+        raise ValueError("label is required")
+    photographs = await _visible_photographs(session, query, user_id)
+    count = func.count(DetectedObjectModel.id).label("count")
+    max_score = func.max(DetectedObjectModel.score).label("max_score")
+    per_photograph = (
+        select(DetectedObjectModel.photograph_id, count, max_score)
+        .where(DetectedObjectModel.label == query.label, DetectedObjectModel.score >= query.min_score)
+        .where(DetectedObjectModel.photograph_id.in_(photographs))
+        .group_by(DetectedObjectModel.photograph_id)
+    )
+    total = (await session.execute(
+        select(func.count()).select_from(per_photograph.subquery())
+    )).scalar() or 0
+
+    rows = (await session.execute(
+        per_photograph.order_by(count.desc(), max_score.desc(), DetectedObjectModel.photograph_id)
+        .offset(skip).limit(limit)
+    )).all()
+    photos = {
+        photo.id: (photo, collection_id)
+        for photo, collection_id in (await session.execute(
+            select(PhotographModel, BoxModel.collection_id)
+            .join(RollModel, RollModel.id == PhotographModel.roll_id)
+            .join(BoxModel, BoxModel.id == RollModel.box_id)
+            .where(PhotographModel.id.in_([row.photograph_id for row in rows]))
+        )).all()
+    }
+    page = []
+    for photograph_id, n_objects, best in rows:
+        photo, collection_id = photos[photograph_id]
+        page.append(PhotographObjects(
+            photograph_id=photo.id,
+            roll_id=photo.roll_id,
+            collection_id=collection_id,
+            frame_number=photo.frame_number,
+            identifier=photo.identifier,
+            is_public=photo.is_public,
+            count=n_objects,
+            max_score=round(best, 4),
+        ))
+    return total, page
+
+
+async def photograph_objects(
+    session: AsyncSession, photograph_id: int,
+) -> tuple[ObjectScanModel, list[DetectedObjectModel]]:
+    """A photograph's last scan and its objects, best score first."""
+    scan = await session.get(ObjectScanModel, photograph_id)
+    if scan is None:
+        raise EntityNotFoundError(f"La fotografía {photograph_id} no tiene detección de objetos")
+    objects = (await session.execute(
+        select(DetectedObjectModel)
+        .where(DetectedObjectModel.photograph_id == photograph_id)
+        .order_by(DetectedObjectModel.score.desc(), DetectedObjectModel.id)
+    )).scalars().all()
+    return scan, list(objects)
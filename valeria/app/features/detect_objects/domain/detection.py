@@ -0,0 +1,49 @@
+"""
+Object detection value objects
+"""
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class ObjectQuery:
+    """
+    Filters for object queries: detections scoring at least min_score, in
+    photographs matching the archive filters. label is normalized (COCO
+    class names are lower case, e.g. "train", "traffic light").
+    """
+    label: Optional[str] = None
+    min_score: float = 0.0
+    year_from: Optional[int] = None
+    year_to: Optional[int] = None
+    collection_id: Optional[int] = None
+    only_public: bool = True
+
+    def __post_init__(self):
+        if self.label is not None:
+            self.label = " ".join(self.label.lower().split())
+        if not 0.0 <= self.min_score <= 1.0:
+            raise ValueError("min_score must be between 0 and 1")
+        if self.year_from and self.year_to and self.year_from > self.year_to:
+            raise ValueError("year_from cannot be greater than year_to")
+
+
+@dataclass
+class ObjectClassCount:
+    """A detected class with the number of photographs and boxes it has."""
+    label: str
+    photographs: int
+    objects: int
+
+
+@dataclass
+class PhotographObjects:
+    """A photograph containing a class: how many boxes and the best score."""
+    photograph_id: int
+    roll_id: int
+    collection_id: int
+    frame_number: Optional[int]
+    identifier: Optional[str]
+    is_public: bool
+    count: int
+    max_score: float
@@ -0,0 +1,105 @@
+"""
+In-process background object detection of photographs.
+
+Registering a master file submits its photograph here when
+USE_LOCAL_OBJECT_DETECTION is set. One asyncio worker drains whatever is
+queued, up to ANALYSIS_BATCH_SIZE photographs, and detects them together
+(see detections), so a bulk registration turns into batched forward
+passes instead of one per photograph. The file is usually still in the
+shared decode cache from the attribute analyses queued with it.
+
+Nothing about pending work is persisted: photographs left unscanned by a
+restart are picked up by scripts/detect_objects.py.
+"""
+
+import asyncio
+from typing import Callable, Optional
+
+import structlog
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.settings import settings
+from app.features.detect_objects.application.detections import detect_photographs
+
+logger = structlog.get_logger()
+
+
+class ObjectDetectionQueue:
+    """Queue + one asyncio worker detecting objects in batches of photographs."""
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], AsyncSession]] = None,
+        batch_size: Optional[int] = None,
+    ) -> None:
+        self._session_factory = session_factory
+        self._batch_size = batch_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker_task: Optional[asyncio.Task] = None
+
+    @property
+    def batch_size(self) -> int:
+        return max(self._batch_size if self._batch_size is not None else settings.analysis_batch_size, 1)
+
+    @property
+    def started(self) -> bool:
+        return self._queue is not None
+
+    def _sessions(self) -> AsyncSession:
+        if self._session_factory is None:
+            from app.infrastructure.database.session import AsyncSessionLocal
+            self._session_factory = AsyncSessionLocal
+        return self._session_factory()
+
+    # ── Lifecycle ─────────────────────────────────────────────────────────────
+
+    async def start(self) -> None:
+        if self.started:
+            return
+        self._queue = asyncio.Queue()
+        self._worker_task = asyncio.create_task(self._worker())
+
+    async def stop(self) -> None:
+        """Cancel the worker. Queued photographs stay unscanned until a backfill."""
+        if self._worker_task is not None:
+            self._worker_task.cancel()
+            await asyncio.gather(self._worker_task, return_exceptions=True)
+        self._worker_task = None
+        self._queue = None
+
+    async def join(self) -> None:
+        """Wait until every submitted photograph has been processed (tests, CLI)."""
+        if self._queue is not None:
+            await self._queue.join()
+
+    # ── Submission ────────────────────────────────────────────────────────────
+
+    async def submit(self, session: AsyncSession, photograph_id: int) -> None:
+        """Commit the caller's session (the worker reads the files from its own), then queue."""
+        await session.commit()
+        if self._queue is None:
+            logger.debug("Object detection queue not started", photograph_id=photograph_id)
+            return
+        self._queue.put_nowait(photograph_id)
+
+    async def _worker(self) -> None:
+        queue = self._queue
+        while True:
+            batch = [await queue.get()]
+            while len(batch) < self.batch_size and not queue.empty():
+                batch.append(queue.get_nowait())
+            try:
+                async with self._sessions() as session:
+                    await detect_photographs(session, dict.fromkeys(batch))
+                    await session.commit()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("Object detection batch failed", photographs=batch, error=str(exc))
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+
+# Global queue instance (started in the application lifespan)
+object_detection_queue = ObjectDetectionQueue()
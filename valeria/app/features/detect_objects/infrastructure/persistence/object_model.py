@@ -0,0 +1,58 @@
+"""
+Object detection SQLAlchemy models for ROGER - Valeria API
+A DetectedObject is one bounding box found in a photograph by the local
+detector; an ObjectScan records that a photograph was scanned (and by
+which model), so photographs with no objects are not scanned again.
+"""
+
+from sqlalchemy import Column, String, Integer, Float, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+
+from app.infrastructure.database.base import Base
+
+
+class DetectedObjectModel(Base):
+    """
+    A labelled box, coordinates normalized to the image (0-1, origin top
+    left). Indexed by (label, photograph_id) for per-class queries.
+    """
+
+    __tablename__ = "detected_objects"
+    __table_args__ = (
+        Index("ix_detected_objects_label_photograph", "label", "photograph_id"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
+    photograph_id = Column(
+        Integer, ForeignKey("photographs.id", ondelete="CASCADE"),
+        nullable=False, index=True,
+    )
+    label = Column(String(50), nullable=False)
+    score = Column(Float, nullable=False)
+    x0 = Column(Float, nullable=False)
+    y0 = Column(Float, nullable=False)
+    x1 = Column(Float, nullable=False)
+    y1 = Column(Float, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<DetectedObjectModel(photograph_id={self.photograph_id}, label='{self.label}', score={self.score:.2f})>"
+
+
+class ObjectScanModel(Base):
+    """Last detection pass over a photograph: model, file and number of objects."""
+
+    __tablename__ = "object_scans"
+
+    photograph_id = Column(
+        Integer, ForeignKey("photographs.id", ondelete="CASCADE"), primary_key=True,
+    )
+    provider = Column(String(100), nullable=False)
+    provider_version = Column(String(100), nullable=False)
+    file_id = Column(
+        Integer, ForeignKey("photograph_files.id", ondelete="SET NULL"), nullable=True,
+    )
+    objects = Column(Integer, nullable=False, default=0, server_default="0")
+    scanned_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<ObjectScanModel(photograph_id={self.photograph_id}, objects={self.objects})>"
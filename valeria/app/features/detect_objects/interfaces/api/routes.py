@@ -0,0 +1,169 @@
+"""
+FastAPI routes for detected objects.
+
+Photographs are scanned by the local object detector (YOLO on ONNX
+Runtime) when their master file is registered with
+USE_LOCAL_OBJECT_DETECTION set, or in bulk with scripts/detect_objects.py.
+These routes browse the stored boxes by class, combined with the archive
+filters: e.g. /objects/photographs?label=train&year_from=1930&year_to=1939.
+"""
+
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.features.archive.application.file_access import accessible_photograph_ids
+from app.features.authenticate.interfaces.api.dependencies import get_current_user_id
+from app.features.detect_objects.application.object_search import (
+    object_classes,
+    photograph_objects,
+    photographs_with_object,
+)
+from app.features.detect_objects.domain.detection import ObjectQuery
+from app.infrastructure.database.session import get_db
+from app.shared.domain.exceptions import EntityNotFoundError
+
+router = APIRouter(prefix="/objects", tags=["Objects"])
+
+
+# ── Schemas ───────────────────────────────────────────────────────────────────
+
+class ObjectClassResponse(BaseModel):
+    label: str
+    photographs: int
+    objects: int
+
+    model_config = {"from_attributes": True}
+
+
+class ObjectPhotographResponse(BaseModel):
+    photograph_id: int
+    roll_id: int
+    collection_id: int
+    frame_number: Optional[int]
+    identifier: Optional[str]
+    is_public: bool
+    count: int
+    max_score: float
+
+    model_config = {"from_attributes": True}
+
+
+class ObjectPhotographListResponse(BaseModel):
+    label: str
+    total: int
+    skip: int
+    limit: int
+    photographs: List[ObjectPhotographResponse]
+
+
+class DetectedObjectResponse(BaseModel):
+    label: str
+    score: float
+    x0: float
+    y0: float
+    x1: float
+    y1: float
+
+    model_config = {"from_attributes": True}
+
+
+class PhotographObjectsResponse(BaseModel):
+    photograph_id: int
+    provider: str
+    provider_version: str
+    scanned_at: datetime
+    objects: List[DetectedObjectResponse]
+
+
+def _object_query(
+    label: Optional[str],
+    min_score: float,
+    year_from: Optional[int],
+    year_to: Optional[int],
+    collection_id: Optional[int],
+    only_public: bool,
+) -> ObjectQuery:
+    try:
+        return ObjectQuery(
+            label=label, min_score=min_score, year_from=year_from, year_to=year_to,
+            collection_id=collection_id, only_public=only_public,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+
+
+# ── Browsing ──────────────────────────────────────────────────────────────────
+
+@router.get("/classes", response_model=List[ObjectClassResponse])
+async def list_object_classes(
+    min_score: float = Query(0.5, ge=0.0, le=1.0),
+    year_from: Optional[int] = Query(None, ge=1800, le=2100),
+    year_to: Optional[int] = Query(None, ge=1800, le=2100),
+    collection_id: Optional[int] = Query(None),
+    only_public: bool = Query(True),
+    user_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Detected object classes with the number of photographs (and boxes)
+    showing each, most widespread first.
+
+    - **min_score**: Only boxes scored at least this (0-1)
+    - **year_from** / **year_to**: Only photographs whose active dating overlaps these years
+    - **collection_id**: Only photographs of this collection
+    - **only_public**: Only public photographs of public collections (default: true);
+      false also includes the non-public photographs the user may access
+    """
+    query = _object_query(None, min_score, year_from, year_to, collection_id, only_public)
+    return [ObjectClassResponse.model_validate(c) for c in await object_classes(db, query, user_id)]
+
+
+@router.get("/photographs", response_model=ObjectPhotographListResponse)
+async def list_photographs_with_object(
+    label: str = Query(..., min_length=1, max_length=50, description='Clase detectada, p. ej. "train"'),
+    min_score: float = Query(0.5, ge=0.0, le=1.0),
+    year_from: Optional[int] = Query(None, ge=1800, le=2100),
+    year_to: Optional[int] = Query(None, ge=1800, le=2100),
+    collection_id: Optional[int] = Query(None),
+    only_public: bool = Query(True),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500),
+    user_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Photographs showing an object class, with how many instances each has;
+    most instances first. Same filters as /objects/classes.
+    """
+    query = _object_query(label, min_score, year_from, year_to, collection_id, only_public)
+    total, page = await photographs_with_object(db, query, user_id, skip, limit)
+    return ObjectPhotographListResponse(
+        label=query.label, total=total, skip=skip, limit=limit,
+        photographs=[ObjectPhotographResponse.model_validate(p) for p in page],
+    )
+
+
+@router.get("/photographs/{photograph_id}", response_model=PhotographObjectsResponse)
+async def get_photograph_objects(
+    photograph_id: int,
+    user_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+):
+    """Boxes found in one photograph, normalized to the image (0-1, origin top left)."""
+    try:
+        scan, objects = await photograph_objects(db, photograph_id)
+    except EntityNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    if photograph_id not in await accessible_photograph_ids(db, user_id, [photograph_id]):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="No tiene acceso a esta fotografía.")
+    return PhotographObjectsResponse(
+        photograph_id=photograph_id,
+        provider=scan.provider,
+        provider_version=scan.provider_version,
+        scanned_at=scan.scanned_at,
+        objects=[DetectedObjectResponse.model_validate(o) for o in objects],
+    )
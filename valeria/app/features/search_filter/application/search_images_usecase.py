@@ -1,11 +1,13 @@
 """
 Use case for searching images
 """
+from typing import Optional
+
 import structlog
 
 from app.features.search_filter.domain.search_port import SearchPort
 from app.features.search_filter.domain.search_query import SearchQuery
-from app.features.search_filter.domain.search_result import SearchResult
+from app.features.search_filter.domain.search_result import SearchResult, VisualSearchResult
 
 logger = structlog.get_logger()
 
@@ -64,6 +66,28 @@ class SearchImagesUseCase:
                 limit=limit
             )
     
+    async def execute_visual(
+        self,
+        query: SearchQuery,
+        limit: int = 20,
+        user_id: Optional[int] = None
+    ) -> VisualSearchResult:
+        """
+        Execute a visual (text-to-image) search over archive photographs.
+        
+        Args:
+            query: The query text plus year, collection and visibility filters
+            limit: Maximum number of results to return
+            user_id: Requesting user, for non-public photographs
+            
+        Returns:
+            VisualSearchResult with the best matching photographs first
+        """
+        if not query.query_text:
+            raise ValueError("query_text is required for visual search")
+        logger.info("Performing visual search", query=query.query_text, has_filters=query.has_filters())
+        return await self.search_service.visual_search(query=query, limit=limit, user_id=user_id)
+    
     async def get_search_facets(self, query: SearchQuery) -> dict:
         """
         Get faceted search results for the query.
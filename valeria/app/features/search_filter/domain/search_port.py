@@ -2,10 +2,10 @@
 Port interface for search operations
 """
 from abc import ABC, abstractmethod
-from typing import List
+from typing import List, Optional
 
 from app.features.search_filter.domain.search_query import SearchQuery
-from app.features.search_filter.domain.search_result import SearchResult
+from app.features.search_filter.domain.search_result import SearchResult, VisualSearchResult
 
 
 class SearchPort(ABC):
@@ -54,6 +54,27 @@ class SearchPort(ABC):
         """
         pass
     
+    @abstractmethod
+    async def visual_search(
+        self,
+        query: SearchQuery,
+        limit: int = 20,
+        user_id: Optional[int] = None
+    ) -> VisualSearchResult:
+        """
+        Rank archive photographs by how well their images match the query
+        text (CLIP joint text-image embedding space).
+        
+        Args:
+            query: Query text plus year, collection and visibility filters
+            limit: Maximum number of results
+            user_id: Requesting user; required when only_public is False
+            
+        Returns:
+            VisualSearchResult with the best matching photographs
+        """
+        pass
+    
     @abstractmethod
     async def get_facets(self, query: SearchQuery) -> dict:
         """
@@ -17,6 +17,7 @@ class SearchQuery:
     locations: Optional[List[str]] = None
     tags: Optional[List[str]] = None
     author: Optional[str] = None
+    collection_id: Optional[int] = None
     only_public: bool = True
     semantic_search: bool = False
     
@@ -40,7 +41,8 @@ class SearchQuery:
             self.year_to,
             self.locations,
             self.tags,
-            self.author
+            self.author,
+            self.collection_id
         ])
     
     def is_semantic(self) -> bool:
@@ -56,6 +58,7 @@ class SearchQuery:
             "locations": self.locations,
             "tags": self.tags,
             "author": self.author,
+            "collection_id": self.collection_id,
             "only_public": self.only_public,
             "semantic_search": self.semantic_search
         }
@@ -47,3 +47,36 @@ class SearchResult:
             "relevance_scores": self.relevance_scores,
             "search_type": self.search_type
         }
+
+
+@dataclass
+class PhotographMatch:
+    """
+    A photograph ranked by visual (text-to-image) search.
+    score is the cosine similarity between the query and image embeddings.
+    """
+    photograph_id: int
+    roll_id: int
+    collection_id: int
+    frame_number: Optional[int]
+    identifier: Optional[str]
+    is_public: bool
+    score: float
+
+
+@dataclass
+class VisualSearchResult:
+    """
+    Value object representing a visual search result, best match first.
+    candidates counts the photographs that passed the filters; only those
+    with an image embedding can be ranked.
+    """
+    photographs: List[PhotographMatch]
+    query: str
+    embedding_model: str
+    candidates: int
+    search_type: str = "visual"
+
+    def has_results(self) -> bool:
+        """Check if there are any results."""
+        return len(self.photographs) > 0
@@ -1,20 +1,63 @@
 """
 Search service adapter implementation
+
+Visual search ranks archive photographs against the CLIP image embeddings
+stored when they were dated (see embedding_index). The query text goes
+through the CLIP text tower in the analysis executor once per distinct
+query (LRU of _TEXT_CACHE_SIZE entries); the SQL filters select the
+candidate photographs, which the exact vector scan is restricted to.
 """
-from typing import List, Dict
+from collections import OrderedDict
+from typing import List, Dict, Optional
 from sqlalchemy import select, func, or_, and_
 from sqlalchemy.ext.asyncio import AsyncSession
+import numpy as np
 import structlog
 
+from app.config.settings import settings
+from app.features.archive.application.file_access import accessible_photographs
+from app.features.archive.infrastructure.persistence.archive_model import (
+    BoxModel,
+    PhotographModel,
+    RollModel,
+)
 from app.features.search_filter.domain.search_port import SearchPort
 from app.features.search_filter.domain.search_query import SearchQuery
-from app.features.search_filter.domain.search_result import SearchResult
+from app.features.search_filter.domain.search_result import (
+    PhotographMatch,
+    SearchResult,
+    VisualSearchResult,
+)
+from app.features.taxonomy.application.dating_filter import dated_between
 from app.features.view_images.domain.image import Image
-from app.features.view_images.infrastructure.persistence.image_model import ImageModel
+from app.features.view_images.infrastructure.persistence.image_model import CollectionModel, ImageModel
+from app.infrastructure.analysis.embedding_index import embeddings_for
+from app.infrastructure.analysis.executor import analysis_executor
+from app.infrastructure.analysis.model_registry import CHRONOLOGY
 from app.infrastructure.rag.vector_stores.chroma_store import ChromaVectorStore
+from app.shared.domain.exceptions import BusinessRuleViolationError
 
 logger = structlog.get_logger()
 
+_TEXT_CACHE_SIZE = 256
+_text_embeddings: "OrderedDict[tuple[str, str], tuple[str, np.ndarray]]" = OrderedDict()
+
+
+async def _text_embedding(text: str) -> Optional[tuple[str, np.ndarray]]:
+    """(embedding_model, vector) of a query; None when the analyzer has no text tower."""
+    normalized = " ".join(text.lower().split())  # the CLIP tokenizer lowercases too
+    key = (settings.attr02_analyzer, normalized)
+    cached = _text_embeddings.get(key)
+    if cached is not None:
+        _text_embeddings.move_to_end(key)
+        return cached
+    encoded = await analysis_executor.encode_text(CHRONOLOGY, normalized)
+    if encoded is not None:
+        _text_embeddings[key] = encoded
+        while len(_text_embeddings) > _TEXT_CACHE_SIZE:
+            _text_embeddings.popitem(last=False)
+    return encoded
+
 
 class SearchService(SearchPort):
     """
@@ -77,6 +120,9 @@ class SearchService(SearchPort):
         if query.author:
             conditions.append(ImageModel.author.ilike(f"%{query.author}%"))
 
+        if query.collection_id:
+            conditions.append(ImageModel.collection_id == query.collection_id)
+
         # TODO: Add tags filtering when we implement proper JSON queries
 
         if conditions:
@@ -172,6 +218,88 @@ class SearchService(SearchPort):
             )
             return await self.search(query, skip=0, limit=limit)
 
+    async def visual_search(
+        self,
+        query: SearchQuery,
+        limit: int = 20,
+        user_id: Optional[int] = None
+    ) -> VisualSearchResult:
+        """
+        Rank photographs by image similarity to the query text.
+        Location, author and tag filters apply to the legacy images only.
+        """
+        encoded = await _text_embedding(query.query_text or "")
+        if encoded is None:
+            raise BusinessRuleViolationError(
+                "La búsqueda visual requiere el analizador CLIP (ATTR02_ANALYZER=clip o clip-onnx)"
+            )
+        model, vector = encoded
+
+        candidates, candidate_count = await self._visual_candidates(query, user_id)
+        index = embeddings_for(model)
+        hits = await analysis_executor.run(index.search, vector, limit, (), candidates)
+
+        rows = (await self.db_session.execute(
+            select(PhotographModel, BoxModel.collection_id)
+            .join(RollModel, RollModel.id == PhotographModel.roll_id)
+            .join(BoxModel, BoxModel.id == RollModel.box_id)
+            .where(PhotographModel.id.in_([pid for pid, _ in hits]))
+        )).all()
+        by_id = {photo.id: (photo, collection_id) for photo, collection_id in rows}
+
+        matches = []
+        for photograph_id, score in hits:
+            if photograph_id not in by_id:
+                continue
+            photo, collection_id = by_id[photograph_id]
+            matches.append(PhotographMatch(
+                photograph_id=photo.id,
+                roll_id=photo.roll_id,
+                collection_id=collection_id,
+                frame_number=photo.frame_number,
+                identifier=photo.identifier,
+                is_public=photo.is_public,
+                score=round(score, 4),
+            ))
+        return VisualSearchResult(
+            photographs=matches,
+            query=query.query_text or "",
+            embedding_model=model,
+            candidates=candidate_count,
+        )
+
+    async def _visual_candidates(
+        self, query: SearchQuery, user_id: Optional[int],
+    ) -> tuple[Optional[List[int]], int]:
+        """
+        Ids of the photographs passing the filters and visible to the user,
+        with their count. The ids are None when nothing restricts them, so
+        the vector scan covers the whole index without an id filter.
+        """
+        stmt = (
+            select(PhotographModel.id)
+            .join(RollModel, RollModel.id == PhotographModel.roll_id)
+            .join(BoxModel, BoxModel.id == RollModel.box_id)
+            .join(CollectionModel, CollectionModel.id == BoxModel.collection_id)
+        )
+        if query.collection_id:
+            stmt = stmt.where(BoxModel.collection_id == query.collection_id)
+        if query.only_public:
+            stmt = stmt.where(PhotographModel.is_public == True, CollectionModel.is_public == True)
+        else:
+            accessible = await accessible_photographs(self.db_session, user_id) if user_id else None
+            if accessible is None:
+                return [], 0
+            if accessible.whereclause is not None:
+                stmt = stmt.where(PhotographModel.id.in_(accessible))
+        stmt = dated_between(stmt, query.year_from, query.year_to)
+
+        if stmt.whereclause is None:
+            count = await self.db_session.scalar(select(func.count()).select_from(stmt.subquery()))
+            return None, count or 0
+        ids = list((await self.db_session.execute(stmt)).scalars().all())
+        return ids, len(ids)
+
     async def get_facets(self, query: SearchQuery) -> dict:
         """
         Get faceted search results (aggregations).
@@ -1,7 +1,7 @@
 """
 FastAPI routes for search
 """
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, List
 
@@ -11,7 +11,9 @@ from app.features.search_filter.interfaces.api.schemas import (
     FacetsResponse,
     YearFacetItem,
     LocationFacetItem,
-    AuthorFacetItem
+    AuthorFacetItem,
+    PhotographMatchResponse,
+    VisualSearchResponse
 )
 from app.features.search_filter.application.search_images_usecase import (
     SearchImagesUseCase
@@ -20,10 +22,12 @@ from app.features.search_filter.infrastructure.adapters.search_service import (
     SearchService
 )
 from app.features.search_filter.domain.search_query import SearchQuery
+from app.features.authenticate.interfaces.api.dependencies import get_current_user_id
 from app.features.view_images.interfaces.api.schemas import ImageResponse
 from app.infrastructure.database.session import get_db
 from app.infrastructure.rag.vector_stores.chroma_store import ChromaVectorStore
 from app.config.settings import settings
+from app.shared.domain.exceptions import BusinessRuleViolationError
 
 
 router = APIRouter(prefix="/search", tags=["Search"])
@@ -101,6 +105,57 @@ async def search_images(
     )
 
 
+@router.get("/visual", response_model=VisualSearchResponse)
+async def search_photographs_visual(
+    query: str = Query(..., min_length=1, max_length=500),
+    year_from: Optional[int] = Query(None, ge=1800, le=2100),
+    year_to: Optional[int] = Query(None, ge=1800, le=2100),
+    collection_id: Optional[int] = Query(None),
+    only_public: bool = Query(True),
+    limit: int = Query(20, ge=1, le=100),
+    user_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Find archive photographs by what they show, described in words
+    (e.g. "a steam locomotive in the desert"), with no textual metadata needed.
+
+    Photographs are ranked by CLIP similarity between the query and their
+    image embeddings, stored when the chronology is dated with ATTR02_ANALYZER=clip
+    (see scripts/build_embeddings.py).
+
+    - **query**: Description of the picture
+    - **year_from** / **year_to**: Only photographs whose active dating overlaps these years
+    - **collection_id**: Only photographs of this collection
+    - **only_public**: Only public photographs of public collections (default: true);
+      false also includes the non-public photographs the user may access
+    - **limit**: Maximum number of results to return
+    """
+    try:
+        search_query = SearchQuery(
+            query_text=query,
+            year_from=year_from,
+            year_to=year_to,
+            collection_id=collection_id,
+            only_public=only_public
+        )
+        search_usecase = SearchImagesUseCase(SearchService(db))
+        result = await search_usecase.execute_visual(search_query, limit=limit, user_id=user_id)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+    except BusinessRuleViolationError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+
+    return VisualSearchResponse(
+        photographs=[PhotographMatchResponse.model_validate(match) for match in result.photographs],
+        query=result.query,
+        embedding_model=result.embedding_model,
+        candidates=result.candidates,
+        search_type=result.search_type,
+        limit=limit
+    )
+
+
 @router.get("/facets", response_model=FacetsResponse)
 async def get_search_facets(
     only_public: bool = Query(True),
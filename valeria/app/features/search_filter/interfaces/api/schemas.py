@@ -29,6 +29,29 @@ class SearchResponse(BaseModel):
     limit: int
 
 
+class PhotographMatchResponse(BaseModel):
+    """Visual search match schema."""
+    photograph_id: int
+    roll_id: int
+    collection_id: int
+    frame_number: Optional[int]
+    identifier: Optional[str]
+    is_public: bool
+    score: float
+
+    model_config = {"from_attributes": True}
+
+
+class VisualSearchResponse(BaseModel):
+    """Visual search response schema."""
+    photographs: List[PhotographMatchResponse]
+    query: str
+    embedding_model: str
+    candidates: int
+    search_type: str  # "visual"
+    limit: int
+
+
 class FacetItem(BaseModel):
     """Facet item schema."""
     value: str
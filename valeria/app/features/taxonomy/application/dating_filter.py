@@ -0,0 +1,37 @@
+"""
+Year-range filter over the photographs' ACTIVE chronology dating.
+
+A photograph matches when its dating overlaps [year_from, year_to]: a
+precise date must fall inside the range, a date_from/date_to interval
+must intersect it. Undated photographs never match a year filter.
+"""
+
+from datetime import date
+from typing import Optional
+
+from sqlalchemy import and_, func
+from sqlalchemy.sql import Select
+
+from app.features.archive.infrastructure.persistence.archive_model import PhotographModel
+from app.features.taxonomy.domain.taxonomy import AttributeStatus
+from app.features.taxonomy.infrastructure.persistence.taxonomy_model import AttrChronologyDatingModel
+
+
+def dated_between(stmt: Select, year_from: Optional[int], year_to: Optional[int]) -> Select:
+    """Restrict a query over PhotographModel to photographs dated within the years."""
+    if not year_from and not year_to:
+        return stmt
+    dating = AttrChronologyDatingModel
+    stmt = stmt.join(
+        dating,
+        and_(dating.photograph_id == PhotographModel.id, dating.status == AttributeStatus.ACTIVE),
+    ).distinct()
+    if year_from:
+        stmt = stmt.where(
+            func.coalesce(dating.precise_date, dating.date_to, dating.date_from) >= date(year_from, 1, 1)
+        )
+    if year_to:
+        stmt = stmt.where(
+            func.coalesce(dating.precise_date, dating.date_from, dating.date_to) <= date(year_to, 12, 31)
+        )
+    return stmt
@@ -3,16 +3,24 @@ Use case: extract Attribute 02 (Chronological Dating) from a photograph file.
 
 Flow:
   1. Verify the photograph exists and has at least one registered file.
-  2. Create an AnalysisJob (status=RUNNING) for traceability.
-  3. Call the configured chronology analyzer (stub or CLIP temporal).
+  2. Create an AnalysisJob (status=RUNNING) for traceability, or adopt the
+     QUEUED job when running inside the background analysis queue.
+  3. Call the configured chronology analyzer (stub or CLIP temporal) in the
+     analysis executor, off the event loop — unless the result cache already
+     holds a result for the same file bytes and provider version.
   4. Supersede any existing ACTIVE record for this photograph.
-  5. Write a new ACTIVE ChronologyDating record.
+  5. Write a new ACTIVE ChronologyDating record, and keep the image
+     embedding the analyzer returned (CLIP) for visual similarity search,
+     publishing it to embedding_hooks (cluster browsing subscribes).
   6. Update the AnalysisJob to COMPLETED or FAILED.
   7. Return the new record.
 """
 
+import time
 from datetime import datetime, timezone
+from typing import Optional
 
+import structlog
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
@@ -21,8 +29,13 @@ from app.features.archive.infrastructure.persistence.archive_model import (
     PhotographFileModel,
     FileType,
 )
+from app.features.analysis.application.job_tracking import (
+    analyze_with_cache,
+    complete_analysis_job,
+    measured_analysis,
+    start_analysis_job,
+)
 from app.features.analysis.infrastructure.persistence.analysis_model import (
-    AnalysisJobModel,
     JobStatus,
     AnalysisAttributeType,
 )
@@ -32,9 +45,14 @@ from app.features.taxonomy.domain.taxonomy import (
     ChronologyDating,
 )
 from app.features.taxonomy.domain.taxonomy_port import ITaxonomyRepository
-from app.infrastructure.analysis.analyzer_factory import create_chronology_analyzer
+from app.infrastructure.analysis.embedding_hooks import embedding_hooks
+from app.infrastructure.analysis.embedding_index import decode_embedding, embeddings_for
+from app.infrastructure.analysis.executor import analysis_executor
+from app.infrastructure.analysis.model_registry import CHRONOLOGY
 from app.shared.domain.exceptions import EntityNotFoundError
 
+logger = structlog.get_logger()
+
 
 class ExtractChronologyUseCase:
 
@@ -42,7 +60,9 @@ class ExtractChronologyUseCase:
         self.repository = repository
         self.session = session
 
-    async def execute(self, photograph_id: int, triggered_by: int) -> ChronologyDating:
+    async def execute(
+        self, photograph_id: int, triggered_by: int, job_id: Optional[int] = None,
+    ) -> ChronologyDating:
         # 1. Verify photograph exists
         photo_result = await self.session.execute(
             select(PhotographModel).where(PhotographModel.id == photograph_id)
@@ -68,24 +88,27 @@ class ExtractChronologyUseCase:
             files[0],
         )
 
-        # 3. Instantiate analyzer from factory (reads settings.attr02_analyzer)
-        analyzer = create_chronology_analyzer()
+        # 3. Resolve the configured provider. The analyzer itself lives in the
+        #    analysis executor (thread or process pool), never on the event loop.
+        tool_name, tool_version = await analysis_executor.provider_info(CHRONOLOGY)
 
-        # 4. Create AnalysisJob
-        job = AnalysisJobModel(
+        # 4. Create (or adopt the queued) AnalysisJob
+        job = await start_analysis_job(
+            self.session,
             photograph_id=photograph_id,
             attribute_type=AnalysisAttributeType.CHRONOLOGY,
-            tool_name=analyzer.provider_name,
-            tool_version=analyzer.provider_version,
-            status=JobStatus.RUNNING,
+            tool_name=tool_name,
+            tool_version=tool_version,
             triggered_by=triggered_by,
-            started_at=datetime.now(timezone.utc),
+            job_id=job_id,
         )
-        self.session.add(job)
-        await self.session.flush()
 
         # 5. Run analysis
-        analysis = analyzer.analyze(target.file_path)
+        # Same bytes + same provider version → cached result, job flagged cache_hit
+        analysis = await analyze_with_cache(
+            self.session, job, target,
+            measured_analysis(job, CHRONOLOGY, target.file_path),
+        )
 
         if analysis.get("error"):
             job.status = JobStatus.FAILED
@@ -98,6 +121,7 @@ class ExtractChronologyUseCase:
             )
 
         # 6. Supersede existing ACTIVE records
+        write_started = time.perf_counter()
         await self.repository.supersede_active_chronology(photograph_id)
 
         # 7. Save new record
@@ -117,10 +141,25 @@ class ExtractChronologyUseCase:
             raw_output=analysis.get("raw_output"),
         )
         saved = await self.repository.save_chronology(record)
+        if analysis.get("image_embedding"):
+            await self._store_embedding(photograph_id, analysis)
 
         # 8. Close job
-        job.status = JobStatus.COMPLETED
-        job.completed_at = datetime.now(timezone.utc)
-        await self.session.flush()
+        await complete_analysis_job(self.session, job, write_started)
 
         return saved
+
+    async def _store_embedding(self, photograph_id: int, analysis: dict) -> None:
+        """
+        Keep the embedding for similarity search and publish it to the
+        embedding hooks. Best effort: a full disk must not fail the dating.
+        """
+        try:
+            model = analysis["embedding_model"]
+            vector = decode_embedding(analysis["image_embedding"])
+            index = embeddings_for(model)
+            await analysis_executor.run(index.add, photograph_id, vector)
+        except Exception as exc:
+            logger.warning("embedding_store_failed", photograph_id=photograph_id, error=str(exc))
+            return
+        await embedding_hooks.publish(self.session, photograph_id, vector, model, index)
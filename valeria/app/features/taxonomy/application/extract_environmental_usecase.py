@@ -1,10 +1,12 @@
 """
 Use case: extract Attribute 04 (Environmental & Spatial Context) from a photograph file.
 
-Flow mirrors ExtractChronologyUseCase with the environmental analyzer factory.
+Flow mirrors ExtractChronologyUseCase with the environmental analyzer.
 """
 
+import time
 from datetime import datetime, timezone
+from typing import Optional
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
@@ -14,8 +16,13 @@ from app.features.archive.infrastructure.persistence.archive_model import (
     PhotographFileModel,
     FileType,
 )
+from app.features.analysis.application.job_tracking import (
+    analyze_with_cache,
+    complete_analysis_job,
+    measured_analysis,
+    start_analysis_job,
+)
 from app.features.analysis.infrastructure.persistence.analysis_model import (
-    AnalysisJobModel,
     JobStatus,
     AnalysisAttributeType,
 )
@@ -25,7 +32,8 @@ from app.features.taxonomy.domain.taxonomy import (
     EnvironmentalSpatial,
 )
 from app.features.taxonomy.domain.taxonomy_port import ITaxonomyRepository
-from app.infrastructure.analysis.analyzer_factory import create_environmental_analyzer
+from app.infrastructure.analysis.executor import analysis_executor
+from app.infrastructure.analysis.model_registry import ENVIRONMENTAL
 from app.shared.domain.exceptions import EntityNotFoundError
 
 
@@ -35,7 +43,9 @@ class ExtractEnvironmentalUseCase:
         self.repository = repository
         self.session = session
 
-    async def execute(self, photograph_id: int, triggered_by: int) -> EnvironmentalSpatial:
+    async def execute(
+        self, photograph_id: int, triggered_by: int, job_id: Optional[int] = None,
+    ) -> EnvironmentalSpatial:
         # 1. Verify photograph
         result = await self.session.execute(
             select(PhotographModel).where(PhotographModel.id == photograph_id)
@@ -61,24 +71,27 @@ class ExtractEnvironmentalUseCase:
             files[0],
         )
 
-        # 3. Instantiate analyzer
-        analyzer = create_environmental_analyzer()
+        # 3. Resolve the configured provider. The analyzer itself lives in the
+        #    analysis executor (thread or process pool), never on the event loop.
+        tool_name, tool_version = await analysis_executor.provider_info(ENVIRONMENTAL)
 
-        # 4. Create AnalysisJob
-        job = AnalysisJobModel(
+        # 4. Create (or adopt the queued) AnalysisJob
+        job = await start_analysis_job(
+            self.session,
             photograph_id=photograph_id,
             attribute_type=AnalysisAttributeType.ENVIRONMENTAL,
-            tool_name=analyzer.provider_name,
-            tool_version=analyzer.provider_version,
-            status=JobStatus.RUNNING,
+            tool_name=tool_name,
+            tool_version=tool_version,
             triggered_by=triggered_by,
-            started_at=datetime.now(timezone.utc),
+            job_id=job_id,
         )
-        self.session.add(job)
-        await self.session.flush()
 
         # 5. Run analysis
-        analysis = analyzer.analyze(target.file_path)
+        # Same bytes + same provider version → cached result, job flagged cache_hit
+        analysis = await analyze_with_cache(
+            self.session, job, target,
+            measured_analysis(job, ENVIRONMENTAL, target.file_path),
+        )
 
         if analysis.get("error"):
             job.status = JobStatus.FAILED
@@ -91,6 +104,7 @@ class ExtractEnvironmentalUseCase:
             )
 
         # 6. Supersede existing ACTIVE records
+        write_started = time.perf_counter()
         await self.repository.supersede_active_environmental(photograph_id)
 
         # 7. Save new record
@@ -110,8 +124,6 @@ class ExtractEnvironmentalUseCase:
         saved = await self.repository.save_environmental(record)
 
         # 8. Close job
-        job.status = JobStatus.COMPLETED
-        job.completed_at = datetime.now(timezone.utc)
-        await self.session.flush()
+        await complete_analysis_job(self.session, job, write_started)
 
         return saved
@@ -3,7 +3,8 @@ Use case: extract Attribute 01 (Technical Metadata) from a photograph file.
 
 Flow:
   1. Verify the photograph exists and has at least one registered file.
-  2. Create an AnalysisJob (status=RUNNING) for traceability.
+  2. Create an AnalysisJob (status=RUNNING) for traceability, or adopt the
+     QUEUED job when running inside the background analysis queue.
   3. Call the Pillow analyzer on the best available file (master first, else first file).
   4. Supersede any existing ACTIVE record for this photograph.
   5. Write a new ACTIVE TechnicalMetadata record.
@@ -11,7 +12,9 @@ Flow:
   7. Return the new record.
 """
 
+import time
 from datetime import datetime, timezone
+from typing import Optional
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
@@ -19,12 +22,19 @@ from sqlalchemy.future import select
 from app.features.archive.infrastructure.persistence.archive_model import (
     PhotographModel, PhotographFileModel, FileType,
 )
+from app.features.analysis.application.job_tracking import (
+    analyze_with_cache,
+    complete_analysis_job,
+    measured_analysis,
+    start_analysis_job,
+)
 from app.features.analysis.infrastructure.persistence.analysis_model import (
-    AnalysisJobModel, JobStatus, AnalysisAttributeType,
+    JobStatus, AnalysisAttributeType,
 )
 from app.features.taxonomy.domain.taxonomy import AttributeStatus, TechnicalMetadata
 from app.features.taxonomy.domain.taxonomy_port import ITaxonomyRepository
 from app.infrastructure.analysis import pillow_analyzer
+from app.infrastructure.analysis.executor import TECHNICAL
 from app.shared.domain.exceptions import EntityNotFoundError
 
 
@@ -34,7 +44,9 @@ class ExtractTechnicalMetadataUseCase:
         self.repository = repository
         self.session = session
 
-    async def execute(self, photograph_id: int, triggered_by: int) -> TechnicalMetadata:
+    async def execute(
+        self, photograph_id: int, triggered_by: int, job_id: Optional[int] = None,
+    ) -> TechnicalMetadata:
         # 1. Verify photograph exists
         photo_result = await self.session.execute(
             select(PhotographModel).where(PhotographModel.id == photograph_id)
@@ -66,21 +78,24 @@ class ExtractTechnicalMetadataUseCase:
                 "Registra al menos un archivo antes de analizar."
             )
 
-        # 3. Create AnalysisJob (running)
-        job = AnalysisJobModel(
+        # 3. Create (or adopt the queued) AnalysisJob
+        job = await start_analysis_job(
+            self.session,
             photograph_id=photograph_id,
             attribute_type=AnalysisAttributeType.TECHNICAL,
             tool_name=pillow_analyzer.PROVIDER_NAME,
             tool_version=pillow_analyzer.PROVIDER_VERSION,
-            status=JobStatus.RUNNING,
             triggered_by=triggered_by,
-            started_at=datetime.now(timezone.utc),
+            job_id=job_id,
         )
-        self.session.add(job)
-        await self.session.flush()
 
         # 4. Run analyzer
-        analysis = pillow_analyzer.analyze(target_file.file_path)
+        # JPG/TIFF come from the shared decode cache; RAW goes through ExifTool.
+        use_decoded = target_file.file_type in (FileType.JPG, FileType.TIFF)
+        analysis = await analyze_with_cache(
+            self.session, job, target_file,
+            measured_analysis(job, TECHNICAL, target_file.file_path, use_decoded),
+        )
 
         if analysis.get("error"):
             job.status = JobStatus.FAILED
@@ -92,6 +107,7 @@ class ExtractTechnicalMetadataUseCase:
             )
 
         # 5. Supersede existing ACTIVE records
+        write_started = time.perf_counter()
         await self.repository.supersede_active_technical(photograph_id)
 
         # 6. Build and save new TechnicalMetadata record
@@ -123,8 +139,6 @@ class ExtractTechnicalMetadataUseCase:
             await self.session.flush()
 
         # 8. Close job as COMPLETED
-        job.status = JobStatus.COMPLETED
-        job.completed_at = datetime.now(timezone.utc)
-        await self.session.flush()
+        await complete_analysis_job(self.session, job, write_started)
 
         return saved
@@ -7,7 +7,7 @@ from enum import Enum
 
 from sqlalchemy import (
     Column, String, Integer, Boolean, Text, Date, Float, JSON,
-    ForeignKey, Enum as SQLEnum, DateTime,
+    ForeignKey, Enum as SQLEnum, DateTime, Index,
 )
 from sqlalchemy.sql import func
 
@@ -65,6 +65,10 @@ class AttrTechnicalMetadataModel(Base):
     """
 
     __tablename__ = "attr_technical_metadata"
+    __table_args__ = (
+        # Staleness query: ACTIVE rows whose provider/version differ from the configured one
+        Index("ix_attr_technical_metadata_provider_staleness", "status", "analysis_provider", "provider_version"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     photograph_id = Column(
@@ -110,6 +114,9 @@ class AttrChronologyDatingModel(Base):
     """
 
     __tablename__ = "attr_chronology_dating"
+    __table_args__ = (
+        Index("ix_attr_chronology_dating_provider_staleness", "status", "analysis_provider", "provider_version"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     photograph_id = Column(
@@ -154,6 +161,9 @@ class AttrGeographicReferenceModel(Base):
     """
 
     __tablename__ = "attr_geographic_reference"
+    __table_args__ = (
+        Index("ix_attr_geographic_reference_provider_staleness", "status", "analysis_provider", "provider_version"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     photograph_id = Column(
@@ -198,6 +208,9 @@ class AttrEnvironmentalSpatialModel(Base):
     """
 
     __tablename__ = "attr_environmental_spatial"
+    __table_args__ = (
+        Index("ix_attr_environmental_spatial_provider_staleness", "status", "analysis_provider", "provider_version"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     photograph_id = Column(
@@ -2,9 +2,16 @@
 FastAPI routes for the taxonomy feature.
 Attribute 01 (Technical Metadata): extract and query.
 Write/analysis requires CURADOR or ADMINISTRADOR role.
+Analyzer model management (load state, reload, unload), the analysis
+result cache (metrics, purge), the stale-result report and the per-job
+resource percentiles require ADMINISTRADOR.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+import asyncio
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.features.authenticate.domain.role import Role
@@ -24,12 +31,21 @@ from app.features.taxonomy.interfaces.api.schemas import (
     ChronologyWriteRequest, ChronologyResponse,
     GeographicWriteRequest, GeographicResponse,
     EnvironmentalWriteRequest, EnvironmentalResponse,
+    AnalyzerStatusResponse,
+    AnalysisCacheStatsResponse,
+    StaleAnalysesResponse,
+    JobMetricsResponse,
 )
 from app.features.taxonomy.infrastructure.persistence.taxonomy_model import (
     AttrChronologyDatingModel, AttrGeographicReferenceModel, AttrEnvironmentalSpatialModel,
     AttributeStatus, SourceType,
 )
 from sqlalchemy import update as sa_update
+from app.features.analysis.application.job_metrics import job_metrics_summary
+from app.features.analysis.application.staleness import stale_summary
+from app.features.analysis.infrastructure.persistence.analysis_model import AnalysisAttributeType
+from app.features.analysis.infrastructure.adapters.result_cache import analysis_result_cache
+from app.infrastructure.analysis.model_registry import analyzer_registry
 from app.infrastructure.database.session import get_db
 from app.shared.domain.exceptions import EntityNotFoundError
 
@@ -51,6 +67,20 @@ async def _require_write_access(
     return user_id
 
 
+async def _require_admin(
+    user_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+) -> int:
+    user_repo = UserRepository(db)
+    user = await user_repo.get_by_id(user_id)
+    if not user or user.role != Role.ADMINISTRADOR:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Solo administradores pueden gestionar los modelos de análisis.",
+        )
+    return user_id
+
+
 # ── Attribute 01 — Technical Metadata ─────────────────────────────────────────
 
 @router.post(
@@ -303,3 +333,105 @@ async def get_environmental(
     if not model:
         raise HTTPException(status_code=404, detail="Sin contexto ambiental activo para esta fotografía.")
     return EnvironmentalResponse(**_to_dict(model))
+
+
+# ── Analyzer models (process-wide registry) ───────────────────────────────────
+
+def _check_attribute(attribute: str) -> None:
+    if attribute not in analyzer_registry.attributes:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Atributo de análisis desconocido: {attribute}",
+        )
+
+
+@router.get(
+    "/analyzers",
+    response_model=List[AnalyzerStatusResponse],
+    summary="Estado de los modelos de análisis cargados en este proceso",
+)
+async def list_analyzers(_: int = Depends(_require_admin)):
+    return [AnalyzerStatusResponse(**s) for s in analyzer_registry.stats()]
+
+
+@router.post(
+    "/analyzers/{attribute}/reload",
+    response_model=AnalyzerStatusResponse,
+    summary="Recargar el modelo de un atributo (chronology | geographic | environmental | objects)",
+)
+async def reload_analyzer(attribute: str, _: int = Depends(_require_admin)):
+    _check_attribute(attribute)
+    try:
+        entry = await asyncio.to_thread(analyzer_registry.reload, attribute)
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+    return AnalyzerStatusResponse(**entry.describe())
+
+
+@router.delete(
+    "/analyzers/{attribute}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Descargar el modelo de un atributo y liberar memoria",
+)
+async def unload_analyzer(attribute: str, _: int = Depends(_require_admin)):
+    _check_attribute(attribute)
+    if not analyzer_registry.unload(attribute):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="El modelo no está cargado.")
+    return None
+
+
+# ── Analysis result cache (content hash + provider version) ───────────────────
+
+@router.get(
+    "/analysis-cache",
+    response_model=AnalysisCacheStatsResponse,
+    summary="Métricas de la caché de resultados de análisis",
+)
+async def analysis_cache_stats(
+    _: int = Depends(_require_admin),
+    db: AsyncSession = Depends(get_db),
+):
+    return AnalysisCacheStatsResponse(**await analysis_result_cache.stats(db))
+
+
+@router.delete(
+    "/analysis-cache",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Vaciar la caché de resultados de análisis",
+)
+async def clear_analysis_cache(
+    _: int = Depends(_require_admin),
+    db: AsyncSession = Depends(get_db),
+):
+    await analysis_result_cache.clear(db)
+    return None
+
+
+# ── Stale results (written by an outdated provider version) ──────────────────
+
+@router.get(
+    "/stale-analyses",
+    response_model=List[StaleAnalysesResponse],
+    summary="Registros ACTIVE generados por una versión de proveedor distinta a la configurada",
+)
+async def list_stale_analyses(
+    _: int = Depends(_require_admin),
+    db: AsyncSession = Depends(get_db),
+):
+    return [StaleAnalysesResponse(**s) for s in await stale_summary(db)]
+
+
+# ── Per-job resource metrics (decode / inference / DB write, memory, input) ──
+
+@router.get(
+    "/job-metrics",
+    response_model=List[JobMetricsResponse],
+    summary="Percentiles p50/p95 de tiempos y memoria de los jobs de análisis por herramienta y versión",
+)
+async def analysis_job_metrics(
+    attribute_type: Optional[AnalysisAttributeType] = Query(None),
+    since: Optional[datetime] = Query(None, description="Solo jobs completados desde esta fecha"),
+    _: int = Depends(_require_admin),
+    db: AsyncSession = Depends(get_db),
+):
+    return [JobMetricsResponse(**m) for m in await job_metrics_summary(db, attribute_type, since)]
@@ -131,3 +131,59 @@ class EnvironmentalResponse(BaseModel):
     analyzed_at: datetime
 
     model_config = {"from_attributes": True}
+
+
+# ── Analyzer registry schemas ──────────────────────────────────────────────────
+
+class AnalyzerStatusResponse(BaseModel):
+    attribute: str
+    configured_as: str
+    provider: Optional[str]
+    provider_version: Optional[str]
+    loaded: bool
+    load_seconds: Optional[float]
+    memory_bytes: Optional[int]
+    loaded_at: Optional[float]
+
+
+class AnalysisCacheStatsResponse(BaseModel):
+    enabled: bool
+    entries: int
+    max_entries: int
+    hits: int
+    misses: int
+    stores: int
+    evictions: int
+    hit_rate: Optional[float]
+
+
+class OutdatedProviderCount(BaseModel):
+    provider: Optional[str]
+    provider_version: Optional[str]
+    count: int
+
+
+class StaleAnalysesResponse(BaseModel):
+    attribute_type: str
+    provider: str
+    provider_version: str
+    stale: int
+    outdated: List[OutdatedProviderCount]
+
+
+class MetricPercentiles(BaseModel):
+    p50: Optional[float]
+    p95: Optional[float]
+    samples: int
+
+
+class JobMetricsResponse(BaseModel):
+    tool_name: str
+    tool_version: Optional[str]
+    jobs: int
+    decode_ms: MetricPercentiles
+    inference_ms: MetricPercentiles
+    db_write_ms: MetricPercentiles
+    peak_memory_bytes: MetricPercentiles
+    input_pixels: MetricPercentiles
+    input_bytes: MetricPercentiles
@@ -1,19 +1,26 @@
 """
-Factory functions for attribute analyzers 02, 03, and 04.
+Factory functions for attribute analyzers 02, 03, and 04, and the object
+detector.
 
 Select the active provider via .env — no code changes needed to switch tools:
 
   ATTR02_ANALYZER=stub      # no-op, zero confidence (default)
   ATTR02_ANALYZER=clip      # CLIP zero-shot decade classification
+  ATTR02_ANALYZER=clip-onnx # same, image tower on ONNX Runtime (CPU)
 
   ATTR03_ANALYZER=stub      # no-op, zero confidence (default)
   ATTR03_ANALYZER=geoclip   # GeoCLIP geographic localization
 
   ATTR04_ANALYZER=stub      # no-op, zero confidence (default)
   ATTR04_ANALYZER=places365 # Places365 scene classification
+  ATTR04_ANALYZER=places365-onnx  # same, ResNet50 on ONNX Runtime (CPU)
+
+  USE_LOCAL_OBJECT_DETECTION=False  # stub, finds nothing (default)
+  USE_LOCAL_OBJECT_DETECTION=True   # YOLO exported to ONNX (CPU)
 
 The factory imports the concrete provider lazily, so missing optional
-dependencies (torch, open_clip, geoclip) never break the default stub path.
+dependencies (torch, open_clip, geoclip, onnxruntime) never break the
+default stub path.
 """
 
 from app.infrastructure.analysis.base_analyzer import IAttributeAnalyzer
@@ -22,7 +29,13 @@ from app.config.settings import settings
 
 def create_chronology_analyzer() -> IAttributeAnalyzer:
     """Return the configured analyzer for Attribute 02 (Chronological Dating)."""
-    if settings.attr02_analyzer.lower().strip() == "clip":
+    provider = settings.attr02_analyzer.lower().strip()
+    if provider == "clip-onnx":
+        from app.infrastructure.analysis.providers.attr02.clip_temporal_onnx_analyzer import (
+            CLIPTemporalOnnxAnalyzer,
+        )
+        return CLIPTemporalOnnxAnalyzer()
+    if provider == "clip":
         from app.infrastructure.analysis.providers.attr02.clip_temporal_analyzer import (
             CLIPTemporalAnalyzer,
         )
@@ -44,10 +57,25 @@ def create_geographic_analyzer() -> IAttributeAnalyzer:
 
 def create_environmental_analyzer() -> IAttributeAnalyzer:
     """Return the configured analyzer for Attribute 04 (Environmental & Spatial Context)."""
-    if settings.attr04_analyzer.lower().strip() == "places365":
+    provider = settings.attr04_analyzer.lower().strip()
+    if provider == "places365-onnx":
+        from app.infrastructure.analysis.providers.attr04.places365_onnx_analyzer import (
+            Places365OnnxAnalyzer,
+        )
+        return Places365OnnxAnalyzer()
+    if provider == "places365":
         from app.infrastructure.analysis.providers.attr04.places365_analyzer import (
             Places365Analyzer,
         )
         return Places365Analyzer()
     from app.infrastructure.analysis.providers.attr04.stub_analyzer import StubEnvironmentalAnalyzer
     return StubEnvironmentalAnalyzer()
+
+
+def create_object_detector() -> IAttributeAnalyzer:
+    """Return the configured object detector (see detect_objects)."""
+    if settings.use_local_object_detection:
+        from app.infrastructure.analysis.providers.objects.yolo_onnx_detector import YoloOnnxDetector
+        return YoloOnnxDetector()
+    from app.infrastructure.analysis.providers.objects.stub_detector import StubObjectDetector
+    return StubObjectDetector()
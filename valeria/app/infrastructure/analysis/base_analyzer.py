@@ -10,9 +10,37 @@ Contract for analyze():
 - Always returns a dict with 'provider' and 'provider_version' keys.
 - On error, returns {'error': '<message>', 'provider': ..., 'provider_version': ...}.
 - On success, 'error' is None.
+
+Contract for analyze_batch():
+- Same guarantees as analyze(), per item: returns one dict per input path,
+  in input order; a bad file only fails its own entry.
+- Providers backed by a neural network override it to push up to
+  batch_size preprocessed images through the model in a single forward pass.
+  The default implementation loops over analyze() (stubs, GeoCLIP).
+
+Contract for analyze_image() / analyze_images():
+- Same guarantees, but take DecodedImage objects produced once by the
+  shared decode stage (image_decoding) instead of paths, so a file is not
+  re-opened and re-decoded by every analyzer.
+- The default implementation falls back to analyze(image.file_path).
 """
 
 from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Any, Iterator, Optional, Sequence, TypeVar
+
+from app.config.settings import settings
+
+if TYPE_CHECKING:
+    from app.infrastructure.analysis.image_decoding import DecodedImage
+
+T = TypeVar("T")
+
+
+def chunked(items: Sequence[T], size: int) -> Iterator[Sequence[T]]:
+    """Yield consecutive slices of at most size items."""
+    size = max(int(size), 1)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
 
 
 class IAttributeAnalyzer(ABC):
@@ -28,3 +56,54 @@ class IAttributeAnalyzer(ABC):
         Must never raise — errors go in the 'error' key.
         """
         ...
+
+    def analyze_batch(
+        self, file_paths: Sequence[str], batch_size: Optional[int] = None,
+    ) -> list[dict]:
+        """
+        Analyze several files; one result dict per path, in order.
+        Must never raise. batch_size defaults to ANALYSIS_BATCH_SIZE.
+        """
+        return [self.analyze(path) for path in file_paths]
+
+    def analyze_image(self, image: "DecodedImage") -> dict:
+        """Analyze an already decoded file. Must never raise."""
+        return self.analyze(image.file_path)
+
+    def analyze_images(
+        self, images: Sequence["DecodedImage"], batch_size: Optional[int] = None,
+    ) -> list[dict]:
+        """Batch counterpart of analyze_image(); one result per image, in order."""
+        return [self.analyze_image(image) for image in images]
+
+    def decode_paths(
+        self, indexed_paths: Sequence[tuple[int, str]], results: list,
+    ) -> list[tuple[int, Any]]:
+        """
+        Decode (index, path) pairs to (index, RGB working image). Missing or
+        unreadable files get an error result at their index instead.
+        """
+        import os
+        from app.infrastructure.analysis.image_decoding import decode_image
+
+        decoded = []
+        for i, path in indexed_paths:
+            if not os.path.exists(path):
+                results[i] = self.error_result(f"File not found: {path}")
+                continue
+            try:
+                decoded.append((i, decode_image(path).image))
+            except Exception as exc:
+                results[i] = self.error_result(str(exc))
+        return decoded
+
+    def resolve_batch_size(self, batch_size: Optional[int] = None) -> int:
+        return max(int(batch_size or settings.analysis_batch_size), 1)
+
+    def error_result(self, message: str) -> dict:
+        """Result dict for a failed analysis, per the analyze() contract."""
+        return {
+            "error": message,
+            "provider": self.provider_name,
+            "provider_version": self.provider_version,
+        }
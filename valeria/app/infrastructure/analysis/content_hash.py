@@ -0,0 +1,70 @@
+"""
+Content hashing for photograph files.
+
+The SHA-256 of the file bytes identifies a file independently of its path,
+so an analysis result computed once can be reused when the same bytes are
+registered again (re-registration, moved archives, restarts).
+
+A hash is stored with the stat signature (size and mtime) of the bytes it
+was computed from; current_sha256() hashes again only when the signature
+changed, i.e. when the master was replaced on disk. refresh_content_hash()
+does that for a photograph file row, off the event loop.
+"""
+
+import hashlib
+import os
+from typing import Optional
+
+from app.infrastructure.analysis.executor import analysis_executor
+
+_CHUNK_SIZE = 1024 * 1024
+
+
+def sha256_file(file_path: str) -> Optional[str]:
+    """Hex SHA-256 of a file's bytes, or None when it cannot be read."""
+    digest = hashlib.sha256()
+    try:
+        with open(file_path, "rb") as fh:
+            for chunk in iter(lambda: fh.read(_CHUNK_SIZE), b""):
+                digest.update(chunk)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+def stat_signature(file_path: str) -> Optional[str]:
+    """'<size>:<mtime ns>' of a file, or None when it cannot be stat'ed."""
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def current_sha256(
+    file_path: str, known_sha256: Optional[str] = None, known_signature: Optional[str] = None,
+) -> tuple[Optional[str], Optional[str]]:
+    """
+    (sha256, stat signature) of a file's current bytes: known_sha256 while
+    the signature still matches known_signature, otherwise hashed again.
+    An unreachable file keeps what was known.
+    """
+    signature = stat_signature(file_path)
+    if signature is None:
+        return known_sha256, known_signature
+    if known_sha256 is not None and signature == known_signature:
+        return known_sha256, signature
+    sha256 = sha256_file(file_path)
+    if sha256 is None:
+        return known_sha256, known_signature
+    return sha256, signature
+
+
+async def refresh_content_hash(pf) -> None:
+    """
+    Hash a PhotographFileModel again when its bytes changed on disk since
+    content_sha256 was computed (caller commits).
+    """
+    pf.content_sha256, pf.content_stat = await analysis_executor.run(
+        current_sha256, pf.file_path, pf.content_sha256, pf.content_stat,
+    )
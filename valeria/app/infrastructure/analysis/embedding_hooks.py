@@ -0,0 +1,65 @@
+"""
+Hook for features that react to a newly stored image embedding.
+
+Dating a photograph with CLIP keeps the image embedding in the embedding
+index (see embedding_index) and then publishes it here, so the analysis
+use case does not import the features built on top of the embeddings.
+Cluster browsing subscribes to place the photograph in the current
+clustering without a refit.
+
+Subscribers are wired at the composition roots (the API lifespan and the
+scripts that analyze outside it). They run in the publisher's session,
+each inside a savepoint: a failing subscriber is logged and rolled back
+without undoing the dating record or skipping the other subscribers.
+"""
+
+from typing import Awaitable, Callable
+
+import numpy as np
+import structlog
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.infrastructure.analysis.embedding_index import EmbeddingIndex
+
+logger = structlog.get_logger()
+
+# (session, photograph_id, vector, embedding_model, index)
+EmbeddingListener = Callable[[AsyncSession, int, np.ndarray, str, EmbeddingIndex], Awaitable[object]]
+
+
+class EmbeddingHooks:
+    """Subscribers notified after an embedding is stored."""
+
+    def __init__(self) -> None:
+        self._listeners: list[EmbeddingListener] = []
+
+    def subscribe(self, listener: EmbeddingListener) -> None:
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def unsubscribe(self, listener: EmbeddingListener) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    async def publish(
+        self,
+        session: AsyncSession,
+        photograph_id: int,
+        vector: np.ndarray,
+        embedding_model: str,
+        index: EmbeddingIndex,
+    ) -> None:
+        for listener in list(self._listeners):
+            try:
+                async with session.begin_nested():
+                    await listener(session, photograph_id, vector, embedding_model, index)
+            except Exception as exc:
+                logger.warning(
+                    "embedding_listener_failed",
+                    photograph_id=photograph_id, listener=getattr(listener, "__name__", repr(listener)),
+                    error=str(exc),
+                )
+
+
+# Global hooks instance
+embedding_hooks = EmbeddingHooks()
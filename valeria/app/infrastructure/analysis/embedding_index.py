@@ -0,0 +1,336 @@
+"""
+Persistent CLIP image embeddings of photographs, searchable by cosine similarity.
+
+The chronology analyzer (CLIP) encodes every photograph it dates. Its
+L2-normalized image embedding is kept here, one row per photograph, in a
+contiguous float16 matrix on disk:
+
+    EMBEDDINGS_DIR/<model>/meta.json            model, dimension, generation
+    EMBEDDINGS_DIR/<model>/vectors-<gen>.f16    (rows, dim) float16, row-major
+    EMBEDDINGS_DIR/<model>/ids-<gen>.i64        photograph id of each row
+
+The matrix is memory-mapped, so worker processes and restarts share the
+page cache instead of loading it. New and re-analyzed photographs are
+appended. The id map keeps each photograph's latest row, and compaction
+rewrites both files into the next generation once superseded rows
+outnumber live ones. meta.json is replaced last, so a crash mid-compaction
+leaves the previous generation intact. Rows are only counted once their id
+is written, and a torn append is truncated by the next writer.
+
+API workers and the scripts share the files. Every operation holds an
+advisory lock on the directory (exclusive to append or compact) and first
+catches up with the disk: meta.json replaced means another process
+compacted, so the id map is rebuilt; longer files mean rows appended
+elsewhere, read incrementally. A row number is therefore always the
+file's own, never a count cached by one process.
+
+Search is exact: one pass over the matrix, then the top k are picked with
+argpartition. With torch installed (the CLIP analyzers need it anyway) the
+float16 rows are multiplied directly, about 30 ms for 100k photographs on
+one core; numpy converts blocks of _SEARCH_BLOCK_ROWS rows to float32
+first, several times slower. Callers restrict the candidates with only=
+(e.g. ids matching SQL filters) instead of filtering the top k afterwards,
+so selective filters still return k results.
+At 512 dimensions that is about 1 MB of float16 per 1000 photographs;
+float16 halves the memory and disk footprint at no cost in ranking
+quality for cosine similarity.
+
+There is one index per embedding model (embeddings_for), since vectors of
+different models are not comparable; analyzers tag their results with
+embedding_model.
+"""
+
+import base64
+import json
+import os
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+import numpy as np
+
+from app.config.settings import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows: a single process per index
+    fcntl = None
+
+_SEARCH_BLOCK_ROWS = 8192
+_COMPACT_MIN_DEAD = 1024
+
+
+def encode_embedding(vector) -> str:
+    """L2-normalized vector as base64 float16 (compact enough for result dicts and JSON caches)."""
+    array = np.asarray(vector, dtype=np.float32).ravel()
+    norm = float(np.linalg.norm(array))
+    if norm > 0:
+        array = array / norm
+    return base64.b64encode(array.astype("<f2").tobytes()).decode("ascii")
+
+
+def decode_embedding(data: str) -> np.ndarray:
+    return np.frombuffer(base64.b64decode(data), dtype="<f2").astype(np.float32)
+
+
+def _scores(vectors: np.ndarray, query: np.ndarray) -> np.ndarray:
+    """vectors @ query as float32, vectors being the float16 matrix."""
+    try:
+        import torch
+    except ImportError:
+        torch = None
+    if torch is not None:
+        product = torch.from_numpy(vectors) @ torch.from_numpy(query.astype(np.float16))
+        return product.float().numpy()
+
+    scores = np.empty(len(vectors), dtype=np.float32)
+    for start in range(0, len(vectors), _SEARCH_BLOCK_ROWS):
+        block = np.asarray(vectors[start:start + _SEARCH_BLOCK_ROWS], dtype=np.float32)
+        scores[start:start + len(block)] = block @ query
+    return scores
+
+
+class EmbeddingIndex:
+    """
+    Append-only float16 matrix of photograph embeddings for one model.
+    Thread-safe, and safe across processes sharing EMBEDDINGS_DIR.
+    """
+
+    def __init__(self, model: str, root: Optional[Path] = None) -> None:
+        self.model = model
+        self._root = root
+        self._lock = threading.Lock()
+        self._dim: Optional[int] = None
+        self._generation = 0
+        self._meta_stamp: Optional[tuple] = None
+        # Row -> photograph id and row still current; capacity doubles, first _rows valid
+        self._ids = np.empty(0, dtype="<i8")
+        self._live = np.empty(0, dtype=bool)
+        self._row_of: dict[int, int] = {}
+        self._vectors: Optional[np.ndarray] = None  # memmap, refreshed when rows were appended
+        self._rows = 0
+
+    @property
+    def root(self) -> Path:
+        base = self._root if self._root is not None else Path(settings.embeddings_dir)
+        return base / self.model.replace("/", "_")
+
+    def _paths(self, generation: int) -> tuple[Path, Path]:
+        return self.root / f"vectors-{generation}.f16", self.root / f"ids-{generation}.i64"
+
+    # ── Loading ───────────────────────────────────────────────────────────────
+
+    @contextmanager
+    def _locked(self, writing: bool = False) -> Iterator[None]:
+        """
+        Hold the thread lock and an advisory lock on the directory (shared to
+        read, exclusive to write), then catch up with the files: the API
+        workers and the scripts all append to, and compact, the same index.
+        """
+        with self._lock:
+            if fcntl is None or (not writing and not self.root.exists()):
+                self._sync(writing)
+                yield
+                return
+            self.root.mkdir(parents=True, exist_ok=True)
+            with open(self.root / "lock", "a+b") as fh:
+                fcntl.flock(fh.fileno(), fcntl.LOCK_EX if writing else fcntl.LOCK_SH)
+                try:
+                    self._sync(writing)
+                    yield
+                finally:
+                    fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+
+    def _reset(self) -> None:
+        self._ids = np.empty(0, dtype="<i8")
+        self._live = np.empty(0, dtype=bool)
+        self._row_of = {}
+        self._vectors = None
+        self._rows = 0
+
+    def _sync(self, writing: bool) -> None:
+        """Read meta.json again if it was replaced, then any rows appended since."""
+        meta_path = self.root / "meta.json"
+        try:
+            stat = meta_path.stat()
+        except FileNotFoundError:
+            return
+        stamp = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if stamp != self._meta_stamp:
+            meta = json.loads(meta_path.read_text())
+            if meta["generation"] != self._generation or meta["dim"] != self._dim:
+                self._reset()
+            self._dim, self._generation = meta["dim"], meta["generation"]
+            self._meta_stamp = stamp
+
+        vectors_path, ids_path = self._paths(self._generation)
+        row_bytes = self._dim * 2
+        vectors_size = vectors_path.stat().st_size if vectors_path.exists() else 0
+        ids_size = ids_path.stat().st_size if ids_path.exists() else 0
+        rows = min(ids_size // 8, vectors_size // row_bytes)
+        if writing:
+            # Torn append (crash between the two writes): drop the partial row
+            for path, size, expected in ((vectors_path, vectors_size, rows * row_bytes), (ids_path, ids_size, rows * 8)):
+                if size != expected:
+                    os.truncate(path, expected)
+        if rows < self._rows:
+            self._reset()
+        if rows > self._rows:
+            with open(ids_path, "rb") as fh:
+                fh.seek(self._rows * 8)
+                new_ids = np.frombuffer(fh.read((rows - self._rows) * 8), dtype="<i8")
+            for photograph_id in new_ids:
+                self._append_row(int(photograph_id))
+
+    def _append_row(self, photograph_id: int) -> None:
+        """Record that row _rows holds photograph_id, superseding its previous row."""
+        row = self._rows
+        if row == len(self._ids):
+            capacity = max(2 * row, 1024)
+            self._ids = np.resize(self._ids, capacity)
+            self._live = np.resize(self._live, capacity)
+        self._ids[row] = photograph_id
+        self._live[row] = True
+        self._rows += 1
+        previous = self._row_of.get(photograph_id)
+        if previous is not None:
+            self._live[previous] = False
+        self._row_of[photograph_id] = row
+
+    def _matrix(self) -> Optional[np.ndarray]:
+        """Memmap of the first _rows rows (mapped again only after appends or compaction)."""
+        if self._rows == 0:
+            return None
+        if self._vectors is None or len(self._vectors) != self._rows:
+            vectors_path, _ = self._paths(self._generation)
+            # Copy-on-write rather than read-only so torch accepts it; nothing writes to it
+            self._vectors = np.memmap(vectors_path, dtype="<f2", mode="c", shape=(self._rows, self._dim))
+        return self._vectors
+
+    def _write_meta(self) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.root / "meta.json.tmp"
+        tmp.write_text(json.dumps({"model": self.model, "dim": self._dim, "generation": self._generation}))
+        os.replace(tmp, self.root / "meta.json")
+        stat = (self.root / "meta.json").stat()
+        self._meta_stamp = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    # ── Writing ───────────────────────────────────────────────────────────────
+
+    def add(self, photograph_id: int, vector) -> None:
+        """Store (or replace) a photograph's embedding; vector is normalized here."""
+        array = np.asarray(vector, dtype=np.float32).ravel()
+        norm = float(np.linalg.norm(array))
+        if norm == 0:
+            raise ValueError("Zero embedding")
+        with self._locked(writing=True):
+            if self._dim is None:
+                self._dim = len(array)
+                self._write_meta()
+            if len(array) != self._dim:
+                raise ValueError(f"Embedding has {len(array)} dimensions, index has {self._dim}")
+
+            # Synced under the exclusive lock: _rows is the end of both files
+            vectors_path, ids_path = self._paths(self._generation)
+            with open(vectors_path, "ab") as fh:
+                fh.write((array / norm).astype("<f2").tobytes())
+            with open(ids_path, "ab") as fh:
+                fh.write(np.array([photograph_id], dtype="<i8").tobytes())
+            self._append_row(photograph_id)
+            if self._rows - len(self._row_of) >= max(len(self._row_of), _COMPACT_MIN_DEAD):
+                self._compact()
+
+    def compact(self) -> None:
+        with self._locked(writing=True):
+            if self._rows:
+                self._compact()
+
+    def _compact(self) -> None:
+        """Rewrite the live rows as the next generation. Caller holds the exclusive lock."""
+        rows = np.flatnonzero(self._live[:self._rows])
+        matrix = self._matrix()
+        generation = self._generation + 1
+        vectors_path, ids_path = self._paths(generation)
+        with open(vectors_path, "wb") as fh:
+            for start in range(0, len(rows), _SEARCH_BLOCK_ROWS):
+                fh.write(np.ascontiguousarray(matrix[rows[start:start + _SEARCH_BLOCK_ROWS]]).tobytes())
+            fh.flush()
+            os.fsync(fh.fileno())
+        ids = self._ids[rows]
+        with open(ids_path, "wb") as fh:
+            fh.write(ids.tobytes())
+            fh.flush()
+            os.fsync(fh.fileno())
+
+        # Other processes see the new meta.json and reload; their memmaps of
+        # the old generation stay readable after the unlink
+        old_paths = self._paths(self._generation)
+        self._generation = generation
+        self._write_meta()
+        self._reset()
+        for photograph_id in ids:
+            self._append_row(int(photograph_id))
+        for path in old_paths:
+            path.unlink(missing_ok=True)
+
+    # ── Reading ───────────────────────────────────────────────────────────────
+
+    def __len__(self) -> int:
+        with self._locked():
+            return len(self._row_of)
+
+    def __contains__(self, photograph_id: int) -> bool:
+        with self._locked():
+            return photograph_id in self._row_of
+
+    def get(self, photograph_id: int) -> Optional[np.ndarray]:
+        with self._locked():
+            row = self._row_of.get(photograph_id)
+            return None if row is None else np.asarray(self._matrix()[row], dtype=np.float32)
+
+    def snapshot(self) -> tuple[np.ndarray, np.ndarray]:
+        """(photograph ids, float32 (n, dim) matrix) of every live embedding, copied."""
+        with self._locked():
+            rows = np.flatnonzero(self._live[:self._rows])
+            if len(rows) == 0:
+                return np.empty(0, dtype=np.int64), np.empty((0, self._dim or 0), dtype=np.float32)
+            return self._ids[rows].astype(np.int64), np.asarray(self._matrix()[rows], dtype=np.float32)
+
+    def search(
+        self, query, k: int, exclude: Iterable[int] = (), only: Optional[Iterable[int]] = None,
+    ) -> list[tuple[int, float]]:
+        """
+        (photograph_id, cosine similarity) of the k most similar photographs,
+        best first; only, when given, restricts the candidates to those ids.
+        """
+        with self._locked():
+            rows = self._rows
+            vectors, ids, live = self._matrix(), self._ids[:rows], self._live[:rows].copy()
+            for photograph_id in exclude:
+                row = self._row_of.get(photograph_id)
+                if row is not None:
+                    live[row] = False
+        if vectors is None or k <= 0:
+            return []
+        if only is not None:
+            live &= np.isin(ids, np.fromiter(only, dtype=np.int64))
+
+        q = np.asarray(query, dtype=np.float32).ravel()
+        q = q / (np.linalg.norm(q) or 1.0)
+        scores = _scores(vectors, q)
+        scores[~live] = -np.inf
+
+        k = min(k, int(live.sum()))
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(int(ids[row]), float(scores[row])) for row in top]
+
+
+@lru_cache(maxsize=None)
+def embeddings_for(model: str) -> EmbeddingIndex:
+    """The process-wide index of one embedding model."""
+    return EmbeddingIndex(model)
@@ -0,0 +1,286 @@
+"""
+Off-event-loop execution for analyzers and other blocking work.
+
+The extraction use cases are coroutines, but model inference (CLIP, GeoCLIP,
+Places365), file hashing and decoding are CPU-bound and synchronous; run
+inline they stall the uvicorn event loop, so every other request (even
+/health) waits for a forward pass. This module moves that work to a pool:
+
+  ANALYSIS_EXECUTOR=thread   (default) ThreadPoolExecutor. Models are the
+                             process-wide warm instances of analyzer_registry;
+                             torch releases the GIL during inference.
+  ANALYSIS_EXECUTOR=process  ProcessPoolExecutor (spawn). Each worker process
+                             keeps its own registry and decode cache, so memory
+                             grows with the worker count, but pure-Python work
+                             (pre/post-processing) no longer contends for the
+                             GIL. Admin model endpoints describe the API
+                             process, not the workers, in this mode.
+
+ANALYSIS_EXECUTOR_WORKERS bounds how many analyses run at once;
+ANALYSIS_TORCH_THREADS caps torch intra-op threads (per worker process in
+process mode, process-wide in thread mode; 0 leaves torch's default).
+
+Work is addressed by attribute slot (see model_registry) plus a file path,
+so everything sent to a worker is picklable; results are the analyzers'
+plain output dicts (analyze_measured() adds the per-job resource metrics
+of instrumentation, measured inside the worker).
+"""
+
+import asyncio
+import functools
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from app.config.settings import settings
+from app.infrastructure.analysis.instrumentation import AnalysisMetrics, rss_peak, timed
+
+TECHNICAL = "technical"
+
+_THREAD_ENV_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS")
+
+
+def _limit_torch_threads(torch_threads: int) -> None:
+    if torch_threads <= 0:
+        return
+    try:
+        import torch
+    except ImportError:
+        return
+    torch.set_num_threads(torch_threads)
+
+
+def _init_process_worker(torch_threads: int, preload: bool) -> None:
+    """Initializer of each worker process: thread limits, optional warm-up."""
+    if torch_threads > 0:
+        for name in _THREAD_ENV_VARS:
+            os.environ[name] = str(torch_threads)
+    _limit_torch_threads(torch_threads)
+    if preload:
+        from app.infrastructure.analysis.model_registry import analyzer_registry
+        analyzer_registry.warm_up()
+
+
+# ── Functions executed inside the workers (module-level: picklable) ──────────
+
+def provider_info(attribute: str) -> tuple[str, str]:
+    """(provider_name, provider_version) of the analyzer serving a slot."""
+    if attribute == TECHNICAL:
+        from app.infrastructure.analysis import pillow_analyzer
+        return pillow_analyzer.PROVIDER_NAME, pillow_analyzer.PROVIDER_VERSION
+
+    from app.infrastructure.analysis.model_registry import analyzer_registry
+    analyzer = analyzer_registry.get(attribute)
+    return analyzer.provider_name, analyzer.provider_version
+
+
+def analyze_file(attribute: str, file_path: str, use_decoded: bool = True) -> dict:
+    """
+    Run the slot's analyzer on one file, from the shared decode when the
+    file is Pillow-readable. Same never-raises contract as analyze().
+    """
+    return analyze_file_measured(attribute, file_path, use_decoded)[0]
+
+
+def analyze_file_measured(
+    attribute: str, file_path: str, use_decoded: bool = True,
+) -> tuple[dict, dict]:
+    """analyze_file() plus its AnalysisMetrics (see instrumentation) as a dict."""
+    from app.infrastructure.analysis.image_decoding import decoded_images
+
+    metrics = AnalysisMetrics()
+    with rss_peak(metrics):
+        decoded = None
+        if use_decoded:
+            with timed(metrics, "decode_ms"):
+                decoded = decoded_images.get(file_path)
+        with timed(metrics, "inference_ms"):
+            result = _run_analyzer(attribute, file_path, decoded)
+
+    if decoded is None:
+        # Path-based analysis decoded the file itself.
+        metrics.decode_ms = None
+        width, height = result.get("width_px"), result.get("height_px")
+        if width and height:
+            metrics.input_pixels = int(width) * int(height)
+        try:
+            metrics.input_bytes = os.path.getsize(file_path)
+        except OSError:
+            pass
+    else:
+        metrics.input_pixels = decoded.width_px * decoded.height_px
+        metrics.input_bytes = decoded.file_size_bytes
+    return result, metrics.as_dict()
+
+
+def _run_analyzer(attribute: str, file_path: str, decoded) -> dict:
+    if attribute == TECHNICAL:
+        from app.infrastructure.analysis import pillow_analyzer
+        if decoded is not None:
+            return pillow_analyzer.analyze_decoded(decoded)
+        return pillow_analyzer.analyze(file_path)
+
+    from app.infrastructure.analysis.model_registry import analyzer_registry
+    analyzer = analyzer_registry.get(attribute)
+    if decoded is not None:
+        return analyzer.analyze_image(decoded)
+    return analyzer.analyze(file_path)
+
+
+def encode_text(attribute: str, text: str):
+    """
+    (embedding_model, vector) of text in the slot analyzer's image embedding
+    space, or None when the analyzer has no text tower (stub providers).
+    """
+    from app.infrastructure.analysis.model_registry import analyzer_registry
+    analyzer = analyzer_registry.get(attribute)
+    if not hasattr(analyzer, "encode_texts"):
+        return None
+    return analyzer.embedding_model, analyzer.encode_texts([text])[0]
+
+
+def detect_objects(file_paths: list[str]) -> list[dict]:
+    """
+    Object detector results for several files, one per path in order. The
+    files come from the shared decode, and the detector batches them into
+    single forward passes. Same never-raises contract as analyze().
+    """
+    from app.infrastructure.analysis.image_decoding import decoded_images
+    from app.infrastructure.analysis.model_registry import OBJECTS, analyzer_registry
+
+    detector = analyzer_registry.get(OBJECTS)
+    decoded = [decoded_images.get(path) for path in file_paths]
+    readable = [i for i, image in enumerate(decoded) if image is not None]
+    results = [
+        detector.error_result(f"Cannot decode {path}") if image is None else None
+        for path, image in zip(file_paths, decoded)
+    ]
+    for i, result in zip(readable, detector.analyze_images([decoded[i] for i in readable])):
+        results[i] = result
+    return results
+
+
+def _warm_up_worker() -> dict[str, Optional[str]]:
+    from app.infrastructure.analysis.model_registry import analyzer_registry
+    return analyzer_registry.warm_up()
+
+
+# ── Executor ─────────────────────────────────────────────────────────────────
+
+class AnalysisExecutor:
+    """
+    Dispatches blocking calls from coroutines to a thread or process pool.
+    The pool is created on first use, so code paths that never analyze
+    (and unit tests) pay nothing.
+    """
+
+    def __init__(
+        self,
+        mode: Optional[str] = None,
+        max_workers: Optional[int] = None,
+        torch_threads: Optional[int] = None,
+    ) -> None:
+        self._mode = mode
+        self._max_workers = max_workers
+        self._torch_threads = torch_threads
+        self._pool: Optional[Executor] = None
+        self._io_pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def mode(self) -> str:
+        mode = (self._mode or settings.analysis_executor).lower().strip()
+        return "process" if mode == "process" else "thread"
+
+    @property
+    def max_workers(self) -> int:
+        workers = self._max_workers if self._max_workers is not None else settings.analysis_executor_workers
+        return max(int(workers), 1)
+
+    @property
+    def torch_threads(self) -> int:
+        threads = self._torch_threads if self._torch_threads is not None else settings.analysis_torch_threads
+        return max(int(threads), 0)
+
+    def _analysis_pool(self) -> Executor:
+        with self._lock:
+            if self._pool is None:
+                if self.mode == "process":
+                    self._pool = ProcessPoolExecutor(
+                        max_workers=self.max_workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                        initializer=_init_process_worker,
+                        initargs=(self.torch_threads, settings.analyzers_preload),
+                    )
+                else:
+                    _limit_torch_threads(self.torch_threads)
+                    self._pool = ThreadPoolExecutor(
+                        max_workers=self.max_workers, thread_name_prefix="analysis",
+                    )
+            return self._pool
+
+    def _blocking_pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._io_pool is None:
+                self._io_pool = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="analysis-io",
+                )
+            return self._io_pool
+
+    async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Run arbitrary blocking work (hashing, file I/O) on a thread; fn need
+        not be picklable. Analyzer inference goes through analyze() instead.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._blocking_pool(), functools.partial(fn, *args, **kwargs),
+        )
+
+    async def _submit(self, fn: Callable[..., Any], *args: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._analysis_pool(), fn, *args)
+
+    async def provider_info(self, attribute: str) -> tuple[str, str]:
+        """Provider name/version for a slot (loads the model in the worker if needed)."""
+        return await self._submit(provider_info, attribute)
+
+    async def analyze(self, attribute: str, file_path: str, use_decoded: bool = True) -> dict:
+        """Run a slot's analyzer on a file in the pool; never raises for analysis errors."""
+        return await self._submit(analyze_file, attribute, file_path, use_decoded)
+
+    async def analyze_measured(
+        self, attribute: str, file_path: str, use_decoded: bool = True,
+    ) -> tuple[dict, dict]:
+        """analyze() plus the worker-side resource metrics of the call."""
+        return await self._submit(analyze_file_measured, attribute, file_path, use_decoded)
+
+    async def encode_text(self, attribute: str, text: str):
+        """Text embedding for text-to-image search (see encode_text); loads the model if needed."""
+        return await self._submit(encode_text, attribute, text)
+
+    async def detect_objects(self, file_paths: list[str]) -> list[dict]:
+        """Batched object detection (see detect_objects); loads the detector if needed."""
+        return await self._submit(detect_objects, list(file_paths))
+
+    async def warm_up(self) -> dict[str, Optional[str]]:
+        """
+        Load the configured models off the event loop. In process mode every
+        worker also preloads from its initializer when ANALYZERS_PRELOAD is set.
+        """
+        return await self._submit(_warm_up_worker)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pool, io_pool = self._pool, self._io_pool
+            self._pool = self._io_pool = None
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+        if io_pool is not None:
+            io_pool.shutdown(wait=True, cancel_futures=True)
+
+
+# Global executor instance
+analysis_executor = AnalysisExecutor()
@@ -0,0 +1,245 @@
+"""
+Long-lived ExifTool workers for RAW metadata extraction.
+
+Launching `exiftool` per file pays the Perl interpreter and module startup
+(hundreds of ms) every time, which dominates CR3-heavy rolls. Each worker
+here is one ExifTool process started in `-stay_open True -@ -` mode: the
+arguments for a request are written to its stdin, terminated by
+`-execute{N}`, and the JSON answer is read from stdout up to `{readyN}`.
+`-echo4 {readyN}` writes the same marker to stderr so error output is
+drained in step and never fills the pipe.
+
+A request may name several files; ExifTool then answers with one JSON object
+per readable file in a single invocation. Dead workers (crashed, killed, or
+timed out) are replaced on the next request. Timeouts are per request. A
+request is retried on a fresh worker only when it could not be sent: one
+whose worker died while reading the file is not retried, since the same
+file would most likely crash the next worker too.
+
+Each argument is one line of the argument file, so file names are passed
+through file_argument(): relative names starting with "-" get a "./"
+prefix (ExifTool would take them for options) and names containing a line
+break are rejected.
+
+Configure with EXIFTOOL_PATH, EXIFTOOL_WORKERS and EXIFTOOL_TIMEOUT_SECONDS.
+"""
+
+import json
+import os
+import queue
+import selectors
+import subprocess
+import threading
+import time
+from typing import Optional, Sequence
+
+from app.config.settings import settings
+
+# Applied to every request of a worker: JSON output with numeric values.
+_COMMON_ARGS = ["-j", "-n", "-charset", "filename=utf8"]
+
+
+class ExifToolError(RuntimeError):
+    """ExifTool returned no metadata or the worker died mid-request."""
+
+
+class _RequestNotSent(ExifToolError):
+    """The worker was gone before it received the request: safe to retry."""
+
+
+def file_argument(file_path: str) -> str:
+    """file_path as an argument-file line that ExifTool reads as a file name."""
+    if "\n" in file_path or "\r" in file_path:
+        raise ExifToolError(f"File names with line breaks are not supported: {file_path!r}")
+    return f"./{file_path}" if file_path.startswith("-") else file_path
+
+
+class ExifToolProcess:
+    """One `exiftool -stay_open` process. Not thread-safe; the pool serializes use."""
+
+    def __init__(self, executable: str) -> None:
+        self.executable = executable
+        self._seq = 0
+        # Raises FileNotFoundError when ExifTool is not installed.
+        self._proc = subprocess.Popen(
+            [self.executable, "-stay_open", "True", "-@", "-", "-common_args", *_COMMON_ARGS],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+
+    @property
+    def alive(self) -> bool:
+        return self._proc.poll() is None
+
+    def execute(self, args: Sequence[str], timeout: float) -> tuple[str, str]:
+        """Run one request; returns (stdout, stderr) without the ready markers."""
+        self._seq += 1
+        marker = f"{{ready{self._seq}}}"
+        lines = [*args, "-echo4", marker, f"-execute{self._seq}"]
+        try:
+            self._proc.stdin.write(("\n".join(lines) + "\n").encode("utf-8"))
+            self._proc.stdin.flush()
+        except (BrokenPipeError, OSError) as exc:
+            raise _RequestNotSent(f"ExifTool worker is not running: {exc}") from exc
+        out, err = self._read_until(marker.encode(), time.monotonic() + timeout)
+        return out, err
+
+    def _read_until(self, marker: bytes, deadline: float) -> tuple[str, str]:
+        streams = {self._proc.stdout.fileno(): bytearray(), self._proc.stderr.fileno(): bytearray()}
+        pending = set(streams)
+        with selectors.DefaultSelector() as selector:
+            for fd in streams:
+                selector.register(fd, selectors.EVENT_READ)
+            while pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError("ExifTool request timed out")
+                for key, _ in selector.select(remaining):
+                    chunk = os.read(key.fd, 65536)
+                    if not chunk:
+                        raise ExifToolError("ExifTool worker exited unexpectedly")
+                    buf = streams[key.fd]
+                    buf.extend(chunk)
+                    if buf.rstrip().endswith(marker):
+                        pending.discard(key.fd)
+                        selector.unregister(key.fd)
+
+        def _strip(buf: bytearray) -> str:
+            text = buf.rstrip()[: -len(marker)]
+            return text.decode("utf-8", errors="replace").strip()
+
+        return (
+            _strip(streams[self._proc.stdout.fileno()]),
+            _strip(streams[self._proc.stderr.fileno()]),
+        )
+
+    def close(self, timeout: float = 2.0) -> None:
+        if self.alive:
+            try:
+                self._proc.stdin.write(b"-stay_open\nFalse\n")
+                self._proc.stdin.flush()
+                self._proc.wait(timeout=timeout)
+            except (OSError, subprocess.TimeoutExpired):
+                self._proc.kill()
+        for stream in (self._proc.stdin, self._proc.stdout, self._proc.stderr):
+            try:
+                stream.close()
+            except OSError:
+                pass
+        if self._proc.poll() is None:
+            self._proc.kill()
+            self._proc.wait()
+
+
+class ExifToolPool:
+    """
+    Thread-safe pool of up to `size` ExifTool workers, started on demand.
+    A caller borrows an idle worker for one request and returns it.
+    """
+
+    def __init__(
+        self,
+        size: Optional[int] = None,
+        executable: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ) -> None:
+        self.size = max(int(size if size is not None else settings.exiftool_workers), 1)
+        self.executable = executable or settings.exiftool_path
+        self.timeout = timeout if timeout is not None else settings.exiftool_timeout_seconds
+        self._idle: "queue.LifoQueue[ExifToolProcess]" = queue.LifoQueue()
+        self._started = 0
+        self._lock = threading.Lock()
+        self.restarts = 0
+
+    def _acquire(self) -> ExifToolProcess:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._started < self.size:
+                self._started += 1
+                try:
+                    return ExifToolProcess(self.executable)
+                except Exception:
+                    self._started -= 1
+                    raise
+        return self._idle.get()
+
+    def _release(self, worker: ExifToolProcess) -> None:
+        self._idle.put(worker)
+
+    def _discard(self, worker: ExifToolProcess) -> None:
+        worker.close(timeout=0.5)
+        with self._lock:
+            self._started -= 1
+            self.restarts += 1
+
+    def execute(self, args: Sequence[str], timeout: Optional[float] = None) -> tuple[str, str]:
+        """
+        Run one request on an idle worker. A worker found dead before the
+        request is replaced and the request retried once; any other failure
+        (death during the request, timeout, unreadable output) discards the
+        worker and is raised, without retrying the file on another worker.
+        """
+        timeout = timeout if timeout is not None else self.timeout
+        for attempt in range(2):
+            worker = self._acquire()
+            if not worker.alive:
+                self._discard(worker)
+                continue
+            try:
+                result = worker.execute(args, timeout)
+            except _RequestNotSent:
+                self._discard(worker)
+                if attempt == 0:
+                    continue
+                raise
+            except BaseException:
+                # Timed out, died mid-request or left in an unknown state
+                self._discard(worker)
+                raise
+            self._release(worker)
+            return result
+        raise ExifToolError("ExifTool worker could not be started")
+
+    def get_metadata_batch(
+        self, file_paths: Sequence[str], timeout: Optional[float] = None,
+    ) -> list[Optional[dict]]:
+        """
+        Metadata for several files in one invocation, aligned with file_paths;
+        None for files ExifTool could not read.
+        """
+        if not file_paths:
+            return []
+        per_request = (timeout if timeout is not None else self.timeout) * len(file_paths)
+        arguments = [file_argument(path) for path in file_paths]
+        out, _ = self.execute(arguments, timeout=per_request)
+        by_source: dict[str, dict] = {}
+        if out:
+            for entry in json.loads(out):
+                by_source[entry.get("SourceFile")] = entry
+        return [by_source.get(argument) for argument in arguments]
+
+    def get_metadata(self, file_path: str, timeout: Optional[float] = None) -> dict:
+        """Metadata for one file. Raises ExifToolError with ExifTool's message on failure."""
+        out, err = self.execute([file_argument(file_path)], timeout=timeout)
+        if not out:
+            raise ExifToolError(f"ExifTool error: {err or 'no metadata returned'}")
+        return json.loads(out)[0]
+
+    def close(self) -> None:
+        """Stop every idle worker (called on API shutdown)."""
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            worker.close()
+            with self._lock:
+                self._started -= 1
+
+
+# Global pool instance
+exiftool_pool = ExifToolPool()
@@ -0,0 +1,459 @@
+"""
+Single-decode preprocessing stage shared by every analyzer.
+
+Registering a master used to open the same file four times (Pillow metadata,
+CLIP, GeoCLIP, Places365), each with a full-resolution RGB conversion. This
+module decodes a file once, captures what the technical extractor needs
+(dimensions, mode, EXIF) and keeps a bounded-size RGB working copy that the
+vision analyzers preprocess from.
+
+DecodedImageCache keeps the last few decoded files so the four analysis jobs
+queued for one registration share a single decode even though they run as
+separate jobs. Entries are keyed by (path, mtime, size), so a file replaced
+on disk is decoded again.
+
+Decoding is memory-bounded: JPEGs are decoded at reduced scale, pyramidal
+TIFFs from their smallest sufficient page, and TIFFs that would exceed the
+budget in row bands, so a 16-bit 600 dpi scan never has to be materialized
+at full resolution. Uncompressed strips are read row by row; compressed ones
+(LZW, Deflate, PackBits, JPEG) and tiles a strip or tile row at a time, by
+handing libtiff a small in-memory TIFF that holds only those strips.
+
+Configure with ANALYSIS_WORKING_SIZE (longest side of the working copy, px),
+ANALYSIS_DECODE_CACHE_SIZE (number of decoded files kept) and
+ANALYSIS_DECODE_MEMORY_MB (budget per decode).
+"""
+
+import io
+import math
+import os
+import struct
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Iterator, Optional
+
+from app.config.settings import settings
+
+
+@dataclass
+class DecodedImage:
+    """One decoded file: original properties plus a bounded RGB working copy."""
+
+    file_path: str
+    width_px: int
+    height_px: int
+    mode: str
+    image: Any  # PIL.Image.Image in RGB, longest side <= working size
+    exif: dict = field(default_factory=dict)
+    file_size_bytes: Optional[int] = None
+    icc_profile: Optional[bytes] = None  # embedded profile of the original, if any
+
+
+def read_exif(img) -> dict:
+    """Return {tag_id: value} from IFD0 merged with the Exif sub-IFD."""
+    try:
+        exif = img.getexif()
+    except Exception:
+        return {}
+    data = dict(exif)
+    try:
+        data.update(exif.get_ifd(0x8769))
+    except Exception:
+        pass
+    return data
+
+
+ORIENTATION_TAG = 0x0112
+
+
+def apply_orientation(image, orientation: Optional[int]):
+    """Rotate/flip pixels per the EXIF Orientation value (same mapping as ImageOps.exif_transpose)."""
+    from PIL import Image
+
+    method = {
+        2: Image.Transpose.FLIP_LEFT_RIGHT,
+        3: Image.Transpose.ROTATE_180,
+        4: Image.Transpose.FLIP_TOP_BOTTOM,
+        5: Image.Transpose.TRANSPOSE,
+        6: Image.Transpose.ROTATE_270,
+        7: Image.Transpose.TRANSVERSE,
+        8: Image.Transpose.ROTATE_90,
+    }.get(orientation or 1)
+    return image.transpose(method) if method is not None else image
+
+
+# Bytes per pixel of Pillow's in-memory storage (RGB is stored padded to 4).
+_STORAGE_BYTES = {"1": 1, "L": 1, "P": 1, "I;16": 2, "I;16B": 2, "I;16L": 2, "I;16N": 2}
+
+# Bands of at least this many source rows when decoding a TIFF in strips.
+_MIN_BAND_ROWS = 16
+
+
+def estimate_decode_bytes(img) -> int:
+    """
+    Peak bytes needed to materialize img at its current (possibly drafted)
+    size, including the 8-bit copy made for 16-bit grayscale.
+    """
+    per_pixel = _STORAGE_BYTES.get(img.mode, 4)
+    if img.mode.startswith("I;16"):
+        per_pixel += 3  # point() copy (2) + L copy (1)
+    return img.width * img.height * per_pixel
+
+
+def _to_8bit(img):
+    """16-bit grayscale → L by scaling (convert() alone would clip at 255)."""
+    if img.mode.startswith("I;16"):
+        return img.point(lambda v: v / 256).convert("L")
+    return img
+
+
+def _select_reduced_page(img, max_side: int) -> int:
+    """
+    For pyramidal / multi-resolution TIFFs, seek to the smallest page that
+    has the same aspect ratio and is still at least max_side on its longest
+    side. Returns the selected frame index (0 when nothing smaller fits).
+    """
+    frames = getattr(img, "n_frames", 1)
+    if frames <= 1 or img.format != "TIFF":
+        return 0
+    width, height = img.size
+    aspect = width / height
+    best, best_area = 0, width * height
+    for index in range(1, frames):
+        img.seek(index)
+        w, h = img.size
+        if max(w, h) < max_side or abs(w / h - aspect) > 0.01 * aspect:
+            continue
+        if w * h < best_area:
+            best, best_area = index, w * h
+    img.seek(best)
+    return best
+
+
+def _raw_row_bytes(img, tile) -> Optional[int]:
+    """Bytes per source row of an uncompressed TIFF strip, or None if unknown."""
+    _, extents, _, args = tile
+    stride = args[1] if len(args) > 1 else 0
+    if stride:
+        return stride
+    bits = img.tag_v2.get(258) or (8,)
+    samples = img.tag_v2.get(277) or len(bits)
+    bits_per_pixel = sum(bits) if len(bits) == samples else bits[0] * samples
+    return ((extents[2] - extents[0]) * bits_per_pixel + 7) // 8
+
+
+def _can_decode_in_bands(img, budget: int) -> bool:
+    """
+    Chunky TIFF pages can be read in bands: uncompressed top-down strips row
+    by row, compressed strips or tiles one strip / tile row at a time, when
+    such a row fits the budget.
+    """
+    if img.format != "TIFF" or not img.tile:
+        return False
+    if img.tag_v2.get(284, 1) != 1:  # PlanarConfiguration: separate planes
+        return False
+    if all(codec == "raw" and not (len(args) > 2 and args[2] != 1) for codec, _, _, args in img.tile):
+        return True
+    layout = _compressed_layout(img)
+    return layout is not None and layout[0] * img.width * 4 * 2 <= budget
+
+
+# TIFF tags copied into the per-band TIFF handed to libtiff: sample layout,
+# compression and its parameters (Predictor, JPEGTables, YCbCr), tile size.
+_BAND_TAGS = (258, 259, 262, 266, 277, 278, 284, 317, 322, 323, 338, 339, 347, 530)
+_TIFF_FORMATS = {1: "B", 3: "H", 4: "I", 16: "Q"}
+
+
+def _compressed_layout(img) -> Optional[tuple[int, int, tuple, tuple, bool]]:
+    """
+    (rows per strip or tile, units per row of units, offsets, byte counts,
+    tiled) of a compressed TIFF page, or None without those tags.
+    """
+    tags = img.tag_v2
+    if 322 in tags:
+        offsets, counts = tags.get(324), tags.get(325)
+        rows, per_row = tags.get(323), math.ceil(img.width / tags[322])
+    else:
+        offsets, counts = tags.get(273), tags.get(279)
+        rows, per_row = min(tags.get(278, img.height), img.height), 1
+    if not offsets or not counts or not rows or len(offsets) != len(counts):
+        return None
+    if len(offsets) < math.ceil(img.height / rows) * per_row:
+        return None
+    return rows, per_row, tuple(offsets), tuple(counts), 322 in tags
+
+
+def _band_tiff(tags, width: int, rows: int, chunks: list[bytes], tiled: bool) -> bytes:
+    """A little-endian TIFF of width x rows made of the given compressed strips/tiles."""
+    offset_tag, count_tag = (324, 325) if tiled else (273, 279)
+    entries = {256: (4, (width,)), 257: (4, (rows,))}
+    for tag in _BAND_TAGS:
+        if tag in tags:
+            value = tags[tag]
+            if isinstance(value, bytes):
+                entries[tag] = (7, value)
+            else:
+                kind = tags.tagtype.get(tag, 4)
+                entries[tag] = (kind if kind in _TIFF_FORMATS else 4, value if isinstance(value, tuple) else (value,))
+    entries[count_tag] = (4, tuple(len(chunk) for chunk in chunks))
+    entries[offset_tag] = (4, (0,) * len(chunks))
+
+    def packed(kind, value) -> bytes:
+        if isinstance(value, bytes):
+            return value
+        return struct.pack(f"<{len(value)}{_TIFF_FORMATS[kind]}", *value)
+
+    # Header, then the IFD, then values longer than 4 bytes, then the data
+    ifd_end = 8 + 2 + 12 * len(entries) + 4
+    sizes = [len(packed(*entry)) for entry in entries.values()]
+    position = ifd_end + sum(size + (size & 1) for size in sizes if size > 4)
+    offsets = []
+    for chunk in chunks:
+        offsets.append(position)
+        position += len(chunk)
+    entries[offset_tag] = (4, tuple(offsets))
+
+    ifd, extra, extra_at = [struct.pack("<2sHIH", b"II", 42, 8, len(entries))], [], ifd_end
+    for tag in sorted(entries):
+        kind, value = entries[tag]
+        raw = packed(kind, value)
+        if len(raw) <= 4:
+            ifd.append(struct.pack("<HHI", tag, kind, len(value)) + raw.ljust(4, b"\0"))
+        else:
+            ifd.append(struct.pack("<HHII", tag, kind, len(value), extra_at))
+            raw += b"\0" * (len(raw) & 1)
+            extra.append(raw)
+            extra_at += len(raw)
+    ifd.append(b"\0\0\0\0")
+    return b"".join(ifd + extra + chunks)
+
+
+def _iter_compressed_bands(file_path: str, img, band_rows: int) -> Iterator[tuple[int, Any]]:
+    """
+    Yield (top, band) for a compressed TIFF page, decoding only the strips
+    or tile rows that cover band_rows source rows at a time.
+    """
+    from PIL import Image
+
+    width, height = img.size
+    unit_rows, per_row, offsets, counts, tiled = _compressed_layout(img)
+    with open(file_path, "rb") as fh:
+        for top in range(0, height, band_rows):
+            bottom = min(top + band_rows, height)
+            first, last = top // unit_rows, math.ceil(bottom / unit_rows)
+            chunks = []
+            for unit in range(first * per_row, last * per_row):
+                fh.seek(offsets[unit])
+                chunks.append(fh.read(counts[unit]))
+            rows = min(last * unit_rows, height) - first * unit_rows
+            with Image.open(io.BytesIO(_band_tiff(img.tag_v2, width, rows, chunks, tiled))) as band:
+                band.load()
+                skip = top - first * unit_rows
+                if skip or band.height != bottom - top:
+                    band = band.crop((0, skip, width, skip + bottom - top))
+                yield top, band
+
+
+def _iter_tiff_bands(file_path: str, img, frame: int, band_rows: int) -> Iterator[tuple[int, Any]]:
+    """
+    Yield (top, band) for a TIFF page accepted by _can_decode_in_bands,
+    band_rows source rows at a time. Bands keep the page's mode.
+    """
+    if img.tile[0][0] != "raw":
+        yield from _iter_compressed_bands(file_path, img, band_rows)
+        return
+    yield from _iter_raw_bands(file_path, img, frame, band_rows)
+
+
+def _iter_raw_bands(file_path: str, img, frame: int, band_rows: int) -> Iterator[tuple[int, Any]]:
+    """Uncompressed strips: read only the bytes of band_rows source rows at a time."""
+    from PIL import Image
+
+    width, height = img.size
+    strips = [
+        (codec, extents, offset, args, _raw_row_bytes(img, (codec, extents, offset, args)))
+        for codec, extents, offset, args in img.tile
+    ]
+    for top in range(0, height, band_rows):
+        bottom = min(top + band_rows, height)
+        # The part of each strip inside [top, bottom); strip rows are contiguous.
+        tiles = []
+        for codec, (x0, y0, x1, y1), offset, args, row_bytes in strips:
+            start, end = max(y0, top), min(y1, bottom)
+            if start < end:
+                tiles.append((
+                    codec, (x0, start - top, x1, end - top),
+                    offset + (start - y0) * row_bytes, args,
+                ))
+        with Image.open(file_path) as band:
+            band.seek(frame)
+            # TiffImageFile allocates _tile_size, not _size, on load.
+            band._size = band._tile_size = (width, bottom - top)
+            band.tile = tiles
+            band.load()
+            yield top, band
+
+
+def _decode_in_bands(file_path: str, img, frame: int, max_side: int, budget: int):
+    """
+    Decode a TIFF page band by band, downscaling each band before reading
+    the next, so peak memory is one band plus the output.
+    """
+    from PIL import Image
+
+    width, height = img.size
+    scale = min(max_side / width, max_side / height, 1.0)
+    out_w, out_h = max(round(width * scale), 1), max(round(height * scale), 1)
+    band_rows = max(budget // max(width * 4 * 2, 1), _MIN_BAND_ROWS)
+
+    output = Image.new("RGB", (out_w, out_h))
+    for top, band in _iter_tiff_bands(file_path, img, frame, band_rows):
+        bottom = top + band.height
+        out_top, out_bottom = round(top * scale), round(bottom * scale)
+        if out_bottom <= out_top:
+            continue
+        part = _to_8bit(band).resize((out_w, out_bottom - out_top), Image.Resampling.BOX)
+        output.paste(part.convert("RGB"), (0, out_top))
+    return output
+
+
+def iter_full_resolution(
+    file_path: str, band_rows: int, memory_budget: Optional[int] = None,
+) -> Iterator[tuple[int, Any]]:
+    """
+    Yield (top, RGB band) covering the first page of a file at full
+    resolution, top to bottom, band_rows rows per band (the last may be
+    shorter). Files that fit memory_budget are decoded whole and cut into
+    bands; larger TIFFs are read band by band (see _can_decode_in_bands);
+    anything else too large raises MemoryError.
+    """
+    from PIL import Image
+
+    budget = memory_budget or settings.analysis_decode_memory_mb * 1024 * 1024
+    with Image.open(file_path) as img:
+        width, height = img.size
+        if estimate_decode_bytes(img) <= budget:
+            full = _to_8bit(img).convert("RGB")
+            for top in range(0, height, band_rows):
+                yield top, full.crop((0, top, width, min(top + band_rows, height)))
+        elif _can_decode_in_bands(img, budget):
+            for top, band in _iter_tiff_bands(file_path, img, 0, band_rows):
+                yield top, _to_8bit(band).convert("RGB")
+        else:
+            needed = estimate_decode_bytes(img) // (1024 * 1024)
+            raise MemoryError(
+                f"Decoding {os.path.basename(file_path)} at full resolution needs ~{needed} MB, "
+                f"above ANALYSIS_DECODE_MEMORY_MB={budget // (1024 * 1024)}; use a "
+                "TIFF with smaller strips or tiles."
+            )
+
+
+def decode_image(
+    file_path: str, max_side: Optional[int] = None, memory_budget: Optional[int] = None,
+) -> DecodedImage:
+    """
+    Decode a Pillow-readable file once, straight to a working copy whose
+    longest side is at most max_side, within memory_budget bytes.
+
+    - JPEG: draft() makes libjpeg decode at 1/2, 1/4 or 1/8 scale.
+    - Multi-resolution TIFF: the smallest sufficient reduced page is read.
+    - Other TIFF too large for the budget: read in row bands (compressed
+      strips and tiles a strip / tile row at a time).
+    - Anything else too large for the budget raises MemoryError.
+
+    Raises on unreadable files (callers fall back to path-based analysis,
+    e.g. ExifTool for RAW).
+    """
+    from PIL import Image
+
+    max_side = max_side or settings.analysis_working_size
+    budget = memory_budget or settings.analysis_decode_memory_mb * 1024 * 1024
+    with Image.open(file_path) as img:
+        width, height, mode = img.width, img.height, img.mode
+        exif = read_exif(img)
+        icc_profile = img.info.get("icc_profile")
+
+        # Same request thumbnail() makes, issued before estimating memory.
+        img.draft(None, (max_side * 2, max_side * 2))
+        frame = _select_reduced_page(img, max_side)
+
+        if estimate_decode_bytes(img) <= budget:
+            working = _to_8bit(img)
+            # thumbnail() finishes with reduce() + a resampling pass.
+            working.thumbnail((max_side, max_side))
+            working = working.convert("RGB")
+        elif _can_decode_in_bands(img, budget):
+            working = _decode_in_bands(file_path, img, frame, max_side, budget)
+        else:
+            needed = estimate_decode_bytes(img) // (1024 * 1024)
+            raise MemoryError(
+                f"Decoding {os.path.basename(file_path)} needs ~{needed} MB, above "
+                f"ANALYSIS_DECODE_MEMORY_MB={budget // (1024 * 1024)}; use a TIFF "
+                "with smaller strips or tiles, a pyramidal TIFF or a JPEG derivative."
+            )
+
+    return DecodedImage(
+        file_path=file_path,
+        width_px=width,
+        height_px=height,
+        mode=mode,
+        image=working,
+        exif=exif,
+        file_size_bytes=os.path.getsize(file_path),
+        icc_profile=icc_profile,
+    )
+
+
+class DecodedImageCache:
+    """Small thread-safe LRU of DecodedImage, one decode per key at a time."""
+
+    def __init__(self, capacity: Optional[int] = None) -> None:
+        self.capacity = capacity if capacity is not None else settings.analysis_decode_cache_size
+        self._entries: "OrderedDict[tuple, DecodedImage]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks: dict[tuple, threading.Lock] = {}
+
+    @staticmethod
+    def _key(file_path: str) -> Optional[tuple]:
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            return None
+        return (os.path.abspath(file_path), st.st_mtime_ns, st.st_size)
+
+    def get(self, file_path: str) -> Optional[DecodedImage]:
+        """Decoded file, or None when it is missing or not Pillow-readable."""
+        key = self._key(file_path)
+        if key is None:
+            return None
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self._lock:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    return self._entries[key]
+            try:
+                decoded = decode_image(file_path)
+            except Exception:
+                decoded = None
+            with self._lock:
+                self._key_locks.pop(key, None)
+                if decoded is not None and self.capacity > 0:
+                    self._entries[key] = decoded
+                    while len(self._entries) > self.capacity:
+                        self._entries.popitem(last=False)
+            return decoded
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# Global cache instance
+decoded_images = DecodedImageCache()
@@ -0,0 +1,145 @@
+"""
+Per-job resource measurements taken inside the analysis workers.
+
+A registration that feels slow can be I/O, decode or model inference; the
+job row alone (started_at / completed_at) cannot tell them apart. The
+executor wraps each analysis in measure() and returns the numbers with the
+result; job_tracking stores them on AnalysisJobModel, together with the DB
+write time measured by the use case.
+
+  decode_ms          shared decode stage (image_decoding). Near zero when the
+                     file was already decoded for another job of the same
+                     registration; None for path-based analysis (RAW via
+                     ExifTool), where decoding is part of inference_ms.
+  inference_ms       the analyzer call itself.
+  peak_memory_bytes  peak resident set size (RSS) above the starting level,
+                     so Pillow buffers, torch tensors and ONNX arenas count
+                     too. A 10 ms /proc sampler thread per job, so on by
+                     default (ANALYSIS_TRACE_MEMORY=False disables it);
+                     Linux only (/proc), None elsewhere. Exact per job
+                     with ANALYSIS_EXECUTOR=process, where a worker runs one
+                     job at a time; in thread mode RSS is shared by
+                     concurrent jobs, so the value is an upper bound.
+  input_pixels       width x height of the original file.
+  input_bytes        file size on disk.
+"""
+
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Iterator, Optional
+
+from app.config.settings import settings
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+_STATM = "/proc/self/statm"
+# RSS is polled this often while a job runs; getrusage() supplies the exact
+# peak whenever the job pushes the process high-water mark.
+_SAMPLE_SECONDS = 0.01
+
+try:
+    _PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, ValueError, OSError):
+    _PAGE_SIZE = 4096
+
+
+@dataclass
+class AnalysisMetrics:
+    decode_ms: Optional[float] = None
+    inference_ms: Optional[float] = None
+    peak_memory_bytes: Optional[int] = None
+    input_pixels: Optional[int] = None
+    input_bytes: Optional[int] = None
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+def elapsed_ms(started: float) -> float:
+    """Milliseconds since a time.perf_counter() reading."""
+    return round((time.perf_counter() - started) * 1000, 3)
+
+
+@contextmanager
+def timed(metrics: AnalysisMetrics, field: str) -> Iterator[None]:
+    """Store the block's wall time (ms) in metrics.<field>."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        setattr(metrics, field, elapsed_ms(started))
+
+
+def current_rss() -> Optional[int]:
+    """Resident set size of this process in bytes, or None without /proc."""
+    try:
+        with open(_STATM, "rb") as fh:
+            return int(fh.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _max_rss() -> Optional[int]:
+    """Process RSS high-water mark in bytes (getrusage), or None."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class _RssSampler:
+    """Background thread keeping the highest RSS seen until stop()."""
+
+    def __init__(self, baseline: int):
+        self.peak = baseline
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(_SAMPLE_SECONDS):
+            self._sample()
+
+    def _sample(self) -> None:
+        rss = current_rss()
+        if rss is not None and rss > self.peak:
+            self.peak = rss
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> int:
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+        return self.peak
+
+
+@contextmanager
+def rss_peak(metrics: AnalysisMetrics, enabled: Optional[bool] = None) -> Iterator[None]:
+    """Store the block's peak RSS (bytes above its start) in metrics."""
+    if not (settings.analysis_trace_memory if enabled is None else enabled):
+        yield
+        return
+    baseline = current_rss()
+    if baseline is None:
+        yield
+        return
+    start_max = _max_rss()
+    sampler = _RssSampler(baseline)
+    sampler.start()
+    try:
+        yield
+    finally:
+        peak = sampler.stop()
+        end_max = _max_rss()
+        if start_max is not None and end_max is not None and end_max > start_max:
+            # The block raised the process high-water mark: that is its peak.
+            peak = max(peak, end_max)
+        metrics.peak_memory_bytes = max(peak - baseline, 0)
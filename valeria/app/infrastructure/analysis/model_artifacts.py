@@ -0,0 +1,223 @@
+"""
+Versioned local cache of model artifacts (weights, label files).
+
+Every artifact the analyzers need is declared in model_manifest.json with a
+version, a source URL and, once pinned, its sha256. Files live under
+MODEL_ARTIFACTS_DIR (default ~/.cache/roger/models) as
+<name>/<version>/<filename>, so bumping a version never overwrites the
+weights a running process is using.
+
+Weights ("kind": "weights") are converted once to a plain torch state dict
+(weights.mmap.pt next to the download) and loaded with
+torch.load(mmap=True). Loaded into the model with load_state_dict(assign=True),
+the parameters stay backed by the page cache: several uvicorn / executor
+worker processes share one physical copy of the weights instead of each
+holding a private one, and a cold start maps the file instead of reading and
+unpickling it.
+
+  python scripts/fetch_models.py             pre-fetch everything (offline installs)
+  python scripts/fetch_models.py --pin       record the sha256 of unpinned artifacts
+  MODEL_ARTIFACTS_OFFLINE=True               never download at runtime
+
+Downloads are verified against the manifest checksum when it is pinned.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import urllib.request
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from app.config.settings import settings
+
+MANIFEST_PATH = Path(__file__).with_name("model_manifest.json")
+MMAP_FILENAME = "weights.mmap.pt"
+
+_CHUNK = 1 << 20
+
+
+@dataclass(frozen=True)
+class ModelArtifact:
+    name: str
+    version: str
+    kind: str
+    url: str
+    filename: str
+    sha256: Optional[str] = None
+
+
+class ArtifactChecksumError(RuntimeError):
+    pass
+
+
+def load_manifest(path: Path = MANIFEST_PATH) -> dict[str, ModelArtifact]:
+    data = json.loads(path.read_text())
+    return {name: ModelArtifact(name=name, **entry) for name, entry in data.items()}
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_state_dict(path: Path) -> dict:
+    """
+    State dict from a downloaded checkpoint: safetensors or torch, unwrapping
+    {"state_dict": ...} and DataParallel "module." prefixes.
+    """
+    import torch
+
+    if path.suffix == ".safetensors":
+        from safetensors.torch import load_file
+        checkpoint = load_file(str(path), device="cpu")
+    else:
+        checkpoint = torch.load(path, map_location="cpu", weights_only=True)
+    if isinstance(checkpoint, dict) and "state_dict" in checkpoint:
+        checkpoint = checkpoint["state_dict"]
+    return {
+        (key[len("module."):] if key.startswith("module.") else key): tensor
+        for key, tensor in checkpoint.items()
+    }
+
+
+def _atomic_target(path: Path) -> Path:
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".part")
+    os.close(fd)
+    return Path(tmp)
+
+
+class ModelArtifactStore:
+    """Resolves, downloads, verifies and memory-maps manifest artifacts."""
+
+    def __init__(
+        self,
+        root: Optional[Path] = None,
+        manifest_path: Optional[Path] = None,
+        offline: Optional[bool] = None,
+        mmap: Optional[bool] = None,
+    ) -> None:
+        self._root = root
+        self._manifest_path = manifest_path or MANIFEST_PATH
+        self._offline = offline
+        self._mmap = mmap
+        self._manifest: Optional[dict[str, ModelArtifact]] = None
+
+    @property
+    def root(self) -> Path:
+        if self._root is not None:
+            return self._root
+        configured = settings.model_artifacts_dir.strip()
+        return Path(configured).expanduser() if configured else Path.home() / ".cache" / "roger" / "models"
+
+    @property
+    def offline(self) -> bool:
+        return settings.model_artifacts_offline if self._offline is None else self._offline
+
+    @property
+    def mmap(self) -> bool:
+        return settings.model_artifacts_mmap if self._mmap is None else self._mmap
+
+    @property
+    def manifest(self) -> dict[str, ModelArtifact]:
+        if self._manifest is None:
+            self._manifest = load_manifest(self._manifest_path)
+        return self._manifest
+
+    def artifact(self, name: str) -> ModelArtifact:
+        try:
+            return self.manifest[name]
+        except KeyError:
+            raise ValueError(f"Unknown model artifact: {name}") from None
+
+    def path(self, name: str) -> Path:
+        artifact = self.artifact(name)
+        return self.root / artifact.name / artifact.version / artifact.filename
+
+    def fingerprint(self, name: str) -> str:
+        """Identifies the exact artifact (for derived caches such as ONNX exports)."""
+        artifact = self.artifact(name)
+        return f"v{artifact.version}" + (f"-{artifact.sha256[:8]}" if artifact.sha256 else "")
+
+    def fetch(self, name: str) -> Path:
+        """Local path of the artifact, downloading and verifying it if missing."""
+        artifact = self.artifact(name)
+        path = self.path(name)
+        if path.exists():
+            return path
+        if self.offline:
+            raise FileNotFoundError(
+                f"Model artifact {name} v{artifact.version} is not in {self.root} and "
+                f"MODEL_ARTIFACTS_OFFLINE is set. Run: python scripts/fetch_models.py {name}"
+            )
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = _atomic_target(path)
+        digest = hashlib.sha256()
+        try:
+            with urllib.request.urlopen(artifact.url) as response, open(tmp_path, "wb") as out:
+                for chunk in iter(lambda: response.read(_CHUNK), b""):
+                    digest.update(chunk)
+                    out.write(chunk)
+            if artifact.sha256 and digest.hexdigest() != artifact.sha256:
+                raise ArtifactChecksumError(
+                    f"{name}: sha256 {digest.hexdigest()} does not match the manifest ({artifact.sha256})"
+                )
+            os.replace(tmp_path, path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        return path
+
+    def verify(self, name: str) -> Optional[bool]:
+        """True/False against the pinned checksum; None when missing or unpinned."""
+        artifact = self.artifact(name)
+        path = self.path(name)
+        if not path.exists() or not artifact.sha256:
+            return None
+        return file_sha256(path) == artifact.sha256
+
+    def prepare(self, name: str) -> Path:
+        """Fetch a weights artifact and write its mmap-able state dict. Returns its path."""
+        import torch
+
+        mmap_path = self.path(name).with_name(MMAP_FILENAME)
+        if not mmap_path.exists():
+            state_dict = read_state_dict(self.fetch(name))
+            tmp_path = _atomic_target(mmap_path)
+            try:
+                torch.save({k: v.contiguous() for k, v in state_dict.items()}, tmp_path)
+                os.replace(tmp_path, mmap_path)
+            finally:
+                tmp_path.unlink(missing_ok=True)
+        return mmap_path
+
+    def state_dict(self, name: str) -> dict:
+        """
+        The artifact's state dict, memory-mapped from the local cache. Load it
+        with module.load_state_dict(state_dict, assign=True) to keep the
+        parameters file-backed (and shared between processes).
+        """
+        import torch
+
+        return torch.load(
+            self.prepare(name), map_location="cpu", weights_only=True, mmap=self.mmap,
+        )
+
+    def pin(self, name: str) -> str:
+        """Write the local file's sha256 into the manifest; returns it."""
+        artifact = self.artifact(name)
+        checksum = file_sha256(self.fetch(name))
+        data = json.loads(self._manifest_path.read_text())
+        data[artifact.name]["sha256"] = checksum
+        self._manifest_path.write_text(json.dumps(data, indent=2) + "\n")
+        self._manifest = None
+        return checksum
+
+
+# Global artifact store
+model_artifacts = ModelArtifactStore()
@@ -0,0 +1,258 @@
+"""
+Process-wide registry of warm attribute analyzers.
+
+The factory functions in analyzer_factory build a new analyzer on every call,
+which for the real providers means re-reading hundreds of MB of weights
+(open_clip ViT-B-32, GeoCLIP, Places365 ResNet50) per photograph.
+
+The registry builds each configured analyzer once per process and hands the
+same instance to every request. It records load time and the resident memory
+growth observed during the load, and supports explicit unload and reload so
+an administrator can free RAM or pick up a new checkpoint without restarting.
+
+Entries are keyed by attribute slot; the object detector has a slot too
+(OBJECTS). If the .env provider for a slot changes (e.g. ATTR02_ANALYZER=
+stub → clip), the next get() transparently rebuilds it.
+
+Optional warm-up at startup: ANALYZERS_PRELOAD=true in .env.
+"""
+
+import gc
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from app.config.settings import settings
+from app.infrastructure.analysis.base_analyzer import IAttributeAnalyzer
+from app.infrastructure.analysis.analyzer_factory import (
+    create_chronology_analyzer,
+    create_geographic_analyzer,
+    create_environmental_analyzer,
+    create_object_detector,
+)
+
+CHRONOLOGY = "chronology"
+GEOGRAPHIC = "geographic"
+ENVIRONMENTAL = "environmental"
+OBJECTS = "objects"
+
+
+def _rss_bytes() -> Optional[int]:
+    """Current resident set size of this process, or None if unavailable."""
+    try:
+        with open("/proc/self/statm") as fh:
+            pages = int(fh.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+        # ru_maxrss is a high-water mark (KiB on Linux, bytes on macOS),
+        # good enough as a fallback for load-time deltas.
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss if os.uname().sysname == "Darwin" else rss * 1024
+    except Exception:
+        return None
+
+
+@dataclass
+class LoadedAnalyzer:
+    """A warm analyzer instance plus the cost of loading it."""
+
+    attribute: str
+    configured_as: str
+    analyzer: IAttributeAnalyzer
+    load_seconds: float
+    memory_bytes: Optional[int]
+    loaded_at: float
+
+    def describe(self) -> dict:
+        return {
+            "attribute": self.attribute,
+            "configured_as": self.configured_as,
+            "provider": self.analyzer.provider_name,
+            "provider_version": self.analyzer.provider_version,
+            "loaded": True,
+            "load_seconds": round(self.load_seconds, 3),
+            "memory_bytes": self.memory_bytes,
+            "loaded_at": self.loaded_at,
+        }
+
+
+class AnalyzerRegistry:
+    """
+    Thread-safe cache of one analyzer instance per attribute slot.
+
+    Loads are serialized per slot, so concurrent first requests trigger a
+    single model load and the others wait for it instead of loading twice.
+    """
+
+    def __init__(self) -> None:
+        self._builders: dict[str, tuple[Callable[[], str], Callable[[], IAttributeAnalyzer]]] = {
+            CHRONOLOGY: (lambda: settings.attr02_analyzer, create_chronology_analyzer),
+            GEOGRAPHIC: (lambda: settings.attr03_analyzer, create_geographic_analyzer),
+            ENVIRONMENTAL: (lambda: settings.attr04_analyzer, create_environmental_analyzer),
+            OBJECTS: (
+                lambda: "yolo-onnx" if settings.use_local_object_detection else "stub",
+                create_object_detector,
+            ),
+        }
+        self._entries: dict[str, LoadedAnalyzer] = {}
+        self._locks: dict[str, threading.Lock] = {name: threading.Lock() for name in self._builders}
+
+    @property
+    def attributes(self) -> list[str]:
+        return list(self._builders)
+
+    def _check(self, attribute: str) -> None:
+        if attribute not in self._builders:
+            raise KeyError(f"Unknown analyzer attribute: {attribute}")
+
+    def _configured(self, attribute: str) -> str:
+        read_setting, _ = self._builders[attribute]
+        return read_setting().lower().strip()
+
+    def register(
+        self,
+        attribute: str,
+        read_setting: Callable[[], str],
+        builder: Callable[[], IAttributeAnalyzer],
+    ) -> None:
+        """Add (or replace) the builder for an attribute slot."""
+        self._builders[attribute] = (read_setting, builder)
+        self._locks.setdefault(attribute, threading.Lock())
+        self._entries.pop(attribute, None)
+
+    def get(self, attribute: str) -> IAttributeAnalyzer:
+        """Return the warm analyzer for a slot, loading it on first use."""
+        self._check(attribute)
+        configured = self._configured(attribute)
+        entry = self._entries.get(attribute)
+        if entry is not None and entry.configured_as == configured:
+            return entry.analyzer
+
+        with self._locks[attribute]:
+            entry = self._entries.get(attribute)
+            if entry is not None and entry.configured_as == configured:
+                return entry.analyzer
+            return self._load(attribute, configured).analyzer
+
+    def _load(self, attribute: str, configured: str) -> LoadedAnalyzer:
+        """Build the analyzer for a slot. Caller must hold the slot lock."""
+        self._entries.pop(attribute, None)
+        gc.collect()
+
+        _, builder = self._builders[attribute]
+        rss_before = _rss_bytes()
+        started = time.perf_counter()
+        analyzer = builder()
+        # Some providers defer weight loading until first use (Places365);
+        # force it here so the first request does not pay for it.
+        warm = getattr(analyzer, "warm_up", None)
+        if callable(warm):
+            warm()
+        elapsed = time.perf_counter() - started
+        rss_after = _rss_bytes()
+
+        memory = None
+        if rss_before is not None and rss_after is not None:
+            memory = max(rss_after - rss_before, 0)
+
+        entry = LoadedAnalyzer(
+            attribute=attribute,
+            configured_as=configured,
+            analyzer=analyzer,
+            load_seconds=elapsed,
+            memory_bytes=memory,
+            loaded_at=time.time(),
+        )
+        self._entries[attribute] = entry
+        return entry
+
+    def warm_up(self, attributes: Optional[list[str]] = None) -> dict[str, Optional[str]]:
+        """
+        Load every (or the given) slot now. Returns {attribute: error or None};
+        a provider whose optional dependencies are missing does not stop
+        the others from loading.
+        """
+        errors: dict[str, Optional[str]] = {}
+        for attribute in attributes or self.attributes:
+            try:
+                self.get(attribute)
+                errors[attribute] = None
+            except Exception as exc:
+                errors[attribute] = str(exc)
+        return errors
+
+    def reload(self, attribute: str) -> LoadedAnalyzer:
+        """Drop and rebuild a slot, e.g. after replacing a checkpoint on disk."""
+        self._check(attribute)
+        with self._locks[attribute]:
+            return self._load(attribute, self._configured(attribute))
+
+    def unload(self, attribute: str) -> bool:
+        """Release a slot's instance. Returns False if nothing was loaded."""
+        self._check(attribute)
+        with self._locks[attribute]:
+            entry = self._entries.pop(attribute, None)
+        if entry is None:
+            return False
+        del entry
+        gc.collect()
+        try:
+            import torch
+            if torch.cuda.is_available():
+                torch.cuda.empty_cache()
+        except ImportError:
+            pass
+        return True
+
+    def unload_all(self) -> None:
+        for attribute in list(self._entries):
+            self.unload(attribute)
+
+    def stats(self) -> list[dict]:
+        """Describe every slot, loaded or not."""
+        described = []
+        for attribute in self.attributes:
+            entry = self._entries.get(attribute)
+            if entry is not None:
+                described.append(entry.describe())
+            else:
+                described.append({
+                    "attribute": attribute,
+                    "configured_as": self._configured(attribute),
+                    "provider": None,
+                    "provider_version": None,
+                    "loaded": False,
+                    "load_seconds": None,
+                    "memory_bytes": None,
+                    "loaded_at": None,
+                })
+        return described
+
+
+# Global registry instance
+analyzer_registry = AnalyzerRegistry()
+
+
+def get_chronology_analyzer() -> IAttributeAnalyzer:
+    """Warm analyzer for Attribute 02 (Chronological Dating)."""
+    return analyzer_registry.get(CHRONOLOGY)
+
+
+def get_geographic_analyzer() -> IAttributeAnalyzer:
+    """Warm analyzer for Attribute 03 (Geographic Reference)."""
+    return analyzer_registry.get(GEOGRAPHIC)
+
+
+def get_environmental_analyzer() -> IAttributeAnalyzer:
+    """Warm analyzer for Attribute 04 (Environmental & Spatial Context)."""
+    return analyzer_registry.get(ENVIRONMENTAL)
+
+
+def get_object_detector() -> IAttributeAnalyzer:
+    """Warm object detector (see detect_objects)."""
+    return analyzer_registry.get(OBJECTS)
@@ -0,0 +1,114 @@
+"""
+ONNX Runtime backend for the vision analyzers (CPU deployments).
+
+The torch providers run eager fp32 PyTorch. The *-onnx providers export the
+image network once (CLIP ViT-B-32 image tower, Places365 ResNet50) to
+~/.cache/roger/onnx/, optionally apply int8 dynamic quantization, and run
+inference through an onnxruntime InferenceSession with graph optimizations
+enabled. Preprocessing, text embeddings and result mapping stay in the torch
+provider, so the output dict contract is identical.
+
+Dependencies:  pip install onnxruntime onnx (plus the torch provider's deps,
+               needed for the one-time export)
+Activate with: ATTR02_ANALYZER=clip-onnx / ATTR04_ANALYZER=places365-onnx
+
+Configure with ONNX_INTRA_OP_THREADS (0 = onnxruntime default, one per
+physical core) and ONNX_QUANTIZE_INT8.
+"""
+
+import os
+from pathlib import Path
+from typing import Callable
+
+from app.config.settings import settings
+
+_CACHE_DIR = Path.home() / ".cache" / "roger" / "onnx"
+
+INPUT_NAME = "pixel_values"
+OUTPUT_NAME = "output"
+
+
+def require_onnxruntime(provider: str, fallback: str) -> None:
+    """Raise the provider-style ImportError when onnxruntime is missing."""
+    try:
+        import onnxruntime  # noqa: F401
+    except ImportError as exc:
+        raise ImportError(
+            f"{provider} requires: pip install onnxruntime onnx. "
+            f"Or set {fallback} to use the PyTorch backend."
+        ) from exc
+
+
+def backend_suffix() -> str:
+    """Appended to provider_version so cached results never mix backends."""
+    return "+onnx-int8" if settings.onnx_quantize_int8 else "+onnx"
+
+
+def export_model(module, example_input, path: Path) -> None:
+    """Export a torch module with a dynamic batch axis; atomic on success."""
+    import torch
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp.onnx")
+    module.eval()
+    # Not under no_grad(): that enables nn.MultiheadAttention's fused fast
+    # path (aten::_native_multi_head_attention), which has no ONNX export.
+    torch.onnx.export(
+        module,
+        (example_input,),
+        str(tmp_path),
+        input_names=[INPUT_NAME],
+        output_names=[OUTPUT_NAME],
+        dynamic_axes={INPUT_NAME: {0: "batch"}, OUTPUT_NAME: {0: "batch"}},
+        opset_version=17,
+        dynamo=False,
+    )
+    os.replace(tmp_path, path)
+
+
+def quantize_model(src: Path, dst: Path) -> None:
+    """int8 dynamic quantization of weights (activations stay fp32)."""
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    tmp_path = dst.with_suffix(".tmp.onnx")
+    quantize_dynamic(str(src), str(tmp_path), weight_type=QuantType.QInt8)
+    os.replace(tmp_path, dst)
+
+
+def ensure_model(name: str, build: Callable[[], tuple]) -> Path:
+    """
+    Path of the ONNX file for name, exporting (and quantizing) it first when
+    it is not cached yet. build() returns (torch module, example input).
+    """
+    fp32_path = _CACHE_DIR / f"{name}.onnx"
+    if not fp32_path.exists():
+        module, example_input = build()
+        export_model(module, example_input, fp32_path)
+    if not settings.onnx_quantize_int8:
+        return fp32_path
+
+    int8_path = _CACHE_DIR / f"{name}-int8.onnx"
+    if not int8_path.exists():
+        quantize_model(fp32_path, int8_path)
+    return int8_path
+
+
+def create_session(path: Path):
+    """CPU InferenceSession with full graph optimization and bounded threads."""
+    import onnxruntime as ort
+
+    options = ort.SessionOptions()
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+    options.intra_op_num_threads = max(int(settings.onnx_intra_op_threads), 0)
+    options.inter_op_num_threads = 1
+    return ort.InferenceSession(str(path), options, providers=["CPUExecutionProvider"])
+
+
+def run(session, batch):
+    """Run a (N, 3, H, W) float tensor through session; returns a torch tensor."""
+    import numpy as np
+    import torch
+
+    inputs = {INPUT_NAME: np.ascontiguousarray(batch.detach().cpu().numpy(), dtype=np.float32)}
+    return torch.from_numpy(session.run([OUTPUT_NAME], inputs)[0])
@@ -0,0 +1,111 @@
+"""
+Perceptual hashing of photograph files (duplicate and near-duplicate scans).
+
+content_hash only matches identical bytes. A perceptual hash matches the
+same picture across rescans, exports and formats: the image is reduced to
+32x32 grayscale, a 2-D DCT keeps its 8x8 lowest frequencies, and each of
+the 64 bits says whether a coefficient is above their median. Two scans of
+one negative differ in a few bits. Different pictures differ in about 32.
+
+Pillow-readable files are decoded with image_decoding (draft / reduced
+page / row bands), so a large master never materializes at full
+resolution. RAW files (CR3) are hashed from the preview JPEG that ExifTool
+extracts, which is what lets a CR3 match the JPG exported from it. EXIF
+orientation is applied first, so a rotated export still matches.
+
+Hashes are unsigned 64-bit ints; the database stores them as signed
+BIGINT (to_signed64 / from_signed64).
+"""
+
+import base64
+import io
+import json
+from typing import Optional
+
+HASH_BITS = 64
+_HASH_SIZE = 8
+_DCT_SIZE = 32
+_DECODE_SIDE = 256
+_MASK = (1 << HASH_BITS) - 1
+
+_dct_matrix = None
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+def to_signed64(value: int) -> int:
+    return value - (1 << HASH_BITS) if value >= 1 << (HASH_BITS - 1) else value
+
+
+def from_signed64(value: int) -> int:
+    return value & _MASK
+
+
+def _dct():
+    """Orthonormal DCT-II matrix, so the 2-D transform is M @ X @ M.T."""
+    global _dct_matrix
+    if _dct_matrix is None:
+        import numpy as np
+
+        n = np.arange(_DCT_SIZE)
+        matrix = np.cos(np.pi * (2 * n[None, :] + 1) * n[:, None] / (2 * _DCT_SIZE))
+        matrix[0] *= 1 / np.sqrt(2)
+        _dct_matrix = matrix * np.sqrt(2 / _DCT_SIZE)
+    return _dct_matrix
+
+
+def phash_image(img, orientation: Optional[int] = None) -> int:
+    """64-bit DCT hash of a PIL image (any mode or size)."""
+    import numpy as np
+    from PIL import Image
+
+    from app.infrastructure.analysis.image_decoding import apply_orientation
+
+    small = apply_orientation(img, orientation).convert("L").resize((_DCT_SIZE, _DCT_SIZE), Image.Resampling.LANCZOS)
+    pixels = np.asarray(small, dtype=np.float64)
+    matrix = _dct()
+    low = (matrix @ pixels @ matrix.T)[:_HASH_SIZE, :_HASH_SIZE].ravel()
+    bits = low > np.median(low)
+    return int("".join("1" if bit else "0" for bit in bits), 2)
+
+
+def _raw_preview(file_path: str) -> tuple:
+    """(PIL image, orientation) of the preview JPEG embedded in a RAW file."""
+    from PIL import Image
+
+    from app.infrastructure.analysis.exiftool_pool import ExifToolError, exiftool_pool, file_argument
+
+    out, err = exiftool_pool.execute(["-b", "-PreviewImage", "-Orientation", file_argument(file_path)])
+    if not out:
+        raise ExifToolError(f"ExifTool error: {err or 'no metadata returned'}")
+    entry = json.loads(out)[0]
+    preview = entry.get("PreviewImage")
+    if not isinstance(preview, str) or not preview.startswith("base64:"):
+        raise ExifToolError("El archivo no contiene una vista previa embebida.")
+    img = Image.open(io.BytesIO(base64.b64decode(preview[len("base64:"):])))
+    img.draft("RGB", (_DECODE_SIDE * 2, _DECODE_SIDE * 2))
+    return img, entry.get("Orientation")
+
+
+def perceptual_hash_file(file_path: str) -> Optional[int]:
+    """
+    Hash of the picture in file_path, or None when neither Pillow nor the
+    ExifTool preview can read it. Blocking: run it in the analysis executor.
+    """
+    from app.infrastructure.analysis.image_decoding import ORIENTATION_TAG, decode_image
+
+    try:
+        decoded = decode_image(file_path, max_side=_DECODE_SIDE)
+        return phash_image(decoded.image, decoded.exif.get(ORIENTATION_TAG))
+    except MemoryError:
+        return None
+    except Exception:
+        pass
+    try:
+        img, orientation = _raw_preview(file_path)
+        with img:
+            return phash_image(img, orientation)
+    except Exception:
+        return None
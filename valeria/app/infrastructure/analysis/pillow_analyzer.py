@@ -2,12 +2,21 @@
 Pillow-based technical metadata extractor for ROGER.
 Supports JPG and TIFF files. CR3 (raw Canon) is read via ExifTool when available.
 Returns a structured dict; never raises — errors go in the 'error' key.
+
+analyze_decoded() reuses a file already decoded by the shared decode stage
+(dimensions, mode and EXIF are captured there) instead of re-opening it.
+
+RAW files go through the persistent ExifTool worker pool (exiftool_pool);
+analyze_batch() reads every RAW file of a batch in one ExifTool request.
 """
 
 import os
-import subprocess
-import json
-from typing import Any, Optional
+from typing import Any, Optional, Sequence
+
+from app.infrastructure.analysis.exiftool_pool import exiftool_pool
+from app.infrastructure.analysis.image_decoding import DecodedImage, read_exif
+
+_RAW_EXTENSIONS = (".cr3", ".cr2", ".nef", ".arw", ".raf")
 
 
 # EXIF tag IDs we care about
@@ -24,7 +33,9 @@ _EXIF_TAGS = {
 }
 
 PROVIDER_NAME = "pillow"
-PROVIDER_VERSION = "12"
+# Bump whenever the output for the same file changes: the result cache and
+# staleness detection key on it. 13: shared decode and getexif() for TIFFs.
+PROVIDER_VERSION = "13"
 
 
 def _fraction_to_str(value: Any) -> Optional[str]:
@@ -54,15 +65,14 @@ def _safe_str(value: Any) -> Optional[str]:
         return None
 
 
-def analyze_with_pillow(file_path: str) -> dict:
-    """Extract metadata from JPG/TIFF using Pillow."""
-    from PIL import Image
+def _metadata_from_exif(width: int, height: int, mode: str, raw_exif: dict) -> dict:
+    """Build the technical metadata dict from dimensions, mode and raw EXIF tags."""
     from PIL.ExifTags import TAGS
 
     result: dict = {
-        "width_px": None,
-        "height_px": None,
-        "color_mode_raw": None,
+        "width_px": width,
+        "height_px": height,
+        "color_mode_raw": mode,
         "manufacturer": None,
         "camera_model": None,
         "exposure": None,
@@ -73,52 +83,51 @@ def analyze_with_pillow(file_path: str) -> dict:
         "raw_exif": {},
     }
 
-    with Image.open(file_path) as img:
-        result["width_px"] = img.width
-        result["height_px"] = img.height
-        result["color_mode_raw"] = img.mode
-
-        raw_exif = img._getexif() or {}
-        # Build a human-readable dict of all tags
-        readable: dict = {}
-        for tag_id, val in raw_exif.items():
-            tag_name = TAGS.get(tag_id, str(tag_id))
-            try:
-                readable[tag_name] = _safe_str(val)
-            except Exception:
-                pass
-
-        result["raw_exif"] = readable
-        result["manufacturer"] = _safe_str(raw_exif.get(271))
-        result["camera_model"] = _safe_str(raw_exif.get(272))
-        result["exposure"] = _fraction_to_str(raw_exif.get(33434))
-        result["diaphragm_aperture"] = _fraction_to_str(raw_exif.get(33437))
-        iso = raw_exif.get(34855)
-        result["iso_sensitivity"] = _safe_str(iso)
-        focal = raw_exif.get(37386)
-        result["lens_optical"] = _fraction_to_str(focal)
-        lens_model = raw_exif.get(42036)
-        if lens_model:
-            existing = result["lens_optical"] or ""
-            result["lens_optical"] = f"{existing} {lens_model}".strip()
-        result["analyzed_at_exif"] = _safe_str(raw_exif.get(36867) or raw_exif.get(306))
+    # Build a human-readable dict of all tags
+    readable: dict = {}
+    for tag_id, val in raw_exif.items():
+        tag_name = TAGS.get(tag_id, str(tag_id))
+        try:
+            readable[tag_name] = _safe_str(val)
+        except Exception:
+            pass
+
+    result["raw_exif"] = readable
+    result["manufacturer"] = _safe_str(raw_exif.get(271))
+    result["camera_model"] = _safe_str(raw_exif.get(272))
+    result["exposure"] = _fraction_to_str(raw_exif.get(33434))
+    result["diaphragm_aperture"] = _fraction_to_str(raw_exif.get(33437))
+    iso = raw_exif.get(34855)
+    result["iso_sensitivity"] = _safe_str(iso)
+    focal = raw_exif.get(37386)
+    result["lens_optical"] = _fraction_to_str(focal)
+    lens_model = raw_exif.get(42036)
+    if lens_model:
+        existing = result["lens_optical"] or ""
+        result["lens_optical"] = f"{existing} {lens_model}".strip()
+    result["analyzed_at_exif"] = _safe_str(raw_exif.get(36867) or raw_exif.get(306))
 
     return result
 
 
+def analyze_with_pillow(file_path: str) -> dict:
+    """Extract metadata from JPG/TIFF using Pillow."""
+    from PIL import Image
+
+    with Image.open(file_path) as img:
+        return _metadata_from_exif(img.width, img.height, img.mode, read_exif(img))
+
+
 def analyze_with_exiftool(file_path: str) -> dict:
     """
-    Extract metadata from any file (including CR3) via ExifTool CLI.
-    Requires ExifTool to be installed and on PATH.
+    Extract metadata from any file (including CR3) via the ExifTool pool.
+    Requires ExifTool to be installed (EXIFTOOL_PATH, default: on PATH).
     """
-    proc = subprocess.run(
-        ["exiftool", "-j", "-n", file_path],
-        capture_output=True, text=True, timeout=30,
-    )
-    if proc.returncode != 0:
-        raise RuntimeError(f"ExifTool error: {proc.stderr.strip()}")
+    return _metadata_from_exiftool(exiftool_pool.get_metadata(file_path))
+
 
-    data = json.loads(proc.stdout)[0]
+def _metadata_from_exiftool(data: dict) -> dict:
+    """Map one ExifTool JSON object (-j -n) to the technical metadata dict."""
 
     def _get(*keys: str) -> Optional[str]:
         for k in keys:
@@ -154,7 +163,7 @@ def analyze(file_path: str) -> dict:
     try:
         if ext in (".jpg", ".jpeg", ".tif", ".tiff"):
             data = analyze_with_pillow(file_path)
-        elif ext in (".cr3", ".cr2", ".nef", ".arw", ".raf"):
+        elif ext in _RAW_EXTENSIONS:
             # Raw formats require ExifTool
             data = analyze_with_exiftool(file_path)
         else:
@@ -181,3 +190,49 @@ def analyze(file_path: str) -> dict:
             "provider": PROVIDER_NAME,
             "provider_version": PROVIDER_VERSION,
         }
+
+
+def analyze_decoded(image: DecodedImage) -> dict:
+    """Same contract as analyze(), for a file already decoded by image_decoding."""
+    try:
+        data = _metadata_from_exif(image.width_px, image.height_px, image.mode, image.exif)
+        data["error"] = None
+        data["provider"] = PROVIDER_NAME
+        data["provider_version"] = PROVIDER_VERSION
+        return data
+    except Exception as exc:
+        return {
+            "error": str(exc),
+            "provider": PROVIDER_NAME,
+            "provider_version": PROVIDER_VERSION,
+        }
+
+
+def analyze_batch(file_paths: Sequence[str]) -> list[dict]:
+    """
+    analyze() for several files, one result per path in order. RAW files are
+    read together in a single ExifTool request instead of one per file.
+    """
+    results: list[Optional[dict]] = [None] * len(file_paths)
+    raw = [
+        (i, path) for i, path in enumerate(file_paths)
+        if os.path.splitext(path)[1].lower() in _RAW_EXTENSIONS and os.path.exists(path)
+    ]
+    if raw:
+        try:
+            entries = exiftool_pool.get_metadata_batch([path for _, path in raw])
+        except Exception:
+            # Fall back to per-file requests so one bad file names its own error.
+            entries = [None] * len(raw)
+        for (i, _), entry in zip(raw, entries):
+            if entry is not None:
+                data = _metadata_from_exiftool(entry)
+                data["error"] = None
+                data["provider"] = PROVIDER_NAME
+                data["provider_version"] = PROVIDER_VERSION
+                results[i] = data
+
+    return [
+        result if result is not None else analyze(path)
+        for path, result in zip(file_paths, results)
+    ]
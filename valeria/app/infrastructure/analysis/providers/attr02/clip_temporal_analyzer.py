@@ -7,14 +7,50 @@ was taken by comparing the image against a set of decade-labelled text prompts.
 Dependencies:  pip install open-clip-torch torch Pillow
 Activate with: ATTR02_ANALYZER=clip  in .env
 
-First run downloads ~350 MB of CLIP weights to the torch cache.
+The ~350 MB of CLIP weights come from the model artifact cache (see
+model_artifacts; pre-fetch with scripts/fetch_models.py) and are
+memory-mapped, so worker processes share one copy.
+
+analyze_batch() / analyze_images() stack up to ANALYSIS_BATCH_SIZE preprocessed
+images and run a single encode_image pass; analyze() is a batch of one.
+Images are preprocessed from the shared decode stage's working copy.
+
+The decade prompts never change, so their text embeddings are encoded once
+per model load, L2-normalized, and persisted to ~/.cache/roger/clip/ keyed by
+model name and a hash of the prompt set. Each decade may use several prompt
+templates (a prompt ensemble); their embeddings are averaged. Inference is
+then one image encode plus one matrix product against the cached matrix.
+
+Each result also carries the normalized image embedding (image_embedding,
+base64 float16, see embedding_index) so the chronology use case can keep
+it for visual similarity search instead of discarding it. encode_texts()
+maps search queries into the same space (text-to-image search).
 """
 
+import hashlib
+import json
 import os
-from app.infrastructure.analysis.base_analyzer import IAttributeAnalyzer
+from pathlib import Path
+from typing import Optional, Sequence
+
+from app.infrastructure.analysis.base_analyzer import IAttributeAnalyzer, chunked
+from app.infrastructure.analysis.embedding_index import encode_embedding
+from app.infrastructure.analysis.image_decoding import DecodedImage
+from app.infrastructure.analysis.model_artifacts import model_artifacts
 
 PROVIDER_NAME = "clip_temporal"
-PROVIDER_VERSION = "open_clip/ViT-B-32"
+PROVIDER_VERSION = "open_clip/ViT-B-32/2"
+
+_MODEL_NAME = "ViT-B-32"
+_PRETRAINED = "openai"
+_CACHE_DIR = Path.home() / ".cache" / "roger" / "clip"
+# Embedding space of image_embedding (same for the torch and ONNX image towers)
+EMBEDDING_MODEL = f"open_clip/{_MODEL_NAME}/{_PRETRAINED}"
+
+# Prompt templates per decade; embeddings of all templates are averaged.
+_TEMPLATES: list[str] = [
+    "a historical photograph taken in the {}",
+]
 
 # (date_from ISO, date_to ISO, display label)
 _DECADES: list[tuple[str, str, str]] = [
@@ -36,9 +72,17 @@ _DECADES: list[tuple[str, str, str]] = [
 ]
 
 
+def weights_artifact() -> Optional[str]:
+    """model_artifacts name of the _PRETRAINED weights (None: random init)."""
+    if _PRETRAINED is None:
+        return None
+    return f"clip-{_MODEL_NAME}-{_PRETRAINED}".lower()
+
+
 class CLIPTemporalAnalyzer(IAttributeAnalyzer):
     provider_name = PROVIDER_NAME
     provider_version = PROVIDER_VERSION
+    embedding_model = EMBEDDING_MODEL
 
     def __init__(self) -> None:
         try:
@@ -54,62 +98,167 @@ class CLIPTemporalAnalyzer(IAttributeAnalyzer):
         import torch
 
         self._torch = torch
-        self._model, _, self._preprocess = open_clip.create_model_and_transforms(
-            "ViT-B-32", pretrained="openai"
-        )
-        self._tokenizer = open_clip.get_tokenizer("ViT-B-32")
+        self._model, self._preprocess = self._create_model(open_clip)
+        self._tokenizer = open_clip.get_tokenizer(_MODEL_NAME)
         self._model.eval()
+        self._logit_scale = float(self._model.logit_scale.detach().exp())
+        self._txt_features = self._load_text_features()
 
-    def analyze(self, file_path: str) -> dict:
-        if not os.path.exists(file_path):
-            return {
-                "error": f"File not found: {file_path}",
-                "provider": self.provider_name,
-                "provider_version": self.provider_version,
-            }
+    @staticmethod
+    def _create_model(open_clip):
+        """
+        Model and preprocessing for _PRETRAINED with weights mmap'd from the
+        artifact cache. The architecture and preprocessing options open_clip
+        would derive from the pretrained tag (QuickGELU, mean/std, resize)
+        are applied explicitly, since the weights no longer come from the tag.
+        """
+        if _PRETRAINED is None:
+            model, _, preprocess = open_clip.create_model_and_transforms(_MODEL_NAME, pretrained=None)
+            return model, preprocess
+
+        cfg = open_clip.get_pretrained_cfg(_MODEL_NAME, _PRETRAINED)
+        model, _, preprocess = open_clip.create_model_and_transforms(
+            _MODEL_NAME,
+            pretrained=None,
+            force_quick_gelu=cfg.get("quick_gelu", False),
+            image_mean=cfg.get("mean"),
+            image_std=cfg.get("std"),
+            image_interpolation=cfg.get("interpolation"),
+            image_resize_mode=cfg.get("resize_mode"),
+        )
+        model.load_state_dict(model_artifacts.state_dict(weights_artifact()), assign=True)
+        return model, preprocess
+
+    @staticmethod
+    def prompt_set_hash() -> str:
+        """Stable hash of everything that determines the text embeddings."""
+        payload = json.dumps(
+            {
+                "model": _MODEL_NAME,
+                "pretrained": _PRETRAINED,
+                "templates": _TEMPLATES,
+                "labels": [label for _, _, label in _DECADES],
+            },
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+    def _load_text_features(self):
+        """Return the (n_decades, dim) normalized text matrix, from disk when cached."""
+        cache_path = _CACHE_DIR / f"text_{_MODEL_NAME}_{_PRETRAINED}_{self.prompt_set_hash()}.pt"
+        if cache_path.exists():
+            try:
+                return self._torch.load(cache_path, map_location="cpu", weights_only=True)
+            except Exception:
+                pass  # corrupt or incompatible cache — recompute below
+
+        features = self._encode_prompts()
         try:
-            from PIL import Image
-            import torch.nn.functional as F
+            _CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            tmp_path = cache_path.with_suffix(".tmp")
+            self._torch.save(features, tmp_path)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            pass  # read-only home: keep the in-memory copy only
+        return features
 
-            image = self._preprocess(Image.open(file_path).convert("RGB")).unsqueeze(0)
-            prompts = [
-                f"a historical photograph taken in the {label}"
-                for _, _, label in _DECADES
-            ]
-            text_tokens = self._tokenizer(prompts)
+    def _encode_prompts(self):
+        prompts = [
+            template.format(label)
+            for _, _, label in _DECADES
+            for template in _TEMPLATES
+        ]
+        with self._torch.no_grad():
+            features = self._model.encode_text(self._tokenizer(prompts)).float()
+            features = features / features.norm(dim=-1, keepdim=True)
+            features = features.reshape(len(_DECADES), len(_TEMPLATES), -1).mean(dim=1)
+            features = features / features.norm(dim=-1, keepdim=True)
+        return features.contiguous()
 
-            with self._torch.no_grad():
-                img_features = self._model.encode_image(image)
-                txt_features = self._model.encode_text(text_tokens)
-                logits = (img_features @ txt_features.T).squeeze(0)
-                probs = F.softmax(logits, dim=0).tolist()
-
-            best_idx = int(max(range(len(probs)), key=lambda i: probs[i]))
-            confidence = float(probs[best_idx])
-            date_from, date_to, label = _DECADES[best_idx]
-
-            raw = {lbl: round(p, 4) for (_, _, lbl), p in zip(_DECADES, probs)}
-
-            return {
-                "date_type": "range",
-                "precise_date": None,
-                "date_from": date_from,
-                "date_to": date_to,
-                "date_hypothesis": (
-                    f"Estimated decade: {label} (confidence {confidence:.0%})"
-                ),
-                "methodology": "CLIP zero-shot decade classification via open_clip ViT-B/32",
-                "visual_evidence_notes": None,
-                "confidence": round(confidence, 4),
-                "raw_output": raw,
-                "error": None,
-                "provider": self.provider_name,
-                "provider_version": self.provider_version,
-            }
+    def encode_texts(self, texts: Sequence[str]):
+        """(N, dim) L2-normalized float32 text embeddings, comparable with image_embedding."""
+        with self._torch.no_grad():
+            features = self._model.encode_text(self._tokenizer(list(texts))).float()
+            features = features / features.norm(dim=-1, keepdim=True)
+        return features.cpu().numpy()
+
+    def analyze(self, file_path: str) -> dict:
+        return self.analyze_batch([file_path], batch_size=1)[0]
+
+    def analyze_image(self, image: DecodedImage) -> dict:
+        return self.analyze_images([image], batch_size=1)[0]
+
+    def analyze_batch(
+        self, file_paths: Sequence[str], batch_size: Optional[int] = None,
+    ) -> list[dict]:
+        results: list[Optional[dict]] = [None] * len(file_paths)
+        for chunk in chunked(list(enumerate(file_paths)), self.resolve_batch_size(batch_size)):
+            self._infer(self.decode_paths(chunk, results), results)
+        return results  # type: ignore[return-value]
+
+    def analyze_images(
+        self, images: Sequence[DecodedImage], batch_size: Optional[int] = None,
+    ) -> list[dict]:
+        results: list[Optional[dict]] = [None] * len(images)
+        for chunk in chunked(list(enumerate(images)), self.resolve_batch_size(batch_size)):
+            self._infer([(i, decoded.image) for i, decoded in chunk], results)
+        return results  # type: ignore[return-value]
+
+    def _infer(self, items, results: list) -> None:
+        """Preprocess (index, RGB image) pairs, run one encode_image pass, fill results."""
+        import torch.nn.functional as F
 
+        tensors, indices = [], []
+        for i, image in items:
+            try:
+                tensors.append(self._preprocess(image))
+                indices.append(i)
+            except Exception as exc:
+                results[i] = self.error_result(str(exc))
+        if not tensors:
+            return
+
+        try:
+            with self._torch.no_grad():
+                img_features = self._encode_images(self._torch.stack(tensors)).float()
+                img_features = img_features / img_features.norm(dim=-1, keepdim=True)
+                logits = self._logit_scale * (img_features @ self._txt_features.T)
+                probs = F.softmax(logits, dim=1).tolist()
+                embeddings = img_features.cpu().numpy()
         except Exception as exc:
-            return {
-                "error": str(exc),
-                "provider": self.provider_name,
-                "provider_version": self.provider_version,
-            }
+            for i in indices:
+                results[i] = self.error_result(str(exc))
+            return
+
+        for i, row, embedding in zip(indices, probs, embeddings):
+            results[i] = self._to_result(row)
+            results[i]["image_embedding"] = encode_embedding(embedding)
+            results[i]["embedding_model"] = EMBEDDING_MODEL
+
+    def _encode_images(self, batch):
+        """(N, 3, 224, 224) preprocessed batch → (N, dim) unnormalized image features."""
+        return self._model.encode_image(batch)
+
+    def _to_result(self, probs: list[float]) -> dict:
+        best_idx = int(max(range(len(probs)), key=lambda i: probs[i]))
+        confidence = float(probs[best_idx])
+        date_from, date_to, label = _DECADES[best_idx]
+
+        raw = {lbl: round(p, 4) for (_, _, lbl), p in zip(_DECADES, probs)}
+
+        return {
+            "date_type": "range",
+            "precise_date": None,
+            "date_from": date_from,
+            "date_to": date_to,
+            "date_hypothesis": (
+                f"Estimated decade: {label} (confidence {confidence:.0%})"
+            ),
+            "methodology": "CLIP zero-shot decade classification via open_clip ViT-B/32",
+            "visual_evidence_notes": None,
+            "confidence": round(confidence, 4),
+            "raw_output": raw,
+            "error": None,
+            "provider": self.provider_name,
+            "provider_version": self.provider_version,
+        }
@@ -0,0 +1,44 @@
+"""
+ONNX Runtime variant of the CLIP temporal analyzer for Attribute 02.
+
+Same prompts, text embeddings and output dict as CLIPTemporalAnalyzer; only
+the image tower runs through onnxruntime (see onnx_backend). The open_clip
+model is still loaded to encode the decade prompts and to export the image
+tower the first time; its torch image tower is released afterwards. The
+export is redone when the weights artifact changes version or checksum.
+
+Dependencies:  pip install onnxruntime onnx open-clip-torch torch Pillow
+Activate with: ATTR02_ANALYZER=clip-onnx  in .env
+"""
+
+from app.infrastructure.analysis import onnx_backend
+from app.infrastructure.analysis.model_artifacts import model_artifacts
+from app.infrastructure.analysis.providers.attr02 import clip_temporal_analyzer as clip
+from app.infrastructure.analysis.providers.attr02.clip_temporal_analyzer import (
+    CLIPTemporalAnalyzer,
+)
+
+
+class CLIPTemporalOnnxAnalyzer(CLIPTemporalAnalyzer):
+
+    def __init__(self) -> None:
+        onnx_backend.require_onnxruntime("CLIPTemporalOnnxAnalyzer", "ATTR02_ANALYZER=clip")
+        super().__init__()
+        self.provider_version = clip.PROVIDER_VERSION + onnx_backend.backend_suffix()
+        path = onnx_backend.ensure_model(self._onnx_name(), self._export_target)
+        self._session = onnx_backend.create_session(path)
+        # The torch image tower (~350 MB fp32) is not used after export.
+        self._model.visual = self._torch.nn.Identity()
+
+    def _onnx_name(self) -> str:
+        name = f"clip_visual_{clip._MODEL_NAME}_{clip._PRETRAINED}"
+        artifact = clip.weights_artifact()
+        return f"{name}_{model_artifacts.fingerprint(artifact)}" if artifact else name
+
+    def _export_target(self):
+        size = self._model.visual.image_size
+        size = size if isinstance(size, tuple) else (size, size)
+        return self._model.visual, self._torch.zeros(1, 3, *size)
+
+    def _encode_images(self, batch):
+        return onnx_backend.run(self._session, batch)
@@ -8,10 +8,23 @@ Dependencies:  pip install geoclip torch
 Activate with: ATTR03_ANALYZER=geoclip  in .env
 
 First run downloads GeoCLIP model weights (~1 GB) to the torch cache.
+
+Inference mirrors GeoCLIP.predict() but runs on the shared decode stage's
+in-memory RGB working copy instead of re-opening the file. GeoCLIP.forward()
+re-encodes the whole GPS gallery on every call; here the candidate gallery
+is restricted once to GEOCLIP_REGION (see region_prior) and its normalized
+location features are computed once at load, so a prediction costs one
+image encoding plus a (1, D) x (D, M) matmul over the regional candidates.
 """
 
 import os
+from app.config.settings import settings
 from app.infrastructure.analysis.base_analyzer import IAttributeAnalyzer
+from app.infrastructure.analysis.image_decoding import DecodedImage, decode_image
+from app.infrastructure.analysis.providers.attr03.region_prior import (
+    region_fingerprint,
+    restrict_gallery,
+)
 
 PROVIDER_NAME = "geoclip"
 PROVIDER_VERSION = "1"
@@ -32,16 +45,59 @@ class GeoCLIPAnalyzer(IAttributeAnalyzer):
 
         from geoclip import GeoCLIP as _GeoCLIP
         self._model = _GeoCLIP()
+        self._load_gallery(settings.geoclip_region)
+
+    def _load_gallery(self, region: str, chunk_size: int = 8192) -> None:
+        """Restrict the GPS gallery to the region and cache its location features."""
+        import torch
+        import torch.nn.functional as F
+
+        model = self._model
+        device = model.logit_scale.device
+        gallery = restrict_gallery(model.gps_gallery.cpu().double().numpy(), region)
+        gps = torch.as_tensor(gallery, dtype=torch.float32, device=device)
+        with torch.no_grad():
+            features = torch.cat([
+                F.normalize(model.location_encoder(gps[i:i + chunk_size]), dim=1)
+                for i in range(0, len(gps), chunk_size)
+            ])
+        self._gallery_gps = gps
+        self._gallery_features = features
+        fingerprint = region_fingerprint(region)
+        self.provider_version = PROVIDER_VERSION + (f"+region-{fingerprint}" if fingerprint else "")
 
     def analyze(self, file_path: str) -> dict:
         if not os.path.exists(file_path):
-            return {
-                "error": f"File not found: {file_path}",
-                "provider": self.provider_name,
-                "provider_version": self.provider_version,
-            }
+            return self.error_result(f"File not found: {file_path}")
         try:
-            top_gps, top_prob = self._model.predict(file_path, top_k=3)
+            image = decode_image(file_path).image
+        except Exception as exc:
+            return self.error_result(str(exc))
+        return self._analyze_rgb(image)
+
+    def analyze_image(self, image: DecodedImage) -> dict:
+        return self._analyze_rgb(image.image)
+
+    def _predict(self, image, top_k: int):
+        """GeoCLIP.predict() on an in-memory RGB image, against the cached gallery features."""
+        import torch
+        import torch.nn.functional as F
+
+        model = self._model
+        with torch.no_grad():
+            tensor = model.image_encoder.preprocess_image(image)
+            tensor = tensor.to(model.logit_scale.device)
+            image_features = F.normalize(model.image_encoder(tensor), dim=1)
+            logits = model.logit_scale.exp() * (image_features @ self._gallery_features.t())
+            probs = logits.softmax(dim=-1)
+            top_pred = torch.topk(probs, min(top_k, probs.shape[1]), dim=1)
+            top_gps = self._gallery_gps.index_select(0, top_pred.indices[0]).cpu()
+            top_prob = top_pred.values[0].cpu()
+        return top_gps, top_prob
+
+    def _analyze_rgb(self, image) -> dict:
+        try:
+            top_gps, top_prob = self._predict(image, top_k=3)
             # top_gps: tensor (3, 2) with rows [lat, lon]
             # top_prob: tensor (3,) with probabilities
 
@@ -75,8 +131,4 @@ class GeoCLIPAnalyzer(IAttributeAnalyzer):
             }
 
         except Exception as exc:
-            return {
-                "error": str(exc),
-                "provider": self.provider_name,
-                "provider_version": self.provider_version,
-            }
+            return self.error_result(str(exc))
@@ -0,0 +1,136 @@
+"""
+Geographic prior for GeoCLIP: restricts the candidate GPS gallery to a region.
+
+GEOCLIP_REGION accepts one of:
+
+  (empty)                        worldwide gallery (GeoCLIP's 100K points)
+  lat_min,lon_min,lat_max,lon_max  bounding box, e.g. -56,-82,-10,-60
+  path/to/region.geojson         Polygon / MultiPolygon (Feature or
+                                 FeatureCollection); holes are honoured
+  path/to/gallery.csv            precomputed gallery subset, LAT,LON columns
+                                 (same format as GeoCLIP's coordinates_100K.csv)
+
+Predictions are then a softmax over the regional candidates only, so the
+prior both removes far-away answers and shrinks the similarity matmul.
+region_fingerprint() goes into provider_version, so results computed under
+different priors are never mixed by the result cache or staleness checks.
+"""
+
+import csv
+import hashlib
+import json
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+
+def parse_bbox(spec: str) -> Optional[tuple[float, float, float, float]]:
+    """(lat_min, lon_min, lat_max, lon_max) when spec is four numbers, else None."""
+    parts = [p.strip() for p in spec.split(",")]
+    if len(parts) != 4:
+        return None
+    try:
+        lat_min, lon_min, lat_max, lon_max = (float(p) for p in parts)
+    except ValueError:
+        return None
+    if lat_min > lat_max or lon_min > lon_max:
+        raise ValueError(f"GEOCLIP_REGION: bounding box inválido: {spec}")
+    return lat_min, lon_min, lat_max, lon_max
+
+
+def load_polygons(path: Path) -> list[list[np.ndarray]]:
+    """GeoJSON polygons as lists of rings, each an (n, 2) array of [lon, lat]."""
+    data = json.loads(path.read_text())
+    geometries = []
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        kind = node.get("type")
+        if kind == "FeatureCollection":
+            stack.extend(node.get("features", []))
+        elif kind == "Feature":
+            stack.append(node.get("geometry") or {})
+        elif kind == "Polygon":
+            geometries.append(node["coordinates"])
+        elif kind == "MultiPolygon":
+            geometries.extend(node["coordinates"])
+    if not geometries:
+        raise ValueError(f"GEOCLIP_REGION: {path} no contiene polígonos")
+    return [[np.asarray(ring, dtype=np.float64)[:, :2] for ring in polygon] for polygon in geometries]
+
+
+def _in_ring(lat: np.ndarray, lon: np.ndarray, ring: np.ndarray) -> np.ndarray:
+    """Even-odd ray casting of many points against one ring."""
+    inside = np.zeros(lat.shape, dtype=bool)
+    x1, y1 = ring[-1]
+    for x2, y2 in ring:
+        crosses = (y1 > lat) != (y2 > lat)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            x_at = x1 + (lat - y1) * (x2 - x1) / (y2 - y1)
+        inside ^= crosses & (lon < x_at)
+        x1, y1 = x2, y2
+    return inside
+
+
+def points_in_polygons(gallery: np.ndarray, polygons: list[list[np.ndarray]]) -> np.ndarray:
+    """Boolean mask of gallery rows ([lat, lon]) inside any polygon."""
+    lat, lon = gallery[:, 0], gallery[:, 1]
+    mask = np.zeros(len(gallery), dtype=bool)
+    for outer, *holes in polygons:
+        inside = _in_ring(lat, lon, outer)
+        for hole in holes:
+            inside &= ~_in_ring(lat, lon, hole)
+        mask |= inside
+    return mask
+
+
+def load_gallery_csv(path: Path) -> np.ndarray:
+    """(n, 2) [lat, lon] rows from a CSV with LAT and LON columns."""
+    with path.open(newline="") as handle:
+        reader = csv.DictReader(handle)
+        columns = {name.strip().lower(): name for name in reader.fieldnames or []}
+        if "lat" not in columns or "lon" not in columns:
+            raise ValueError(f"GEOCLIP_REGION: {path} debe tener columnas LAT y LON")
+        rows = [(float(r[columns["lat"]]), float(r[columns["lon"]])) for r in reader]
+    return np.asarray(rows, dtype=np.float64).reshape(-1, 2)
+
+
+def restrict_gallery(gallery: np.ndarray, spec: str) -> np.ndarray:
+    """The subset of gallery ([lat, lon] rows) allowed by the GEOCLIP_REGION spec."""
+    spec = spec.strip()
+    if not spec:
+        return gallery
+
+    bbox = parse_bbox(spec)
+    if bbox is not None:
+        lat_min, lon_min, lat_max, lon_max = bbox
+        mask = (
+            (gallery[:, 0] >= lat_min) & (gallery[:, 0] <= lat_max)
+            & (gallery[:, 1] >= lon_min) & (gallery[:, 1] <= lon_max)
+        )
+        subset = gallery[mask]
+    else:
+        path = Path(spec).expanduser()
+        if not path.exists():
+            raise ValueError(f"GEOCLIP_REGION: archivo no encontrado: {spec}")
+        if path.suffix.lower() == ".csv":
+            subset = load_gallery_csv(path)
+        else:
+            subset = gallery[points_in_polygons(gallery, load_polygons(path))]
+
+    if len(subset) == 0:
+        raise ValueError(f"GEOCLIP_REGION: la región {spec} no contiene puntos de la galería")
+    return subset
+
+
+def region_fingerprint(spec: str) -> str:
+    """Short stable id of a region spec (file contents included), '' for worldwide."""
+    spec = spec.strip()
+    if not spec:
+        return ""
+    digest = hashlib.sha256(spec.encode())
+    path = Path(spec).expanduser()
+    if parse_bbox(spec) is None and path.is_file():
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:8]
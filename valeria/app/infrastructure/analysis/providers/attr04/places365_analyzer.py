@@ -7,27 +7,26 @@ and map it to the ROGER taxonomy (setting_type, specific_typology, conservation_
 Dependencies:  pip install torch torchvision Pillow
 Activate with: ATTR04_ANALYZER=places365  in .env
 
-Model weights (~100 MB) and category list are downloaded on first use
-to ~/.cache/roger/places365/.
+Model weights (~100 MB) and the category list come from the model artifact
+cache (see model_artifacts; pre-fetch with scripts/fetch_models.py). The
+weights are memory-mapped, so worker processes share one copy.
+
+analyze_batch() / analyze_images() stack up to ANALYSIS_BATCH_SIZE preprocessed
+images into a single ResNet50 forward pass; analyze() is a batch of one.
+Images are preprocessed from the shared decode stage's working copy.
 """
 
-import os
-import urllib.request
-from pathlib import Path
-from typing import Optional
+from typing import Optional, Sequence
 
-from app.infrastructure.analysis.base_analyzer import IAttributeAnalyzer
+from app.infrastructure.analysis.base_analyzer import IAttributeAnalyzer, chunked
+from app.infrastructure.analysis.image_decoding import DecodedImage
+from app.infrastructure.analysis.model_artifacts import model_artifacts
 
 PROVIDER_NAME = "places365"
 PROVIDER_VERSION = "resnet50"
 
-_CACHE_DIR = Path.home() / ".cache" / "roger" / "places365"
-_WEIGHTS_URL = (
-    "http://places2.csail.mit.edu/models_places365/resnet50_places365.pth.tar"
-)
-_CATEGORIES_URL = (
-    "https://raw.githubusercontent.com/csailvision/places365/master/categories_places365.txt"
-)
+WEIGHTS_ARTIFACT = "places365-resnet50"
+CATEGORIES_ARTIFACT = "places365-categories"
 
 # Keywords that identify interior scenes
 _INTERIOR_KW = {
@@ -86,19 +85,17 @@ class Places365Analyzer(IAttributeAnalyzer):
             ) from exc
 
         self._model = None
+        self._transform = None
         self._categories: list[str] = []
 
     def _load(self) -> None:
         """Lazy-load model weights on first use."""
-        import torch
-        import torchvision.models as models
-
-        _CACHE_DIR.mkdir(parents=True, exist_ok=True)
-
-        categories_path = _CACHE_DIR / "categories_places365.txt"
-        if not categories_path.exists():
-            urllib.request.urlretrieve(_CATEGORIES_URL, categories_path)
+        self._load_categories()
+        self._model = self._build_model()
 
+    def _load_categories(self) -> None:
+        """Category labels and preprocessing transform (no weights)."""
+        categories_path = model_artifacts.fetch(CATEGORIES_ARTIFACT)
         with open(categories_path) as fh:
             # Format: "/a/abbey 0" — strip leading path component and index
             self._categories = [
@@ -107,79 +104,125 @@ class Places365Analyzer(IAttributeAnalyzer):
                 if line.strip()
             ]
 
-        weights_path = _CACHE_DIR / "resnet50_places365.pth.tar"
-        if not weights_path.exists():
-            urllib.request.urlretrieve(_WEIGHTS_URL, weights_path)
+        self._transform = self._build_transform()
 
-        arch = models.resnet50(num_classes=365)
-        checkpoint = torch.load(weights_path, map_location="cpu")
-        state_dict = {
-            k.replace("module.", ""): v
-            for k, v in checkpoint["state_dict"].items()
-        }
-        arch.load_state_dict(state_dict)
-        arch.eval()
-        self._model = arch
+    def _build_model(self):
+        """ResNet50 bound to the memory-mapped Places365 weights."""
+        import torch
+        import torchvision.models as models
+
+        # Built on the meta device (no allocation), then bound to the mmap'd tensors
+        with torch.device("meta"):
+            arch = models.resnet50(num_classes=365)
+        arch.load_state_dict(model_artifacts.state_dict(WEIGHTS_ARTIFACT), assign=True)
+        return arch.eval()
+
+    def warm_up(self) -> None:
+        """Load weights now instead of on the first analyze() call."""
+        if self._model is None:
+            self._load()
+
+    def _build_transform(self):
+        import torchvision.transforms as transforms
+
+        return transforms.Compose([
+            transforms.Resize((256, 256)),
+            transforms.CenterCrop(224),
+            transforms.ToTensor(),
+            transforms.Normalize(
+                mean=[0.485, 0.456, 0.406],
+                std=[0.229, 0.224, 0.225],
+            ),
+        ])
 
     def analyze(self, file_path: str) -> dict:
-        if not os.path.exists(file_path):
-            return {
-                "error": f"File not found: {file_path}",
-                "provider": self.provider_name,
-                "provider_version": self.provider_version,
-            }
+        return self.analyze_batch([file_path], batch_size=1)[0]
+
+    def analyze_image(self, image: DecodedImage) -> dict:
+        return self.analyze_images([image], batch_size=1)[0]
+
+    def analyze_batch(
+        self, file_paths: Sequence[str], batch_size: Optional[int] = None,
+    ) -> list[dict]:
+        results: list[Optional[dict]] = [None] * len(file_paths)
+        if not self._ensure_loaded(range(len(file_paths)), results):
+            return results  # type: ignore[return-value]
+        for chunk in chunked(list(enumerate(file_paths)), self.resolve_batch_size(batch_size)):
+            self._infer(self.decode_paths(chunk, results), results)
+        return results  # type: ignore[return-value]
+
+    def analyze_images(
+        self, images: Sequence[DecodedImage], batch_size: Optional[int] = None,
+    ) -> list[dict]:
+        results: list[Optional[dict]] = [None] * len(images)
+        if not self._ensure_loaded(range(len(images)), results):
+            return results  # type: ignore[return-value]
+        for chunk in chunked(list(enumerate(images)), self.resolve_batch_size(batch_size)):
+            self._infer([(i, decoded.image) for i, decoded in chunk], results)
+        return results  # type: ignore[return-value]
+
+    def _ensure_loaded(self, indices, results: list) -> bool:
+        """Load weights if needed; on failure mark every entry as failed."""
         try:
-            if self._model is None:
-                self._load()
-
-            from PIL import Image
-            import torch
-            import torch.nn.functional as F
-            import torchvision.transforms as transforms
-
-            transform = transforms.Compose([
-                transforms.Resize((256, 256)),
-                transforms.CenterCrop(224),
-                transforms.ToTensor(),
-                transforms.Normalize(
-                    mean=[0.485, 0.456, 0.406],
-                    std=[0.229, 0.224, 0.225],
-                ),
-            ])
-
-            tensor = transform(Image.open(file_path).convert("RGB")).unsqueeze(0)
+            self.warm_up()
+            return True
+        except Exception as exc:
+            for i in indices:
+                results[i] = self.error_result(str(exc))
+            return False
 
-            with torch.no_grad():
-                logits = self._model(tensor)
-                probs = F.softmax(logits, dim=1).squeeze(0)
-
-            top5_prob, top5_idx = probs.topk(5)
-            best_category = self._categories[int(top5_idx[0])]
-            confidence = float(top5_prob[0])
-
-            setting_type, specific_typology = _map_category(best_category)
-            conservation_state = _conservation_from_setting(setting_type)
-
-            raw = {
-                self._categories[int(top5_idx[i])]: round(float(top5_prob[i]), 4)
-                for i in range(len(top5_idx))
-            }
-
-            return {
-                "setting_type": setting_type,
-                "specific_typology": specific_typology,
-                "conservation_state": conservation_state,
-                "human_env_relationship": None,
-                "confidence": round(confidence, 4),
-                "raw_output": raw,
-                "error": None,
-                "provider": self.provider_name,
-                "provider_version": self.provider_version,
-            }
+    def _infer(self, items, results: list) -> None:
+        """Preprocess (index, RGB image) pairs, run one forward pass, fill results."""
+        import torch
+        import torch.nn.functional as F
+
+        tensors, indices = [], []
+        for i, image in items:
+            try:
+                tensors.append(self._transform(image))
+                indices.append(i)
+            except Exception as exc:
+                results[i] = self.error_result(str(exc))
+        if not tensors:
+            return
 
+        try:
+            with torch.no_grad():
+                logits = self._forward(torch.stack(tensors))
+                probs = F.softmax(logits, dim=1)
+            top5_prob, top5_idx = probs.topk(5, dim=1)
         except Exception as exc:
-            return {
-                "error": str(exc),
-                "provider": self.provider_name,
-                "provider_version": self.provider_version,
-            }
+            for i in indices:
+                results[i] = self.error_result(str(exc))
+            return
+
+        for row, i in enumerate(indices):
+            results[i] = self._to_result(top5_prob[row], top5_idx[row])
+
+    def _forward(self, batch):
+        """(N, 3, 224, 224) preprocessed batch → (N, 365) logits."""
+        return self._model(batch)
+
+    def _to_result(self, top5_prob, top5_idx) -> dict:
+        best_category = self._categories[int(top5_idx[0])]
+        confidence = float(top5_prob[0])
+
+        setting_type, specific_typology = _map_category(best_category)
+        conservation_state = _conservation_from_setting(setting_type)
+
+        raw = {
+            self._categories[int(top5_idx[i])]: round(float(top5_prob[i]), 4)
+            for i in range(len(top5_idx))
+        }
+
+        return {
+            "setting_type": setting_type,
+            "specific_typology": specific_typology,
+            "conservation_state": conservation_state,
+            "human_env_relationship": None,
+            "confidence": round(confidence, 4),
+            "raw_output": raw,
+            "error": None,
+            "provider": self.provider_name,
+            "provider_version": self.provider_version,
+        }
@@ -0,0 +1,46 @@
+"""
+ONNX Runtime variant of the Places365 analyzer for Attribute 04.
+
+Same preprocessing, categories and output dict as Places365Analyzer; the
+ResNet50 forward pass runs through onnxruntime (see onnx_backend). The torch
+ResNet50 is only built for the one-time export, which is redone when the
+weights artifact changes version or checksum, and is released afterwards.
+
+Dependencies:  pip install onnxruntime onnx torch torchvision Pillow
+Activate with: ATTR04_ANALYZER=places365-onnx  in .env
+"""
+
+from app.infrastructure.analysis import onnx_backend
+from app.infrastructure.analysis.model_artifacts import model_artifacts
+from app.infrastructure.analysis.providers.attr04 import places365_analyzer as places
+from app.infrastructure.analysis.providers.attr04.places365_analyzer import Places365Analyzer
+
+
+class Places365OnnxAnalyzer(Places365Analyzer):
+
+    def __init__(self) -> None:
+        onnx_backend.require_onnxruntime("Places365OnnxAnalyzer", "ATTR04_ANALYZER=places365")
+        super().__init__()
+        self.provider_version = places.PROVIDER_VERSION + onnx_backend.backend_suffix()
+        self._session = None
+
+    def warm_up(self) -> None:
+        if self._session is None:
+            if self._transform is None:
+                self._load_categories()
+            path = onnx_backend.ensure_model(self._onnx_name(), self._export_target)
+            self._session = onnx_backend.create_session(path)
+            # The torch ResNet50 is not used after export.
+            self._model = None
+
+    def _onnx_name(self) -> str:
+        return f"places365_resnet50_{model_artifacts.fingerprint(places.WEIGHTS_ARTIFACT)}"
+
+    def _export_target(self):
+        import torch
+
+        model = self._model if self._model is not None else self._build_model()
+        return model, torch.zeros(1, 3, 224, 224)
+
+    def _forward(self, batch):
+        return onnx_backend.run(self._session, batch)
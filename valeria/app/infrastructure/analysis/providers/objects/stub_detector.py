@@ -0,0 +1,25 @@
+"""
+Stub object detector.
+
+Default when USE_LOCAL_OBJECT_DETECTION=False (or unset). Finds nothing;
+photographs are not queued for detection while it is configured.
+No external dependencies required.
+"""
+
+from app.infrastructure.analysis.base_analyzer import IAttributeAnalyzer
+
+PROVIDER_NAME = "stub"
+PROVIDER_VERSION = "1"
+
+
+class StubObjectDetector(IAttributeAnalyzer):
+    provider_name = PROVIDER_NAME
+    provider_version = PROVIDER_VERSION
+
+    def analyze(self, file_path: str) -> dict:
+        return {
+            "objects": [],
+            "error": None,
+            "provider": self.provider_name,
+            "provider_version": self.provider_version,
+        }
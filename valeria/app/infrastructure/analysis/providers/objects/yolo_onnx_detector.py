@@ -0,0 +1,249 @@
+"""
+YOLO object detector on ONNX Runtime (CPU).
+
+Reads a YOLOv8-style export: input (N, 3, S, S) RGB in [0, 1], output
+(N, 4 + classes, anchors) with boxes as centre/size in input pixels and
+per-class scores (YOLOv8, v9 and 11 share it). Export one with
+ultralytics and point OBJECT_DETECTION_MODEL at it:
+
+    yolo export model=yolov8n.pt format=onnx dynamic=True
+
+Class names come from the export's metadata, falling back to the 80 COCO
+classes. Models exported without dynamic=True have a fixed batch of 1 and
+are run one image at a time.
+
+analyze_images() letterboxes up to ANALYSIS_BATCH_SIZE working copies
+from the shared decode stage into one tensor and runs a single forward
+pass; analyze() is a batch of one. Boxes are returned normalized to the
+image (0-1), so they do not depend on the working-copy resolution.
+
+Dependencies:  pip install onnxruntime Pillow
+Activate with: USE_LOCAL_OBJECT_DETECTION=True  in .env
+"""
+
+import ast
+from pathlib import Path
+from typing import Optional, Sequence
+
+import numpy as np
+
+from app.config.settings import settings
+from app.infrastructure.analysis import onnx_backend
+from app.infrastructure.analysis.base_analyzer import IAttributeAnalyzer, chunked
+from app.infrastructure.analysis.image_decoding import DecodedImage
+
+PROVIDER_NAME = "yolo-onnx"
+
+DEFAULT_MODEL_PATH = Path.home() / ".cache" / "roger" / "onnx" / "yolov8n.onnx"
+
+_DEFAULT_INPUT_SIZE = 640
+_PAD_VALUE = 114
+_IOU_THRESHOLD = 0.45
+_MAX_CANDIDATES = 3000
+_MAX_DETECTIONS = 100
+
+COCO_CLASSES = (
+    "person", "bicycle", "car", "motorcycle", "airplane", "bus", "train", "truck", "boat",
+    "traffic light", "fire hydrant", "stop sign", "parking meter", "bench", "bird", "cat",
+    "dog", "horse", "sheep", "cow", "elephant", "bear", "zebra", "giraffe", "backpack",
+    "umbrella", "handbag", "tie", "suitcase", "frisbee", "skis", "snowboard", "sports ball",
+    "kite", "baseball bat", "baseball glove", "skateboard", "surfboard", "tennis racket",
+    "bottle", "wine glass", "cup", "fork", "knife", "spoon", "bowl", "banana", "apple",
+    "sandwich", "orange", "broccoli", "carrot", "hot dog", "pizza", "donut", "cake", "chair",
+    "couch", "potted plant", "bed", "dining table", "toilet", "tv", "laptop", "mouse",
+    "remote", "keyboard", "cell phone", "microwave", "oven", "toaster", "sink",
+    "refrigerator", "book", "clock", "vase", "scissors", "teddy bear", "hair drier",
+    "toothbrush",
+)
+
+
+def model_path() -> Path:
+    configured = settings.object_detection_model.strip()
+    return Path(configured).expanduser() if configured else DEFAULT_MODEL_PATH
+
+
+def letterbox(image, size: int) -> tuple[np.ndarray, float, int, int]:
+    """
+    Fit an RGB image into a size x size canvas keeping its aspect ratio.
+    Returns (HWC uint8 canvas, scale, pad_x, pad_y).
+    """
+    from PIL import Image
+
+    width, height = image.size
+    scale = min(size / width, size / height)
+    new_w, new_h = min(max(round(width * scale), 1), size), min(max(round(height * scale), 1), size)
+    pad_x, pad_y = (size - new_w) // 2, (size - new_h) // 2
+    canvas = np.full((size, size, 3), _PAD_VALUE, dtype=np.uint8)
+    resized = image.resize((new_w, new_h), Image.Resampling.BILINEAR)
+    canvas[pad_y:pad_y + new_h, pad_x:pad_x + new_w] = np.asarray(resized, dtype=np.uint8)
+    return canvas, scale, pad_x, pad_y
+
+
+def non_max_suppression(boxes: np.ndarray, scores: np.ndarray, iou_threshold: float, limit: int) -> np.ndarray:
+    """Greedy NMS over (n, 4) x0,y0,x1,y1 boxes; indices kept, best first."""
+    areas = np.clip(boxes[:, 2] - boxes[:, 0], 0, None) * np.clip(boxes[:, 3] - boxes[:, 1], 0, None)
+    order = np.argsort(-scores, kind="stable")
+    keep: list[int] = []
+    while order.size and len(keep) < limit:
+        best, rest = order[0], order[1:]
+        keep.append(int(best))
+        width = np.clip(np.minimum(boxes[best, 2], boxes[rest, 2]) - np.maximum(boxes[best, 0], boxes[rest, 0]), 0, None)
+        height = np.clip(np.minimum(boxes[best, 3], boxes[rest, 3]) - np.maximum(boxes[best, 1], boxes[rest, 1]), 0, None)
+        inter = width * height
+        iou = inter / np.maximum(areas[best] + areas[rest] - inter, 1e-9)
+        order = rest[iou <= iou_threshold]
+    return np.asarray(keep, dtype=np.int64)
+
+
+class YoloOnnxDetector(IAttributeAnalyzer):
+    provider_name = PROVIDER_NAME
+
+    def __init__(self, path: Optional[Path] = None, min_score: Optional[float] = None) -> None:
+        try:
+            import onnxruntime  # noqa: F401
+        except ImportError as exc:
+            raise ImportError(
+                "YoloOnnxDetector requires: pip install onnxruntime Pillow. "
+                "Or set USE_LOCAL_OBJECT_DETECTION=False to disable object detection."
+            ) from exc
+
+        self.path = path or model_path()
+        self.provider_version = f"{self.path.stem}+onnx"
+        self.min_score = settings.object_detection_min_score if min_score is None else min_score
+        self._session = None
+        self._input_name = ""
+        self._input_size = _DEFAULT_INPUT_SIZE
+        self._max_batch: Optional[int] = None
+        self.classes: tuple[str, ...] = COCO_CLASSES
+
+    def warm_up(self) -> None:
+        """Open the ONNX session now instead of on the first analyze() call."""
+        if self._session is not None:
+            return
+        if not self.path.exists():
+            raise FileNotFoundError(
+                f"Object detection model not found: {self.path}. Export one with "
+                "'yolo export model=yolov8n.pt format=onnx dynamic=True' and set OBJECT_DETECTION_MODEL."
+            )
+        session = onnx_backend.create_session(self.path)
+        model_input = session.get_inputs()[0]
+        batch, _, height, _ = model_input.shape
+        self._input_name = model_input.name
+        self._input_size = height if isinstance(height, int) else _DEFAULT_INPUT_SIZE
+        self._max_batch = batch if isinstance(batch, int) else None
+        self.classes = self._read_classes(session)
+        self._session = session
+
+    @staticmethod
+    def _read_classes(session) -> tuple[str, ...]:
+        names = session.get_modelmeta().custom_metadata_map.get("names")
+        if not names:
+            return COCO_CLASSES
+        try:
+            parsed = ast.literal_eval(names)
+            return tuple(str(parsed[i]) for i in sorted(parsed))
+        except (ValueError, SyntaxError, TypeError):
+            return COCO_CLASSES
+
+    def resolve_batch_size(self, batch_size: Optional[int] = None) -> int:
+        size = super().resolve_batch_size(batch_size)
+        return min(size, self._max_batch) if self._max_batch else size
+
+    def analyze(self, file_path: str) -> dict:
+        return self.analyze_batch([file_path], batch_size=1)[0]
+
+    def analyze_image(self, image: DecodedImage) -> dict:
+        return self.analyze_images([image], batch_size=1)[0]
+
+    def analyze_batch(
+        self, file_paths: Sequence[str], batch_size: Optional[int] = None,
+    ) -> list[dict]:
+        results: list[Optional[dict]] = [None] * len(file_paths)
+        if not self._ensure_loaded(range(len(file_paths)), results):
+            return results  # type: ignore[return-value]
+        for chunk in chunked(list(enumerate(file_paths)), self.resolve_batch_size(batch_size)):
+            self._infer(self.decode_paths(chunk, results), results)
+        return results  # type: ignore[return-value]
+
+    def analyze_images(
+        self, images: Sequence[DecodedImage], batch_size: Optional[int] = None,
+    ) -> list[dict]:
+        results: list[Optional[dict]] = [None] * len(images)
+        if not self._ensure_loaded(range(len(images)), results):
+            return results  # type: ignore[return-value]
+        for chunk in chunked(list(enumerate(images)), self.resolve_batch_size(batch_size)):
+            self._infer([(i, decoded.image) for i, decoded in chunk], results)
+        return results  # type: ignore[return-value]
+
+    def _ensure_loaded(self, indices, results: list) -> bool:
+        """Open the session if needed; on failure mark every entry as failed."""
+        try:
+            self.warm_up()
+            return True
+        except Exception as exc:
+            for i in indices:
+                results[i] = self.error_result(str(exc))
+            return False
+
+    def _infer(self, items, results: list) -> None:
+        """Letterbox (index, RGB image) pairs, run one forward pass, fill results."""
+        size = self._input_size
+        batch = np.empty((len(items), 3, size, size), dtype=np.float32)
+        frames, indices = [], []
+        for i, image in items:
+            try:
+                canvas, scale, pad_x, pad_y = letterbox(image, size)
+            except Exception as exc:
+                results[i] = self.error_result(str(exc))
+                continue
+            batch[len(indices)] = canvas.transpose(2, 0, 1) / 255.0
+            frames.append((scale, pad_x, pad_y, image.size))
+            indices.append(i)
+        if not indices:
+            return
+
+        try:
+            output = self._session.run(None, {self._input_name: batch[:len(indices)]})[0]
+        except Exception as exc:
+            for i in indices:
+                results[i] = self.error_result(str(exc))
+            return
+
+        for row, i in enumerate(indices):
+            results[i] = self._to_result(output[row], *frames[row])
+
+    def _to_result(self, prediction: np.ndarray, scale: float, pad_x: float, pad_y: float, image_size) -> dict:
+        """(4 + classes, anchors) prediction of one image → result dict."""
+        width, height = image_size
+        scores = prediction[4:]
+        classes = scores.argmax(axis=0)
+        best = scores[classes, np.arange(scores.shape[1])]
+        candidates = np.flatnonzero(best >= self.min_score)
+        candidates = candidates[np.argsort(-best[candidates], kind="stable")[:_MAX_CANDIDATES]]
+
+        cx, cy, w, h = prediction[:4, candidates]
+        boxes = np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=1)
+        boxes = (boxes - [pad_x, pad_y, pad_x, pad_y]) / scale / [width, height, width, height]
+        boxes = np.clip(boxes, 0.0, 1.0)
+        labels, confidences = classes[candidates], best[candidates]
+
+        # Per-class NMS in one pass: classes are shifted apart so they never overlap
+        keep = non_max_suppression(boxes + labels[:, None] * 2.0, confidences, _IOU_THRESHOLD, _MAX_DETECTIONS)
+        objects = [
+            {
+                "label": self._label(int(labels[k])),
+                "score": round(float(confidences[k]), 4),
+                "box": [round(float(v), 5) for v in boxes[k]],
+            }
+            for k in keep
+        ]
+        return {
+            "objects": objects,
+            "input_size": self._input_size,
+            "error": None,
+            "provider": self.provider_name,
+            "provider_version": self.provider_version,
+        }
+
+    def _label(self, index: int) -> str:
+        return self.classes[index] if index < len(self.classes) else f"class_{index}"
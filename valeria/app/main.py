@@ -3,6 +3,7 @@ ROGER - Valeria API
 Main FastAPI application entry point
 """
 
+import asyncio
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.responses import JSONResponse
@@ -13,6 +14,18 @@ from app.config.settings import settings
 from app.infrastructure.database.session import init_db, close_db
 from app.infrastructure.middleware.cors import setup_cors
 from app.infrastructure.cache.redis_cache import cache
+from app.infrastructure.analysis.model_registry import analyzer_registry
+from app.infrastructure.analysis.exiftool_pool import exiftool_pool
+from app.infrastructure.analysis.executor import analysis_executor
+from app.infrastructure.analysis.embedding_hooks import embedding_hooks
+from app.features.analysis.infrastructure.adapters.job_queue import analysis_queue
+from app.features.analysis.infrastructure.adapters.campaign_runner import campaign_runner
+from app.features.archive.infrastructure.adapters.derivative_store import derivative_store
+from app.features.archive.infrastructure.adapters.duplicate_index import duplicate_index
+from app.features.archive.infrastructure.adapters.pyramid_store import pyramid_store
+from app.features.cluster_images.application.clusters import absorb_photograph
+from app.features.cluster_images.infrastructure.adapters.clustering_runner import clustering_runner
+from app.features.detect_objects.infrastructure.adapters.detection_queue import object_detection_queue
 
 # Import routers
 from app.features.authenticate.interfaces.api.routes import router as auth_router
@@ -21,9 +34,12 @@ from app.features.search_filter.interfaces.api.routes import router as search_ro
 from app.features.generate_narrative.interfaces.api.routes import router as narratives_router
 from app.features.manage_projects.interfaces.api.routes import router as projects_router, invitations_router
 from app.features.archive.interfaces.api.routes import router as archive_router
+from app.features.archive.interfaces.api.iiif_routes import router as iiif_router
 from app.features.taxonomy.interfaces.api.routes import router as taxonomy_router
 from app.features.contributions.interfaces.api.routes import router as contributions_router
 from app.features.tagging.interfaces.api.routes import router as tags_router
+from app.features.cluster_images.interfaces.api.routes import router as clusters_router
+from app.features.detect_objects.interfaces.api.routes import router as objects_router
 
 # Setup logging
 logger = structlog.get_logger()
@@ -47,11 +63,54 @@ async def lifespan(app: FastAPI):
         logger.info("Redis cache connected")
     except Exception as e:
         logger.warning("Redis cache connection failed", error=str(e))
+
+    # Warm attribute analyzers (model weights) once, inside the analysis executor
+    if settings.analyzers_preload:
+        errors = await analysis_executor.warm_up()
+        for attribute, error in errors.items():
+            if error:
+                logger.warning("Analyzer preload failed", attribute=attribute, error=error)
+        logger.info("Analyzers loaded", executor=analysis_executor.mode, models=analyzer_registry.stats())
+
+    # Start background analysis workers (recovers unfinished jobs)
+    await analysis_queue.start()
+    logger.info("Analysis queue started", workers=analysis_queue.workers)
+
+    # Resume analysis campaigns interrupted by a previous shutdown or crash
+    await campaign_runner.start()
+
+    # Web derivative, IIIF pyramid and perceptual hash workers (missing ones are also built on demand)
+    await derivative_store.start()
+    await pyramid_store.start()
+    await duplicate_index.start()
+
+    # Resume clustering recomputes interrupted by a previous shutdown or crash;
+    # photographs dated with CLIP join the current clustering as they are embedded
+    await clustering_runner.start()
+    embedding_hooks.subscribe(absorb_photograph)
+
+    # Batched object detection of newly registered masters
+    await object_detection_queue.start()
     
     yield
     
     # Shutdown
     logger.info("Shutting down ROGER - Valeria API")
+
+    # Stop campaigns and analysis workers; both resume on next start
+    await campaign_runner.stop()
+    await analysis_queue.stop()
+    await derivative_store.stop()
+    await pyramid_store.stop()
+    await duplicate_index.stop()
+    await clustering_runner.stop()
+    embedding_hooks.unsubscribe(absorb_photograph)
+    await object_detection_queue.stop()
+
+    # Stop executor workers, then release analyzer models and ExifTool workers
+    await asyncio.to_thread(analysis_executor.shutdown)
+    analyzer_registry.unload_all()
+    exiftool_pool.close()
     
     # Close database connections
     await close_db()
@@ -117,11 +176,15 @@ app.include_router(narratives_router, prefix=settings.api_prefix)
 app.include_router(projects_router, prefix=settings.api_prefix)
 app.include_router(invitations_router, prefix=settings.api_prefix)
 app.include_router(archive_router, prefix=settings.api_prefix)
+app.include_router(iiif_router, prefix=settings.api_prefix)
 app.include_router(taxonomy_router, prefix=settings.api_prefix)
 app.include_router(contributions_router, prefix=settings.api_prefix)
 app.include_router(tags_router, prefix=settings.api_prefix)
+app.include_router(clusters_router, prefix=settings.api_prefix)
+app.include_router(objects_router, prefix=settings.api_prefix)
 
-# Serve static files (images, uploads)
+# Serve static files (images, uploads). Photograph files are not mounted:
+# they go through the permission-checked /archive/files/{id}/download route.
 # app.mount("/storage", StaticFiles(directory="storage"), name="storage")
 
 # Global exception handler
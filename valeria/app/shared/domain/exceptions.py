@@ -9,12 +9,15 @@ class DomainException(Exception):
 
 
 class EntityNotFoundError(DomainException):
-    """Raised when an entity is not found."""
+    """Raised when an entity is not found (type and id, or a ready-made message)."""
     
-    def __init__(self, entity_type: str, entity_id: any):
+    def __init__(self, entity_type: str, entity_id: any = None):
         self.entity_type = entity_type
         self.entity_id = entity_id
-        super().__init__(f"{entity_type} with id {entity_id} not found")
+        if entity_id is None:
+            super().__init__(entity_type)
+        else:
+            super().__init__(f"{entity_type} with id {entity_id} not found")
 
 
 class ValidationError(DomainException):
@@ -0,0 +1,449 @@
+"""
+Script to benchmark the attribute analyzers on synthetic images.
+
+    python scripts/benchmark_analyzers.py                           # pillow, stubs, installed models
+    python scripts/benchmark_analyzers.py --providers pillow places365 --sizes 1024x768 4000x3000
+    python scripts/benchmark_analyzers.py --output before.json
+    python scripts/benchmark_analyzers.py --output after.json --compare before.json
+
+Fixtures are generated deterministically (fixed seed) as 8-bit JPEG, 8-bit
+RGB TIFF and 16-bit grayscale TIFF at every --sizes resolution, --images
+distinct files per format and size, and kept in --fixtures so later runs
+reuse the same bytes. "decode" times the shared decode stage alone
+(pillow_analyzer only reads headers). Every provider is measured in two
+modes:
+
+  single   analyze(path) once per file
+  batch    analyze_batch(paths, batch_size) over all files of a case
+
+Each case reports call latency (p50/p95/mean/min/max), per-image time,
+throughput, the tracemalloc peak of one extra traced run (Python and NumPy
+allocations; torch tensors are not traced) and the process max RSS. Timed
+runs never have tracemalloc enabled.
+
+The clip, clip-onnx, places365, places365-onnx and geoclip providers are
+included when their packages are installed and their weights load; the
+others are listed under "skipped" with the reason. Results are JSON, so two
+runs on the same hardware can be compared with --compare.
+"""
+
+import argparse
+import hashlib
+import importlib.util
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from importlib import metadata
+from pathlib import Path
+from typing import Callable, Optional, Sequence
+
+# Add app directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.config.settings import settings
+from app.features.analysis.application.job_metrics import percentile
+
+SCHEMA_VERSION = 1
+FIXTURE_VERSION = 1
+FORMATS = ("jpeg", "tiff", "tiff16")
+DEFAULT_SIZES = ("640x480", "2000x1500", "4000x3000")
+DEFAULT_FIXTURES = Path.home() / ".cache" / "roger" / "benchmark-fixtures"
+MODES = ("single", "batch")
+
+_PACKAGES = (
+    "pillow", "numpy", "torch", "torchvision", "open_clip_torch",
+    "onnxruntime", "geoclip", "transformers",
+)
+
+
+# ── Synthetic fixtures ──────────────────────────────────────────────────────
+
+def parse_size(spec: str) -> tuple[int, int]:
+    width, _, height = spec.lower().partition("x")
+    return int(width), int(height)
+
+
+def synthetic_pixels(width: int, height: int, seed: int, channels: int = 3, high: int = 255):
+    """
+    Smooth gradients and low-frequency waves plus seeded noise: compresses
+    like a scanned photograph rather than like a flat or random image.
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    y = np.linspace(0.0, 1.0, height, dtype=np.float32)[:, None]
+    x = np.linspace(0.0, 1.0, width, dtype=np.float32)[None, :]
+    planes = []
+    for c in range(channels):
+        fx, fy, phase = rng.uniform(1, 6), rng.uniform(1, 6), rng.uniform(0, 6.28)
+        base = 0.45 * (x * (c + 1) / channels + y * (channels - c) / channels)
+        wave = 0.25 * np.sin(6.28 * (fx * x + fy * y) + phase)
+        noise = rng.normal(0.0, 0.04, (height, width)).astype(np.float32)
+        planes.append(np.clip(0.15 + base + wave + noise, 0.0, 1.0))
+    pixels = np.stack(planes, axis=-1) if channels > 1 else planes[0]
+    return (pixels * high).astype(np.uint16 if high > 255 else np.uint8)
+
+
+def fixture_path(root: Path, fmt: str, size: tuple[int, int], index: int) -> Path:
+    ext = "jpg" if fmt == "jpeg" else "tif"
+    return root / f"v{FIXTURE_VERSION}" / f"{fmt}_{size[0]}x{size[1]}_{index}.{ext}"
+
+
+def ensure_fixture(root: Path, fmt: str, size: tuple[int, int], index: int) -> Path:
+    """Create one fixture file unless it already exists. Returns its path."""
+    from PIL import Image
+
+    path = fixture_path(root, fmt, size, index)
+    if path.exists():
+        return path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    seed = int(hashlib.sha256(f"{fmt}:{size}:{index}".encode()).hexdigest()[:8], 16)
+    width, height = size
+    tmp = path.with_name(f".{path.name}.part")
+    if fmt == "tiff16":
+        Image.fromarray(synthetic_pixels(width, height, seed, channels=1, high=65535)).save(tmp, format="TIFF")
+    else:
+        image = Image.fromarray(synthetic_pixels(width, height, seed))
+        if fmt == "jpeg":
+            image.save(tmp, format="JPEG", quality=90)
+        else:
+            image.save(tmp, format="TIFF")
+    os.replace(tmp, path)
+    return path
+
+
+def build_fixtures(
+    root: Path, sizes: Sequence[tuple[int, int]], formats: Sequence[str], images: int,
+) -> dict[tuple[str, tuple[int, int]], list[str]]:
+    """{(format, size): [paths]} for every requested combination."""
+    return {
+        (fmt, size): [str(ensure_fixture(root, fmt, size, i)) for i in range(images)]
+        for fmt in formats
+        for size in sizes
+    }
+
+
+# ── Providers ───────────────────────────────────────────────────────────────
+
+class _PillowBenchmark:
+    """Module-level pillow_analyzer functions behind the analyzer interface."""
+
+    provider_name = "pillow"
+
+    def __init__(self) -> None:
+        from app.infrastructure.analysis import pillow_analyzer
+        self._module = pillow_analyzer
+        self.provider_version = pillow_analyzer.PROVIDER_VERSION
+
+    def analyze(self, file_path: str) -> dict:
+        return self._module.analyze(file_path)
+
+    def analyze_batch(self, file_paths: Sequence[str], batch_size: Optional[int] = None) -> list[dict]:
+        return self._module.analyze_batch(file_paths)
+
+
+class _DecodeBenchmark:
+    """The shared decode stage (image_decoding) that feeds every vision analyzer."""
+
+    provider_name = "decode"
+    provider_version = "1"
+
+    def analyze(self, file_path: str) -> dict:
+        from app.infrastructure.analysis.image_decoding import decode_image
+        try:
+            decode_image(file_path)
+        except Exception as exc:
+            return {"error": str(exc)}
+        return {"error": None}
+
+    def analyze_batch(self, file_paths: Sequence[str], batch_size: Optional[int] = None) -> list[dict]:
+        return [self.analyze(path) for path in file_paths]
+
+
+def _builder(module: str, cls: str) -> Callable:
+    """Deferred import, so a missing optional package only skips its provider."""
+    def build():
+        provider = importlib.import_module(f"app.infrastructure.analysis.providers.{module}")
+        return getattr(provider, cls)()
+    return build
+
+
+# name → (required packages, builder)
+PROVIDERS: dict[str, tuple[tuple[str, ...], Callable]] = {
+    "pillow": ((), _PillowBenchmark),
+    "decode": ((), _DecodeBenchmark),
+    "stub-chronology": ((), _builder("attr02.stub_analyzer", "StubChronologyAnalyzer")),
+    "stub-geographic": ((), _builder("attr03.stub_analyzer", "StubGeographicAnalyzer")),
+    "stub-environmental": ((), _builder("attr04.stub_analyzer", "StubEnvironmentalAnalyzer")),
+    "clip": (
+        ("torch", "open_clip"),
+        _builder("attr02.clip_temporal_analyzer", "CLIPTemporalAnalyzer"),
+    ),
+    "clip-onnx": (
+        ("torch", "open_clip", "onnx", "onnxruntime"),
+        _builder("attr02.clip_temporal_onnx_analyzer", "CLIPTemporalOnnxAnalyzer"),
+    ),
+    "places365": (
+        ("torch", "torchvision"),
+        _builder("attr04.places365_analyzer", "Places365Analyzer"),
+    ),
+    "places365-onnx": (
+        ("torch", "torchvision", "onnx", "onnxruntime"),
+        _builder("attr04.places365_onnx_analyzer", "Places365OnnxAnalyzer"),
+    ),
+    "geoclip": (
+        ("torch", "geoclip"),
+        _builder("attr03.geoclip_analyzer", "GeoCLIPAnalyzer"),
+    ),
+}
+
+
+def load_provider(name: str):
+    """(analyzer, None) or (None, reason it cannot be benchmarked here)."""
+    required, build = PROVIDERS[name]
+    missing = [pkg for pkg in required if importlib.util.find_spec(pkg) is None]
+    if missing:
+        return None, f"not installed: {', '.join(missing)}"
+    try:
+        analyzer = build()
+        warm = getattr(analyzer, "warm_up", None)
+        if callable(warm):
+            warm()
+    except Exception as exc:
+        return None, f"{type(exc).__name__}: {exc}"
+    return analyzer, None
+
+
+# ── Measurement ─────────────────────────────────────────────────────────────
+
+def _max_rss_bytes() -> int:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def _summary(values: Sequence[float]) -> dict:
+    return {
+        "p50": round(percentile(values, 50), 3),
+        "p95": round(percentile(values, 95), 3),
+        "mean": round(sum(values) / len(values), 3),
+        "min": round(min(values), 3),
+        "max": round(max(values), 3),
+    }
+
+
+def _calls(analyzer, mode: str, paths: Sequence[str], batch_size: int) -> list[Callable[[], list]]:
+    if mode == "single":
+        return [lambda p=p: [analyzer.analyze(p)] for p in paths]
+    return [lambda: analyzer.analyze_batch(paths, batch_size)]
+
+
+def run_case(analyzer, mode: str, paths: Sequence[str], repeat: int, batch_size: int) -> dict:
+    """Latency, throughput and memory of one provider/mode over one fixture set."""
+    calls = _calls(analyzer, mode, paths, batch_size)
+    for call in calls:
+        call()  # warm-up: lazy imports, allocator pools, first-call kernels
+
+    latencies, errors, first_error = [], 0, None
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for call in calls:
+            t0 = time.perf_counter()
+            results = call()
+            latencies.append((time.perf_counter() - t0) * 1000)
+            for result in results:
+                if result.get("error"):
+                    errors += 1
+                    first_error = first_error or result["error"]
+    total = time.perf_counter() - started
+    images = len(paths) * repeat
+
+    tracemalloc.start()
+    try:
+        for call in calls:
+            call()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "calls": len(latencies),
+        "images": images,
+        "latency_ms": _summary(latencies),
+        "per_image_ms": round(total * 1000 / images, 3),
+        "throughput_ips": round(images / total, 3) if total > 0 else None,
+        "peak_traced_bytes": peak,
+        "max_rss_bytes": _max_rss_bytes(),
+        "errors": errors,
+        "first_error": first_error,
+    }
+
+
+# ── Environment / comparison ────────────────────────────────────────────────
+
+def environment() -> dict:
+    """What a comparison must hold constant: machine, packages, settings."""
+    versions = {}
+    for package in _PACKAGES:
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+    torch_threads = None
+    if "torch" in sys.modules:
+        torch_threads = sys.modules["torch"].get_num_threads()
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=Path(__file__).parent, timeout=5,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor() or None,
+        "cpu_count": os.cpu_count(),
+        "python": platform.python_version(),
+        "packages": versions,
+        "torch_threads": torch_threads,
+        "git_commit": commit,
+        "settings": {
+            "analysis_working_size": settings.analysis_working_size,
+            "analysis_decode_memory_mb": settings.analysis_decode_memory_mb,
+            "analysis_batch_size": settings.analysis_batch_size,
+            "onnx_quantize_int8": settings.onnx_quantize_int8,
+            "model_artifacts_mmap": settings.model_artifacts_mmap,
+        },
+    }
+
+
+def case_key(case: dict) -> tuple:
+    return case["provider"], case["mode"], case["format"], case["size"]
+
+
+def compare(baseline: dict, current: dict) -> list[dict]:
+    """Per-image time of every case present in both runs, with the ratio."""
+    before = {case_key(c): c for c in baseline.get("results", [])}
+    rows = []
+    for case in current.get("results", []):
+        old = before.get(case_key(case))
+        if old is None:
+            continue
+        rows.append({
+            "case": "/".join(case_key(case)),
+            "before_ms": old["per_image_ms"],
+            "after_ms": case["per_image_ms"],
+            "ratio": round(case["per_image_ms"] / old["per_image_ms"], 3) if old["per_image_ms"] else None,
+        })
+    return rows
+
+
+# ── CLI ─────────────────────────────────────────────────────────────────────
+
+def _parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="ROGER - Analyzer benchmarks")
+    parser.add_argument("--providers", nargs="+", choices=list(PROVIDERS), default=list(PROVIDERS))
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=list(FORMATS))
+    parser.add_argument("--sizes", nargs="+", default=list(DEFAULT_SIZES), help="WIDTHxHEIGHT")
+    parser.add_argument("--images", type=int, default=4, help="Distinct files per format and size")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed passes over every case")
+    parser.add_argument("--batch-size", type=int, default=None, help="Default: ANALYSIS_BATCH_SIZE")
+    parser.add_argument("--torch-threads", type=int, default=0, help="0 = torch default")
+    parser.add_argument("--fixtures", type=Path, default=DEFAULT_FIXTURES)
+    parser.add_argument("--output", type=Path, default=None, help="JSON file (default: stdout)")
+    parser.add_argument("--compare", type=Path, default=None, help="Earlier JSON run to compare with")
+    return parser.parse_args(argv)
+
+
+def benchmark(argv: Optional[Sequence[str]] = None) -> dict:
+    """Run the suite and return the JSON document."""
+    args = _parse_args(argv)
+    sizes = [parse_size(s) for s in args.sizes]
+    batch_size = max(args.batch_size or settings.analysis_batch_size, 1)
+    if args.torch_threads > 0 and importlib.util.find_spec("torch") is not None:
+        import torch
+        torch.set_num_threads(args.torch_threads)
+
+    log = sys.stderr
+    print("=" * 60, file=log)
+    print("ROGER - Analyzer Benchmarks", file=log)
+    print("=" * 60, file=log)
+    print(f"Fixtures: {args.fixtures}", file=log)
+    fixtures = build_fixtures(args.fixtures, sizes, args.formats, args.images)
+
+    results, skipped = [], []
+    for name in args.providers:
+        analyzer, reason = load_provider(name)
+        if analyzer is None:
+            print(f"⚠️  {name}: skipped ({reason})", file=log)
+            skipped.append({"provider": name, "reason": reason})
+            continue
+        for mode in args.modes:
+            for (fmt, size), paths in fixtures.items():
+                case = run_case(analyzer, mode, paths, args.repeat, batch_size)
+                case.update({
+                    "provider": name,
+                    "provider_version": analyzer.provider_version,
+                    "mode": mode,
+                    "format": fmt,
+                    "size": f"{size[0]}x{size[1]}",
+                })
+                results.append(case)
+                status = "✅" if not case["errors"] else "❌"
+                print(
+                    f"{status} {name:<18} {mode:<6} {fmt:<6} {case['size']:>10}  "
+                    f"{case['per_image_ms']:>9.2f} ms/img  {case['throughput_ips']:>8.2f} img/s",
+                    file=log,
+                )
+        del analyzer
+
+    return {
+        "schema_version": SCHEMA_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "environment": environment(),
+        "config": {
+            "fixture_version": FIXTURE_VERSION,
+            "formats": args.formats,
+            "sizes": args.sizes,
+            "images": args.images,
+            "repeat": args.repeat,
+            "batch_size": batch_size,
+            "modes": args.modes,
+        },
+        "results": results,
+        "skipped": skipped,
+    }
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = _parse_args(argv)
+    report = benchmark(argv)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n")
+        print(f"\nResults written to {args.output}", file=sys.stderr)
+    else:
+        print(text)
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())
+        if baseline.get("environment", {}).get("machine") != report["environment"]["machine"]:
+            print("⚠️  Baseline was recorded on a different machine", file=sys.stderr)
+        print(f"\n{'case':<48} {'before':>10} {'after':>10} {'ratio':>7}", file=sys.stderr)
+        for row in compare(baseline, report):
+            print(
+                f"{row['case']:<48} {row['before_ms']:>10.2f} {row['after_ms']:>10.2f} {row['ratio']:>7.3f}",
+                file=sys.stderr,
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+"""
+Script to compute the CLIP image embeddings used by visual similarity search.
+
+    python scripts/build_embeddings.py                  # photographs without one
+    python scripts/build_embeddings.py --limit 1000 --compact
+    python scripts/build_embeddings.py --photographs 10 11 --force
+
+Photographs dated before ATTR02_ANALYZER=clip was enabled (or whose dating
+came from the result cache, which predates embeddings) have no embedding.
+This runs the chronology analyzer on the same file the chronology use case
+picks and stores only the embedding; dating records are left untouched.
+The index is appended to as it goes, so an interrupted run keeps its work;
+the API may keep running, appends from both are serialized by the index.
+"""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# Add app directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy.future import select
+
+from app.features.archive.infrastructure.persistence.archive_model import (
+    FileType,
+    PhotographFileModel,
+)
+from app.infrastructure.analysis.embedding_index import decode_embedding, embeddings_for
+from app.infrastructure.analysis.executor import analysis_executor
+from app.infrastructure.analysis.model_registry import CHRONOLOGY
+from app.infrastructure.analysis.providers.attr02.clip_temporal_analyzer import EMBEDDING_MODEL
+from app.infrastructure.database.session import AsyncSessionLocal, init_db
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="ROGER - Build image embeddings")
+    parser.add_argument("--photographs", nargs="+", type=int, metavar="ID", help="Only these photographs")
+    parser.add_argument("--force", action="store_true", help="Recompute existing embeddings")
+    parser.add_argument("--limit", type=int, default=None, help="At most this many photographs")
+    parser.add_argument("--compact", action="store_true", help="Rewrite the index without superseded rows")
+    return parser.parse_args()
+
+
+async def _targets(session, photograph_ids, limit, force, index) -> list[tuple[int, str]]:
+    """(photograph_id, file path) to analyze: master first, JPG/TIFF preferred."""
+    query = select(PhotographFileModel).order_by(
+        PhotographFileModel.photograph_id, PhotographFileModel.is_master.desc(), PhotographFileModel.id,
+    )
+    if photograph_ids:
+        query = query.where(PhotographFileModel.photograph_id.in_(photograph_ids))
+    files: dict[int, list[PhotographFileModel]] = {}
+    for pf in (await session.execute(query)).scalars():
+        files.setdefault(pf.photograph_id, []).append(pf)
+
+    targets = []
+    for photograph_id, candidates in files.items():
+        if not force and photograph_id in index:
+            continue
+        target = next(
+            (f for f in candidates if f.file_type in (FileType.JPG, FileType.TIFF)),
+            candidates[0],
+        )
+        targets.append((photograph_id, target.file_path))
+    return targets[:limit]
+
+
+async def build_embeddings():
+    """Analyze photographs without an embedding and append them to the index."""
+    args = _parse_args()
+    print("=" * 60)
+    print("ROGER - Build image embeddings")
+    print("=" * 60)
+
+    index = embeddings_for(EMBEDDING_MODEL)
+    await init_db()
+    try:
+        async with AsyncSessionLocal() as session:
+            targets = await _targets(session, args.photographs, args.limit, args.force, index)
+        print(f"{len(index)} photographs indexed, {len(targets)} to analyze.")
+
+        stored = failed = 0
+        for n, (photograph_id, file_path) in enumerate(targets, start=1):
+            analysis = await analysis_executor.analyze(CHRONOLOGY, file_path)
+            if analysis.get("error"):
+                failed += 1
+                print(f"  ⚠️  photograph {photograph_id}: {analysis['error']}")
+            elif analysis.get("embedding_model") != EMBEDDING_MODEL:
+                print("❌ The chronology analyzer returns no CLIP embeddings: set ATTR02_ANALYZER=clip.")
+                return
+            else:
+                await analysis_executor.run(index.add, photograph_id, decode_embedding(analysis["image_embedding"]))
+                stored += 1
+            if n % 100 == 0:
+                print(f"  {n}/{len(targets)}")
+
+        if args.compact:
+            await analysis_executor.run(index.compact)
+        print(f"\n✅ {stored} embeddings stored, {failed} failed; {len(index)} photographs indexed.")
+    finally:
+        await asyncio.to_thread(analysis_executor.shutdown)
+
+
+if __name__ == "__main__":
+    asyncio.run(build_embeddings())
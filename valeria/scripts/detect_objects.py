@@ -0,0 +1,87 @@
+"""
+Script to run the local object detector over archive photographs.
+
+    python scripts/detect_objects.py                  # photographs never scanned
+    python scripts/detect_objects.py --limit 1000
+    python scripts/detect_objects.py --photographs 10 11 --force
+
+Photographs registered before USE_LOCAL_OBJECT_DETECTION was enabled, or
+left queued by a restart, have no scan. This detects them in batches of
+ANALYSIS_BATCH_SIZE (one forward pass each) with the same file choice as
+the chronology use case, and commits after every batch, so an interrupted
+run keeps its work. --force rescans, e.g. after changing OBJECT_DETECTION_MODEL.
+"""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# Add app directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy.future import select
+
+from app.config.settings import settings
+from app.features.archive.infrastructure.persistence.archive_model import PhotographFileModel
+from app.features.detect_objects.application.detections import detect_photographs
+from app.features.detect_objects.infrastructure.persistence.object_model import ObjectScanModel
+from app.infrastructure.analysis.executor import analysis_executor
+from app.infrastructure.database.session import AsyncSessionLocal, init_db
+
+# Photographs per transaction (several detector batches)
+_COMMIT_EVERY = 64
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="ROGER - Detect objects")
+    parser.add_argument("--photographs", nargs="+", type=int, metavar="ID", help="Only these photographs")
+    parser.add_argument("--force", action="store_true", help="Rescan photographs already scanned")
+    parser.add_argument("--limit", type=int, default=None, help="At most this many photographs")
+    return parser.parse_args()
+
+
+async def _targets(session, photograph_ids, limit, force) -> list[int]:
+    """Ids of the photographs with files to scan, in id order."""
+    query = select(PhotographFileModel.photograph_id).distinct().order_by(PhotographFileModel.photograph_id)
+    if photograph_ids:
+        query = query.where(PhotographFileModel.photograph_id.in_(photograph_ids))
+    if not force:
+        query = query.where(PhotographFileModel.photograph_id.not_in(select(ObjectScanModel.photograph_id)))
+    if limit is not None:
+        query = query.limit(limit)
+    return list((await session.execute(query)).scalars().all())
+
+
+async def detect_objects():
+    """Scan photographs for objects and store the boxes."""
+    args = _parse_args()
+    print("=" * 60)
+    print("ROGER - Detect objects")
+    print("=" * 60)
+
+    if not settings.use_local_object_detection:
+        print("❌ Object detection is disabled: set USE_LOCAL_OBJECT_DETECTION=True.")
+        return
+
+    await init_db()
+    try:
+        async with AsyncSessionLocal() as session:
+            targets = await _targets(session, args.photographs, args.limit, args.force)
+        print(f"{len(targets)} photographs to scan.")
+
+        scanned = failed = 0
+        for start in range(0, len(targets), _COMMIT_EVERY):
+            async with AsyncSessionLocal() as session:
+                ok, bad = await detect_photographs(session, targets[start:start + _COMMIT_EVERY])
+                await session.commit()
+            scanned, failed = scanned + ok, failed + bad
+            print(f"  {min(start + _COMMIT_EVERY, len(targets))}/{len(targets)}")
+
+        print(f"\n✅ {scanned} photographs scanned, {failed} failed.")
+    finally:
+        await asyncio.to_thread(analysis_executor.shutdown)
+
+
+if __name__ == "__main__":
+    asyncio.run(detect_objects())
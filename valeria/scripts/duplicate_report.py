@@ -0,0 +1,83 @@
+"""
+Script to hash photograph files and report duplicates and near-duplicates.
+
+    python scripts/duplicate_report.py                          # CSV to stdout
+    python scripts/duplicate_report.py --max-distance 6 --output duplicados.csv
+    python scripts/duplicate_report.py --skip-hashing --include-same-photograph
+
+Files without a perceptual hash (registered before hashing existed, or
+while the API was down) are hashed first, committed in batches, so an
+interrupted run picks up where it stopped. The report has one row per file
+in a group: files whose perceptual hashes are within --max-distance bits,
+directly or through other files of the group (see duplicate_index).
+Groups of a single photograph's files (CR3 + JPG) are left out unless
+--include-same-photograph is given.
+"""
+
+import argparse
+import asyncio
+import csv
+import sys
+from pathlib import Path
+
+# Add app directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.config.settings import settings
+from app.features.archive.application.duplicate_report import duplicate_groups
+from app.features.archive.infrastructure.adapters.duplicate_index import duplicate_index
+from app.infrastructure.analysis.executor import analysis_executor
+from app.infrastructure.analysis.exiftool_pool import exiftool_pool
+from app.infrastructure.database.session import AsyncSessionLocal, init_db
+
+COLUMNS = [
+    "group", "file_id", "photograph_id", "identifier", "roll_id", "box_id",
+    "file_type", "is_master", "distance", "file_path",
+]
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="ROGER - Duplicate report")
+    parser.add_argument("--max-distance", type=int, default=settings.duplicate_max_distance, metavar="BITS")
+    parser.add_argument("--include-same-photograph", action="store_true")
+    parser.add_argument("--skip-hashing", action="store_true", help="Only report files already hashed")
+    parser.add_argument("--limit", type=int, default=None, help="Hash at most this many files")
+    parser.add_argument("--output", type=Path, default=None, help="CSV file (default: stdout)")
+    return parser.parse_args()
+
+
+async def duplicate_report():
+    """Hash missing files, then write the duplicate groups as CSV."""
+    args = _parse_args()
+    log = sys.stderr
+    print("=" * 60, file=log)
+    print("ROGER - Duplicate report", file=log)
+    print("=" * 60, file=log)
+
+    await init_db()
+    try:
+        async with AsyncSessionLocal() as session:
+            if not args.skip_hashing:
+                hashed, unreadable = await duplicate_index.backfill(session, limit=args.limit)
+                print(f"Hashed {hashed} files ({unreadable} unreadable).", file=log)
+            groups = await duplicate_groups(session, args.max_distance, args.include_same_photograph)
+
+        out = args.output.open("w", newline="", encoding="utf-8") if args.output else sys.stdout
+        try:
+            writer = csv.DictWriter(out, fieldnames=COLUMNS)
+            writer.writeheader()
+            for group in groups:
+                for file in group["files"]:
+                    writer.writerow({"group": group["group"], **{k: file[k] for k in COLUMNS[1:]}})
+        finally:
+            if args.output:
+                out.close()
+        files = sum(len(group["files"]) for group in groups)
+        print(f"\n✅ {len(groups)} groups, {files} files within {args.max_distance} bits.", file=log)
+    finally:
+        await asyncio.to_thread(analysis_executor.shutdown)
+        exiftool_pool.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(duplicate_report())
@@ -0,0 +1,72 @@
+"""
+Script to pre-fetch model artifacts into the local cache.
+
+    python scripts/fetch_models.py                  # every artifact in the manifest
+    python scripts/fetch_models.py places365-resnet50
+    python scripts/fetch_models.py --list
+    python scripts/fetch_models.py --verify         # check local files against pinned sha256
+    python scripts/fetch_models.py --pin            # write sha256 of unpinned artifacts to the manifest
+
+Downloads go to MODEL_ARTIFACTS_DIR (default ~/.cache/roger/models). Weights
+are also converted to their memory-mappable form, so a container built with
+this step starts with MODEL_ARTIFACTS_OFFLINE=True and never downloads.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add app directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.infrastructure.analysis.model_artifacts import model_artifacts
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="ROGER - Fetch model artifacts")
+    parser.add_argument("names", nargs="*", help="Artifacts to fetch (default: all)")
+    action = parser.add_mutually_exclusive_group()
+    action.add_argument("--list", action="store_true", help="Show manifest and local state")
+    action.add_argument("--verify", action="store_true", help="Verify local files against the manifest")
+    action.add_argument("--pin", action="store_true", help="Record checksums of unpinned artifacts")
+    return parser.parse_args()
+
+
+def fetch_models() -> int:
+    """Fetch, verify, list or pin artifacts. Returns the process exit code."""
+    args = _parse_args()
+    names = args.names or list(model_artifacts.manifest)
+    print("=" * 60)
+    print("ROGER - Model Artifacts")
+    print(f"Cache: {model_artifacts.root}")
+    print("=" * 60)
+
+    failed = False
+    for name in names:
+        artifact = model_artifacts.artifact(name)
+        path = model_artifacts.path(name)
+        if args.list:
+            state = "present" if path.exists() else "missing"
+            pinned = artifact.sha256[:12] if artifact.sha256 else "unpinned"
+            print(f"  {name:<24} v{artifact.version:<4} {artifact.kind:<8} {pinned:<12} {state}")
+        elif args.verify:
+            result = model_artifacts.verify(name)
+            label = {True: "✅ ok", False: "❌ checksum mismatch", None: "⚠️  missing or unpinned"}[result]
+            print(f"  {name:<24} {label}")
+            failed |= result is False
+        elif args.pin:
+            if artifact.sha256:
+                print(f"  {name:<24} already pinned")
+            else:
+                print(f"  {name:<24} sha256 {model_artifacts.pin(name)}")
+        else:
+            print(f"  {name:<24} fetching v{artifact.version}...")
+            model_artifacts.fetch(name)
+            if artifact.kind == "weights":
+                model_artifacts.prepare(name)
+            print(f"  {name:<24} ✅ {path}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(fetch_models())
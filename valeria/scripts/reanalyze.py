@@ -0,0 +1,93 @@
+"""
+Script to re-queue attribute analyses.
+
+    python scripts/reanalyze.py --stale                  # every outdated record
+    python scripts/reanalyze.py --stale --attributes environmental --limit 500
+    python scripts/reanalyze.py --stale --dry-run        # report only
+    python scripts/reanalyze.py --photographs 10 11 12   # explicit, all attributes
+
+--stale re-queues only the photographs whose ACTIVE AI records were written
+by a provider name or version other than the one configured now (see
+app/features/analysis/application/staleness.py), in priority order: most
+outdated attributes first, then oldest analyses. The script runs only the
+jobs it queues, so it is safe beside a running API. Jobs are committed
+QUEUED before they run, so if this script is interrupted the API resumes
+them in the same order on its next startup.
+"""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# Add app directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.features.analysis.application.staleness import stale_photographs, stale_summary
+from app.features.analysis.infrastructure.adapters.job_queue import analysis_queue
+from app.features.analysis.infrastructure.persistence.analysis_model import AnalysisAttributeType
+from app.features.cluster_images.application.clusters import absorb_photograph
+from app.infrastructure.analysis.embedding_hooks import embedding_hooks
+from app.infrastructure.analysis.executor import analysis_executor
+from app.infrastructure.database.session import AsyncSessionLocal, init_db
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="ROGER - Re-analyze photographs")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--stale", action="store_true", help="Only records from outdated providers")
+    target.add_argument("--photographs", nargs="+", type=int, metavar="ID")
+    parser.add_argument(
+        "--attributes", nargs="+", choices=[a.value for a in AnalysisAttributeType],
+        default=[a.value for a in AnalysisAttributeType],
+    )
+    parser.add_argument("--limit", type=int, default=None, help="At most this many photographs")
+    parser.add_argument("--dry-run", action="store_true", help="Report without queueing")
+    return parser.parse_args()
+
+
+async def reanalyze():
+    """Select photographs, queue their analyses and wait for the queue to drain."""
+    args = _parse_args()
+    attribute_types = [AnalysisAttributeType(a) for a in args.attributes]
+    print("=" * 60)
+    print("ROGER - Re-analyze")
+    print("=" * 60)
+
+    await init_db()
+    try:
+        async with AsyncSessionLocal() as session:
+            if args.stale:
+                for row in await stale_summary(session, attribute_types):
+                    print(
+                        f"  {row['attribute_type']:<14} current {row['provider']} "
+                        f"{row['provider_version']}: {row['stale']} stale"
+                    )
+                    for outdated in row["outdated"]:
+                        print(f"      {outdated['provider']} {outdated['provider_version']}: {outdated['count']}")
+                targets = await stale_photographs(session, attribute_types, limit=args.limit)
+            else:
+                targets = [(pid, attribute_types) for pid in args.photographs[:args.limit]]
+
+        jobs = sum(len(attrs) for _, attrs in targets)
+        print(f"\n{len(targets)} photographs, {jobs} analyses to queue.")
+        if args.dry_run or not targets:
+            return
+
+        # Not recover: jobs RUNNING now may belong to the API
+        await analysis_queue.start(recover=False)
+        # Re-dated photographs join the current clustering, as in the API
+        embedding_hooks.subscribe(absorb_photograph)
+        async with AsyncSessionLocal() as session:
+            for photograph_id, attrs in targets:
+                await analysis_queue.submit(session, photograph_id, attrs, triggered_by=None)
+        print("Queued. Waiting for the analyses to finish (Ctrl+C to stop; queued jobs persist)...")
+        await analysis_queue.join()
+        print("\n✅ Re-analysis finished.")
+    finally:
+        await analysis_queue.stop()
+        await asyncio.to_thread(analysis_executor.shutdown)
+
+
+if __name__ == "__main__":
+    asyncio.run(reanalyze())
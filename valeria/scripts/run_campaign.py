@@ -0,0 +1,123 @@
+"""
+Script to run an analysis campaign over a collection, box or roll.
+
+    python scripts/run_campaign.py collection 3
+    python scripts/run_campaign.py roll 12 --attributes chronology environmental --concurrency 8
+    python scripts/run_campaign.py --resume 7
+
+Runs its own analysis queue in this process and prints progress until the
+campaign ends. The queue runs only this campaign's jobs and never recovers
+the API's, so it is safe beside a running API. Interrupting it (Ctrl+C)
+leaves the campaign resumable with --resume, or by the API on its next
+startup. Jobs the interrupted run left RUNNING are only reset with
+--recover-running; use it when no API is running the campaign.
+"""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# Add app directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.features.analysis.application.campaigns import campaign_progress, job_status_counts
+from app.features.analysis.infrastructure.adapters.campaign_runner import campaign_runner
+from app.features.analysis.infrastructure.adapters.job_queue import analysis_queue
+from app.features.analysis.infrastructure.persistence.analysis_model import (
+    AnalysisAttributeType,
+    AnalysisCampaignModel,
+    CampaignScope,
+    CampaignStatus,
+    JobStatus,
+)
+from app.features.cluster_images.application.clusters import absorb_photograph
+from app.infrastructure.analysis.embedding_hooks import embedding_hooks
+from app.infrastructure.analysis.executor import analysis_executor
+from app.infrastructure.database.session import AsyncSessionLocal, init_db
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="ROGER - Analysis campaign")
+    parser.add_argument("scope_type", nargs="?", choices=[s.value for s in CampaignScope])
+    parser.add_argument("scope_id", nargs="?", type=int)
+    parser.add_argument(
+        "--attributes", nargs="+", choices=[a.value for a in AnalysisAttributeType],
+        default=[a.value for a in AnalysisAttributeType],
+    )
+    parser.add_argument("--concurrency", type=int, default=None)
+    parser.add_argument("--resume", type=int, metavar="CAMPAIGN_ID")
+    parser.add_argument(
+        "--recover-running", action="store_true",
+        help="With --resume, re-run jobs left RUNNING (only when no API is running the campaign)",
+    )
+    parser.add_argument("--interval", type=float, default=10.0, help="Seconds between progress lines")
+    args = parser.parse_args()
+    if args.resume is None and (args.scope_type is None or args.scope_id is None):
+        parser.error("scope_type and scope_id are required unless --resume is given")
+    return args
+
+
+async def _print_progress(campaign_id: int) -> str:
+    async with AsyncSessionLocal() as session:
+        campaign = await session.get(AnalysisCampaignModel, campaign_id)
+        progress = await campaign_progress(session, campaign)
+    eta = f"{progress['eta_seconds']:.0f}s" if progress["eta_seconds"] is not None else "-"
+    print(
+        f"[{campaign.status.value}] {progress['completed']}/{progress['planned']} done, "
+        f"{progress['failed']} failed, {campaign.skipped} skipped, "
+        f"{progress['images_per_second']:.2f} img/s, ETA {eta}"
+    )
+    return campaign.status
+
+
+async def run_campaign():
+    """Create or resume a campaign and drive it to completion."""
+    args = _parse_args()
+    print("=" * 60)
+    print("ROGER - Analysis Campaign")
+    print("=" * 60)
+
+    await init_db()
+    # Not recover: jobs RUNNING now may belong to the API
+    await analysis_queue.start(recover=False)
+    # Re-dated photographs join the current clustering, as in the API
+    embedding_hooks.subscribe(absorb_photograph)
+    try:
+        if args.resume is not None:
+            campaign_id = args.resume
+            async with AsyncSessionLocal() as session:
+                campaign = await session.get(AnalysisCampaignModel, campaign_id)
+            if campaign is None or campaign.status not in CampaignStatus.unfinished():
+                print(f"\n❌ Campaign {campaign_id} does not exist or has already finished.")
+                return
+            await analysis_queue.recover(campaign_id, include_running=args.recover_running)
+            async with AsyncSessionLocal() as session:
+                running = (await job_status_counts(session, campaign_id))[JobStatus.RUNNING]
+            if running:
+                print(f"{running} jobs are RUNNING elsewhere; rerun with --recover-running if nothing is.")
+            campaign_runner.launch(campaign_id)
+        else:
+            async with AsyncSessionLocal() as session:
+                campaign = await campaign_runner.create(
+                    session, CampaignScope(args.scope_type), args.scope_id,
+                    [AnalysisAttributeType(a) for a in args.attributes],
+                    triggered_by=None, concurrency=args.concurrency,
+                )
+            campaign_id = campaign.id
+        print(f"Campaign {campaign_id} started\n")
+
+        while await _print_progress(campaign_id) in CampaignStatus.unfinished():
+            if not campaign_runner.driving(campaign_id):
+                print(f"\n❌ Campaign stopped with an error; resume it with --resume {campaign_id}.")
+                return
+            await campaign_runner.wait(campaign_id, timeout=args.interval)
+        print("\n✅ Campaign finished.")
+    finally:
+        await campaign_runner.stop()
+        await analysis_queue.stop()
+        await asyncio.to_thread(analysis_executor.shutdown)
+
+
+if __name__ == "__main__":
+    asyncio.run(run_campaign())
@@ -0,0 +1,35 @@
+"""
+Shared fixtures for the unit tests.
+"""
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.infrastructure.database.base import Base
+
+
+@pytest.fixture
+async def sessions(tmp_path):
+    """
+    Session factory on a fresh SQLite file with every table init_db() creates.
+    Modules that need rows override it, taking this one as an argument.
+    """
+    import app.features.authenticate.infrastructure.persistence.user_model  # noqa
+    import app.features.view_images.infrastructure.persistence.image_model  # noqa
+    import app.features.generate_narrative.infrastructure.persistence.narrative_model  # noqa
+    import app.features.manage_projects.infrastructure.persistence.project_model  # noqa
+    import app.features.manage_projects.infrastructure.persistence.project_message_model  # noqa
+    import app.features.manage_projects.infrastructure.persistence.project_invitation_model  # noqa
+    import app.features.archive.infrastructure.persistence.archive_model  # noqa
+    import app.features.taxonomy.infrastructure.persistence.taxonomy_model  # noqa
+    import app.features.tagging.infrastructure.persistence.tag_model  # noqa
+    import app.features.contributions.infrastructure.persistence.contribution_model  # noqa
+    import app.features.analysis.infrastructure.persistence.analysis_model  # noqa
+    import app.features.cluster_images.infrastructure.persistence.cluster_model  # noqa
+    import app.features.detect_objects.infrastructure.persistence.object_model  # noqa
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
@@ -0,0 +1,104 @@
+"""
+Unit tests for the analyze_batch() contract: chunking, the default loop of
+the stubs and the single forward pass of the CLIP and Places365 providers
+(randomly initialized weights; skipped without torch / open_clip).
+"""
+
+import pytest
+from PIL import Image
+
+from app.infrastructure.analysis.base_analyzer import chunked
+from app.infrastructure.analysis.providers.attr03.stub_analyzer import StubGeographicAnalyzer
+from app.infrastructure.analysis.providers.attr04.stub_analyzer import StubEnvironmentalAnalyzer
+
+
+class TestChunked:
+
+    def test_chunks_preserve_order(self):
+        assert [list(c) for c in chunked([1, 2, 3, 4, 5], 2)] == [[1, 2], [3, 4], [5]]
+
+    def test_non_positive_size_falls_back_to_one(self):
+        assert [list(c) for c in chunked([1, 2], 0)] == [[1], [2]]
+
+
+class TestDefaultAnalyzeBatch:
+
+    def test_one_result_per_path(self):
+        analyzer = StubEnvironmentalAnalyzer()
+        results = analyzer.analyze_batch(["a.jpg", "b.jpg", "c.jpg"], batch_size=2)
+        assert len(results) == 3
+        assert all(r["error"] is None for r in results)
+        assert all(r["provider"] == "stub" for r in results)
+
+    def test_empty_batch(self):
+        assert StubGeographicAnalyzer().analyze_batch([]) == []
+
+    def test_error_result_shape(self):
+        analyzer = StubGeographicAnalyzer()
+        assert analyzer.error_result("boom") == {
+            "error": "boom", "provider": "stub", "provider_version": "1",
+        }
+
+
+@pytest.fixture
+def images(tmp_path):
+    paths = []
+    for i in range(5):
+        path = tmp_path / f"img{i}.jpg"
+        Image.new("RGB", (64, 48), (40 * i, 255 - 40 * i, 90)).save(path)
+        paths.append(str(path))
+    return paths
+
+
+def _count_calls(monkeypatch, owner, name: str) -> list[int]:
+    """Batch sizes passed to owner.name."""
+    sizes = []
+    method = getattr(owner, name)
+
+    def counted(batch):
+        sizes.append(batch.shape[0])
+        return method(batch)
+
+    monkeypatch.setattr(owner, name, counted)
+    return sizes
+
+
+class TestNativeBatching:
+
+    def test_clip_encodes_a_batch_in_one_pass(self, monkeypatch, tmp_path, images):
+        torch = pytest.importorskip("torch")
+        pytest.importorskip("open_clip")
+        from app.infrastructure.analysis.providers.attr02 import clip_temporal_analyzer as clip
+
+        monkeypatch.setattr(clip, "_PRETRAINED", None)
+        monkeypatch.setattr(clip, "_CACHE_DIR", tmp_path / "clip")
+        torch.manual_seed(0)
+        analyzer = clip.CLIPTemporalAnalyzer()
+        expected = [analyzer.analyze(path) for path in images]
+        sizes = _count_calls(monkeypatch, analyzer._model, "encode_image")
+
+        results = analyzer.analyze_batch(images, batch_size=8)
+        assert sizes == [5]
+        for result, single in zip(results, expected):
+            assert result["date_from"] == single["date_from"]
+            assert result["confidence"] == pytest.approx(single["confidence"], abs=1e-4)
+
+        analyzer.analyze_batch(images, batch_size=2)
+        assert sizes == [5, 2, 2, 1]
+
+    def test_places365_classifies_a_batch_in_one_pass(self, monkeypatch, tmp_path, images):
+        torch = pytest.importorskip("torch")
+        models = pytest.importorskip("torchvision.models")
+        from app.infrastructure.analysis.providers.attr04.places365_analyzer import Places365Analyzer
+
+        torch.manual_seed(0)
+        analyzer = Places365Analyzer()
+        analyzer._model = models.resnet18(num_classes=365).eval()
+        analyzer._categories = [f"category_{i}" for i in range(365)]
+        analyzer._transform = analyzer._build_transform()
+        sizes = _count_calls(monkeypatch, analyzer, "_forward")
+
+        missing = str(tmp_path / "missing.jpg")
+        results = analyzer.analyze_batch(images[:2] + [missing] + images[2:], batch_size=8)
+        assert sizes == [5]
+        assert results[2]["error"] and all(r["error"] is None for i, r in enumerate(results) if i != 2)
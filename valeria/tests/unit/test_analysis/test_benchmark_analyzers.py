@@ -0,0 +1,46 @@
+"""
+Unit tests for the analyzer benchmark script (tiny fixtures, no models).
+"""
+
+import json
+
+from PIL import Image
+
+from scripts import benchmark_analyzers as bench
+
+
+class TestFixtures:
+
+    def test_formats_and_determinism(self, tmp_path):
+        fixtures = bench.build_fixtures(tmp_path, [(40, 30)], bench.FORMATS, images=1)
+        modes = {fmt: Image.open(paths[0]).mode for (fmt, _), paths in fixtures.items()}
+        assert modes == {"jpeg": "RGB", "tiff": "RGB", "tiff16": "I;16"}
+
+        again = bench.build_fixtures(tmp_path / "again", [(40, 30)], ["tiff16"], images=1)
+        first = fixtures[("tiff16", (40, 30))][0]
+        assert open(again[("tiff16", (40, 30))][0], "rb").read() == open(first, "rb").read()
+
+
+class TestBenchmark:
+
+    def test_report_covers_every_case_and_skips_missing_providers(self, tmp_path, monkeypatch):
+        monkeypatch.setitem(bench.PROVIDERS, "missing", (("no_such_package_xyz",), object))
+        report = bench.benchmark([
+            "--providers", "pillow", "decode", "stub-environmental", "missing",
+            "--sizes", "48x32", "--formats", "jpeg", "tiff16",
+            "--images", "2", "--repeat", "1", "--fixtures", str(tmp_path),
+        ])
+        json.dumps(report)
+
+        assert len(report["results"]) == 3 * 2 * 2
+        assert report["skipped"] == [{"provider": "missing", "reason": "not installed: no_such_package_xyz"}]
+        single = next(r for r in report["results"] if (r["provider"], r["mode"], r["format"]) == ("pillow", "single", "tiff16"))
+        assert single["errors"] == 0
+        assert (single["calls"], single["images"]) == (2, 2)
+        assert single["throughput_ips"] > 0
+        batch = next(r for r in report["results"] if (r["provider"], r["mode"]) == ("decode", "batch"))
+        assert batch["calls"] == 1
+
+        rows = bench.compare(report, report)
+        assert len(rows) == len(report["results"])
+        assert all(row["ratio"] in (1.0, None) for row in rows)
@@ -0,0 +1,205 @@
+"""
+Unit tests for analysis campaigns: planning, bounded dispatch and resume
+(SQLite in a temp file, fake job runners).
+"""
+
+import asyncio
+
+import pytest
+from sqlalchemy.future import select
+
+from app.features.analysis.application import staleness
+from app.features.analysis.application.campaigns import campaign_progress, plan_campaign
+from app.features.analysis.infrastructure.adapters.campaign_runner import AnalysisCampaignRunner
+from app.features.analysis.infrastructure.adapters.job_queue import AnalysisJobQueue
+from app.features.analysis.infrastructure.persistence.analysis_model import (
+    AnalysisAttributeType,
+    AnalysisCampaignModel,
+    AnalysisJobModel,
+    CampaignScope,
+    CampaignStatus,
+    JobStatus,
+)
+from app.features.archive.infrastructure.persistence.archive_model import (
+    BoxModel, FileType, PhotographFileModel, PhotographModel, RollModel,
+)
+from app.features.taxonomy.infrastructure.persistence.taxonomy_model import (
+    AttributeStatus, AttrChronologyDatingModel,
+)
+from app.features.view_images.infrastructure.persistence.image_model import CollectionModel
+
+CHRONO = AnalysisAttributeType.CHRONOLOGY
+TECHNICAL = AnalysisAttributeType.TECHNICAL
+
+
+class _FakeExecutor:
+    async def provider_info(self, attribute):
+        return "stub", "1"
+
+
+@pytest.fixture(autouse=True)
+def fake_executor(monkeypatch):
+    monkeypatch.setattr(staleness, "analysis_executor", _FakeExecutor())
+
+
+async def _archive(sessions, photographs=5, without_file=()) -> list[int]:
+    """One collection → box → roll with n photographs; returns their ids."""
+    async with sessions() as session:
+        collection = CollectionModel(name="Gerstmann")
+        session.add(collection)
+        await session.flush()
+        box = BoxModel(collection_id=collection.id, box_number=1)
+        session.add(box)
+        await session.flush()
+        roll = RollModel(box_id=box.id)
+        session.add(roll)
+        await session.flush()
+        ids = []
+        for frame in range(photographs):
+            photo = PhotographModel(roll_id=roll.id, frame_number=frame)
+            session.add(photo)
+            await session.flush()
+            if frame not in without_file:
+                session.add(PhotographFileModel(
+                    photograph_id=photo.id, file_type=FileType.JPG,
+                    file_path=f"/tmp/{frame}.jpg", is_master=True,
+                ))
+            ids.append(photo.id)
+        await session.commit()
+        return ids
+
+
+async def _campaign(sessions, attribute_types, concurrency=2) -> int:
+    async with sessions() as session:
+        campaign = AnalysisCampaignModel(
+            scope_type=CampaignScope.COLLECTION, scope_id=1,
+            attribute_types=[a.value for a in attribute_types],
+            concurrency=concurrency, status=CampaignStatus.PLANNING,
+        )
+        session.add(campaign)
+        await session.commit()
+        return campaign.id
+
+
+async def _jobs(sessions, campaign_id) -> list[AnalysisJobModel]:
+    async with sessions() as session:
+        result = await session.execute(
+            select(AnalysisJobModel).where(AnalysisJobModel.campaign_id == campaign_id)
+        )
+        return list(result.scalars().all())
+
+
+class TestPlanCampaign:
+
+    async def test_skips_current_records_and_photographs_without_files(self, sessions):
+        ids = await _archive(sessions, photographs=4, without_file=(3,))
+        async with sessions() as session:
+            session.add(AttrChronologyDatingModel(
+                photograph_id=ids[0], status=AttributeStatus.ACTIVE,
+                analysis_provider="stub", provider_version="1",
+            ))
+            session.add(AttrChronologyDatingModel(
+                photograph_id=ids[1], status=AttributeStatus.ACTIVE,
+                analysis_provider="stub", provider_version="0",
+            ))
+            await session.commit()
+        campaign_id = await _campaign(sessions, [CHRONO])
+
+        async with sessions() as session:
+            campaign = await session.get(AnalysisCampaignModel, campaign_id)
+            assert await plan_campaign(session, campaign) == 2
+            assert campaign.status == CampaignStatus.RUNNING
+            assert (campaign.total_photographs, campaign.skipped) == (4, 2)
+
+        jobs = await _jobs(sessions, campaign_id)
+        assert sorted(j.photograph_id for j in jobs) == [ids[1], ids[2]]
+        assert {j.status for j in jobs} == {JobStatus.PENDING}
+
+    async def test_replanning_does_not_duplicate_jobs(self, sessions):
+        await _archive(sessions, photographs=3)
+        campaign_id = await _campaign(sessions, [CHRONO, TECHNICAL])
+        async with sessions() as session:
+            campaign = await session.get(AnalysisCampaignModel, campaign_id)
+            assert await plan_campaign(session, campaign) == 6
+            assert await plan_campaign(session, campaign) == 0
+        assert len(await _jobs(sessions, campaign_id)) == 6
+
+
+class TestAnalysisCampaignRunner:
+
+    async def test_runs_to_completion_within_concurrency(self, sessions):
+        await _archive(sessions, photographs=6)
+        in_flight, peak = 0, 0
+
+        async def run(session, photograph_id, triggered_by, job_id):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            job = await session.get(AnalysisJobModel, job_id)
+            job.status = JobStatus.COMPLETED
+
+        queue = AnalysisJobQueue(
+            session_factory=sessions, runners={CHRONO: run},
+            workers=4, max_attempts=1, backoff_seconds=0,
+        )
+        runner = AnalysisCampaignRunner(queue=queue, session_factory=sessions, poll_seconds=0.05)
+        await queue.start()
+        async with sessions() as session:
+            campaign = await runner.create(
+                session, CampaignScope.COLLECTION, 1, [CHRONO], triggered_by=None, concurrency=2,
+            )
+        await runner.wait(campaign.id, timeout=10)
+        await runner.stop()
+        await queue.stop()
+
+        async with sessions() as session:
+            campaign = await session.get(AnalysisCampaignModel, campaign.id)
+            progress = await campaign_progress(session, campaign)
+        assert campaign.status == CampaignStatus.COMPLETED
+        assert progress["completed"] == 6
+        assert progress["eta_seconds"] is None
+        assert peak <= 2
+
+    async def test_start_resumes_interrupted_campaign(self, sessions):
+        await _archive(sessions, photographs=3)
+        campaign_id = await _campaign(sessions, [CHRONO])
+        async with sessions() as session:
+            await plan_campaign(session, await session.get(AnalysisCampaignModel, campaign_id))
+            first = (await session.execute(
+                select(AnalysisJobModel).where(AnalysisJobModel.campaign_id == campaign_id)
+            )).scalars().first()
+            first.status = JobStatus.RUNNING  # killed mid-analysis
+            await session.commit()
+
+        async def run(session, photograph_id, triggered_by, job_id):
+            job = await session.get(AnalysisJobModel, job_id)
+            job.status = JobStatus.COMPLETED
+
+        queue = AnalysisJobQueue(
+            session_factory=sessions, runners={CHRONO: run},
+            workers=2, max_attempts=1, backoff_seconds=0,
+        )
+        runner = AnalysisCampaignRunner(queue=queue, session_factory=sessions, poll_seconds=0.05)
+        await queue.start()
+        await runner.start()
+        await runner.wait(campaign_id, timeout=10)
+        await runner.stop()
+        await queue.stop()
+
+        jobs = await _jobs(sessions, campaign_id)
+        assert [j.status for j in jobs] == [JobStatus.COMPLETED] * 3
+
+    async def test_cancel_cancels_pending_jobs(self, sessions):
+        await _archive(sessions, photographs=3)
+        campaign_id = await _campaign(sessions, [CHRONO])
+        async with sessions() as session:
+            await plan_campaign(session, await session.get(AnalysisCampaignModel, campaign_id))
+
+        queue = AnalysisJobQueue(session_factory=sessions, runners={}, workers=1)
+        runner = AnalysisCampaignRunner(queue=queue, session_factory=sessions)
+        campaign = await runner.cancel(campaign_id)
+
+        assert campaign.status == CampaignStatus.CANCELLED
+        assert {j.status for j in await _jobs(sessions, campaign_id)} == {JobStatus.CANCELLED}
@@ -0,0 +1,59 @@
+"""
+Unit tests for the CLIP prompt-set cache key (no torch required) and the
+cached text embeddings (randomly initialized weights; skipped without
+torch / open_clip).
+"""
+
+import pytest
+
+from app.infrastructure.analysis.providers.attr02 import clip_temporal_analyzer as clip
+
+
+class TestPromptSetHash:
+
+    def test_hash_is_stable(self):
+        assert clip.CLIPTemporalAnalyzer.prompt_set_hash() == clip.CLIPTemporalAnalyzer.prompt_set_hash()
+
+    def test_hash_changes_with_templates(self, monkeypatch):
+        before = clip.CLIPTemporalAnalyzer.prompt_set_hash()
+        monkeypatch.setattr(clip, "_TEMPLATES", clip._TEMPLATES + ["a vintage photo from the {}"])
+        assert clip.CLIPTemporalAnalyzer.prompt_set_hash() != before
+
+    def test_hash_changes_with_model(self, monkeypatch):
+        before = clip.CLIPTemporalAnalyzer.prompt_set_hash()
+        monkeypatch.setattr(clip, "_MODEL_NAME", "ViT-L-14")
+        assert clip.CLIPTemporalAnalyzer.prompt_set_hash() != before
+
+
+class TestTextFeatureCache:
+
+    @pytest.fixture
+    def clip_model(self, monkeypatch, tmp_path):
+        pytest.importorskip("torch")
+        pytest.importorskip("open_clip")
+        monkeypatch.setattr(clip, "_PRETRAINED", None)
+        monkeypatch.setattr(clip, "_CACHE_DIR", tmp_path / "clip")
+
+    def test_cache_hit_skips_text_encoding(self, clip_model, monkeypatch):
+        import torch
+
+        first = clip.CLIPTemporalAnalyzer()
+        [cached] = list(clip._CACHE_DIR.iterdir())
+        assert clip.CLIPTemporalAnalyzer.prompt_set_hash() in cached.name
+
+        monkeypatch.setattr(clip.CLIPTemporalAnalyzer, "_encode_prompts", pytest.fail)
+        second = clip.CLIPTemporalAnalyzer()
+        assert torch.equal(second._txt_features, first._txt_features)
+        assert second._txt_features.shape[0] == len(clip._DECADES)
+
+    def test_inference_does_not_encode_text(self, clip_model, monkeypatch):
+        from PIL import Image
+
+        from app.infrastructure.analysis.image_decoding import DecodedImage
+
+        analyzer = clip.CLIPTemporalAnalyzer()
+        monkeypatch.setattr(analyzer._model, "encode_text", pytest.fail)
+        image = Image.new("RGB", (64, 48), (120, 90, 60))
+        decoded = DecodedImage(file_path="x.jpg", width_px=64, height_px=48, mode="RGB", image=image)
+        [result] = analyzer.analyze_images([decoded])
+        assert result["error"] is None
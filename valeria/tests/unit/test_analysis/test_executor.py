@@ -0,0 +1,66 @@
+"""
+Unit tests for the off-event-loop analysis executor (stub analyzers).
+"""
+
+import asyncio
+import time
+
+from PIL import Image
+
+from app.infrastructure.analysis.executor import TECHNICAL, AnalysisExecutor
+
+
+class TestAnalysisExecutor:
+
+    async def test_blocking_work_does_not_stall_the_loop(self):
+        executor = AnalysisExecutor(mode="thread", max_workers=1)
+        ticks = 0
+
+        async def heartbeat():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        beat = asyncio.create_task(heartbeat())
+        try:
+            await executor.run(time.sleep, 0.3)
+        finally:
+            beat.cancel()
+            executor.shutdown()
+        assert ticks >= 10
+
+    async def test_thread_mode_runs_stub_analyzer(self, tmp_path):
+        executor = AnalysisExecutor(mode="thread", max_workers=2)
+        try:
+            name, _ = await executor.provider_info("chronology")
+            result = await executor.analyze("chronology", str(tmp_path / "missing.jpg"))
+        finally:
+            executor.shutdown()
+        assert name == "stub"
+        assert result["provider"] == "stub"
+
+    async def test_technical_slot_uses_pillow(self, tmp_path):
+        path = tmp_path / "master.jpg"
+        Image.new("RGB", (64, 48)).save(path)
+        executor = AnalysisExecutor(mode="thread", max_workers=1)
+        try:
+            result = await executor.analyze(TECHNICAL, str(path))
+        finally:
+            executor.shutdown()
+        assert result["error"] is None
+        assert (result["width_px"], result["height_px"]) == (64, 48)
+
+    async def test_process_mode_returns_plain_results(self, tmp_path):
+        path = tmp_path / "master.jpg"
+        Image.new("RGB", (32, 16)).save(path)
+        executor = AnalysisExecutor(mode="process", max_workers=1, torch_threads=1)
+        try:
+            results = await asyncio.gather(
+                executor.analyze(TECHNICAL, str(path)),
+                executor.analyze("environmental", str(path)),
+            )
+        finally:
+            executor.shutdown()
+        assert results[0]["width_px"] == 32
+        assert results[1]["provider"] == "stub"
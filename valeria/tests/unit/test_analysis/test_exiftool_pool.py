@@ -0,0 +1,169 @@
+"""
+Unit tests for the persistent ExifTool worker pool.
+
+ExifTool itself is not required: a small script speaking the same
+`-stay_open True -@ -` protocol stands in for it.
+"""
+
+import stat
+import sys
+import textwrap
+
+import pytest
+
+from app.infrastructure.analysis.exiftool_pool import (
+    ExifToolError,
+    ExifToolPool,
+    ExifToolProcess,
+    file_argument,
+)
+
+_FAKE_EXIFTOOL = textwrap.dedent('''\
+    #!{python}
+    import json, os, sys, time
+    args, echo = [], None
+    lines = iter(sys.stdin.readline, "")
+    for line in lines:
+        line = line.rstrip("\\n")
+        if line == "-stay_open":
+            next(lines)
+            break
+        if line == "-echo4":
+            echo = next(lines).rstrip("\\n")
+            continue
+        if line.startswith("-execute"):
+            seq = line[len("-execute"):]
+            found = []
+            for path in args:
+                if path.startswith("-"):
+                    continue
+                if "slow" in path:
+                    time.sleep(5)
+                if "crash" in path:
+                    sys.exit(1)
+                if os.path.exists(path):
+                    found.append({{"SourceFile": path, "Make": "Canon", "ImageWidth": 6000, "Pid": os.getpid()}})
+                else:
+                    sys.stderr.write("Error: File not found - " + path + "\\n")
+            if found:
+                sys.stdout.write(json.dumps(found, indent=1) + "\\n")
+            sys.stdout.write("{{ready" + seq + "}}\\n")
+            sys.stdout.flush()
+            sys.stderr.write((echo or "") + "\\n")
+            sys.stderr.flush()
+            args, echo = [], None
+            continue
+        args.append(line)
+''')
+
+
+@pytest.fixture
+def fake_exiftool(tmp_path):
+    script = tmp_path / "exiftool"
+    script.write_text(_FAKE_EXIFTOOL.format(python=sys.executable))
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    return str(script)
+
+
+@pytest.fixture
+def raw_files(tmp_path):
+    paths = []
+    for name in ("a.cr3", "b.cr3"):
+        path = tmp_path / name
+        path.write_bytes(b"raw")
+        paths.append(str(path))
+    return paths
+
+
+class TestExifToolPool:
+
+    def test_worker_is_reused_across_requests(self, fake_exiftool, raw_files):
+        pool = ExifToolPool(size=1, executable=fake_exiftool, timeout=5)
+        try:
+            first = pool.get_metadata(raw_files[0])
+            second = pool.get_metadata(raw_files[1])
+        finally:
+            pool.close()
+        assert first["Make"] == "Canon"
+        assert first["Pid"] == second["Pid"]
+
+    def test_batch_is_aligned_with_input(self, fake_exiftool, raw_files, tmp_path):
+        pool = ExifToolPool(size=1, executable=fake_exiftool, timeout=5)
+        missing = str(tmp_path / "missing.cr3")
+        try:
+            entries = pool.get_metadata_batch([raw_files[0], missing, raw_files[1]])
+        finally:
+            pool.close()
+        assert [e and e["SourceFile"] for e in entries] == [raw_files[0], None, raw_files[1]]
+
+    def test_missing_file_reports_exiftool_error(self, fake_exiftool, tmp_path):
+        pool = ExifToolPool(size=1, executable=fake_exiftool, timeout=5)
+        try:
+            with pytest.raises(ExifToolError, match="File not found"):
+                pool.get_metadata(str(tmp_path / "missing.cr3"))
+        finally:
+            pool.close()
+
+    def test_timeout_replaces_worker(self, fake_exiftool, raw_files, tmp_path):
+        slow = tmp_path / "slow.cr3"
+        slow.write_bytes(b"raw")
+        pool = ExifToolPool(size=1, executable=fake_exiftool, timeout=0.5)
+        try:
+            with pytest.raises(TimeoutError):
+                pool.get_metadata(str(slow))
+            assert pool.get_metadata(raw_files[0])["Make"] == "Canon"
+            assert pool.restarts == 1
+        finally:
+            pool.close()
+
+    def test_dead_worker_is_restarted(self, fake_exiftool, raw_files, tmp_path):
+        crash = tmp_path / "crash.cr3"
+        crash.write_bytes(b"raw")
+        pool = ExifToolPool(size=1, executable=fake_exiftool, timeout=5)
+        try:
+            pid = pool.get_metadata(raw_files[0])["Pid"]
+            with pytest.raises(ExifToolError):
+                pool.get_metadata(str(crash))
+            # The crashing file is not retried on a second worker
+            assert pool.restarts == 1
+            assert pool.get_metadata(raw_files[0])["Pid"] != pid
+        finally:
+            pool.close()
+
+    def test_unexpected_error_discards_worker(self, fake_exiftool, raw_files, monkeypatch):
+        pool = ExifToolPool(size=1, executable=fake_exiftool, timeout=5)
+        execute = ExifToolProcess.execute
+
+        def garbled(self, args, timeout):
+            monkeypatch.setattr(ExifToolProcess, "execute", execute)
+            raise UnicodeDecodeError("utf-8", b"\xff", 0, 1, "invalid start byte")
+
+        monkeypatch.setattr(ExifToolProcess, "execute", garbled)
+        try:
+            with pytest.raises(UnicodeDecodeError):
+                pool.get_metadata(raw_files[0])
+            # The only worker slot is free again instead of leaking
+            assert pool.restarts == 1
+            assert pool.get_metadata(raw_files[0])["Make"] == "Canon"
+        finally:
+            pool.close()
+
+    def test_file_names_starting_with_dash(self, fake_exiftool, tmp_path, monkeypatch):
+        (tmp_path / "-x.cr3").write_bytes(b"raw")
+        monkeypatch.chdir(tmp_path)
+        pool = ExifToolPool(size=1, executable=fake_exiftool, timeout=5)
+        try:
+            assert pool.get_metadata("-x.cr3")["SourceFile"] == "./-x.cr3"
+            [entry] = pool.get_metadata_batch(["-x.cr3"])
+            assert entry["Make"] == "Canon"
+        finally:
+            pool.close()
+        assert file_argument("/archive/-x.cr3") == "/archive/-x.cr3"
+        with pytest.raises(ExifToolError, match="line breaks"):
+            file_argument("a.cr3\n-delete_original")
+
+    def test_missing_executable_raises_file_not_found(self, tmp_path):
+        pool = ExifToolPool(size=1, executable=str(tmp_path / "no-exiftool"), timeout=1)
+        with pytest.raises(FileNotFoundError):
+            pool.get_metadata("x.cr3")
+        assert pool.restarts == 0
@@ -0,0 +1,117 @@
+"""
+Unit tests for the GeoCLIP regional gallery prior. The analyzer test uses a
+tiny stand-in model (the geoclip package and its weights are not needed).
+"""
+
+import json
+
+import numpy as np
+import pytest
+
+from app.infrastructure.analysis.providers.attr03.region_prior import (
+    region_fingerprint,
+    restrict_gallery,
+)
+
+GALLERY = np.array([
+    [-33.45, -70.66],   # Santiago
+    [-23.65, -70.40],   # Antofagasta
+    [-16.50, -68.15],   # La Paz
+    [48.85, 2.35],      # Paris
+    [35.68, 139.69],    # Tokyo
+])
+
+
+class TestRestrictGallery:
+
+    def test_empty_spec_keeps_worldwide_gallery(self):
+        assert restrict_gallery(GALLERY, "") is GALLERY
+
+    def test_bounding_box(self):
+        subset = restrict_gallery(GALLERY, "-56,-82,-10,-60")
+        assert subset.tolist() == GALLERY[:3].tolist()
+
+    def test_geojson_polygon_with_hole(self, tmp_path):
+        outer = [[-80, -56], [-60, -56], [-60, -10], [-80, -10], [-80, -56]]
+        hole = [[-71, -34], [-70, -34], [-70, -33], [-71, -33], [-71, -34]]
+        path = tmp_path / "andes.geojson"
+        path.write_text(json.dumps({
+            "type": "FeatureCollection",
+            "features": [{"type": "Feature", "geometry": {"type": "Polygon", "coordinates": [outer, hole]}}],
+        }))
+        subset = restrict_gallery(GALLERY, str(path))
+        assert subset.tolist() == GALLERY[1:3].tolist()
+
+    def test_precomputed_csv_replaces_gallery(self, tmp_path):
+        path = tmp_path / "chile.csv"
+        path.write_text("LAT,LON\n-33.45,-70.66\n-41.47,-72.94\n")
+        assert restrict_gallery(GALLERY, str(path)).tolist() == [[-33.45, -70.66], [-41.47, -72.94]]
+
+    def test_region_without_candidates_is_rejected(self):
+        with pytest.raises(ValueError):
+            restrict_gallery(GALLERY, "80,0,85,10")
+
+    def test_fingerprint_tracks_file_contents(self, tmp_path):
+        path = tmp_path / "chile.csv"
+        path.write_text("LAT,LON\n-33.45,-70.66\n")
+        before = region_fingerprint(str(path))
+        path.write_text("LAT,LON\n-41.47,-72.94\n")
+        assert region_fingerprint(str(path)) != before
+        assert region_fingerprint("") == ""
+
+
+class TestGeoCLIPRegionalPrediction:
+
+    def _analyzer(self):
+        torch = pytest.importorskip("torch")
+        import torch.nn.functional as F
+        from torch import nn
+        from app.infrastructure.analysis.providers.attr03.geoclip_analyzer import GeoCLIPAnalyzer
+
+        class ImageEncoder(nn.Linear):
+            def preprocess_image(self, image):
+                return torch.tensor(np.asarray(image, dtype=np.float32).mean(axis=(0, 1)) / 255).unsqueeze(0)
+
+        class TinyGeoCLIP(nn.Module):
+            def __init__(self):
+                super().__init__()
+                torch.manual_seed(0)
+                self.image_encoder = ImageEncoder(3, 8)
+                self.location_encoder = nn.Linear(2, 8)
+                self.logit_scale = nn.Parameter(torch.tensor(2.0))
+                self.register_buffer("gps_gallery", torch.tensor(GALLERY, dtype=torch.float32))
+
+            def forward(self, image, location):
+                image_features = F.normalize(self.image_encoder(image), dim=1)
+                location_features = F.normalize(self.location_encoder(location), dim=1)
+                return self.logit_scale.exp() * (image_features @ location_features.t())
+
+        analyzer = GeoCLIPAnalyzer.__new__(GeoCLIPAnalyzer)
+        analyzer._model = TinyGeoCLIP().eval()
+        return torch, analyzer
+
+    def test_worldwide_matches_geoclip_forward(self):
+        from PIL import Image
+
+        torch, analyzer = self._analyzer()
+        analyzer._load_gallery("")
+        image = Image.new("RGB", (16, 16), (200, 120, 40))
+        model = analyzer._model
+        with torch.no_grad():
+            expected = model.forward(model.image_encoder.preprocess_image(image), model.gps_gallery).softmax(-1)
+        top_gps, top_prob = analyzer._predict(image, top_k=3)
+
+        assert top_prob.tolist() == pytest.approx(torch.topk(expected, 3).values[0].tolist(), abs=1e-6)
+        assert analyzer.provider_version == "1"
+
+    def test_region_limits_candidates_and_versions_results(self):
+        from PIL import Image
+
+        _, analyzer = self._analyzer()
+        analyzer._load_gallery("-56,-82,-10,-60")
+        result = analyzer._analyze_rgb(Image.new("RGB", (16, 16), (10, 200, 90)))
+
+        assert result["error"] is None
+        assert all(-56 <= r["lat"] <= -10 for r in result["raw_output"])
+        assert sum(r["prob"] for r in result["raw_output"]) == pytest.approx(1.0, abs=1e-3)
+        assert result["provider_version"].startswith("1+region-")
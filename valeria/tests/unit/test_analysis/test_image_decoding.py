@@ -0,0 +1,143 @@
+"""
+Unit tests for the shared single-decode stage.
+"""
+
+import zlib
+
+import numpy as np
+import pytest
+from PIL import Image, TiffImagePlugin
+
+from app.infrastructure.analysis import pillow_analyzer
+from app.infrastructure.analysis.image_decoding import (
+    DecodedImageCache,
+    _band_tiff,
+    decode_image,
+    iter_full_resolution,
+)
+
+
+@pytest.fixture
+def jpeg_path(tmp_path):
+    path = tmp_path / "master.jpg"
+    img = Image.new("L", (1200, 800), color=128)
+    exif = Image.Exif()
+    exif[271] = "Canon"
+    exif[272] = "EOS R5"
+    img.save(path, exif=exif)
+    return str(path)
+
+
+class TestDecodeImage:
+
+    def test_keeps_original_properties(self, jpeg_path):
+        decoded = decode_image(jpeg_path, max_side=300)
+        assert (decoded.width_px, decoded.height_px) == (1200, 800)
+        assert decoded.mode == "L"
+        assert decoded.exif[271] == "Canon"
+
+    def test_working_copy_is_bounded_rgb(self, jpeg_path):
+        decoded = decode_image(jpeg_path, max_side=300)
+        assert max(decoded.image.size) <= 300
+        assert decoded.image.mode == "RGB"
+
+
+class TestDecodedImageCache:
+
+    def test_second_get_reuses_decode(self, jpeg_path):
+        cache = DecodedImageCache(capacity=2)
+        assert cache.get(jpeg_path) is cache.get(jpeg_path)
+
+    def test_missing_file_returns_none(self, tmp_path):
+        assert DecodedImageCache(capacity=2).get(str(tmp_path / "nope.jpg")) is None
+
+    def test_capacity_evicts_oldest(self, tmp_path):
+        cache = DecodedImageCache(capacity=1)
+        paths = []
+        for name in ("a.jpg", "b.jpg"):
+            path = tmp_path / name
+            Image.new("RGB", (10, 10)).save(path)
+            paths.append(str(path))
+        first = cache.get(paths[0])
+        cache.get(paths[1])
+        assert cache.get(paths[0]) is not first
+
+
+class TestPillowAnalyzeDecoded:
+
+    def test_matches_path_based_analysis(self, jpeg_path):
+        from_path = pillow_analyzer.analyze(jpeg_path)
+        from_decoded = pillow_analyzer.analyze_decoded(decode_image(jpeg_path))
+        assert from_decoded == from_path
+        assert from_decoded["manufacturer"] == "Canon"
+
+
+def _scan() -> Image.Image:
+    """400x300 RGB with smooth gradients (lossy codecs stay close)."""
+    return Image.merge("RGB", [
+        Image.linear_gradient("L").resize((400, 300)),
+        Image.radial_gradient("L").resize((400, 300)),
+        Image.linear_gradient("L").rotate(90).resize((400, 300)),
+    ])
+
+
+class TestMemoryBoundedDecode:
+
+    def test_banded_tiff_matches_full_decode(self, tmp_path):
+        path = str(tmp_path / "scan.tif")
+        Image.linear_gradient("L").resize((800, 600)).convert("RGB").save(path)
+        full = decode_image(path, max_side=100, memory_budget=10**9).image
+        banded = decode_image(path, max_side=100, memory_budget=20_000).image
+        assert banded.size == full.size
+        diff = [abs(a - b) for a, b in zip(full.convert("L").getdata(), banded.convert("L").getdata())]
+        assert sum(diff) / len(diff) < 2
+
+    def test_16bit_grayscale_is_scaled_not_clipped(self, tmp_path):
+        path = str(tmp_path / "scan16.tif")
+        Image.linear_gradient("L").resize((400, 300)).convert("I").point(lambda v: v * 256).convert("I;16").save(path)
+        for budget in (10**9, 20_000):
+            low, high = decode_image(path, max_side=64, memory_budget=budget).image.convert("L").getextrema()
+            assert low < 32 and high > 200
+
+    def test_pyramidal_tiff_reads_reduced_page(self, tmp_path):
+        path = str(tmp_path / "pyramid.tif")
+        base = Image.new("RGB", (800, 600), "red")
+        base.save(path, save_all=True, append_images=[base.resize((200, 150)), base.resize((100, 75))])
+        decoded = decode_image(path, max_side=150, memory_budget=200 * 150 * 4)
+        assert (decoded.width_px, decoded.height_px) == (800, 600)
+        assert max(decoded.image.size) <= 150
+
+    @pytest.mark.parametrize("compression", ["tiff_lzw", "tiff_adobe_deflate", "packbits", "jpeg"])
+    def test_compressed_strips_are_decoded_in_bands(self, tmp_path, compression):
+        path = str(tmp_path / "scan.tif")
+        _scan().save(path, compression=compression, tiffinfo={278: 16})
+        full = decode_image(path, max_side=100, memory_budget=10**9).image
+        banded = decode_image(path, max_side=100, memory_budget=120_000).image
+        assert banded.size == full.size
+        assert np.abs(np.asarray(banded, dtype=int) - np.asarray(full, dtype=int)).mean() < 2
+
+        # Bands of the full-resolution stream are exactly band_rows high
+        rows = [(top, band.height) for top, band in iter_full_resolution(path, 7, memory_budget=120_000)]
+        assert rows == [(top, min(7, 300 - top)) for top in range(0, 300, 7)]
+
+    def test_compressed_tiles_are_decoded_by_tile_row(self, tmp_path):
+        source = np.asarray(_scan())
+        padded = np.pad(source, ((0, 20), (0, 16), (0, 0)))  # whole 32x32 tiles
+        tiles = [
+            zlib.compress(np.ascontiguousarray(padded[y:y + 32, x:x + 32]).tobytes())
+            for y in range(0, 300, 32) for x in range(0, 400, 32)
+        ]
+        tags = TiffImagePlugin.ImageFileDirectory_v2()
+        for tag, value in {258: (8, 8, 8), 259: 8, 262: 2, 277: 3, 284: 1, 322: 32, 323: 32}.items():
+            tags[tag] = value
+        path = tmp_path / "tiled.tif"
+        path.write_bytes(_band_tiff(tags, 400, 300, tiles, tiled=True))
+
+        bands = list(iter_full_resolution(str(path), 50, memory_budget=150_000))
+        assert np.array_equal(np.concatenate([np.asarray(band) for _, band in bands]), source)
+
+    def test_single_compressed_strip_over_budget_raises(self, tmp_path):
+        path = str(tmp_path / "scan.tif")
+        Image.new("RGB", (800, 600)).save(path, compression="tiff_lzw", tiffinfo={278: 600})
+        with pytest.raises(MemoryError):
+            decode_image(path, max_side=100, memory_budget=20_000)
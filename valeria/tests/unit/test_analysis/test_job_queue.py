@@ -0,0 +1,195 @@
+"""
+Unit tests for the background analysis job queue (SQLite in a temp file).
+"""
+
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.future import select
+
+from app.features.analysis.infrastructure.adapters.job_queue import AnalysisJobQueue
+from app.features.analysis.infrastructure.persistence.analysis_model import (
+    AnalysisJobModel,
+    AnalysisAttributeType,
+    JobStatus,
+)
+from app.features.archive.interfaces.api import routes
+from app.features.authenticate.interfaces.api.dependencies import get_current_user_id
+from app.infrastructure.database.session import get_db
+
+
+async def _job(sessions, job_id) -> AnalysisJobModel:
+    async with sessions() as session:
+        return (await session.execute(
+            select(AnalysisJobModel).where(AnalysisJobModel.id == job_id)
+        )).scalar_one()
+
+
+def _runner(behaviour):
+    async def run(session, photograph_id, triggered_by, job_id):
+        job = (await session.execute(
+            select(AnalysisJobModel).where(AnalysisJobModel.id == job_id)
+        )).scalar_one()
+        await behaviour(job)
+        job.status = JobStatus.COMPLETED
+    return run
+
+
+class TestAnalysisJobQueue:
+
+    async def test_submit_runs_jobs_to_completion(self, sessions):
+        async def ok(job):
+            pass
+
+        queue = AnalysisJobQueue(
+            session_factory=sessions,
+            runners={AnalysisAttributeType.TECHNICAL: _runner(ok)},
+            workers=2, max_attempts=1, backoff_seconds=0,
+        )
+        await queue.start()
+        async with sessions() as session:
+            jobs = await queue.submit(session, 1, [AnalysisAttributeType.TECHNICAL], triggered_by=None)
+        await queue.join()
+        await queue.stop()
+
+        job = await _job(sessions, jobs[0].id)
+        assert job.status == JobStatus.COMPLETED
+        assert job.attempts == 1
+
+    async def test_retries_then_fails(self, sessions):
+        calls = []
+
+        async def boom(job):
+            calls.append(job.id)
+            raise RuntimeError("modelo no disponible")
+
+        queue = AnalysisJobQueue(
+            session_factory=sessions,
+            runners={AnalysisAttributeType.CHRONOLOGY: _runner(boom)},
+            workers=1, max_attempts=3, backoff_seconds=0.01,
+        )
+        await queue.start()
+        async with sessions() as session:
+            jobs = await queue.submit(session, 1, [AnalysisAttributeType.CHRONOLOGY], triggered_by=None)
+        await queue.join()
+        await queue.stop()
+
+        job = await _job(sessions, jobs[0].id)
+        assert len(calls) == 3
+        assert job.status == JobStatus.FAILED
+        assert job.attempts == 3
+        assert job.error_message == "modelo no disponible"
+
+    async def test_cancel_running_job(self, sessions):
+        started = asyncio.Event()
+
+        async def slow(job):
+            started.set()
+            await asyncio.sleep(10)
+
+        queue = AnalysisJobQueue(
+            session_factory=sessions,
+            runners={AnalysisAttributeType.GEOGRAPHIC: _runner(slow)},
+            workers=1, max_attempts=1, backoff_seconds=0,
+        )
+        await queue.start()
+        events = queue.subscribe(1)
+        async with sessions() as session:
+            jobs = await queue.submit(session, 1, [AnalysisAttributeType.GEOGRAPHIC], triggered_by=None)
+        await asyncio.wait_for(started.wait(), timeout=5)
+        await queue.cancel(jobs[0].id)
+        await asyncio.wait_for(queue.join(), timeout=5)
+        await queue.stop()
+
+        job = await _job(sessions, jobs[0].id)
+        assert job.status == JobStatus.CANCELLED
+        statuses = []
+        while not events.empty():
+            statuses.append(events.get_nowait()["status"])
+        assert statuses == ["queued", "running", "cancelled"]
+
+    async def test_start_recovers_unfinished_jobs(self, sessions):
+        async with sessions() as session:
+            session.add(AnalysisJobModel(
+                photograph_id=1, attribute_type=AnalysisAttributeType.TECHNICAL,
+                tool_name="pillow", status=JobStatus.RUNNING, attempts=1,
+            ))
+            await session.commit()
+
+        async def ok(job):
+            pass
+
+        queue = AnalysisJobQueue(
+            session_factory=sessions,
+            runners={AnalysisAttributeType.TECHNICAL: _runner(ok)},
+            workers=1, max_attempts=3, backoff_seconds=0,
+        )
+        await queue.start()
+        await queue.join()
+        await queue.stop()
+
+        job = await _job(sessions, 1)
+        assert job.status == JobStatus.COMPLETED
+        assert job.attempts == 2
+
+    async def test_script_queue_leaves_other_processes_jobs(self, sessions):
+        async with sessions() as session:
+            for status, campaign_id in ((JobStatus.RUNNING, None), (JobStatus.QUEUED, 7), (JobStatus.RUNNING, 7)):
+                session.add(AnalysisJobModel(
+                    photograph_id=1, attribute_type=AnalysisAttributeType.TECHNICAL,
+                    tool_name="pillow", status=status, attempts=1, campaign_id=campaign_id,
+                ))
+            await session.commit()
+
+        async def ok(job):
+            pass
+
+        queue = AnalysisJobQueue(
+            session_factory=sessions,
+            runners={AnalysisAttributeType.TECHNICAL: _runner(ok)},
+            workers=1, max_attempts=3, backoff_seconds=0,
+        )
+        await queue.start(recover=False)
+        # The campaign's queued job runs; RUNNING ones may be another process's
+        assert await queue.recover(7, include_running=False) == 1
+        async with sessions() as session:
+            mine = await queue.submit(session, 2, [AnalysisAttributeType.TECHNICAL], triggered_by=None)
+        await queue.join()
+        await queue.stop()
+
+        statuses = [(await _job(sessions, job_id)).status for job_id in (1, 2, 3, mine[0].id)]
+        assert statuses == [JobStatus.RUNNING, JobStatus.COMPLETED, JobStatus.RUNNING, JobStatus.COMPLETED]
+
+
+class TestJobRoutes:
+
+    async def test_cancel_returns_the_same_fields_as_the_list(self, sessions, monkeypatch):
+        async with sessions() as session:
+            session.add(AnalysisJobModel(
+                id=1, photograph_id=1, attribute_type=AnalysisAttributeType.TECHNICAL,
+                tool_name="pillow", status=JobStatus.QUEUED, cache_hit=True,
+                decode_ms=1.5, input_pixels=64 * 48,
+            ))
+            await session.commit()
+        monkeypatch.setattr(routes, "analysis_queue", AnalysisJobQueue(session_factory=sessions, runners={}))
+
+        async def db():
+            async with sessions() as session:
+                yield session
+
+        app = FastAPI()
+        app.include_router(routes.router)
+        app.dependency_overrides[get_db] = db
+        app.dependency_overrides[get_current_user_id] = lambda: 1
+        app.dependency_overrides[routes._require_write_access] = lambda: 1
+        client = TestClient(app)
+
+        cancelled = client.post("/archive/jobs/1/cancel").json()
+        [listed] = client.get("/archive/photographs/1/jobs").json()
+        # SQLite drops the time zone of the stored completed_at
+        assert cancelled.pop("completed_at").startswith(listed.pop("completed_at"))
+        assert cancelled == listed
+        assert cancelled["status"] == "cancelled"
+        assert cancelled["cache_hit"] is True and cancelled["decode_ms"] == 1.5
@@ -0,0 +1,108 @@
+"""
+Unit tests for the versioned model artifact cache (file:// URLs, no network).
+"""
+
+import hashlib
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from app.infrastructure.analysis.model_artifacts import (  # noqa: E402
+    ArtifactChecksumError,
+    ModelArtifactStore,
+)
+
+
+def _store(tmp_path, entries, **kwargs) -> ModelArtifactStore:
+    manifest = tmp_path / "manifest.json"
+    manifest.write_text(json.dumps(entries))
+    return ModelArtifactStore(root=tmp_path / "models", manifest_path=manifest, **kwargs)
+
+
+def _entry(source: Path, kind="file", sha256=None) -> dict:
+    return {"version": "1", "kind": kind, "url": source.as_uri(), "filename": source.name, "sha256": sha256}
+
+
+def _mapped(path: Path) -> bool:
+    return any(str(path) in line for line in open("/proc/self/maps"))
+
+
+class TestFetch:
+
+    def test_downloads_into_versioned_path_and_verifies(self, tmp_path):
+        source = tmp_path / "labels.txt"
+        source.write_text("abbey\nairport\n")
+        store = _store(tmp_path, {"labels": _entry(source, sha256=hashlib.sha256(source.read_bytes()).hexdigest())})
+
+        path = store.fetch("labels")
+        assert path == tmp_path / "models" / "labels" / "1" / "labels.txt"
+        assert path.read_text() == "abbey\nairport\n"
+        assert store.verify("labels") is True
+
+    def test_checksum_mismatch_leaves_nothing_behind(self, tmp_path):
+        source = tmp_path / "labels.txt"
+        source.write_text("tampered")
+        store = _store(tmp_path, {"labels": _entry(source, sha256="0" * 64)})
+
+        with pytest.raises(ArtifactChecksumError):
+            store.fetch("labels")
+        assert list((tmp_path / "models" / "labels" / "1").iterdir()) == []
+
+    def test_offline_never_downloads(self, tmp_path):
+        source = tmp_path / "labels.txt"
+        source.write_text("abbey")
+        store = _store(tmp_path, {"labels": _entry(source)}, offline=True)
+        with pytest.raises(FileNotFoundError):
+            store.fetch("labels")
+
+    def test_pin_records_checksum(self, tmp_path):
+        source = tmp_path / "labels.txt"
+        source.write_text("abbey")
+        store = _store(tmp_path, {"labels": _entry(source)})
+        checksum = store.pin("labels")
+        assert store.artifact("labels").sha256 == checksum
+        assert store.fingerprint("labels") == f"v1-{checksum[:8]}"
+
+
+class TestMemoryMappedWeights:
+
+    def test_checkpoint_is_unwrapped_and_mapped(self, tmp_path):
+        weight = torch.randn(64, 32)
+        source = tmp_path / "model.pth.tar"
+        torch.save({"epoch": 90, "state_dict": {"module.fc.weight": weight}}, source)
+        store = _store(tmp_path, {"model": _entry(source, kind="weights")}, mmap=True)
+
+        state_dict = store.state_dict("model")
+        assert list(state_dict) == ["fc.weight"]
+        assert torch.equal(state_dict["fc.weight"], weight)
+        if sys.platform.startswith("linux"):
+            assert _mapped(store.prepare("model"))
+
+    def test_places365_binds_parameters_to_the_mapped_file(self, tmp_path, monkeypatch):
+        pytest.importorskip("torchvision")
+        import torchvision.models as models
+        from app.infrastructure.analysis.providers.attr04 import places365_analyzer as places
+
+        reference = models.resnet50(num_classes=365).eval()
+        weights = tmp_path / "resnet50_places365.pth.tar"
+        torch.save({"state_dict": reference.state_dict()}, weights)
+        categories = tmp_path / "categories_places365.txt"
+        categories.write_text("".join(f"/a/category_{i} {i}\n" for i in range(365)))
+        store = _store(tmp_path, {
+            places.WEIGHTS_ARTIFACT: _entry(weights, kind="weights"),
+            places.CATEGORIES_ARTIFACT: _entry(categories),
+        }, mmap=True)
+        monkeypatch.setattr(places, "model_artifacts", store)
+
+        analyzer = places.Places365Analyzer()
+        analyzer.warm_up()
+        batch = torch.rand(2, 3, 224, 224)
+        with torch.no_grad():
+            assert torch.allclose(analyzer._model(batch), reference(batch), atol=1e-5)
+        assert analyzer._categories[0] == "category_0"
+        if sys.platform.startswith("linux"):
+            assert _mapped(store.prepare(places.WEIGHTS_ARTIFACT))
@@ -0,0 +1,79 @@
+"""
+Unit tests for the process-wide analyzer registry.
+"""
+
+import pytest
+
+from app.infrastructure.analysis.model_registry import (
+    AnalyzerRegistry,
+    CHRONOLOGY,
+    GEOGRAPHIC,
+)
+from app.infrastructure.analysis.providers.attr02.stub_analyzer import StubChronologyAnalyzer
+
+
+class TestAnalyzerRegistry:
+    """Tests for AnalyzerRegistry with the dependency-free stub providers."""
+
+    def test_get_returns_shared_instance(self):
+        registry = AnalyzerRegistry()
+        first = registry.get(CHRONOLOGY)
+        second = registry.get(CHRONOLOGY)
+        assert first is second
+        assert isinstance(first, StubChronologyAnalyzer)
+
+    def test_reload_builds_new_instance(self):
+        registry = AnalyzerRegistry()
+        first = registry.get(CHRONOLOGY)
+        entry = registry.reload(CHRONOLOGY)
+        assert entry.analyzer is not first
+        assert registry.get(CHRONOLOGY) is entry.analyzer
+
+    def test_unload(self):
+        registry = AnalyzerRegistry()
+        assert registry.unload(GEOGRAPHIC) is False
+        registry.get(GEOGRAPHIC)
+        assert registry.unload(GEOGRAPHIC) is True
+        stats = {s["attribute"]: s for s in registry.stats()}
+        assert stats[GEOGRAPHIC]["loaded"] is False
+
+    def test_stats_report_load_cost(self):
+        registry = AnalyzerRegistry()
+        registry.warm_up([CHRONOLOGY])
+        stats = {s["attribute"]: s for s in registry.stats()}
+        assert stats[CHRONOLOGY]["loaded"] is True
+        assert stats[CHRONOLOGY]["provider"] == "stub"
+        assert stats[CHRONOLOGY]["load_seconds"] >= 0
+
+    def test_provider_change_rebuilds(self):
+        registry = AnalyzerRegistry()
+        configured = {"value": "stub"}
+        built = []
+
+        def builder():
+            analyzer = StubChronologyAnalyzer()
+            built.append(analyzer)
+            return analyzer
+
+        registry.register(CHRONOLOGY, lambda: configured["value"], builder)
+        registry.get(CHRONOLOGY)
+        registry.get(CHRONOLOGY)
+        assert len(built) == 1
+        configured["value"] = "clip"
+        registry.get(CHRONOLOGY)
+        assert len(built) == 2
+
+    def test_warm_up_collects_errors(self):
+        registry = AnalyzerRegistry()
+
+        def broken():
+            raise ImportError("missing torch")
+
+        registry.register(GEOGRAPHIC, lambda: "geoclip", broken)
+        errors = registry.warm_up()
+        assert errors[GEOGRAPHIC] == "missing torch"
+        assert errors[CHRONOLOGY] is None
+
+    def test_unknown_attribute(self):
+        with pytest.raises(KeyError):
+            AnalyzerRegistry().get("unknown")
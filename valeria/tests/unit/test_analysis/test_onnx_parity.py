@@ -0,0 +1,129 @@
+"""
+Parity tests: the ONNX Runtime backend must pick the same top-1 class as the
+torch path. Randomly initialized weights are used (no downloads); skipped
+when torch / open_clip / onnxruntime are not installed.
+"""
+
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("torchvision")
+pytest.importorskip("onnxruntime")
+
+from PIL import Image  # noqa: E402
+
+from app.config.settings import settings  # noqa: E402
+from app.infrastructure.analysis import onnx_backend  # noqa: E402
+
+
+@pytest.fixture
+def images(tmp_path):
+    generator = torch.Generator().manual_seed(0)
+    paths = []
+    for i in range(6):
+        pixels = (torch.rand(96, 128, 3, generator=generator) * 255).to(torch.uint8).numpy()
+        path = tmp_path / f"img{i}.jpg"
+        Image.fromarray(pixels).save(path)
+        paths.append(str(path))
+    return paths
+
+
+@pytest.fixture(autouse=True)
+def onnx_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(onnx_backend, "_CACHE_DIR", tmp_path / "onnx")
+    monkeypatch.setattr(settings, "onnx_quantize_int8", False)
+    monkeypatch.setattr(settings, "onnx_intra_op_threads", 1)
+
+
+def _places_pair(monkeypatch, tmp_path):
+    import torchvision.models as models
+    from app.infrastructure.analysis.providers.attr04 import places365_analyzer as places
+    from app.infrastructure.analysis.providers.attr04.places365_onnx_analyzer import (
+        Places365OnnxAnalyzer,
+    )
+
+    torch.manual_seed(0)
+    model = models.resnet50(num_classes=365).eval()
+    pair = (places.Places365Analyzer(), Places365OnnxAnalyzer())
+    for analyzer in pair:
+        analyzer._model = model
+        analyzer._categories = [f"category_{i}" for i in range(365)]
+        analyzer._transform = analyzer._build_transform()
+    return pair
+
+
+class TestPlaces365OnnxParity:
+
+    def test_top1_matches_torch(self, monkeypatch, tmp_path, images):
+        torch_analyzer, onnx_analyzer = _places_pair(monkeypatch, tmp_path)
+        expected = torch_analyzer.analyze_batch(images)
+        actual = onnx_analyzer.analyze_batch(images)
+
+        assert all(r["error"] is None for r in actual)
+        assert [r["specific_typology"] for r in actual] == [r["specific_typology"] for r in expected]
+        for a, e in zip(actual, expected):
+            assert a["confidence"] == pytest.approx(e["confidence"], abs=1e-3)
+        assert actual[0]["provider_version"] == "resnet50+onnx"
+        assert onnx_analyzer._model is None
+
+    def test_cached_export_does_not_build_the_torch_model(self, monkeypatch, tmp_path, images):
+        from app.infrastructure.analysis.providers.attr04.places365_onnx_analyzer import (
+            Places365OnnxAnalyzer,
+        )
+
+        _, exported = _places_pair(monkeypatch, tmp_path)
+        exported.warm_up()
+        analyzer = Places365OnnxAnalyzer()
+        monkeypatch.setattr(analyzer, "_build_model", pytest.fail)
+        analyzer._categories = exported._categories
+        analyzer._transform = exported._transform
+        [result] = analyzer.analyze_batch(images[:1])
+
+        assert result["error"] is None and analyzer._model is None
+
+    def test_int8_keeps_the_output_contract(self, monkeypatch, tmp_path, images):
+        monkeypatch.setattr(settings, "onnx_quantize_int8", True)
+        _, onnx_analyzer = _places_pair(monkeypatch, tmp_path)
+        results = onnx_analyzer.analyze_batch(images[:2])
+
+        assert all(r["error"] is None for r in results)
+        assert results[0]["provider_version"] == "resnet50+onnx-int8"
+        assert set(results[0]) >= {"setting_type", "specific_typology", "confidence", "raw_output"}
+
+
+class TestCLIPOnnxParity:
+
+    def test_top1_matches_torch(self, monkeypatch, tmp_path, images):
+        pytest.importorskip("open_clip")
+        from app.infrastructure.analysis.providers.attr02 import clip_temporal_analyzer as clip
+        from app.infrastructure.analysis.providers.attr02.clip_temporal_onnx_analyzer import (
+            CLIPTemporalOnnxAnalyzer,
+        )
+
+        monkeypatch.setattr(clip, "_PRETRAINED", None)
+        monkeypatch.setattr(clip, "_CACHE_DIR", tmp_path / "clip")
+        torch.manual_seed(0)
+        torch_analyzer = clip.CLIPTemporalAnalyzer()
+        torch.manual_seed(0)
+        onnx_analyzer = CLIPTemporalOnnxAnalyzer()
+
+        expected = torch_analyzer.analyze_batch(images)
+        actual = onnx_analyzer.analyze_batch(images)
+
+        assert all(r["error"] is None for r in actual)
+        assert [r["date_from"] for r in actual] == [r["date_from"] for r in expected]
+        for a, e in zip(actual, expected):
+            assert a["confidence"] == pytest.approx(e["confidence"], abs=1e-3)
+        assert actual[0]["provider_version"].endswith("+onnx")
+
+    def test_export_name_tracks_the_weights_artifact(self, monkeypatch):
+        from app.infrastructure.analysis.model_artifacts import model_artifacts
+        from app.infrastructure.analysis.providers.attr02.clip_temporal_onnx_analyzer import (
+            CLIPTemporalOnnxAnalyzer,
+        )
+
+        analyzer = object.__new__(CLIPTemporalOnnxAnalyzer)  # no model needed for the name
+        before = analyzer._onnx_name()
+        assert model_artifacts.fingerprint("clip-vit-b-32-openai") in before
+        monkeypatch.setattr(model_artifacts, "fingerprint", lambda name: "v2-0123abcd")
+        assert analyzer._onnx_name() != before
@@ -0,0 +1,147 @@
+"""
+Unit tests for the content-hash analysis result cache (SQLite in a temp file).
+"""
+
+import pytest
+
+from app.features.analysis.application import job_tracking
+from app.features.analysis.application.job_tracking import analyze_with_cache, start_analysis_job
+from app.features.analysis.infrastructure.adapters.result_cache import AnalysisResultCache
+from app.features.analysis.infrastructure.persistence.analysis_model import AnalysisAttributeType
+from app.features.archive.infrastructure.persistence.archive_model import FileType, PhotographFileModel
+from app.infrastructure.analysis.content_hash import sha256_file
+
+CHRONO = AnalysisAttributeType.CHRONOLOGY
+
+
+class TestSha256File:
+
+    def test_hash_depends_on_bytes_not_path(self, tmp_path):
+        a, b = tmp_path / "a.jpg", tmp_path / "b.jpg"
+        a.write_bytes(b"same")
+        b.write_bytes(b"same")
+        assert sha256_file(str(a)) == sha256_file(str(b))
+        assert len(sha256_file(str(a))) == 64
+
+    def test_missing_file(self, tmp_path):
+        assert sha256_file(str(tmp_path / "nope.jpg")) is None
+
+
+class TestAnalysisResultCache:
+
+    async def test_miss_then_hit(self, sessions):
+        cache = AnalysisResultCache(max_entries=10, enabled=True)
+        async with sessions() as session:
+            assert await cache.get(session, "h", CHRONO, "clip", "1") is None
+            await cache.put(session, "h", CHRONO, "clip", "1", {"date_type": "decade"})
+            assert await cache.get(session, "h", CHRONO, "clip", "1") == {"date_type": "decade"}
+        assert (cache.hits, cache.misses, cache.stores) == (1, 1, 1)
+
+    async def test_provider_version_is_part_of_key(self, sessions):
+        cache = AnalysisResultCache(max_entries=10, enabled=True)
+        async with sessions() as session:
+            await cache.put(session, "h", CHRONO, "clip", "1", {"v": 1})
+            assert await cache.get(session, "h", CHRONO, "clip", "2") is None
+
+    async def test_duplicate_put_is_ignored(self, sessions):
+        cache = AnalysisResultCache(max_entries=10, enabled=True)
+        async with sessions() as session:
+            await cache.put(session, "h", CHRONO, "clip", "1", {"v": 1})
+            await cache.put(session, "h", CHRONO, "clip", "1", {"v": 2})
+            assert await cache.get(session, "h", CHRONO, "clip", "1") == {"v": 1}
+
+    async def test_evicts_least_recently_used(self, sessions):
+        cache = AnalysisResultCache(max_entries=2, enabled=True)
+        async with sessions() as session:
+            await cache.put(session, "a", CHRONO, "clip", "1", {"k": "a"})
+            await cache.put(session, "b", CHRONO, "clip", "1", {"k": "b"})
+            await cache.get(session, "a", CHRONO, "clip", "1")
+            await cache.put(session, "c", CHRONO, "clip", "1", {"k": "c"})
+            stats = await cache.stats(session)
+            assert stats["entries"] == 2
+            assert stats["evictions"] == 1
+            assert await cache.get(session, "b", CHRONO, "clip", "1") is None
+            assert await cache.get(session, "a", CHRONO, "clip", "1") is not None
+
+
+class TestAnalyzeWithCache:
+
+    async def test_second_run_is_served_from_cache(self, sessions, tmp_path, monkeypatch):
+        cache = AnalysisResultCache(max_entries=10, enabled=True)
+        monkeypatch.setattr(job_tracking, "analysis_result_cache", cache)
+        path = tmp_path / "master.jpg"
+        path.write_bytes(b"pixels")
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            return {"error": None, "provider": "clip", "provider_version": "1"}
+
+        async with sessions() as session:
+            target = PhotographFileModel(
+                photograph_id=1, file_type=FileType.JPG, file_path=str(path), is_master=True,
+            )
+            jobs = []
+            for _ in range(2):
+                job = await start_analysis_job(
+                    session, photograph_id=1, attribute_type=CHRONO,
+                    tool_name="clip", tool_version="1", triggered_by=None,
+                )
+                await analyze_with_cache(session, job, target, compute)
+                jobs.append(job)
+
+        assert len(calls) == 1
+        assert target.content_sha256 == sha256_file(str(path))
+        assert [bool(j.cache_hit) for j in jobs] == [False, True]
+
+    async def test_replaced_master_is_a_miss(self, sessions, tmp_path, monkeypatch):
+        cache = AnalysisResultCache(max_entries=10, enabled=True)
+        monkeypatch.setattr(job_tracking, "analysis_result_cache", cache)
+        path = tmp_path / "master.jpg"
+        path.write_bytes(b"pixels")
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            return {"error": None, "provider": "clip", "provider_version": "1"}
+
+        async with sessions() as session:
+            target = PhotographFileModel(
+                photograph_id=1, file_type=FileType.JPG, file_path=str(path), is_master=True,
+            )
+            job = await start_analysis_job(
+                session, photograph_id=1, attribute_type=CHRONO,
+                tool_name="clip", tool_version="1", triggered_by=None,
+            )
+            await analyze_with_cache(session, job, target, compute)
+            assert target.content_stat is not None
+
+            path.write_bytes(b"new master pixels")
+            job = await start_analysis_job(
+                session, photograph_id=1, attribute_type=CHRONO,
+                tool_name="clip", tool_version="1", triggered_by=None,
+            )
+            await analyze_with_cache(session, job, target, compute)
+
+        assert len(calls) == 2 and not job.cache_hit
+        assert target.content_sha256 == sha256_file(str(path))
+
+    async def test_errors_are_not_cached(self, sessions, tmp_path, monkeypatch):
+        cache = AnalysisResultCache(max_entries=10, enabled=True)
+        monkeypatch.setattr(job_tracking, "analysis_result_cache", cache)
+        path = tmp_path / "master.jpg"
+        path.write_bytes(b"pixels")
+
+        async def failing():
+            return {"error": "boom"}
+
+        async with sessions() as session:
+            target = PhotographFileModel(
+                photograph_id=1, file_type=FileType.JPG, file_path=str(path), is_master=True,
+            )
+            job = await start_analysis_job(
+                session, photograph_id=1, attribute_type=CHRONO,
+                tool_name="clip", tool_version="1", triggered_by=None,
+            )
+            await analyze_with_cache(session, job, target, failing)
+        assert cache.stores == 0
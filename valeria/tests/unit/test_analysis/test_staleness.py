@@ -0,0 +1,73 @@
+"""
+Unit tests for stale-result detection (SQLite in a temp file).
+"""
+
+import pytest
+
+from app.features.analysis.application import staleness
+from app.features.analysis.application.staleness import stale_photographs, stale_summary
+from app.features.analysis.infrastructure.persistence.analysis_model import AnalysisAttributeType
+from app.features.taxonomy.infrastructure.persistence.taxonomy_model import (
+    AttributeStatus,
+    AttrEnvironmentalSpatialModel,
+    AttrTechnicalMetadataModel,
+    SourceType,
+)
+
+ENVIRONMENTAL = AnalysisAttributeType.ENVIRONMENTAL
+TECHNICAL = AnalysisAttributeType.TECHNICAL
+BOTH = [TECHNICAL, ENVIRONMENTAL]
+
+
+class _FakeExecutor:
+    async def provider_info(self, attribute):
+        return {"technical": ("pillow", "12"), "environmental": ("places365", "resnet50-v2")}[attribute]
+
+
+@pytest.fixture(autouse=True)
+def fake_executor(monkeypatch):
+    monkeypatch.setattr(staleness, "analysis_executor", _FakeExecutor())
+
+
+def _environmental(photograph_id, version, status=AttributeStatus.ACTIVE, source=SourceType.AI):
+    return AttrEnvironmentalSpatialModel(
+        photograph_id=photograph_id, status=status, source_type=source,
+        analysis_provider="places365", provider_version=version,
+    )
+
+
+def _technical(photograph_id, version):
+    return AttrTechnicalMetadataModel(
+        photograph_id=photograph_id, status=AttributeStatus.ACTIVE,
+        analysis_provider="pillow", provider_version=version,
+    )
+
+
+class TestStaleness:
+
+    async def test_only_active_ai_records_from_other_versions_are_stale(self, sessions):
+        async with sessions() as session:
+            session.add_all([
+                _environmental(1, "resnet50-v2"),
+                _environmental(2, "resnet50"),
+                _environmental(3, "resnet50", status=AttributeStatus.SUPERSEDED),
+                _environmental(4, "resnet50", source=SourceType.CURATOR),
+            ])
+            await session.commit()
+            assert await stale_photographs(session, [ENVIRONMENTAL]) == [(2, [ENVIRONMENTAL])]
+            [summary] = await stale_summary(session, [ENVIRONMENTAL])
+        assert summary["stale"] == 1
+        assert summary["outdated"] == [{"provider": "places365", "provider_version": "resnet50", "count": 1}]
+
+    async def test_priority_puts_most_outdated_photographs_first(self, sessions):
+        async with sessions() as session:
+            session.add_all([
+                _environmental(1, "resnet50"),
+                _technical(2, "11"),
+                _environmental(2, "resnet50"),
+                _technical(3, "12"),
+            ])
+            await session.commit()
+            targets = await stale_photographs(session, BOTH)
+            assert targets == [(2, [TECHNICAL, ENVIRONMENTAL]), (1, [ENVIRONMENTAL])]
+            assert await stale_photographs(session, BOTH, limit=1) == targets[:1]
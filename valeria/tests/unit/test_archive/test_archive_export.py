@@ -0,0 +1,188 @@
+"""
+Unit tests for streaming ZIP exports: archive validity, stored vs deflated
+entries, manifests and permission filtering.
+"""
+
+import csv
+import io
+import json
+import zipfile
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from app.features.archive.application import file_access
+from app.features.archive.infrastructure.adapters.zip_stream import ZipEntry, should_compress, stream_zip
+from app.features.archive.infrastructure.persistence.archive_model import (
+    BoxModel,
+    FileType,
+    PhotographFileModel,
+    PhotographModel,
+    RollModel,
+)
+from app.features.archive.interfaces.api.routes import router
+from app.features.authenticate.domain.role import Role
+from app.features.authenticate.infrastructure.persistence.user_model import UserModel
+from app.features.authenticate.interfaces.api.dependencies import get_current_user_id
+from app.features.taxonomy.infrastructure.persistence.taxonomy_model import (
+    AttrTechnicalMetadataModel,
+    AttributeStatus,
+)
+from app.features.view_images.infrastructure.persistence.image_model import CollectionModel
+from app.infrastructure.database.session import get_db
+
+
+def _zip(response_bytes: bytes) -> zipfile.ZipFile:
+    archive = zipfile.ZipFile(io.BytesIO(response_bytes))
+    assert archive.testzip() is None
+    return archive
+
+
+@pytest.fixture
+async def archive(sessions, tmp_path):
+    """
+    Public collection, one roll: photograph 1 public (JPEG + uncompressed TIFF),
+    photograph 2 private (JPEG), photograph 3 public with its file missing.
+    Users: 1 curator, 2 outsider.
+    """
+    jpeg, tiff, private = tmp_path / "p1.jpg", tmp_path / "p1.tif", tmp_path / "p2.jpg"
+    Image.new("RGB", (64, 48), "red").save(jpeg)
+    Image.new("RGB", (64, 48), "blue").save(tiff)
+    Image.new("RGB", (64, 48), "green").save(private)
+
+    async with sessions() as session:
+        session.add(UserModel(id=1, email="c@x.cl", username="c", hashed_password="x", role=Role.CURADOR))
+        session.add(UserModel(id=2, email="o@x.cl", username="o", hashed_password="x", role=Role.COLABORADOR))
+        session.add(CollectionModel(id=1, name="Gerstmann", is_public=True))
+        session.add(BoxModel(id=1, collection_id=1, box_number=1))
+        session.add(RollModel(id=1, box_id=1))
+        session.add(PhotographModel(id=1, roll_id=1, frame_number=1, identifier="G-001", is_public=True))
+        session.add(PhotographModel(id=2, roll_id=1, frame_number=2, identifier="G-002", is_public=False))
+        session.add(PhotographModel(id=3, roll_id=1, frame_number=3, identifier="G-003", is_public=True))
+        session.add(PhotographFileModel(id=1, photograph_id=1, file_type=FileType.JPG, file_path=str(jpeg)))
+        session.add(PhotographFileModel(id=2, photograph_id=1, file_type=FileType.TIFF, file_path=str(tiff), is_master=True))
+        session.add(PhotographFileModel(id=3, photograph_id=2, file_type=FileType.JPG, file_path=str(private)))
+        session.add(PhotographFileModel(id=4, photograph_id=3, file_type=FileType.JPG, file_path=str(tmp_path / "gone.jpg")))
+        session.add(AttrTechnicalMetadataModel(
+            photograph_id=1, status=AttributeStatus.SUPERSEDED, film_format="old",
+            analyzed_at=datetime(2024, 1, 1, tzinfo=timezone.utc),
+        ))
+        session.add(AttrTechnicalMetadataModel(
+            photograph_id=1, status=AttributeStatus.ACTIVE, film_format="35mm",
+            analyzed_at=datetime(2025, 1, 1, tzinfo=timezone.utc),
+        ))
+        await session.commit()
+    return sessions
+
+
+@pytest.fixture
+def client(archive):
+    app = FastAPI()
+    app.include_router(router)
+
+    async def db():
+        async with archive() as session:
+            yield session
+            await session.commit()
+
+    app.dependency_overrides[get_db] = db
+    app.dependency_overrides[get_current_user_id] = lambda: 1
+    return app, TestClient(app)
+
+
+def test_stream_zip_is_valid_and_picks_compression(tmp_path):
+    jpeg, raw_tiff, lzw_tiff = tmp_path / "a.jpg", tmp_path / "raw.tif", tmp_path / "lzw.tif"
+    Image.new("RGB", (32, 32)).save(jpeg)
+    Image.new("RGB", (32, 32)).save(raw_tiff)
+    Image.new("RGB", (32, 32)).save(lzw_tiff, compression="tiff_lzw")
+    assert not should_compress(str(jpeg))
+    assert should_compress(str(raw_tiff))
+    assert not should_compress(str(lzw_tiff))
+
+    chunks = list(stream_zip([
+        ZipEntry("notes.txt", data=b"hola " * 100),
+        ZipEntry("a.jpg", path=str(jpeg)),
+        ZipEntry("raw.tif", path=str(raw_tiff)),
+    ]))
+    archive = _zip(b"".join(chunks))
+    types = {info.filename: info.compress_type for info in archive.infolist()}
+    assert types == {"notes.txt": zipfile.ZIP_DEFLATED, "a.jpg": zipfile.ZIP_STORED, "raw.tif": zipfile.ZIP_DEFLATED}
+    assert archive.read("a.jpg") == jpeg.read_bytes()
+    assert archive.read("raw.tif") == raw_tiff.read_bytes()
+
+
+def test_roll_export_contents_and_manifest(client):
+    _, http = client
+    response = http.get("/archive/rolls/1/export")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/zip"
+    assert 'filename="roll-1.zip"' in response.headers["content-disposition"]
+
+    archive = _zip(response.content)
+    names = archive.namelist()
+    assert names[:2] == ["roll-1/manifest.json", "roll-1/manifest.csv"]
+    assert "roll-1/G-001/p1.tif" in names
+    assert "roll-1/G-002/p2.jpg" in names
+    assert not any("G-003/" in name for name in names)
+
+    manifest = json.loads(archive.read("roll-1/manifest.json"))
+    photos = {p["photograph_id"]: p for p in manifest["photographs"]}
+    assert [p["photograph_id"] for p in manifest["photographs"]] == [1, 2, 3]
+    assert photos[1]["attributes"]["technical"]["film_format"] == "35mm"
+    assert photos[1]["files"][0]["is_master"] is True
+    assert photos[3]["files"][0]["missing"] is True
+
+    rows = list(csv.DictReader(io.StringIO(archive.read("roll-1/manifest.csv").decode())))
+    assert rows[0]["technical.film_format"] == "35mm"
+    assert rows[1]["technical.film_format"] == ""
+
+
+def test_export_skips_photographs_the_user_cannot_download(client):
+    app, http = client
+    app.dependency_overrides[get_current_user_id] = lambda: 2
+    response = http.get("/archive/boxes/1/export", params={"include_derivatives": False})
+    assert response.status_code == 200
+    assert response.headers["x-export-skipped-photographs"] == "1"
+
+    names = _zip(response.content).namelist()
+    assert names[0] == "box-1/manifest.json"
+    assert "box-1/roll-1/G-001/p1.jpg" in names
+    assert not any("G-002" in name for name in names)
+
+
+async def test_export_missing_or_forbidden(client, archive):
+    app, http = client
+    assert http.get("/archive/rolls/99/export").status_code == 404
+    assert http.get("/archive/boxes/99/export").status_code == 404
+
+    async with archive() as session:
+        for photo in (await session.get(PhotographModel, 1), await session.get(PhotographModel, 3)):
+            photo.is_public = False
+        await session.commit()
+    app.dependency_overrides[get_current_user_id] = lambda: 2
+    assert http.get("/archive/rolls/1/export").status_code == 403
+
+
+async def test_same_identifier_gets_its_own_folder(client, archive, tmp_path, monkeypatch):
+    monkeypatch.setattr(file_access, "_ID_CHUNK", 1)  # one id per IN (...) query
+    twin = tmp_path / "twin" / "p1.tif"
+    twin.parent.mkdir()
+    Image.new("RGB", (16, 16), "white").save(twin)
+    async with archive() as session:
+        session.add(PhotographModel(id=4, roll_id=1, frame_number=4, identifier="G-001", is_public=True))
+        session.add(PhotographFileModel(id=5, photograph_id=4, file_type=FileType.TIFF, file_path=str(twin)))
+        await session.commit()
+
+    _, http = client
+    archive_zip = _zip(http.get("/archive/rolls/1/export").content)
+    names = archive_zip.namelist()
+    assert len(names) == len(set(names))
+    assert archive_zip.read("roll-1/G-001/p1.tif") == (tmp_path / "p1.tif").read_bytes()
+    assert archive_zip.read("roll-1/4-G-001/p1.tif") == twin.read_bytes()
+
+    manifest = json.loads(archive_zip.read("roll-1/manifest.json"))
+    assert [p["photograph_id"] for p in manifest["photographs"]] == [1, 2, 3, 4]
+    assert manifest["photographs"][0]["attributes"]["technical"]["film_format"] == "35mm"
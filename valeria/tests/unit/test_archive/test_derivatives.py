@@ -0,0 +1,187 @@
+"""
+Unit tests for web derivatives: rendering (orientation, sRGB, sizes) and
+the store's generation, reuse and invalidation, and the routes' download
+permission (SQLite in a temp file).
+"""
+
+import io
+import os
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from PIL import Image, ImageCms
+
+from app.features.archive.infrastructure.adapters.derivative_renderer import (
+    RENDITION_SIZES,
+    render_derivatives,
+)
+from app.features.archive.infrastructure.adapters.derivative_store import DerivativeStore
+from app.features.archive.infrastructure.persistence.archive_model import (
+    BoxModel,
+    DerivativeFormat,
+    DerivativeRendition,
+    FileType,
+    PhotographFileModel,
+    PhotographModel,
+    RollModel,
+)
+from app.features.archive.interfaces.api import routes as archive_routes
+from app.features.authenticate.domain.role import Role
+from app.features.authenticate.infrastructure.persistence.user_model import UserModel
+from app.features.authenticate.interfaces.api.dependencies import get_current_user_id
+from app.features.view_images.infrastructure.persistence.image_model import CollectionModel
+from app.infrastructure.database.session import get_db
+from app.shared.domain.exceptions import EntityNotFoundError, ValidationError
+
+BOTH = [DerivativeFormat.WEBP, DerivativeFormat.JPEG]
+
+
+@pytest.fixture
+def store(sessions, tmp_path):
+    return DerivativeStore(session_factory=sessions, root=tmp_path / "derivatives", workers=1)
+
+
+def _master(path, size=(3000, 2000), color=(200, 40, 40)):
+    Image.new("RGB", size, color).save(path, quality=90)
+    return str(path)
+
+
+async def _file(sessions, path, file_type=FileType.JPG) -> int:
+    async with sessions() as session:
+        pf = PhotographFileModel(photograph_id=1, file_type=file_type, file_path=str(path))
+        session.add(pf)
+        await session.commit()
+        return pf.id
+
+
+class TestRenderDerivatives:
+
+    def test_sizes_orientation_and_srgb_tag(self, tmp_path):
+        source = tmp_path / "rotated.jpg"
+        exif = Image.Exif()
+        exif[0x0112] = 6  # rotate 90° CW on display
+        Image.new("RGB", (3000, 2000), (10, 120, 30)).save(source, exif=exif)
+
+        rendered = render_derivatives(str(source), tmp_path / "out", BOTH, quality=80)
+
+        assert len(rendered) == len(RENDITION_SIZES) * 2
+        for item in rendered:
+            assert (item["width_px"], item["height_px"]) == (
+                RENDITION_SIZES[item["rendition"]] * 2 // 3, RENDITION_SIZES[item["rendition"]],
+            )
+            with Image.open(item["file_path"]) as img:
+                assert img.size == (item["width_px"], item["height_px"])
+                profile = ImageCms.ImageCmsProfile(io.BytesIO(img.info["icc_profile"]))
+                assert "sRGB" in ImageCms.getProfileDescription(profile)
+
+    def test_16_bit_tiff_is_not_upscaled(self, tmp_path):
+        source = tmp_path / "scan.tif"
+        Image.new("I;16", (600, 400), 40000).save(source)
+
+        rendered = render_derivatives(str(source), tmp_path / "out", [DerivativeFormat.JPEG], quality=80)
+
+        sizes = {item["rendition"]: (item["width_px"], item["height_px"]) for item in rendered}
+        assert sizes == {
+            DerivativeRendition.LARGE: (600, 400),
+            DerivativeRendition.PREVIEW: (600, 400),
+            DerivativeRendition.THUMBNAIL: (256, 171),
+        }
+
+
+class TestDerivativeStore:
+
+    async def test_generates_reuses_and_invalidates_on_new_bytes(self, sessions, store, tmp_path, monkeypatch):
+        monkeypatch.setattr("app.config.settings.settings.derivative_formats", "webp,jpeg")
+        path = _master(tmp_path / "master.jpg")
+        file_id = await _file(sessions, path)
+
+        async with sessions() as session:
+            pf = await session.get(PhotographFileModel, file_id)
+            rows = await store.ensure(session, pf)
+            await session.commit()
+        assert len(rows) == 6
+        first_dir = {r.file_path.rsplit("/", 1)[0] for r in rows}
+        assert len(first_dir) == 1
+
+        async with sessions() as session:
+            pf = await session.get(PhotographFileModel, file_id)
+            again = await store.ensure(session, pf)
+        assert [r.updated_at for r in again] == [r.updated_at for r in rows]
+
+        # Replaced on disk, same row: the new size/mtime makes it stale
+        _master(tmp_path / "master.jpg", color=(20, 20, 220))
+        async with sessions() as session:
+            pf = await session.get(PhotographFileModel, file_id)
+            renewed = await store.ensure(session, pf)
+            await session.commit()
+        assert len(renewed) == 6
+        assert {r.id for r in renewed} == {r.id for r in rows}
+        new_dir = {r.file_path.rsplit("/", 1)[0] for r in renewed}
+        assert new_dir != first_dir
+        assert not any(os.path.exists(d) for d in first_dir)
+
+    async def test_get_renders_on_demand_and_rejects_raw(self, sessions, store, tmp_path):
+        file_id = await _file(sessions, _master(tmp_path / "master.jpg"))
+        raw_id = await _file(sessions, tmp_path / "master.cr3", file_type=FileType.CR3)
+
+        async with sessions() as session:
+            row = await store.get(session, file_id, DerivativeRendition.PREVIEW, DerivativeFormat.JPEG)
+            assert (row.width_px, row.height_px) == (1024, 683)
+            with pytest.raises(ValidationError):
+                await store.get(session, raw_id, DerivativeRendition.THUMBNAIL, DerivativeFormat.JPEG)
+            with pytest.raises(EntityNotFoundError, match="id=999"):
+                await store.get(session, 999, DerivativeRendition.THUMBNAIL, DerivativeFormat.JPEG)
+
+    async def test_submitted_files_render_in_background(self, sessions, store, tmp_path):
+        file_id = await _file(sessions, _master(tmp_path / "master.jpg", size=(800, 600)))
+        await store.start()
+        try:
+            async with sessions() as session:
+                await store.submit(session, file_id)
+            await store.join()
+        finally:
+            await store.stop()
+
+        async with sessions() as session:
+            rows = await store.list_for_file(session, file_id)
+        assert {r.rendition for r in rows} == set(DerivativeRendition)
+
+
+class TestDerivativeRoutes:
+
+    @pytest.fixture
+    async def client(self, sessions, store, tmp_path, monkeypatch):
+        """A file of a private collection; user 1 curator, user 2 without access."""
+        async with sessions() as session:
+            for i, role in ((1, Role.CURADOR), (2, Role.COLABORADOR)):
+                session.add(UserModel(id=i, email=f"u{i}@x.cl", username=f"u{i}", hashed_password="x", role=role))
+            session.add(CollectionModel(id=1, name="Gerstmann", is_public=False))
+            session.add(BoxModel(id=1, collection_id=1, box_number=1))
+            session.add(RollModel(id=1, box_id=1))
+            session.add(PhotographModel(id=1, roll_id=1, is_public=True))
+            await session.commit()
+        file_id = await _file(sessions, _master(tmp_path / "master.jpg", size=(800, 600)))
+        monkeypatch.setattr(archive_routes, "derivative_store", store)
+
+        async def db():
+            async with sessions() as session:
+                yield session
+                await session.commit()
+
+        app = FastAPI()
+        app.include_router(archive_routes.router)
+        app.dependency_overrides[get_db] = db
+        return app, TestClient(app), file_id
+
+    def test_require_download_permission(self, client):
+        app, http, file_id = client
+        app.dependency_overrides[get_current_user_id] = lambda: 1
+        large = http.get(f"/archive/files/{file_id}/derivatives/large", params={"format": "jpeg"})
+        assert large.status_code == 200 and large.headers["content-type"] == "image/jpeg"
+        assert len(http.get(f"/archive/files/{file_id}/derivatives").json()) >= 3
+        assert http.get("/archive/files/999/derivatives").status_code == 404
+
+        app.dependency_overrides[get_current_user_id] = lambda: 2
+        assert http.get(f"/archive/files/{file_id}/derivatives/large").status_code == 403
+        assert http.get(f"/archive/files/{file_id}/derivatives").status_code == 403
@@ -0,0 +1,205 @@
+"""
+Unit tests for duplicate detection: perceptual hashes, the multi-index
+hash search and the index/report over photograph files (SQLite in a temp file).
+"""
+
+import random
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from PIL import Image, ImageFilter
+
+from app.features.archive.application.duplicate_report import duplicate_groups
+from app.features.archive.domain.hash_index import MultiIndexHash
+from app.features.archive.infrastructure.adapters.duplicate_index import DuplicateIndex
+from app.features.archive.infrastructure.persistence.archive_model import (
+    BoxModel,
+    FileType,
+    PhotographFileModel,
+    PhotographModel,
+    RollModel,
+)
+from app.features.archive.interfaces.api.routes import router
+from app.features.authenticate.interfaces.api.dependencies import get_current_user_id
+from app.features.view_images.infrastructure.persistence.image_model import CollectionModel
+from app.infrastructure.analysis.perceptual_hash import (
+    from_signed64,
+    hamming,
+    perceptual_hash_file,
+    phash_image,
+    to_signed64,
+)
+from app.infrastructure.database.session import get_db
+
+
+def _picture(seed: int, size=(600, 400)) -> Image.Image:
+    noise = np.random.default_rng(seed).random((size[1], size[0], 3)) * 255
+    return Image.fromarray(noise.astype("uint8")).filter(ImageFilter.GaussianBlur(10))
+
+
+@pytest.fixture
+async def sessions(sessions):
+    async with sessions() as session:
+        session.add(CollectionModel(id=1, name="Gerstmann", is_public=True))
+        session.add(BoxModel(id=1, collection_id=1, box_number=1))
+        session.add(RollModel(id=1, box_id=1))
+        for photo_id in (1, 2, 3):
+            session.add(PhotographModel(id=photo_id, roll_id=1, identifier=f"G-00{photo_id}"))
+        await session.commit()
+    return sessions
+
+
+@pytest.fixture
+async def archive(sessions, tmp_path):
+    """
+    Files 1 (TIFF) and 2 (JPEG export) of photograph 1, file 3 a rescan of
+    the same negative filed as photograph 2, files 4 and 5 a different
+    picture registered twice for photograph 3.
+    """
+    same, other = _picture(1), _picture(2)
+    same.save(tmp_path / "p1.tif")
+    same.save(tmp_path / "p1.jpg", quality=85)
+    same.resize((450, 300)).save(tmp_path / "p2.jpg", quality=70)
+    other.save(tmp_path / "p3.jpg")
+    async with sessions() as session:
+        for file_id, photo_id, file_type, name in [
+            (1, 1, FileType.TIFF, "p1.tif"), (2, 1, FileType.JPG, "p1.jpg"),
+            (3, 2, FileType.JPG, "p2.jpg"), (4, 3, FileType.JPG, "p3.jpg"), (5, 3, FileType.JPG, "p3.jpg"),
+        ]:
+            session.add(PhotographFileModel(
+                id=file_id, photograph_id=photo_id, file_type=file_type, file_path=str(tmp_path / name),
+            ))
+        await session.commit()
+    return sessions
+
+
+class TestPerceptualHash:
+
+    def test_matches_rescans_and_orientation_but_not_other_pictures(self, tmp_path):
+        picture = _picture(1)
+        reference = phash_image(picture)
+        picture.save(tmp_path / "a.jpg", quality=60)
+        assert hamming(reference, perceptual_hash_file(str(tmp_path / "a.jpg"))) <= 6
+        assert hamming(reference, phash_image(picture.resize((300, 200)))) <= 2
+        # Stored rotated, EXIF orientation 6 (rotate 90° clockwise to display)
+        assert hamming(reference, phash_image(picture.rotate(90, expand=True), orientation=6)) <= 2
+        assert hamming(reference, phash_image(_picture(2))) > 16
+
+    def test_unreadable_files_have_no_hash(self, tmp_path):
+        (tmp_path / "broken.jpg").write_bytes(b"not an image")
+        assert perceptual_hash_file(str(tmp_path / "broken.jpg")) is None
+
+    def test_signed_storage_round_trip(self):
+        for value in (0, 1, (1 << 63) - 1, 1 << 63, (1 << 64) - 1):
+            stored = to_signed64(value)
+            assert -(1 << 63) <= stored < 1 << 63
+            assert from_signed64(stored) == value
+
+
+class TestMultiIndexHash:
+
+    def test_search_matches_linear_scan(self):
+        rng = random.Random(7)
+        base = [rng.getrandbits(64) for _ in range(50)]
+        # Clusters of near copies around each base hash, plus unrelated noise
+        values = [b ^ (1 << rng.randrange(64)) ^ (1 << rng.randrange(64)) for b in base for _ in range(5)]
+        values += [rng.getrandbits(64) for _ in range(2000)]
+        index: MultiIndexHash[int] = MultiIndexHash()
+        for item, value in enumerate(values):
+            index.add(value, item)
+
+        for query in base[:10]:
+            for k in (0, 3, 8, 13):
+                expected = sorted(i for i, v in enumerate(values) if hamming(v, query) <= k)
+                assert sorted(item for _, _, item in index.search(query, k)) == expected
+
+    def test_shared_hashes_and_removal(self):
+        index: MultiIndexHash[str] = MultiIndexHash()
+        index.add(0xFF, "a")
+        index.add(0xFF, "b")
+        index.add(0xFE, "c")
+        assert [item for _, _, item in index.search(0xFF, 0)] == ["a", "b"]
+        assert index.remove(0xFF, "a") and not index.remove(0xFF, "a")
+        assert index.remove(0xFF, "b")
+        assert [(d, item) for d, _, item in index.search(0xFF, 1)] == [(1, "c")]
+        assert len(index) == 1 and list(index) == [(0xFE, "c")]
+
+
+class TestDuplicateIndex:
+
+    async def test_background_hashing_and_similar(self, archive):
+        index = DuplicateIndex(session_factory=archive, workers=1)
+        await index.start()
+        try:
+            async with archive() as session:
+                for file_id in (1, 2, 3, 4, 5):
+                    await index.submit(session, file_id)
+            await index.join()
+        finally:
+            await index.stop()
+
+        async with archive() as session:
+            assert (await session.get(PhotographFileModel, 4)).perceptual_hash is not None
+            matches = await index.similar(session, 1, max_distance=10)
+        assert [pf.id for pf, _ in matches] == [2, 3]
+        assert all(distance <= 10 for _, distance in matches)
+
+    async def test_report_groups_across_photographs(self, archive):
+        index = DuplicateIndex(session_factory=archive)
+        async with archive() as session:
+            assert await index.backfill(session) == (5, 0)
+            report = await duplicate_groups(session, 10, index=index)
+            assert [[f["file_id"] for f in g["files"]] for g in report] == [[1, 2, 3]]
+            assert report[0]["photographs"] == 2
+            assert report[0]["files"][0]["distance"] == 0
+            # Photograph 3's two identical files only show up on request
+            with_pairs = await duplicate_groups(session, 0, include_same_photograph=True, index=index)
+            assert await duplicate_groups(session, 0, index=index) == []
+        assert [[f["file_id"] for f in g["files"]] for g in with_pairs] == [[4, 5]]
+        assert with_pairs[0]["photographs"] == 1
+
+    async def test_reloads_hashes_stored_by_another_process(self, archive):
+        api, worker = DuplicateIndex(session_factory=archive), DuplicateIndex(session_factory=archive)
+        async with archive() as session:
+            await api.ensure(session, await session.get(PhotographFileModel, 1))
+            await session.commit()
+            assert await api.similar(session, 1, max_distance=10) == []
+
+            # e.g. scripts/duplicate_report.py --backfill in its own process
+            assert await worker.backfill(session) == (4, 0)
+            assert [pf.id for pf, _ in await api.similar(session, 1, max_distance=10)] == [2, 3]
+
+            await session.delete(await session.get(PhotographFileModel, 3))
+            await session.commit()
+            assert [pf.id for pf, _ in await api.similar(session, 1, max_distance=10)] == [2]
+            assert 3 not in {file_id for _, file_id in await api.index(session)}
+
+    async def test_route_lists_duplicates(self, archive, monkeypatch):
+        index = DuplicateIndex(session_factory=archive)
+        monkeypatch.setattr("app.features.archive.interfaces.api.routes.duplicate_index", index)
+        app = FastAPI()
+        app.include_router(router)
+
+        async def db():
+            async with archive() as session:
+                yield session
+                await session.commit()
+
+        app.dependency_overrides[get_db] = db
+        app.dependency_overrides[get_current_user_id] = lambda: 1
+        client = TestClient(app)
+
+        response = client.get("/archive/files/3/duplicates", params={"max_distance": 10})
+        assert response.status_code == 200
+        # Only file 3 is hashed so far: the index knows no other file yet
+        assert response.json() == []
+
+        async with archive() as session:
+            await index.backfill(session)
+        body = client.get("/archive/files/3/duplicates", params={"max_distance": 10}).json()
+        assert [(m["file_id"], m["same_photograph"]) for m in body] in ([(1, False), (2, False)], [(2, False), (1, False)])
+        assert len(body[0]["perceptual_hash"]) == 16
+        assert client.get("/archive/files/99/duplicates").status_code == 404
+        assert client.get("/archive/files/3/duplicates", params={"max_distance": 40}).status_code == 422
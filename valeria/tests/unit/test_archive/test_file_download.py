@@ -0,0 +1,144 @@
+"""
+Unit tests for photograph file downloads: permission rules, conditional
+requests (ETag / If-None-Match / If-Range), ranges and X-Accel handoff.
+"""
+
+import hashlib
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.features.archive.application import file_access
+from app.features.archive.application.file_access import accessible_photograph_ids, can_download_file
+from app.features.archive.infrastructure.adapters.file_download import accel_redirect_path, etag_matches
+from app.features.archive.infrastructure.persistence.archive_model import (
+    BoxModel,
+    FileType,
+    PhotographFileModel,
+    PhotographModel,
+    RollModel,
+)
+from app.features.archive.interfaces.api.routes import router
+from app.features.authenticate.domain.role import Role
+from app.features.authenticate.infrastructure.persistence.user_model import UserModel
+from app.features.authenticate.interfaces.api.dependencies import get_current_user_id
+from app.features.manage_projects.infrastructure.persistence.project_model import (
+    ProjectCollectionModel,
+    ProjectMemberModel,
+    ProjectModel,
+)
+from app.features.view_images.infrastructure.persistence.image_model import CollectionModel
+from app.infrastructure.database.session import get_db
+
+CONTENT = bytes(range(256)) * 40
+
+
+@pytest.fixture
+async def archive(sessions, tmp_path):
+    """Private collection with one file; users 1 curator, 2 project member, 3 outsider, 4 inactive."""
+    path = tmp_path / "master.tif"
+    path.write_bytes(CONTENT)
+    async with sessions() as session:
+        for i, (role, active) in enumerate(
+            [(Role.CURADOR, True), (Role.INVESTIGADOR, True), (Role.COLABORADOR, True), (Role.CURADOR, False)], 1,
+        ):
+            session.add(UserModel(id=i, email=f"u{i}@x.cl", username=f"u{i}", hashed_password="x", role=role, is_active=active))
+        session.add(CollectionModel(id=1, name="Gerstmann", is_public=False))
+        session.add(BoxModel(id=1, collection_id=1, box_number=1))
+        session.add(RollModel(id=1, box_id=1))
+        session.add(PhotographModel(id=1, roll_id=1, is_public=True))
+        session.add(PhotographFileModel(id=1, photograph_id=1, file_type=FileType.TIFF, file_path=str(path)))
+        session.add(ProjectModel(id=1, name="Atacama", owner_id=1))
+        session.add(ProjectMemberModel(project_id=1, user_id=2))
+        session.add(ProjectCollectionModel(project_id=1, collection_id=1))
+        await session.commit()
+    return sessions, path
+
+
+@pytest.fixture
+def client(archive):
+    sessions, _ = archive
+    app = FastAPI()
+    app.include_router(router)
+
+    async def db():
+        async with sessions() as session:
+            yield session
+            await session.commit()
+
+    app.dependency_overrides[get_db] = db
+    app.dependency_overrides[get_current_user_id] = lambda: 1
+    return TestClient(app)
+
+
+class TestCanDownloadFile:
+
+    async def test_roles_projects_and_public_flags(self, archive):
+        sessions, _ = archive
+        async with sessions() as session:
+            pf = await session.get(PhotographFileModel, 1)
+            allowed = {user_id: await can_download_file(session, user_id, pf) for user_id in (1, 2, 3, 4, 99)}
+            assert allowed == {1: True, 2: True, 3: False, 4: False, 99: False}
+
+            (await session.get(CollectionModel, 1)).is_public = True
+            assert await can_download_file(session, 3, pf)
+            (await session.get(PhotographModel, 1)).is_public = False
+            assert not await can_download_file(session, 3, pf)
+
+    async def test_more_ids_than_bound_parameters(self, archive, monkeypatch):
+        sessions, _ = archive
+        monkeypatch.setattr(file_access, "_ID_CHUNK", 1000)
+        ids = range(40000, 0, -1)  # past the 32767 parameters of one asyncpg statement
+        async with sessions() as session:
+            assert await accessible_photograph_ids(session, 2, ids) == {1}
+            assert await accessible_photograph_ids(session, 1, ids) == {1}
+            assert await accessible_photograph_ids(session, 3, ids) == set()
+
+
+class TestDownloadFile:
+
+    def test_full_range_and_conditional_requests(self, client):
+        etag = f'"{hashlib.sha256(CONTENT).hexdigest()}"'
+
+        full = client.get("/archive/files/1/download")
+        assert full.status_code == 200 and full.content == CONTENT
+        assert full.headers["etag"] == etag
+        assert full.headers["content-type"] == "image/tiff"
+        assert "attachment" in full.headers["content-disposition"]
+
+        part = client.get("/archive/files/1/download", headers={"Range": "bytes=100-199", "If-Range": etag})
+        assert part.status_code == 206 and part.content == CONTENT[100:200]
+        assert part.headers["content-range"] == f"bytes 100-199/{len(CONTENT)}"
+
+        changed = client.get("/archive/files/1/download", headers={"Range": "bytes=100-199", "If-Range": '"other"'})
+        assert changed.status_code == 200 and len(changed.content) == len(CONTENT)
+
+        assert client.get("/archive/files/1/download", headers={"If-None-Match": f"W/{etag}"}).status_code == 304
+        assert client.get("/archive/files/2/download").status_code == 404
+
+    def test_forbidden_and_accel_redirect(self, client, archive, monkeypatch):
+        _, path = archive
+        client.app.dependency_overrides[get_current_user_id] = lambda: 3
+        assert client.get("/archive/files/1/download").status_code == 403
+
+        client.app.dependency_overrides[get_current_user_id] = lambda: 1
+        monkeypatch.setattr("app.config.settings.settings.download_accel_root", str(path.parent))
+        monkeypatch.setattr("app.config.settings.settings.download_accel_prefix", "/protected/")
+        response = client.get("/archive/files/1/download")
+        assert response.status_code == 200 and response.content == b""
+        assert response.headers["x-accel-redirect"] == "/protected/master.tif"
+
+
+class TestHelpers:
+
+    def test_etag_matches(self):
+        assert etag_matches('"a", W/"b"', '"b"')
+        assert etag_matches("*", '"a"')
+        assert not etag_matches(None, '"a"') and not etag_matches('"ab"', '"a"')
+
+    def test_accel_redirect_path_stays_inside_root(self, tmp_path, monkeypatch):
+        monkeypatch.setattr("app.config.settings.settings.download_accel_root", str(tmp_path / "storage"))
+        monkeypatch.setattr("app.config.settings.settings.download_accel_prefix", "/protected")
+        assert accel_redirect_path(str(tmp_path / "storage" / "a b" / "x.tif")) == "/protected/a b/x.tif"
+        assert accel_redirect_path(str(tmp_path / "storage" / ".." / "x.tif")) is None
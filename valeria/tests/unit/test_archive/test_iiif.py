@@ -0,0 +1,252 @@
+"""
+Unit tests for the IIIF image service: request parsing, tile pyramids
+(streamed build, region composition), the disk LRU cache and the store.
+"""
+
+import io
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from PIL import Image, ImageChops, ImageStat
+
+from app.features.archive.domain.iiif import parse_image_request, parse_size
+from app.features.archive.infrastructure.adapters.pyramid_store import PyramidStore
+from app.features.archive.infrastructure.adapters.tile_cache import TileCache
+from app.features.archive.infrastructure.adapters.tile_pyramid import (
+    aligned_tile,
+    build_pyramid,
+    read_region,
+    tile_path,
+)
+from app.features.archive.infrastructure.persistence.archive_model import (
+    BoxModel,
+    FileType,
+    PhotographFileModel,
+    PhotographModel,
+    RollModel,
+)
+from app.features.archive.interfaces.api import iiif_routes
+from app.features.authenticate.domain.role import Role
+from app.features.authenticate.infrastructure.persistence.user_model import UserModel
+from app.features.authenticate.interfaces.api.dependencies import get_current_user_id
+from app.features.view_images.infrastructure.persistence.image_model import CollectionModel
+from app.infrastructure.analysis.image_decoding import iter_full_resolution
+from app.infrastructure.database.session import get_db
+from app.shared.domain.exceptions import ValidationError
+
+
+def _gradient(size):
+    """RGB gradient, so misplaced tiles show up as large pixel differences."""
+    w, h = size
+    red = Image.linear_gradient("L").resize((w, h))
+    green = Image.linear_gradient("L").rotate(90).resize((w, h))
+    return Image.merge("RGB", (red, green, Image.new("L", (w, h), 90)))
+
+
+def _mean_diff(a, b) -> float:
+    return sum(ImageStat.Stat(ImageChops.difference(a.convert("RGB"), b.convert("RGB"))).mean) / 3
+
+
+class TestParseImageRequest:
+
+    def test_regions(self):
+        assert parse_image_request("full", "max", "0", "default", "jpg", 1000, 600).region == (0, 0, 1000, 600)
+        assert parse_image_request("square", "max", "0", "default", "jpg", 1000, 600).region == (200, 0, 600, 600)
+        assert parse_image_request("pct:50,50,100,100", "max", "0", "gray", "png", 1000, 600).region == (500, 300, 500, 300)
+        # Cropped to the image, never extended past it
+        assert parse_image_request("900,500,400,400", "max", "0", "default", "jpg", 1000, 600).region == (900, 500, 100, 100)
+        for bad in ("1000,0,10,10", "0,0,0,10", "pct:a", "left"):
+            with pytest.raises(ValidationError):
+                parse_image_request(bad, "max", "0", "default", "jpg", 1000, 600)
+
+    def test_sizes(self):
+        assert parse_size("max", 1000, 600) == (1000, 600)
+        assert parse_size("max", 4000, 4000, max_area=4_000_000) == (2000, 2000)
+        assert parse_size("500,", 1000, 600) == (500, 300)
+        assert parse_size(",300", 1000, 600) == (500, 300)
+        assert parse_size("pct:25", 1000, 600) == (250, 150)
+        assert parse_size("!500,500", 1000, 600) == (500, 300)
+        assert parse_size("!5000,5000", 1000, 600) == (1000, 600)
+        assert parse_size("^!5000,5000", 1000, 600) == (5000, 3000)
+        assert parse_size("^2000,", 1000, 600) == (2000, 1200)
+        for bad in ("2000,", "pct:150", "0,", ",", "!100,", "^2000,", "big"):
+            with pytest.raises(ValidationError):
+                parse_size(bad, 1000, 600, max_area=2_000_000 if bad == "^2000," else None)
+
+    def test_rotation_quality_and_format(self):
+        request = parse_image_request("full", "max", "!90", "bitonal", "webp", 10, 10)
+        assert (request.mirror, request.rotation, request.quality, request.format) == (True, 90.0, "bitonal", "webp")
+        assert parse_image_request("full", "max", "360", "default", "jpg", 10, 10).rotation == 0
+        for rotation, quality, fmt in (("361", "default", "jpg"), ("0", "sepia", "jpg"), ("0", "default", "gif")):
+            with pytest.raises(ValidationError):
+                parse_image_request("full", "max", rotation, quality, fmt, 10, 10)
+
+
+class TestTilePyramid:
+
+    def test_streamed_build_matches_source(self, tmp_path, monkeypatch):
+        source = _gradient((1300, 900))
+        path = tmp_path / "scan.tif"
+        source.save(path)  # uncompressed strips
+        # ~4.5 MB decoded: a 1 MB budget forces the band-by-band read
+        monkeypatch.setattr("app.config.settings.settings.analysis_decode_memory_mb", 1)
+
+        manifest = build_pyramid(str(path), tmp_path / "pyramid", tile_size=256, quality=95)
+
+        assert (manifest["width"], manifest["height"]) == (1300, 900)
+        assert [(l["scale_factor"], l["width"], l["height"]) for l in manifest["levels"]] == [
+            (1, 1300, 900), (2, 650, 450), (4, 325, 225), (8, 163, 113),
+        ]
+        assert len(list((tmp_path / "pyramid" / "1").iterdir())) == 6 * 4
+        with Image.open(tile_path(tmp_path / "pyramid", 1, 5, 3)) as edge:
+            assert edge.size == (1300 - 5 * 256, 900 - 3 * 256)
+
+        region = read_region(manifest, tmp_path / "pyramid", (200, 100, 700, 500), (350, 250))
+        expected = source.crop((200, 100, 900, 600)).resize((350, 250), Image.Resampling.LANCZOS)
+        assert region.size == (350, 250)
+        assert _mean_diff(region, expected) < 3
+
+    @pytest.mark.parametrize("orientation", [3, 6, 7])
+    def test_rotated_master_over_budget_is_spilled(self, tmp_path, monkeypatch, orientation):
+        source = _gradient((700, 500))
+        exif = Image.Exif()
+        exif[0x0112] = orientation
+        path = tmp_path / "camera.jpg"
+        source.save(path, quality=95, exif=exif)
+        in_memory = build_pyramid(str(path), tmp_path / "memory", tile_size=256, quality=95)
+        # ~1 MB decoded: over a 1 MB budget once rotated, so it goes through disk
+        monkeypatch.setattr("app.config.settings.settings.analysis_decode_memory_mb", 1)
+        monkeypatch.setattr(
+            "app.features.archive.infrastructure.adapters.tile_pyramid.iter_full_resolution",
+            lambda file_path, band_rows: iter_full_resolution(file_path, band_rows, memory_budget=8 << 20),
+        )
+        spilled = build_pyramid(str(path), tmp_path / "spilled" / "pyramid", tile_size=256, quality=95)
+
+        assert spilled == in_memory
+        full = (0, 0, spilled["width"], spilled["height"])
+        assert _mean_diff(
+            read_region(spilled, tmp_path / "spilled" / "pyramid", full, (spilled["width"], spilled["height"])),
+            read_region(in_memory, tmp_path / "memory", full, (spilled["width"], spilled["height"])),
+        ) < 1
+        assert [p.name for p in (tmp_path / "spilled").iterdir()] == ["pyramid"]
+
+    def test_aligned_tile_lookup(self, tmp_path):
+        path = tmp_path / "photo.jpg"
+        _gradient((1300, 900)).save(path, quality=95)
+        manifest = build_pyramid(str(path), tmp_path / "pyramid", tile_size=256, quality=90)
+        pyramid = tmp_path / "pyramid"
+
+        assert aligned_tile(manifest, pyramid, (512, 256, 256, 256), (256, 256)) == tile_path(pyramid, 1, 2, 1)
+        assert aligned_tile(manifest, pyramid, (1024, 0, 276, 512), (138, 256)) == tile_path(pyramid, 2, 2, 0)
+        assert aligned_tile(manifest, pyramid, (0, 0, 1024, 900), (256, 225)) == tile_path(pyramid, 4, 0, 0)
+        assert aligned_tile(manifest, pyramid, (0, 0, 1300, 900), (163, 113)) == tile_path(pyramid, 8, 0, 0)
+        assert aligned_tile(manifest, pyramid, (10, 0, 256, 256), (256, 256)) is None
+
+
+class TestTileCache:
+
+    def test_evicts_least_recently_used_within_budget(self, tmp_path):
+        cache = TileCache(tmp_path, max_bytes=250)
+        cache.put("a", "jpg", b"x" * 100)
+        cache.put("b", "jpg", b"x" * 100)
+        assert cache.get("a", "jpg") is not None  # a is now the most recent
+        cache.put("c", "jpg", b"x" * 100)
+
+        assert cache.get("b", "jpg") is None
+        assert cache.get("a", "jpg") is not None and cache.get("c", "jpg") is not None
+        assert cache.total_bytes == 200
+
+        reopened = TileCache(tmp_path, max_bytes=250)
+        assert reopened.total_bytes == 200
+        assert reopened.get("c", "jpg") == b"x" * 100
+
+    def test_processes_sharing_the_directory(self, tmp_path):
+        # Two instances stand for two API workers with their own index
+        first, second = TileCache(tmp_path, max_bytes=250), TileCache(tmp_path, max_bytes=250)
+        first.put("a", "jpg", b"a" * 100)
+        assert second.get("a", "jpg") == b"a" * 100  # written by the other worker
+        second.put("b", "jpg", b"b" * 100)
+        second.put("c", "jpg", b"c" * 100)  # over budget counting a: a goes
+        assert first.get("a", "jpg") is None
+        assert first.get("b", "jpg") == b"b" * 100
+        assert second.total_bytes == 200
+
+
+class TestPyramidStore:
+
+    async def test_serves_tiles_and_caches_rendered_requests(self, sessions, tmp_path, monkeypatch):
+        monkeypatch.setattr("app.config.settings.settings.iiif_tile_size", 256)
+        store = PyramidStore(
+            session_factory=sessions, root=tmp_path / "iiif",
+            cache=TileCache(tmp_path / "cache", max_bytes=10 * 1024 * 1024),
+        )
+        path = tmp_path / "photo.jpg"
+        _gradient((600, 400)).save(path, quality=95)
+        async with sessions() as session:
+            pf = PhotographFileModel(photograph_id=1, file_type=FileType.JPG, file_path=str(path))
+            session.add(pf)
+            await session.commit()
+
+            manifest = await store.info(session, pf.id)
+            tile = await store.render(session, pf.id, parse_image_request(
+                "256,0,256,256", "256,256", "0", "default", "jpg", 600, 400,
+            ))
+            assert tile.parent.parent.parent == tmp_path / "iiif" / str(pf.id)
+
+            rotated = parse_image_request("full", "300,", "!90", "gray", "png", 600, 400)
+            rendered = await store.render(session, pf.id, rotated)
+            assert await store.render(session, pf.id, rotated) == rendered
+            with Image.open(io.BytesIO(rendered)) as img:
+                assert (img.size, img.mode) == ((200, 300), "L")
+
+            with pytest.raises(ValidationError):
+                raw = PhotographFileModel(photograph_id=1, file_type=FileType.CR3, file_path="x.cr3")
+                session.add(raw)
+                await session.flush()
+                await store.info(session, raw.id)
+        assert manifest["levels"][-1]["scale_factor"] == 4  # 150 x 100 fits one 256 px tile
+
+
+class TestIIIFRoutes:
+
+    @pytest.fixture
+    async def client(self, sessions, tmp_path, monkeypatch):
+        """A private collection's file; user 1 curator, user 2 without access."""
+        path = tmp_path / "photo.jpg"
+        _gradient((600, 400)).save(path, quality=95)
+        async with sessions() as session:
+            for i, role in ((1, Role.CURADOR), (2, Role.COLABORADOR)):
+                session.add(UserModel(id=i, email=f"u{i}@x.cl", username=f"u{i}", hashed_password="x", role=role))
+            session.add(CollectionModel(id=1, name="Gerstmann", is_public=False))
+            session.add(BoxModel(id=1, collection_id=1, box_number=1))
+            session.add(RollModel(id=1, box_id=1))
+            session.add(PhotographModel(id=1, roll_id=1, is_public=True))
+            session.add(PhotographFileModel(id=1, photograph_id=1, file_type=FileType.JPG, file_path=str(path)))
+            await session.commit()
+        monkeypatch.setattr(iiif_routes, "pyramid_store", PyramidStore(
+            session_factory=sessions, root=tmp_path / "iiif",
+            cache=TileCache(tmp_path / "cache", max_bytes=10 * 1024 * 1024),
+        ))
+
+        async def db():
+            async with sessions() as session:
+                yield session
+                await session.commit()
+
+        app = FastAPI()
+        app.include_router(iiif_routes.router)
+        app.dependency_overrides[get_db] = db
+        return app, TestClient(app)
+
+    def test_requires_download_permission(self, client):
+        app, http = client
+        app.dependency_overrides[get_current_user_id] = lambda: 1
+        assert http.get("/iiif/1/info.json").json()["width"] == 600
+        rendered = http.get("/iiif/1/full/300,/0/gray.png")
+        assert rendered.status_code == 200 and rendered.headers["content-type"] == "image/png"
+        assert http.get("/iiif/9/info.json").status_code == 404
+
+        app.dependency_overrides[get_current_user_id] = lambda: 2
+        assert http.get("/iiif/1/info.json").status_code == 403
+        assert http.get("/iiif/1/full/max/0/default.jpg").status_code == 403
@@ -0,0 +1,200 @@
+"""
+Unit tests for visual similarity: the on-disk embedding index, the CLIP
+analyzer's embedding output and the "more like this" route.
+"""
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.features.archive.infrastructure.persistence.archive_model import (
+    BoxModel,
+    PhotographModel,
+    RollModel,
+)
+from app.features.archive.interfaces.api.routes import router
+from app.features.authenticate.interfaces.api.dependencies import get_current_user_id
+from app.features.view_images.infrastructure.persistence.image_model import CollectionModel
+from app.infrastructure.analysis import embedding_index as embedding_module
+from app.infrastructure.analysis.embedding_index import (
+    EmbeddingIndex,
+    decode_embedding,
+    encode_embedding,
+)
+from app.infrastructure.database.session import get_db
+
+
+def _vectors(n: int, dim: int = 32, seed: int = 0) -> np.ndarray:
+    vectors = np.random.default_rng(seed).standard_normal((n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+class TestEmbeddingIndex:
+
+    def test_encode_decode_round_trip(self):
+        vector = _vectors(1, 512)[0] * 3
+        decoded = decode_embedding(encode_embedding(vector))
+        assert decoded.dtype == np.float32
+        assert np.allclose(decoded, vector / 3, atol=1e-3)
+
+    def test_search_matches_brute_force(self, tmp_path):
+        vectors = _vectors(300)
+        index = EmbeddingIndex("clip/test", root=tmp_path)
+        for photograph_id, vector in enumerate(vectors, start=1):
+            index.add(photograph_id, vector)
+
+        query = vectors[41]
+        expected = np.argsort(-(vectors @ query))[:5] + 1
+        results = index.search(query, 5)
+        assert [pid for pid, _ in results] == list(expected)
+        assert results[0] == (42, pytest.approx(1.0, abs=1e-3))
+        assert [pid for pid, _ in index.search(query, 3, exclude=[42])] == list(expected[1:4])
+        assert index.search(query, 0) == []
+        assert len(index.search(query, 1000)) == 300
+
+    def test_replace_and_reload(self, tmp_path):
+        vectors = _vectors(4)
+        index = EmbeddingIndex("clip/test", root=tmp_path)
+        for photograph_id in (1, 2, 3):
+            index.add(photograph_id, vectors[photograph_id - 1])
+        index.add(2, vectors[3])  # re-analyzed: the new row wins
+        assert len(index) == 3
+        assert [pid for pid, _ in index.search(vectors[3], 5, only=[1, 2])] == [2, 1]
+
+        reloaded = EmbeddingIndex("clip/test", root=tmp_path)
+        assert len(reloaded) == 3
+        assert np.allclose(reloaded.get(2), vectors[3], atol=1e-3)
+        assert reloaded.get(99) is None
+
+    def test_compaction_drops_superseded_rows(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(embedding_module, "_COMPACT_MIN_DEAD", 4)
+        vectors = _vectors(10)
+        index = EmbeddingIndex("clip/test", root=tmp_path)
+        for _ in range(3):
+            for photograph_id in (1, 2):
+                index.add(photograph_id, vectors[photograph_id])
+        # 6 rows, 4 superseded: compacted into generation 1
+        root = tmp_path / "clip_test"
+        assert sorted(p.name for p in root.iterdir()) == ["ids-1.i64", "lock", "meta.json", "vectors-1.f16"]
+        assert (root / "vectors-1.f16").stat().st_size == 2 * 32 * 2
+
+        index.add(2, vectors[3])
+        index.compact()
+        reloaded = EmbeddingIndex("clip/test", root=tmp_path)
+        assert len(reloaded) == 2 and (root / "vectors-2.f16").stat().st_size == 2 * 32 * 2
+        assert reloaded.search(vectors[3], 1) == [(2, pytest.approx(1.0, abs=1e-3))]
+
+    def test_torn_append_is_truncated(self, tmp_path):
+        vectors = _vectors(3)
+        index = EmbeddingIndex("clip/test", root=tmp_path)
+        index.add(1, vectors[0])
+        index.add(2, vectors[1])
+        # Crash after writing the vector but before its id
+        with open(tmp_path / "clip_test" / "vectors-0.f16", "ab") as fh:
+            fh.write(vectors[2].astype("<f2").tobytes()[:20])
+
+        reloaded = EmbeddingIndex("clip/test", root=tmp_path)
+        assert len(reloaded) == 2
+        reloaded.add(3, vectors[2])
+        assert [pid for pid, _ in EmbeddingIndex("clip/test", root=tmp_path).search(vectors[2], 1)] == [3]
+
+    def test_indexes_sharing_files_stay_consistent(self, tmp_path, monkeypatch):
+        # Two instances on one directory stand for the API and a script
+        monkeypatch.setattr(embedding_module, "_COMPACT_MIN_DEAD", 4)
+        vectors = _vectors(8)
+        api, script = EmbeddingIndex("clip/test", root=tmp_path), EmbeddingIndex("clip/test", root=tmp_path)
+        api.add(1, vectors[1])
+        script.add(2, vectors[2])
+        script.add(3, vectors[3])
+        api.add(4, vectors[4])
+        for index in (api, script):
+            assert len(index) == 4
+            for photograph_id in (1, 2, 3, 4):
+                assert np.allclose(index.get(photograph_id), vectors[photograph_id], atol=1e-3)
+
+        # The script's compaction moves to generation 1 under the API's feet
+        for _ in range(2):
+            for photograph_id in (2, 3):
+                script.add(photograph_id, vectors[photograph_id])
+        assert (tmp_path / "clip_test" / "ids-1.i64").exists()
+        api.add(5, vectors[5])
+        assert [pid for pid, _ in script.search(vectors[5], 1)] == [5]
+        assert [pid for pid, _ in api.search(vectors[3], 1)] == [3]
+        assert len(EmbeddingIndex("clip/test", root=tmp_path)) == 5
+
+    def test_dimension_mismatch_is_rejected(self, tmp_path):
+        index = EmbeddingIndex("clip/test", root=tmp_path)
+        index.add(1, _vectors(1)[0])
+        with pytest.raises(ValueError):
+            index.add(2, _vectors(1, dim=16)[0])
+        with pytest.raises(ValueError):
+            index.add(3, np.zeros(32))
+
+
+class TestCLIPEmbeddingOutput:
+
+    def test_results_carry_normalized_embedding(self):
+        torch = pytest.importorskip("torch")
+        from app.infrastructure.analysis.providers.attr02 import clip_temporal_analyzer as clip
+
+        # No weights: identity "preprocessing" and a fixed image tower
+        analyzer = object.__new__(clip.CLIPTemporalAnalyzer)
+        analyzer._torch = torch
+        analyzer._preprocess = lambda image: torch.tensor(image, dtype=torch.float32)
+        analyzer._encode_images = lambda batch: batch * 5
+        analyzer._logit_scale = 100.0
+        analyzer._txt_features = torch.eye(len(clip._DECADES), 16)
+
+        results: list = [None, None]
+        analyzer._infer([(0, [0.0] * 3 + [1.0] + [0.0] * 12), (1, [1.0] * 16)], results)
+        assert results[0]["date_from"] == clip._DECADES[3][0]
+        assert results[0]["embedding_model"] == clip.EMBEDDING_MODEL
+        assert "image_embedding" not in results[0]["raw_output"]
+        assert np.allclose(decode_embedding(results[1]["image_embedding"]), np.full(16, 0.25), atol=1e-3)
+
+
+@pytest.fixture
+async def sessions(sessions):
+    async with sessions() as session:
+        session.add(CollectionModel(id=1, name="Gerstmann", is_public=True))
+        session.add(BoxModel(id=1, collection_id=1, box_number=1))
+        session.add(RollModel(id=1, box_id=1))
+        for photo_id in (1, 2, 3, 4):
+            session.add(PhotographModel(id=photo_id, roll_id=1, frame_number=photo_id, identifier=f"G-00{photo_id}"))
+        await session.commit()
+    return sessions
+
+
+class TestSimilarRoute:
+
+    def test_lists_nearest_photographs(self, sessions, tmp_path, monkeypatch):
+        vectors = _vectors(3)
+        index = EmbeddingIndex("clip/test", root=tmp_path)
+        index.add(1, vectors[0])
+        index.add(2, 0.9 * vectors[0] + 0.1 * vectors[1])
+        index.add(3, vectors[1])
+        index.add(99, vectors[0])  # photograph deleted since it was indexed
+        monkeypatch.setattr("app.features.archive.interfaces.api.routes.embeddings_for", lambda model: index)
+        app = FastAPI()
+        app.include_router(router)
+
+        async def db():
+            async with sessions() as session:
+                yield session
+
+        app.dependency_overrides[get_db] = db
+        app.dependency_overrides[get_current_user_id] = lambda: 1
+        client = TestClient(app)
+
+        response = client.get("/archive/photographs/1/similar", params={"k": 2})
+        assert response.status_code == 200
+        body = response.json()
+        # The deleted photograph is not a candidate, so k results still come back
+        assert [m["photograph_id"] for m in body] == [2, 3]
+        assert body[0]["identifier"] == "G-002" and 0.9 < body[0]["similarity"] <= 1.0
+        assert [m["photograph_id"] for m in client.get("/archive/photographs/1/similar").json()] == [2, 3]
+
+        assert client.get("/archive/photographs/4/similar").status_code == 409
+        assert client.get("/archive/photographs/50/similar").status_code == 404
+        assert client.get("/archive/photographs/1/similar", params={"k": 500}).status_code == 422
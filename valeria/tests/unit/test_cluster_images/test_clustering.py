@@ -0,0 +1,308 @@
+"""
+Unit tests for image clustering: incremental assignment and layout
+placement, the stored clustering and its browsing routes, and background
+recomputes (SQLite in a temp file; the full fit needs scikit-learn and
+umap-learn and is skipped without them).
+"""
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.features.archive.infrastructure.persistence.archive_model import (
+    BoxModel,
+    PhotographModel,
+    RollModel,
+)
+from app.features.authenticate.domain.role import Role
+from app.features.authenticate.infrastructure.persistence.user_model import UserModel
+from app.features.authenticate.interfaces.api.dependencies import get_current_user_id
+from app.features.cluster_images.application.clusters import absorb_photograph, store_fit
+from app.features.cluster_images.domain.clustering import (
+    LAYOUT_DTYPE,
+    absorb,
+    default_cluster_count,
+    nearest_centroid,
+    pack_layout,
+    place,
+)
+from app.features.cluster_images.infrastructure.adapters import clustering_runner as runner_module
+from app.features.cluster_images.infrastructure.adapters.cluster_fitting import ClusterFit
+from app.features.cluster_images.infrastructure.adapters.clustering_runner import ClusteringRunner
+from app.features.cluster_images.infrastructure.persistence.cluster_model import (
+    ClusteringRunModel,
+    ClusteringStatus,
+    ImageClusterModel,
+    PhotographClusterModel,
+)
+from app.features.cluster_images.interfaces.api.routes import router
+from app.features.view_images.infrastructure.persistence.image_model import CollectionModel
+from app.infrastructure.analysis.embedding_hooks import EmbeddingHooks
+from app.infrastructure.analysis.embedding_index import EmbeddingIndex
+from app.infrastructure.database.session import get_db
+
+DIM = 16
+
+
+def _blobs(seed: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    """Photographs 1-6 around one direction, 7-12 around an orthogonal one."""
+    rng = np.random.default_rng(seed)
+    centres = np.eye(2, DIM, dtype=np.float32)
+    vectors = np.concatenate([c + 0.05 * rng.standard_normal((6, DIM)) for c in centres]).astype(np.float32)
+    return np.arange(1, 13), vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+class TestIncrementalClustering:
+
+    def test_default_cluster_count(self):
+        assert [default_cluster_count(n) for n in (0, 1, 2, 8, 200, 10**7)] == [0, 1, 2, 2, 10, 256]
+
+    def test_absorb_is_a_running_mean(self):
+        vectors = np.random.default_rng(1).standard_normal((5, DIM)).astype(np.float32)
+        centroid = vectors[0]
+        for size, vector in enumerate(vectors[1:], start=1):
+            centroid = absorb(centroid, size, vector)
+        assert np.allclose(centroid, vectors.mean(axis=0), atol=1e-6)
+
+    def test_nearest_centroid_is_cosine(self):
+        centroids = np.array([[10.0, 0.0], [0.0, 0.1]], dtype=np.float32)
+        assert nearest_centroid(centroids, np.array([0.2, 1.0])) == (1, pytest.approx(1 / np.sqrt(1.04)))
+
+    def test_place_weights_similar_neighbours(self):
+        assert place(np.empty((0, 2)), np.empty(0)) is None
+        x, y = place(np.array([[0.0, 0.0], [10.0, 10.0]]), np.array([0.9, 0.1]))
+        assert 0 < x < 1 and x == pytest.approx(y)
+
+    def test_layout_records(self):
+        records = np.frombuffer(pack_layout([3, 7], [0, 1], [0.5, -1.0], [2.0, 4.0]), dtype=LAYOUT_DTYPE)
+        assert LAYOUT_DTYPE.itemsize == 16
+        assert records["photograph_id"].tolist() == [3, 7] and records["y"].tolist() == [2.0, 4.0]
+
+
+@pytest.fixture
+async def sessions(sessions):
+    """Twelve photographs, users 1 curator and 2 standard."""
+    async with sessions() as session:
+        for i, role in ((1, Role.CURADOR), (2, Role.USUARIO_ESTANDAR)):
+            session.add(UserModel(id=i, email=f"u{i}@x.cl", username=f"u{i}", hashed_password="x", role=role))
+        session.add(CollectionModel(id=1, name="Gerstmann", is_public=True))
+        session.add(BoxModel(id=1, collection_id=1, box_number=1))
+        session.add(RollModel(id=1, box_id=1))
+        for photo_id in range(1, 14):
+            session.add(PhotographModel(id=photo_id, roll_id=1, frame_number=photo_id, identifier=f"G-{photo_id:03d}"))
+        await session.commit()
+    return sessions
+
+
+@pytest.fixture
+def index(tmp_path, monkeypatch):
+    index = EmbeddingIndex("clip/test", root=tmp_path)
+    for photo_id, vector in zip(*_blobs()):
+        index.add(int(photo_id), vector)
+    monkeypatch.setattr(runner_module, "embeddings_for", lambda model: index)
+    return index
+
+
+async def _store_blob_fit(sessions) -> None:
+    """A completed run as k-means + UMAP would leave it for the two blobs."""
+    ids, vectors = _blobs()
+    labels = np.array([0] * 6 + [1] * 6)
+    centroids = np.stack([vectors[:6].mean(axis=0), vectors[6:].mean(axis=0)])
+    layout = np.array([[0.0, float(i)] for i in range(6)] + [[20.0, float(i)] for i in range(6)], dtype=np.float32)
+    fit = ClusterFit(labels=labels, centroids=centroids, similarities=np.linspace(0.9, 0.99, 12), layout=layout)
+    async with sessions() as session:
+        run = ClusteringRunModel(embedding_model="clip/test", status=ClusteringStatus.COMPLETED)
+        session.add(run)
+        await session.flush()
+        await store_fit(session, run, ids, fit)
+        await session.commit()
+
+
+class TestStoredClustering:
+
+    async def test_absorb_new_photograph_without_refit(self, sessions, index):
+        await _store_blob_fit(sessions)
+        new = np.eye(1, DIM, 1, dtype=np.float32)[0] + 0.01
+        index.add(13, new)
+        async with sessions() as session:
+            before = await session.get(ImageClusterModel, 2)
+            centroid_before = np.frombuffer(before.centroid, dtype="<f4").copy()
+            assignment = await absorb_photograph(session, 13, new, "clip/test", index)
+            await session.commit()
+
+        assert assignment.label == 1 and assignment.incremental
+        assert assignment.layout_x == pytest.approx(20.0, abs=0.5) and 0 <= assignment.layout_y <= 5
+        async with sessions() as session:
+            cluster = await session.get(ImageClusterModel, 2)
+            assert cluster.size == 7
+            centroid = np.frombuffer(cluster.centroid, dtype="<f4")
+            assert np.allclose(centroid, centroid_before + (new - centroid_before) / 7, atol=1e-6)
+            # Re-analysis in the same cluster does not count it twice
+            await absorb_photograph(session, 13, new, "clip/test", index)
+            assert (await session.get(ImageClusterModel, 2)).size == 7
+
+    async def test_concurrent_absorbs_do_not_lose_updates(self, sessions, index):
+        await _store_blob_fit(sessions)
+        new = np.eye(1, DIM, 1, dtype=np.float32)[0] + 0.01
+        index.add(13, new)
+        async with sessions() as first:
+            stale = await first.get(ImageClusterModel, 2)  # loaded before the other absorb
+            assert stale.size == 6
+            async with sessions() as second:
+                await absorb_photograph(second, 13, new, "clip/test", index)
+                await second.commit()
+            # Photograph 1 re-embedded: it moves from cluster 0 to cluster 1
+            assert (await absorb_photograph(first, 1, new, "clip/test", index)).label == 1
+            await first.commit()
+        async with sessions() as session:
+            assert (await session.get(ImageClusterModel, 2)).size == 8
+            assert (await session.get(ImageClusterModel, 1)).size == 5
+
+    async def test_absorbs_published_embeddings(self, sessions, index):
+        await _store_blob_fit(sessions)
+        new = np.eye(1, DIM, 1, dtype=np.float32)[0] + 0.01
+        index.add(13, new)
+
+        async def broken(session, photograph_id, vector, model, index):
+            session.add(ImageClusterModel(run_id=1, label=9, size=0, centroid=b""))
+            await session.flush()
+            raise RuntimeError("disk full")
+
+        hooks = EmbeddingHooks()
+        hooks.subscribe(broken)
+        hooks.subscribe(absorb_photograph)
+        async with sessions() as session:
+            await hooks.publish(session, 13, new, "clip/test", index)
+            await session.commit()
+            assert (await session.get(PhotographClusterModel, 13)).label == 1
+            labels = (await session.execute(ImageClusterModel.__table__.select())).all()
+            assert sorted(row.label for row in labels) == [0, 1]  # the failed listener was rolled back
+
+    async def test_absorb_without_clustering_is_a_no_op(self, sessions, index):
+        async with sessions() as session:
+            assert await absorb_photograph(session, 1, _blobs()[1][0], "clip/test", index) is None
+
+    async def test_refit_replaces_assignments(self, sessions, index):
+        await _store_blob_fit(sessions)
+        await _store_blob_fit(sessions)
+        async with sessions() as session:
+            assert len((await session.execute(PhotographClusterModel.__table__.select())).all()) == 12
+            assert len((await session.execute(ImageClusterModel.__table__.select())).all()) == 2
+
+
+@pytest.fixture
+def client(sessions):
+    app = FastAPI()
+    app.include_router(router)
+
+    async def db():
+        async with sessions() as session:
+            yield session
+            await session.commit()
+
+    app.dependency_overrides[get_db] = db
+    app.dependency_overrides[get_current_user_id] = lambda: 1
+    return TestClient(app)
+
+
+class TestClusterRoutes:
+
+    async def test_browse_current_clustering(self, sessions, client):
+        assert client.get("/clusters").status_code == 404
+        assert client.get("/clusters/layout").status_code == 404
+        await _store_blob_fit(sessions)
+
+        body = client.get("/clusters").json()
+        assert [(c["label"], c["size"]) for c in body["clusters"]] == [(0, 6), (1, 6)]
+        assert body["clusters"][0]["representative_id"] == 6 and body["run"]["status"] == "completed"
+
+        members = client.get("/clusters/1/photographs", params={"limit": 2}).json()
+        assert members["total"] == 6
+        assert [p["photograph_id"] for p in members["photographs"]] == [12, 11]
+        assert client.get("/clusters/7/photographs").status_code == 404
+
+        response = client.get("/clusters/layout")
+        assert response.headers["content-type"] == "application/octet-stream"
+        assert response.headers["x-layout-format"] == "photograph_id:<i4,label:<i4,x:<f4,y:<f4"
+        records = np.frombuffer(response.content, dtype=LAYOUT_DTYPE)
+        assert records["photograph_id"].tolist() == list(range(1, 13))
+        assert records["label"].tolist() == [0] * 6 + [1] * 6 and records["x"][7] == 20.0
+        etag = response.headers["etag"]
+        assert client.get("/clusters/layout", headers={"If-None-Match": etag}).status_code == 304
+
+    async def test_recompute_permissions_and_conflicts(self, sessions, client, monkeypatch):
+        launched = []
+        monkeypatch.setattr(
+            "app.features.cluster_images.interfaces.api.routes.clustering_runner.launch", launched.append,
+        )
+        client.app.dependency_overrides[get_current_user_id] = lambda: 2
+        assert client.post("/clusters/runs", json={}).status_code == 403
+
+        client.app.dependency_overrides[get_current_user_id] = lambda: 1
+        response = client.post("/clusters/runs", json={"n_clusters": 4})
+        assert response.status_code == 202
+        run = response.json()
+        assert run["status"] == "queued" and run["requested_clusters"] == 4 and launched == [run["id"]]
+        assert client.post("/clusters/runs", json={}).status_code == 409
+        assert client.post("/clusters/runs", json={"n_clusters": 1}).status_code == 422
+        assert client.get(f"/clusters/runs/{run['id']}").json()["status"] == "queued"
+        assert [r["id"] for r in client.get("/clusters/runs").json()] == [run["id"]]
+
+
+class TestClusteringRunner:
+
+    async def test_run_is_claimed_by_one_process(self, sessions, monkeypatch):
+        fitted = []
+
+        async def fit(self, session, run):
+            fitted.append(run.id)
+            run.status = ClusteringStatus.COMPLETED
+            await session.commit()
+
+        monkeypatch.setattr(ClusteringRunner, "_fit", fit)
+        api, other = ClusteringRunner(session_factory=sessions), ClusteringRunner(session_factory=sessions)
+        async with sessions() as session:
+            run = await api.submit(session, "clip/test")
+        other.launch(run.id)
+        await api.wait(run.id, timeout=30)
+        await other.wait(run.id, timeout=30)
+        assert fitted == [run.id]
+
+    async def test_start_recovers_running_runs_only_when_asked(self, sessions, monkeypatch):
+        launched = []
+        monkeypatch.setattr(ClusteringRunner, "launch", lambda self, run_id: launched.append(run_id))
+        async with sessions() as session:
+            session.add(ClusteringRunModel(id=1, embedding_model="clip/test", status=ClusteringStatus.RUNNING))
+            await session.commit()
+
+        await ClusteringRunner(session_factory=sessions).start(recover=False)
+        assert launched == []
+        await ClusteringRunner(session_factory=sessions).start()
+        assert launched == [1]
+        async with sessions() as session:
+            assert (await session.get(ClusteringRunModel, 1)).status == ClusteringStatus.QUEUED
+
+    async def test_run_without_embeddings_fails_cleanly(self, sessions, tmp_path, monkeypatch):
+        monkeypatch.setattr(runner_module, "embeddings_for", lambda model: EmbeddingIndex("clip/empty", root=tmp_path))
+        runner = ClusteringRunner(session_factory=sessions)
+        async with sessions() as session:
+            run = await runner.submit(session, "clip/empty")
+        await runner.wait(run.id, timeout=30)
+        async with sessions() as session:
+            run = await session.get(ClusteringRunModel, run.id)
+        assert run.status == ClusteringStatus.FAILED and "2 fotografías" in run.error_message
+
+    async def test_full_recompute_in_background(self, sessions, index):
+        pytest.importorskip("sklearn")
+        pytest.importorskip("umap")
+        runner = ClusteringRunner(session_factory=sessions)
+        async with sessions() as session:
+            run = await runner.submit(session, "clip/test", n_clusters=2)
+        await runner.wait(run.id, timeout=300)
+        async with sessions() as session:
+            run = await session.get(ClusteringRunModel, run.id)
+            assignments = (await session.execute(PhotographClusterModel.__table__.select())).all()
+        assert run.status == ClusteringStatus.COMPLETED and run.n_clusters == 2 and run.photographs == 12
+        labels = {row.photograph_id: row.label for row in assignments}
+        assert len({labels[i] for i in range(1, 7)}) == 1 and labels[1] != labels[7]
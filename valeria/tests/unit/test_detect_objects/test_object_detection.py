@@ -0,0 +1,253 @@
+"""
+Unit tests for object detection: letterbox and NMS, the ONNX detector on a
+tiny exported model (skipped without torch / onnxruntime), storing scans
+and the /objects routes (SQLite in a temp file).
+"""
+
+from datetime import date
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from app.features.archive.infrastructure.persistence.archive_model import (
+    BoxModel,
+    FileType,
+    PhotographFileModel,
+    PhotographModel,
+    RollModel,
+)
+from app.features.authenticate.domain.role import Role
+from app.features.authenticate.infrastructure.persistence.user_model import UserModel
+from app.features.authenticate.interfaces.api.dependencies import get_current_user_id
+from app.features.detect_objects.application.detections import detect_photographs, store_detections
+from app.features.detect_objects.application.object_search import object_classes, photographs_with_object
+from app.features.detect_objects.domain.detection import ObjectQuery
+from app.features.detect_objects.interfaces.api.routes import router
+from app.features.taxonomy.domain.taxonomy import AttributeStatus
+from app.features.taxonomy.infrastructure.persistence.taxonomy_model import AttrChronologyDatingModel
+from app.features.view_images.infrastructure.persistence.image_model import CollectionModel
+from app.infrastructure.analysis.providers.objects.yolo_onnx_detector import letterbox, non_max_suppression
+from app.infrastructure.database.session import get_db
+
+INPUT_SIZE = 64
+
+
+class TestGeometry:
+
+    def test_letterbox_keeps_aspect_ratio(self):
+        canvas, scale, pad_x, pad_y = letterbox(Image.new("RGB", (100, 50), (255, 255, 255)), INPUT_SIZE)
+        assert canvas.shape == (INPUT_SIZE, INPUT_SIZE, 3)
+        assert (scale, pad_x, pad_y) == (0.64, 0, 16)
+        assert canvas[pad_y:INPUT_SIZE - pad_y].min() == 255
+        assert canvas[:pad_y].max() == canvas[INPUT_SIZE - pad_y:].max() == 114
+
+    def test_nms_keeps_best_of_overlapping_boxes(self):
+        boxes = np.array([[0, 0, 10, 10], [1, 0, 11, 10], [20, 20, 30, 30]], dtype=np.float32)
+        scores = np.array([0.8, 0.9, 0.5], dtype=np.float32)
+        assert non_max_suppression(boxes, scores, 0.5, limit=10).tolist() == [1, 2]
+        assert non_max_suppression(boxes, scores, 0.5, limit=1).tolist() == [1]
+
+
+# ── Detector on a tiny ONNX model ─────────────────────────────────────────────
+
+@pytest.fixture
+def tiny_model(tmp_path):
+    """
+    YOLOv8-shaped export (batch, 4 + 2 classes, 3 anchors): two nearly
+    identical centred boxes scored by image brightness, plus a faint one.
+    """
+    torch = pytest.importorskip("torch")
+    onnx = pytest.importorskip("onnx")
+    pytest.importorskip("onnxruntime")
+
+    class TinyYolo(torch.nn.Module):
+        def forward(self, images):
+            brightness = images.mean(dim=(1, 2, 3))
+            half = INPUT_SIZE / 2
+            boxes = torch.tensor([
+                [half, half + 2, 10.0],
+                [half, half, 10.0],
+                [half, half, 4.0],
+                [half, half, 4.0],
+            ]).expand(images.shape[0], 4, 3)
+            faint = torch.full_like(brightness, 0.01)
+            locomotive = torch.stack([brightness, brightness * 0.9, faint], dim=1)
+            person = torch.stack([torch.zeros_like(brightness), torch.zeros_like(brightness), faint], dim=1)
+            return torch.cat([boxes, locomotive[:, None], person[:, None]], dim=1)
+
+    path = tmp_path / "tiny-yolo.onnx"
+    torch.onnx.export(
+        TinyYolo(), (torch.zeros(1, 3, INPUT_SIZE, INPUT_SIZE),), str(path),
+        input_names=["images"], output_names=["output0"],
+        dynamic_axes={"images": {0: "batch"}, "output0": {0: "batch"}},
+        opset_version=17, dynamo=False,
+    )
+    model = onnx.load(str(path))
+    onnx.helper.set_model_props(model, {"names": "{0: 'locomotive', 1: 'person'}"})
+    onnx.save(model, str(path))
+    return path
+
+
+@pytest.fixture
+def images(tmp_path):
+    paths = []
+    for name, colour in (("bright", (255, 255, 255)), ("dark", (0, 0, 0))):
+        path = tmp_path / f"{name}.jpg"
+        Image.new("RGB", (100, 50), colour).save(path)
+        paths.append(str(path))
+    return paths
+
+
+class TestYoloOnnxDetector:
+
+    def test_batch_of_images_in_one_pass(self, tiny_model, images):
+        from app.infrastructure.analysis.providers.objects.yolo_onnx_detector import YoloOnnxDetector
+
+        detector = YoloOnnxDetector(tiny_model, min_score=0.25)
+        bright, dark = detector.analyze_batch(images)
+
+        assert detector.classes == ("locomotive", "person")
+        assert bright["error"] is None and bright["provider_version"] == "tiny-yolo+onnx"
+        # The overlapping second box is suppressed; the box maps back to the
+        # un-letterboxed 100x50 image: centre half horizontally, full height
+        [locomotive] = bright["objects"]
+        assert locomotive["label"] == "locomotive" and locomotive["score"] > 0.7
+        assert locomotive["box"] == pytest.approx([0.25, 0.0, 0.75, 1.0], abs=0.01)
+        # Only the grey letterbox bars light up the dark image: below min_score
+        assert dark["objects"] == [] and dark["error"] is None
+
+    def test_missing_model_is_an_error_result(self, tmp_path, images):
+        pytest.importorskip("onnxruntime")
+        from app.infrastructure.analysis.providers.objects.yolo_onnx_detector import YoloOnnxDetector
+
+        results = YoloOnnxDetector(tmp_path / "missing.onnx").analyze_batch(images)
+        assert all("not found" in r["error"] for r in results)
+
+
+# ── Stored detections and routes ──────────────────────────────────────────────
+
+@pytest.fixture
+async def sessions(sessions):
+    """Photographs 1-2 public (1930s and 1960s), 3 private; users 1 curator and 2 standard."""
+    async with sessions() as session:
+        for i, role in ((1, Role.CURADOR), (2, Role.USUARIO_ESTANDAR)):
+            session.add(UserModel(id=i, email=f"u{i}@x.cl", username=f"u{i}", hashed_password="x", role=role))
+        session.add(CollectionModel(id=1, name="Gerstmann", is_public=True))
+        session.add(BoxModel(id=1, collection_id=1, box_number=1))
+        session.add(RollModel(id=1, box_id=1))
+        for photo_id, decade in ((1, 1930), (2, 1960), (3, 1930)):
+            session.add(PhotographModel(
+                id=photo_id, roll_id=1, frame_number=photo_id, identifier=f"G-{photo_id:03d}",
+                is_public=photo_id != 3,
+            ))
+            session.add(PhotographFileModel(
+                id=photo_id, photograph_id=photo_id, file_type=FileType.JPG,
+                file_path=f"/archive/G-{photo_id:03d}.jpg", is_master=True,
+            ))
+            session.add(AttrChronologyDatingModel(
+                photograph_id=photo_id, status=AttributeStatus.ACTIVE,
+                date_from=date(decade, 1, 1), date_to=date(decade + 9, 12, 31),
+            ))
+        await session.commit()
+    return sessions
+
+
+def _result(*objects) -> dict:
+    return {
+        "objects": [{"label": label, "score": score, "box": [0.1, 0.1, 0.5, 0.5]} for label, score in objects],
+        "error": None, "provider": "yolo-onnx", "provider_version": "tiny+onnx",
+    }
+
+
+async def _store_trains(sessions) -> None:
+    async with sessions() as session:
+        await store_detections(session, 1, 1, _result(("train", 0.9), ("train", 0.8), ("person", 0.6)))
+        await store_detections(session, 2, 2, _result(("train", 0.7)))
+        await store_detections(session, 3, 3, _result(("train", 0.95)))
+        await session.commit()
+
+
+class TestObjectQueries:
+
+    async def test_rescan_replaces_objects(self, sessions):
+        await _store_trains(sessions)
+        async with sessions() as session:
+            assert await store_detections(session, 1, 1, _result(("bicycle", 0.5))) == 1
+            await session.commit()
+            classes = await object_classes(session, ObjectQuery(min_score=0.0, year_from=1930, year_to=1939))
+        assert [(c.label, c.photographs, c.objects) for c in classes] == [("bicycle", 1, 1)]
+
+    async def test_classes_and_photographs_by_decade(self, sessions):
+        await _store_trains(sessions)
+        async with sessions() as session:
+            classes = await object_classes(session, ObjectQuery(min_score=0.5))
+            assert [(c.label, c.photographs, c.objects) for c in classes] == [("train", 2, 3), ("person", 1, 1)]
+
+            total, page = await photographs_with_object(
+                session, ObjectQuery(label="Train", min_score=0.5, year_from=1930, year_to=1939),
+            )
+            assert total == 1 and [(p.photograph_id, p.count, p.max_score) for p in page] == [(1, 2, 0.9)]
+
+            # The private photograph counts for its curator only
+            total, page = await photographs_with_object(session, ObjectQuery(label="train", only_public=False), 1)
+            assert total == 3 and [p.photograph_id for p in page] == [1, 3, 2]
+            total, page = await photographs_with_object(session, ObjectQuery(label="train", only_public=False), 2)
+            assert total == 2 and [p.photograph_id for p in page] == [1, 2]
+            classes = await object_classes(session, ObjectQuery(only_public=False), None)
+            assert classes == []
+
+    async def test_detect_photographs_with_onnx_model(self, sessions, tiny_model, images, monkeypatch):
+        from app.config.settings import settings
+
+        monkeypatch.setattr(settings, "use_local_object_detection", True)
+        monkeypatch.setattr(settings, "object_detection_model", str(tiny_model))
+        async with sessions() as session:
+            for photo_id, path in ((1, images[0]), (2, images[1])):
+                (await session.get(PhotographFileModel, photo_id)).file_path = path
+            await session.commit()
+
+            assert await detect_photographs(session, [1, 2, 3]) == (2, 1)
+            await session.commit()
+            classes = await object_classes(session, ObjectQuery(min_score=0.25))
+        assert [(c.label, c.photographs, c.objects) for c in classes] == [("locomotive", 1, 1)]
+
+
+class TestObjectRoutes:
+
+    @pytest.fixture
+    async def client(self, sessions):
+        await _store_trains(sessions)
+
+        async def db():
+            async with sessions() as session:
+                yield session
+
+        app = FastAPI()
+        app.include_router(router)
+        app.dependency_overrides[get_db] = db
+        app.dependency_overrides[get_current_user_id] = lambda: 2
+        return TestClient(app)
+
+    def test_classes(self, client):
+        response = client.get("/objects/classes", params={"year_from": 1960})
+        assert response.status_code == 200
+        assert response.json() == [{"label": "train", "photographs": 1, "objects": 1}]
+
+    def test_photographs_with_label(self, client):
+        body = client.get("/objects/photographs", params={"label": "TRAIN", "limit": 1}).json()
+        assert body["label"] == "train" and body["total"] == 2
+        assert [p["photograph_id"] for p in body["photographs"]] == [1]
+
+    def test_invalid_year_range(self, client):
+        response = client.get("/objects/photographs", params={"label": "train", "year_from": 1960, "year_to": 1930})
+        assert response.status_code == 422
+
+    def test_photograph_objects(self, client):
+        body = client.get("/objects/photographs/1").json()
+        assert [o["label"] for o in body["objects"]] == ["train", "train", "person"]
+        assert body["provider"] == "yolo-onnx"
+        assert client.get("/objects/photographs/3").status_code == 403
+        assert client.get("/objects/photographs/99").status_code == 404
@@ -0,0 +1,145 @@
+"""
+Unit tests for visual (text-to-image) search: SQL filters restricting the
+embedding scan, the per-query text embedding cache and the /search/visual
+route (SQLite in a temp file, CLIP text tower replaced by fixed vectors).
+"""
+
+from collections import OrderedDict
+from datetime import date
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.config.settings import settings
+from app.features.archive.infrastructure.persistence.archive_model import (
+    BoxModel,
+    PhotographModel,
+    RollModel,
+)
+from app.features.authenticate.domain.role import Role
+from app.features.authenticate.infrastructure.persistence.user_model import UserModel
+from app.features.authenticate.interfaces.api.dependencies import get_current_user_id
+from app.features.search_filter.infrastructure.adapters import search_service
+from app.features.search_filter.interfaces.api.routes import router
+from app.features.taxonomy.domain.taxonomy import AttributeStatus
+from app.features.taxonomy.infrastructure.persistence.taxonomy_model import AttrChronologyDatingModel
+from app.features.view_images.infrastructure.persistence.image_model import CollectionModel
+from app.infrastructure.analysis.embedding_index import EmbeddingIndex
+from app.infrastructure.analysis.executor import analysis_executor
+from app.infrastructure.database.session import get_db
+
+VECTORS = np.random.default_rng(3).standard_normal((5, 32)).astype(np.float32)
+
+
+@pytest.fixture
+async def sessions(sessions):
+    """
+    Collection 1 public: photographs 1 (1930s), 2 (1960s), 3 (not public),
+    5 (no embedding). Collection 2 private: photograph 4.
+    Users 1 curator, 2 outsider.
+    """
+    async with sessions() as session:
+        for i, role in ((1, Role.CURADOR), (2, Role.COLABORADOR)):
+            session.add(UserModel(id=i, email=f"u{i}@x.cl", username=f"u{i}", hashed_password="x", role=role))
+        session.add(CollectionModel(id=1, name="Gerstmann", is_public=True))
+        session.add(CollectionModel(id=2, name="Privada", is_public=False))
+        for collection_id in (1, 2):
+            session.add(BoxModel(id=collection_id, collection_id=collection_id, box_number=1))
+            session.add(RollModel(id=collection_id, box_id=collection_id))
+        for photo_id, roll_id, public in ((1, 1, True), (2, 1, True), (3, 1, False), (4, 2, True), (5, 1, True)):
+            session.add(PhotographModel(id=photo_id, roll_id=roll_id, identifier=f"G-00{photo_id}", is_public=public))
+        for photo_id, decade in ((1, 1930), (2, 1960)):
+            session.add(AttrChronologyDatingModel(
+                photograph_id=photo_id, status=AttributeStatus.ACTIVE,
+                date_from=date(decade, 1, 1), date_to=date(decade + 9, 12, 31),
+            ))
+        await session.commit()
+    return sessions
+
+
+@pytest.fixture
+def encoded_texts(monkeypatch) -> list[str]:
+    """Texts sent to the (fixed-vector) CLIP text tower."""
+    calls = []
+
+    async def encode_text(attribute, text):
+        calls.append(text)
+        return ("clip/test", VECTORS[3] + 0.5 * VECTORS[0]) if settings.attr02_analyzer != "stub" else None
+
+    monkeypatch.setattr(settings, "attr02_analyzer", "clip")
+    monkeypatch.setattr(analysis_executor, "encode_text", encode_text)
+    monkeypatch.setattr(search_service, "_text_embeddings", OrderedDict())
+    return calls
+
+
+@pytest.fixture
+def client(sessions, encoded_texts, tmp_path, monkeypatch):
+    index = EmbeddingIndex("clip/test", root=tmp_path)
+    for photo_id in (1, 2, 3, 4):
+        index.add(photo_id, VECTORS[photo_id - 1])
+    monkeypatch.setattr(search_service, "embeddings_for", lambda model: index)
+
+    app = FastAPI()
+    app.include_router(router, prefix="/api")
+
+    async def db():
+        async with sessions() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = db
+    app.dependency_overrides[get_current_user_id] = lambda: 1
+    return TestClient(app)
+
+
+def _ids(response) -> list[int]:
+    assert response.status_code == 200, response.text
+    return [match["photograph_id"] for match in response.json()["photographs"]]
+
+
+class TestVisualSearch:
+
+    def test_ranks_public_photographs_and_caches_the_query(self, client, encoded_texts):
+        query = VECTORS[3] + 0.5 * VECTORS[0]
+        expected = sorted((1, 2), key=lambda pid: -float(VECTORS[pid - 1] @ query))
+
+        response = client.get("/api/search/visual", params={"query": "A locomotive"})
+        assert _ids(response) == expected
+        body = response.json()
+        assert body["candidates"] == 3 and body["embedding_model"] == "clip/test"
+        assert body["photographs"][0]["collection_id"] == 1
+        assert _ids(client.get("/api/search/visual", params={"query": "  a  LOCOMOTIVE"})) == expected
+        assert encoded_texts == ["a locomotive"]
+
+    def test_year_and_collection_filters(self, client):
+        assert _ids(client.get("/api/search/visual", params={"query": "x", "year_from": 1960})) == [2]
+        assert _ids(client.get("/api/search/visual", params={"query": "x", "year_to": 1935})) == [1]
+        assert _ids(client.get("/api/search/visual", params={"query": "x", "year_from": 1940, "year_to": 1950})) == []
+        params = {"query": "x", "collection_id": 2}
+        assert _ids(client.get("/api/search/visual", params=params)) == []
+        assert _ids(client.get("/api/search/visual", params={**params, "only_public": False})) == [4]
+
+    def test_non_public_photographs_follow_access_rules(self, client, monkeypatch):
+        restrictions = []
+        search = EmbeddingIndex.search
+        monkeypatch.setattr(
+            EmbeddingIndex, "search",
+            lambda self, query, k, exclude=(), only=None: restrictions.append(only) or search(self, query, k, exclude, only),
+        )
+        params = {"query": "x", "only_public": False, "limit": 10}
+        response = client.get("/api/search/visual", params=params)
+        assert sorted(_ids(response)) == [1, 2, 3, 4]
+        assert response.json()["candidates"] == 5 and restrictions == [None]  # curator: whole index
+
+        client.app.dependency_overrides[get_current_user_id] = lambda: 2
+        response = client.get("/api/search/visual", params=params)
+        assert sorted(_ids(response)) == [1, 2]
+        assert response.json()["candidates"] == 3 and sorted(restrictions[1]) == [1, 2, 5]
+
+    def test_errors(self, client, monkeypatch):
+        bad_years = {"query": "x", "year_from": 1990, "year_to": 1950}
+        assert client.get("/api/search/visual", params=bad_years).status_code == 422
+        assert client.get("/api/search/visual").status_code == 422
+        monkeypatch.setattr(settings, "attr02_analyzer", "stub")
+        assert client.get("/api/search/visual", params={"query": "x"}).status_code == 503